@@ -2,7 +2,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 from pydantic import EmailStr, HttpUrl, Field, validator # Import necessary types and Field, validator
-from typing import Optional # Import Optional
+from typing import Dict, List, Optional # Import Optional
 from pydantic import model_validator
 # import logging # Import logging
 
@@ -21,6 +21,69 @@ class Settings(BaseSettings):
     DATABASE_POOL_MAX_TOTAL: int = Field(20, description="最大总连接数")
     DATABASE_POOL_BLOCKING: bool = Field(True, description="连接池满时是否阻塞等待")
 
+    # Read-only Connection Settings
+    DATABASE_READ_ISOLATION_LEVEL: Optional[str] = None # 只读连接的会话隔离级别，例如 SNAPSHOT（需数据库开启 ALLOW_SNAPSHOT_ISOLATION）；默认使用数据库默认级别
+
+    # Read Replica Settings
+    DATABASE_READ_REPLICAS: List[str] = Field(default_factory=list, description='读副本服务器地址列表 (JSON 数组，如 ["replica1,1433"])，只读连接优先使用；为空时全部走主库')
+    DATABASE_READ_YOUR_WRITES_SECONDS: float = 5.0 # 用户写入后该时长（秒）内的读请求仍走主库，应大于副本的复制延迟
+    DATABASE_READ_REPLICA_RETRY_SECONDS: float = 30.0 # 副本连接失败后暂停使用该副本的时长（秒）
+
+    # Transient Error Retry Settings
+    DB_RETRY_MAX_ATTEMPTS: int = Field(3, ge=1, description="死锁 / 锁超时时工作单元的最多执行次数 (包含第一次)")
+    DB_RETRY_BASE_DELAY_MS: int = 50 # 第一次重试前的最大等待时间（毫秒），之后每次翻倍并随机抖动
+    DB_RETRY_MAX_DELAY_MS: int = 1000 # 单次重试等待的上限（毫秒）
+    DB_RETRY_BUDGET_MS: int = 3000 # 一个工作单元所有尝试与等待的总时间预算（毫秒）
+
+    # Circuit Breaker Settings
+    DB_CIRCUIT_BREAKER_ENABLED: bool = True # 主库连接连续失败后熔断：打开期间直接返回 503，不再等待连接超时
+    DB_CIRCUIT_FAILURE_THRESHOLD: int = Field(5, ge=1, description="连续多少次连接失败后打开熔断器")
+    DB_CIRCUIT_RESET_SECONDS: float = Field(10.0, gt=0, description="熔断器打开后多久（秒）放行一个探测连接")
+
+    # Query Timeout / Cancellation Settings
+    DB_QUERY_TIMEOUT_SECONDS: int = Field(30, ge=0, description="单次数据库调用的默认超时（秒），由驱动强制 (SQL_ATTR_QUERY_TIMEOUT)；0 表示不限制")
+    DB_PRODUCT_LIST_TIMEOUT_SECONDS: float = 5.0 # 商品列表 / 关键词搜索请求中全部数据库调用的截止时间（秒）
+    CANCEL_ON_CLIENT_DISCONNECT: bool = True # 客户端在响应发出前断开时取消请求的处理 (排队中的数据库调用不再执行，执行中的语句发送取消)
+
+    # Order Stock Admission Settings
+    ORDER_STOCK_GATE_ENABLED: bool = True # 下单前在进程内按商品排队，已知库存不足时直接拒绝而不访问数据库
+    ORDER_STOCK_GATE_CONCURRENCY: int = Field(1, ge=1, description="每个商品同时进入数据库的下单请求数 (每个进程)")
+    ORDER_STOCK_GATE_TTL_SECONDS: float = 5.0 # 已知库存记录的有效期（秒）；其它进程售出或卖家补货后最多这么久恢复准确
+    ORDER_STOCK_GATE_MAX_PRODUCTS: int = 10000 # 最多保存库存记录的商品数
+
+    # Concurrency Limit (Load Shedding) Settings
+    CONCURRENCY_LIMIT_ENABLED: bool = True # 按路由类别限制同时持有数据库连接的请求数，饱和时排队，队列满 / 超时返回 503
+    CONCURRENCY_LIMITS: Dict[str, int] = Field(
+        default_factory=lambda: {"browse": 16, "write": 8, "admin": 2, "auth": 6},
+        description="各路由类别 (browse / write / admin / auth) 每个进程同时执行的请求数 (JSON)；总和应不超过数据库可承受的连接数与线程池大小",
+    )
+    CONCURRENCY_MAX_QUEUE: Dict[str, int] = Field(
+        default_factory=lambda: {"browse": 32, "write": 16, "admin": 4, "auth": 12},
+        description="各路由类别最多排队的请求数 (JSON)，超出时直接返回 503",
+    )
+    CONCURRENCY_QUEUE_TIMEOUT_MS: int = Field(2000, ge=0, description="排队等待并发名额的最长时间（毫秒），超时返回 503")
+
+    # Rate Limit Settings
+    RATE_LIMIT_ENABLED: bool = True # 对登录、发送验证码 / 重置邮件的接口按 IP 与账号做令牌桶限流，超出时返回 429
+    RATE_LIMIT_POLICIES: Dict[str, Dict[str, str]] = Field(
+        default_factory=lambda: {
+            "login": {"ip": "20/60", "account": "10/300"},
+            "email": {"ip": "10/600", "account": "3/300"},
+        },
+        description='各限流策略按 ip / account 的令牌桶，"容量/秒数" 表示最多突发 容量 次、每 秒数 秒补满 (JSON)',
+    )
+    RATE_LIMIT_MAX_KEYS: int = Field(100000, ge=1, description="内存中最多保存的令牌桶数，超出时丢弃最久未使用的")
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False # 部署在反向代理之后时设为 True，按 X-Forwarded-For 中代理追加的最后一个地址识别客户端
+
+    # Background Maintenance Settings
+    MAINTENANCE_ENABLED: bool = False # 在进程内定时清理过期 OTP / 密码重置 Token 与旧的已读通知 (多进程时只有持锁的一个执行)；默认关闭，生产环境在 .env 中开启
+    MAINTENANCE_INTERVAL_SECONDS: int = Field(600, ge=10, description="维护任务的执行间隔（秒）")
+    MAINTENANCE_BATCH_SIZE: int = Field(1000, ge=1, le=4000, description="每批删除的行数；保持在 5000 以下以免行锁升级为表锁")
+    MAINTENANCE_MAX_BATCHES: int = Field(50, ge=1, description="每个清理任务单轮最多执行的批数，剩余的留到下一轮")
+    MAINTENANCE_BATCH_PAUSE_MS: int = Field(50, ge=0, description="批次之间的暂停（毫秒），让出锁给在线请求")
+    MAINTENANCE_TOKEN_GRACE_HOURS: int = 24 # OTP / 密码重置 Token 过期或使用后保留的小时数
+    MAINTENANCE_NOTIFICATION_RETENTION_DAYS: int = 90 # 已读通知的保留天数
+
     # Parameters for pyodbc.connect to be passed directly
     # This allows flexibility for various connection string options
     PYODBC_PARAMS: dict = Field(default_factory=lambda: {},
@@ -60,6 +123,49 @@ class Settings(BaseSettings):
     # OTP Expiration
     OTP_EXPIRE_MINUTES: int = 5 # OTP过期时间（分钟）
 
+    # File Upload Settings
+    UPLOAD_MAX_SIZE_BYTES: int = 10 * 1024 * 1024 # 单个上传文件大小上限（字节）
+    UPLOAD_CHUNK_SIZE_BYTES: int = 1024 * 1024 # 上传文件流式写盘的分块大小（字节）
+
+    # Uploads Static Serving Settings
+    UPLOADS_CACHE_MAX_AGE: int = 31536000 # /uploads 响应的 Cache-Control max-age（秒），上传文件不可变
+    UPLOADS_DERIVATIVE_CACHE_MAX_AGE: int = 86400 # 派生图片（缩略图 / WebP）的 max-age（秒），调整图片处理设置后会重新生成
+    UPLOADS_ACCEL_REDIRECT_PREFIX: Optional[str] = None # 设置后通过 X-Accel-Redirect 交给前置代理发送文件，例如 /internal-uploads/
+
+    # Image Processing Settings
+    IMAGE_THUMBNAIL_SIZE: int = 320 # 缩略图最长边（像素）
+    IMAGE_WEBP_QUALITY: int = 80 # WebP 编码质量
+    IMAGE_PROCESS_WORKERS: Optional[int] = None # 图片处理进程数，默认 min(2, CPU 核数)
+    IMAGE_MAX_CONCURRENT_JOBS: int = 4 # 同时提交到进程池的图片处理任务上限
+
+    # Logging Settings
+    LOG_CONFIG_FILE: Optional[str] = None # 日志配置文件路径，默认项目根目录的 logging_config.json
+    LOG_LEVEL: Optional[str] = None # 覆盖 app logger 的级别，例如 DEBUG；默认使用配置文件中的级别
+
+    # Monitoring Settings
+    DB_SLOW_QUERY_THRESHOLD_MS: int = 500 # 存储过程调用超过该耗时（毫秒）时记录慢查询日志
+    DB_SLOW_QUERY_PARAMS_SAMPLE_RATE: float = Field(0.1, ge=0, le=1, description="慢查询日志中输出参数的抽样比例 (只对 db_metrics.LOGGABLE_PARAM_PROCEDURES 中的过程生效)")
+
+    @validator('DATABASE_READ_ISOLATION_LEVEL')
+    def validate_read_isolation_level(cls, v):
+        if v is None:
+            return v
+        level = " ".join(v.upper().split())
+        if level not in ('READ UNCOMMITTED', 'READ COMMITTED', 'REPEATABLE READ', 'SNAPSHOT', 'SERIALIZABLE'):
+            raise ValueError('DATABASE_READ_ISOLATION_LEVEL 必须是 READ UNCOMMITTED / READ COMMITTED / REPEATABLE READ / SNAPSHOT / SERIALIZABLE 之一')
+        return level
+
+    @validator('RATE_LIMIT_POLICIES')
+    def validate_rate_limit_policies(cls, v):
+        for policy, limits in v.items():
+            for scope, limit in limits.items():
+                if scope not in ('ip', 'account'):
+                    raise ValueError(f'RATE_LIMIT_POLICIES.{policy} 只能包含 ip / account，收到 {scope}')
+                capacity, _, period = limit.partition('/')
+                if not (capacity.isdigit() and int(capacity) > 0 and period.replace('.', '', 1).isdigit() and float(period) > 0):
+                    raise ValueError(f'RATE_LIMIT_POLICIES.{policy}.{scope} 的格式应为 "容量/秒数"，收到 {limit}')
+        return v
+
     @validator('EMAIL_PROVIDER')
     def validate_email_provider(cls, v):
         if v not in ('smtp', 'aliyun'):
@@ -0,0 +1,231 @@
+"""
+按路由类别的并发预算 (load shedding)：数据库变慢时，限制同时持有数据库连接的请求数，
+超出的请求在有界队列中等待一小段时间，队列已满或等待超时时立即返回 503，而不是无限排队。
+
+路由分为四类，各自有独立的并发数与队列长度，一类饱和不会占满其它类的预算:
+  browse  GET / HEAD / OPTIONS 读取
+  write   其它方法 (下单、发布商品等写操作)
+  admin   依赖管理员身份的路由 (register_admin_dependency 登记的依赖)
+  auth    /auth 下的登录、注册、验证码接口
+
+只有需要数据库连接的请求经过这里 (见 app.dal.connection 中的 concurrency_slot 依赖)，
+/metrics、/uploads 静态文件等不访问数据库的接口在数据库故障期间不受影响。
+"""
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Optional, Set, Tuple
+
+from fastapi import Request
+
+from app.config import settings
+from app.core.metrics import REGISTRY, MetricsRegistry
+from app.exceptions import ServiceOverloadedError
+
+logger = logging.getLogger(__name__)
+
+ROUTE_CLASS_BROWSE = "browse"
+ROUTE_CLASS_WRITE = "write"
+ROUTE_CLASS_ADMIN = "admin"
+ROUTE_CLASS_AUTH = "auth"
+
+# 拒绝原因标签
+SHED_QUEUE_FULL = "queue_full"  # 等待队列已满
+SHED_TIMEOUT = "timeout"        # 排队超过 queue_timeout
+
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+QUEUE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class ConcurrencyMetrics:
+    """并发预算相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.in_flight = registry.gauge(
+            "concurrency_in_flight", "持有并发预算 (数据库连接) 的请求数", ("route_class",))
+        self.queued = registry.gauge(
+            "concurrency_queued", "排队等待并发预算的请求数", ("route_class",))
+        self.shed = registry.counter(
+            "concurrency_shed_total", "因并发预算耗尽直接返回 503 的请求数", ("route_class", "reason"))
+        self.queue_wait = registry.histogram(
+            "concurrency_queue_wait_seconds", "获得并发预算前的排队时间 (秒)", ("route_class",), QUEUE_WAIT_BUCKETS)
+
+
+class _Budget:
+    """一个路由类别的并发数与 FIFO 等待队列；释放时把名额直接交给最早的等待者。"""
+
+    __slots__ = ("limit", "max_queue", "active", "waiters")
+
+    def __init__(self, limit: int, max_queue: int) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    def release(self) -> None:
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None) # 名额转交，active 不变
+                return
+        self.active -= 1
+
+
+class ConcurrencyGovernor:
+    """
+    按路由类别分配并发预算。
+
+    Args:
+        limits: 路由类别 -> 同时执行的请求数；未列出的类别不限制。
+        max_queue: 路由类别 -> 最多排队的请求数 (0 表示不排队，饱和时直接拒绝)。
+        queue_timeout: 排队的最长时间 (秒)，超时返回 503。
+        clock: 单调时钟 (测试时可替换)。
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, int],
+        max_queue: Dict[str, int],
+        queue_timeout: float = 2.0,
+        metrics: Optional[ConcurrencyMetrics] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.queue_timeout = queue_timeout
+        self.metrics = metrics or get_concurrency_metrics()
+        self.clock = clock
+        self._budgets = {name: _Budget(limit, max_queue.get(name, 0)) for name, limit in limits.items()}
+
+    def _shed(self, route_class: str, reason: str) -> None:
+        self.metrics.shed.inc(route_class, reason)
+        logger.warning("Shedding %s request: %s", route_class, reason)
+        raise ServiceOverloadedError(retry_after=1, route_class=route_class)
+
+    async def _acquire(self, route_class: str, budget: _Budget) -> None:
+        if budget.active < budget.limit and not budget.waiters:
+            budget.active += 1
+            return
+        if len(budget.waiters) >= budget.max_queue:
+            self._shed(route_class, SHED_QUEUE_FULL)
+
+        waiter = asyncio.get_running_loop().create_future()
+        budget.waiters.append(waiter)
+        self.metrics.queued.inc(route_class)
+        started = self.clock()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                budget.release() # 超时的同时拿到了名额：交给下一个等待者
+            elif waiter in budget.waiters:
+                budget.waiters.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                self._shed(route_class, SHED_TIMEOUT)
+            raise
+        finally:
+            self.metrics.queued.dec(route_class)
+            self.metrics.queue_wait.observe(self.clock() - started, route_class)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, route_class: str) -> AsyncIterator[None]:
+        """
+        在 route_class 的并发预算内执行；预算已满时排队。
+
+        Raises:
+            ServiceOverloadedError: 等待队列已满或排队超时 (路由返回 503)。
+        """
+        budget = self._budgets.get(route_class)
+        if budget is None:
+            yield
+            return
+        await self._acquire(route_class, budget)
+        self.metrics.in_flight.inc(route_class)
+        try:
+            yield
+        finally:
+            self.metrics.in_flight.dec(route_class)
+            budget.release()
+
+
+_admin_dependencies: Set[Callable] = set()
+
+
+def register_admin_dependency(dependency: Callable) -> None:
+    """登记表示管理员路由的依赖函数，依赖它的路由归入 admin 类别。"""
+    _admin_dependencies.add(dependency)
+
+
+def _depends_on_admin(dependant) -> bool:
+    return any(
+        sub.call in _admin_dependencies or _depends_on_admin(sub)
+        for sub in getattr(dependant, "dependencies", ())
+    )
+
+
+_route_classes: Dict[Tuple[int, str], str] = {}
+
+
+def route_class(request: Request) -> str:
+    """按匹配到的路由与请求方法确定路由类别 (按路由缓存)。"""
+    route = request.scope.get("route")
+    method = request.method
+    key = (id(route), method)
+    cached = _route_classes.get(key)
+    if cached is not None:
+        return cached
+
+    path = getattr(route, "path", request.url.path)
+    if route is not None and _depends_on_admin(getattr(route, "dependant", None)):
+        result = ROUTE_CLASS_ADMIN
+    elif "auth" in path.strip("/").split("/"):
+        result = ROUTE_CLASS_AUTH
+    elif method in _SAFE_METHODS:
+        result = ROUTE_CLASS_BROWSE
+    else:
+        result = ROUTE_CLASS_WRITE
+    if route is not None:
+        _route_classes[key] = result
+    return result
+
+
+async def concurrency_slot(request: Request) -> AsyncIterator[None]:
+    """
+    依赖函数：在请求的路由类别预算内持有一个名额，直到请求结束 (数据库连接关闭之后) 才释放。
+
+    Raises:
+        ServiceOverloadedError: 预算与队列都已满或排队超时。
+    """
+    governor = get_concurrency_governor()
+    if governor is None:
+        yield
+        return
+    async with governor.admit(route_class(request)):
+        yield
+
+
+_default_metrics = None
+_default_governor = None
+
+
+def get_concurrency_metrics() -> ConcurrencyMetrics:
+    """全局注册表上的并发预算指标 (首次使用时注册)。"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = ConcurrencyMetrics(REGISTRY)
+    return _default_metrics
+
+
+def get_concurrency_governor() -> Optional[ConcurrencyGovernor]:
+    """按 settings 创建的进程级并发预算；CONCURRENCY_LIMIT_ENABLED 关闭时返回 None。"""
+    global _default_governor
+    if not settings.CONCURRENCY_LIMIT_ENABLED:
+        return None
+    if _default_governor is None:
+        _default_governor = ConcurrencyGovernor(
+            limits=settings.CONCURRENCY_LIMITS,
+            max_queue=settings.CONCURRENCY_MAX_QUEUE,
+            queue_timeout=settings.CONCURRENCY_QUEUE_TIMEOUT_MS / 1000,
+        )
+    return _default_governor
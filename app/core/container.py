@@ -0,0 +1,92 @@
+# app/core/container.py
+"""
+应用级单例容器：在 lifespan 启动时创建一次 DAL / Service，并持有需要在关闭时释放的共享资源。
+
+DAL 与 Service 本身不保存请求状态 (连接由 get_db_connection 按请求注入并作为参数传入)，
+因此可以在所有请求间共享；依赖函数只需从 app.state.container 取出现成的实例。
+"""
+import logging
+from typing import Any, Callable, Optional
+
+from app.dal.base import execute_query
+from app.dal.user_dal import UserDAL
+from app.dal.orders_dal import OrdersDAL
+from app.dal.evaluation_dal import EvaluationDAL
+from app.dal.product_dal import ProductDAL, ProductImageDAL, UserFavoriteDAL
+from app.dal.upload_dal import UploadDAL
+from app.dal.maintenance_dal import MaintenanceDAL
+from app.dal.connection import open_connection, close_connection
+from app.services.user_service import UserService
+from app.services.order_service import OrderService
+from app.services.stock_gate import get_stock_gate
+from app.services.evaluation_service import EvaluationService
+from app.services.product_service import ProductService
+from app.services.upload_service import UploadService
+from app.services.maintenance import build_maintenance_runner, start_maintenance_scheduler
+from app.config import settings
+from app.utils.image_processing import shutdown_image_pool
+
+logger = logging.getLogger(__name__)
+
+
+class AppContainer:
+    """
+    持有应用生命周期内共享的 DAL、Service 与资源。
+
+    Args:
+        execute_query_func: 注入各 DAL 的查询执行函数 (测试时可替换)。
+        email_sender: UserService 使用的邮件发送函数，默认 app.utils.email_sender.send_email。
+    """
+
+    def __init__(self, execute_query_func: Callable[..., Any] = execute_query, email_sender: Optional[Callable] = None) -> None:
+        # --- DAL ---
+        self.user_dal = UserDAL(execute_query_func=execute_query_func)
+        self.orders_dal = OrdersDAL(execute_query_func=execute_query_func)
+        self.evaluation_dal = EvaluationDAL(execute_query_func=execute_query_func)
+        self.product_dal = ProductDAL(execute_query_func=execute_query_func)
+        self.product_image_dal = ProductImageDAL(execute_query_func=execute_query_func)
+        self.user_favorite_dal = UserFavoriteDAL(execute_query_func=execute_query_func)
+        self.upload_dal = UploadDAL(execute_query_func=execute_query_func)
+        self.maintenance_dal = MaintenanceDAL(execute_query_func=execute_query_func)
+
+        # --- Service ---
+        self.user_service = UserService(user_dal=self.user_dal, email_sender=email_sender)
+        self.order_service = OrderService(order_dal=self.orders_dal, stock_gate=get_stock_gate())
+        self.evaluation_service = EvaluationService(evaluation_dal=self.evaluation_dal)
+        self.product_service = ProductService(
+            product_dal=self.product_dal,
+            product_image_dal=self.product_image_dal,
+            user_favorite_dal=self.user_favorite_dal,
+        )
+        self.upload_service = UploadService(upload_dal=self.upload_dal)
+
+        # --- 后台维护 (startup 时按配置启动) ---
+        self.maintenance_runner = build_maintenance_runner(self.maintenance_dal, open_connection, close_connection)
+        self.maintenance_scheduler = None
+
+        self._closed = False
+
+    async def startup(self) -> None:
+        """启动时的初始化：DAL/Service 均在构造时完成；MAINTENANCE_ENABLED 时启动后台维护调度器。"""
+        if settings.MAINTENANCE_ENABLED and self.maintenance_scheduler is None:
+            self.maintenance_scheduler = start_maintenance_scheduler(
+                self.maintenance_runner, settings.MAINTENANCE_INTERVAL_SECONDS)
+        logger.info("Application container started.")
+
+    async def shutdown(self) -> None:
+        """释放共享资源：维护调度器与维护连接、图片处理进程池、(已启用时的) 数据库连接池。可重复调用。"""
+        if self._closed:
+            return
+        self._closed = True
+        if self.maintenance_scheduler is not None:
+            self.maintenance_scheduler.shutdown(wait=False)
+            self.maintenance_scheduler = None
+        await self.maintenance_runner.close()
+        shutdown_image_pool()
+        try:
+            from app.core.db import close_db_pool
+        except ImportError:  # 连接池依赖 DBUtils，未安装时不会启用
+            close_db_pool = None
+        if close_db_pool is not None:
+            close_db_pool()
+        logger.info("Application container shut down.")
@@ -68,4 +68,16 @@ def get_pooled_connection() -> pyodbc.Connection:
         return conn
     except Exception as e:
         logger.error(f"Failed to get connection from pool: {e}")
-        raise DALError(f"Failed to get database connection from pool: {e}") from e 
\ No newline at end of file
+        raise DALError(f"Failed to get database connection from pool: {e}") from e 
+
+def get_pool_stats():
+    """
+    返回连接池状态 {"in_use", "idle", "max"}；连接池未初始化时返回 None。
+    """
+    if db_pool is None:
+        return None
+    return {
+        "in_use": getattr(db_pool, "_connections", 0),
+        "idle": len(getattr(db_pool, "_idle_cache", ())),
+        "max": getattr(db_pool, "_maxconnections", 0),
+    }
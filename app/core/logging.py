@@ -0,0 +1,200 @@
+# app/core/logging.py
+"""
+日志子系统：队列化的非阻塞输出、JSON 结构化格式与 DEBUG 日志限流。
+
+配置由项目根目录的 logging_config.json 驱动 (也可通过 uvicorn --log-config 直接加载)：
+  - QueueListenerHandler: 请求处理线程只把记录放入内存队列，由后台监听线程写 stderr / stdout；
+  - JsonFormatter: 每条记录输出一行 JSON，extra 字段原样保留；
+  - SamplingFilter: 按 logger 名称对低级别日志做每秒限流与概率抽样，WARNING 及以上始终保留。
+"""
+import atexit
+import json
+import logging
+import logging.config
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Union
+
+import orjson
+
+DEFAULT_CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "logging_config.json"))
+
+# LogRecord 的标准属性；其余属性视为 extra 字段输出
+_RESERVED_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "color_message"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    将日志记录格式化为单行 JSON: {"time", "level", "logger", "message", ...extra}。
+
+    uvicorn 的访问日志等带参数的记录在这里才调用 getMessage()，即只有真正输出的记录才做字符串格式化。
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc_info"] = record.exc_text  # 已由 QueueListenerHandler 转换为文本
+        if record.stack_info:
+            payload["stack_info"] = self.formatStack(record.stack_info)
+        return orjson.dumps(payload, default=str).decode()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    对不高于 level 的日志做限流：每个 logger 每秒最多 max_per_second 条，并按 sample_rate 抽样。
+
+    Args:
+        level: 受限流影响的最高级别 (默认 DEBUG)，更高级别的记录总是通过。
+        max_per_second: 每个 logger 每秒允许的条数，0 表示不限。
+        sample_rate: 通过限流后再按该概率保留 (1.0 表示全部保留)。
+    """
+
+    def __init__(self, level: str = "DEBUG", max_per_second: int = 0, sample_rate: float = 1.0) -> None:
+        super().__init__()
+        self.levelno = logging.getLevelName(level) if isinstance(level, str) else level
+        self.max_per_second = max_per_second
+        self.sample_rate = sample_rate
+        self._windows: Dict[str, List[float]] = {}  # logger 名称 -> [窗口开始时间, 窗口内条数]
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.levelno:
+            return True
+        if self.max_per_second:
+            now = time.monotonic()
+            window = self._windows.get(record.name)
+            if window is None or now - window[0] >= 1.0:
+                window = self._windows[record.name] = [now, 0]
+            if window[1] >= self.max_per_second:
+                self.dropped += 1
+                return False
+            window[1] += 1
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.dropped += 1
+            return False
+        return True
+
+
+def _find_handler(name: str) -> Optional[logging.Handler]:
+    get_handler = getattr(logging, "getHandlerByName", None)  # Python 3.12+
+    if get_handler is not None:
+        return get_handler(name)
+    handler_ref = logging._handlers.get(name)
+    return handler_ref if isinstance(handler_ref, logging.Handler) else None
+
+
+def _resolve_target(target: Union[str, logging.Handler]) -> logging.Handler:
+    if isinstance(target, logging.Handler):
+        return target
+    handler = _find_handler(target) if isinstance(target, str) else None
+    if handler is None:
+        # cfg:// 引用的处理器尚未创建时这里得到的是它的配置字典 (dictConfig 按名称排序依次创建处理器)
+        raise ValueError(f"QueueListenerHandler: 未找到日志处理器 {target!r}，目标处理器需先于队列处理器创建")
+    return handler
+
+
+class QueueListenerHandler(logging.handlers.QueueHandler):
+    """
+    非阻塞的队列日志处理器：emit 只把记录放入有界队列，由 QueueListener 线程交给目标处理器输出。
+
+    目标处理器在 logging 配置中以 cfg:// 引用 (handlers: ["cfg://handlers.console"])，由 dictConfig 在创建本处理器时
+    传入处理器对象；也可以传入已创建的处理器名称。构造时即解析并保持强引用 —— logging 只保存处理器的弱引用，
+    仅按名称引用的处理器在 dictConfig 返回后可能被垃圾回收。队列满时丢弃记录并计数，不阻塞请求。
+
+    Args:
+        handlers: 目标处理器对象或名称列表。
+        queue_size: 队列容量。
+    """
+
+    def __init__(self, handlers: List[Union[str, logging.Handler]], queue_size: int = 10000) -> None:
+        # 按下标取值：dictConfig 的 ConvertingList 只在 __getitem__ 中解析 cfg:// 引用
+        targets = [_resolve_target(handlers[i]) for i in range(len(handlers))]
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.targets: List[logging.Handler] = targets
+        self.listener: Optional[logging.handlers.QueueListener] = None
+        self.dropped = 0
+        self._start_lock = threading.Lock()
+        _queue_handlers.append(self)
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self.listener is not None:
+                return
+            self.listener = logging.handlers.QueueListener(self.queue, *self.targets, respect_handler_level=True)
+            self.listener.start()
+
+    def stop(self) -> None:
+        with self._start_lock:
+            if self.listener is not None:
+                self.listener.stop()  # 输出队列中剩余的记录
+                self.listener = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 不在调用线程中格式化消息 (QueueHandler 默认会调用 self.format)；
+        # 只把异常信息转换为文本，避免 traceback 对象跨线程持有局部变量
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.listener is None:
+            self.start()
+        super().emit(record)
+
+    def close(self) -> None:
+        # dictConfig 重新配置时会关闭旧的处理器
+        self.stop()
+        if self in _queue_handlers:
+            _queue_handlers.remove(self)
+        super().close()
+
+
+_queue_handlers: List[QueueListenerHandler] = []
+
+
+def setup_logging(config_path: Optional[str] = None, level: Optional[str] = None) -> None:
+    """
+    从 JSON 文件加载日志配置并启动队列监听线程。
+
+    Args:
+        config_path: 配置文件路径，默认项目根目录的 logging_config.json。
+        level: 覆盖 "app" logger 的级别 (如 "DEBUG")，为 None 时使用配置文件中的级别。
+    """
+    with open(config_path or DEFAULT_CONFIG_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    if level:
+        config.setdefault("loggers", {}).setdefault("app", {})["level"] = level.upper()
+    logging.config.dictConfig(config)
+    for handler in list(_queue_handlers):
+        handler.start()
+
+
+def shutdown_logging() -> None:
+    """停止所有队列监听线程，输出队列中剩余的日志。"""
+    for handler in list(_queue_handlers):
+        handler.stop()
+
+
+atexit.register(shutdown_logging)
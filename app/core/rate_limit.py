@@ -0,0 +1,225 @@
+"""
+令牌桶限流：登录、发送验证码 / 重置邮件等接口每次都访问数据库并可能发出邮件，
+按客户端 IP 与账号 (邮箱 / 用户名) 分别限制请求速率，超出时返回 429 与 Retry-After。
+
+每个 (策略, ip|account, 值) 对应一个令牌桶：容量为允许的突发请求数，按 容量/周期 的速率补充。
+桶只保存 (剩余令牌, 上次更新时间)，检查时按经过的时间补充后扣减，是 O(1) 的字典操作。
+
+默认使用进程内存储 (InMemoryRateLimitStore)：多进程部署时每个进程各自计数，实际上限为
+进程数 × 容量。需要跨进程共享时实现 RateLimitStore.consume (例如 Redis 上的原子脚本) 并传给 RateLimiter。
+"""
+import logging
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+
+from app.config import settings
+from app.core.metrics import REGISTRY, MetricsRegistry
+from app.exceptions import RateLimitExceededError
+
+logger = logging.getLogger(__name__)
+
+SCOPE_IP = "ip"
+SCOPE_ACCOUNT = "account"
+
+
+class RateLimit(NamedTuple):
+    """一个令牌桶的参数。"""
+    capacity: int  # 桶容量，即允许的突发请求数
+    period: float  # 从空桶补满所需的秒数
+
+    @property
+    def refill_rate(self) -> float:
+        """每秒补充的令牌数。"""
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """解析 "容量/秒数" 格式，例如 "5/60" 表示突发 5 次、60 秒补满。"""
+        capacity, _, period = value.partition("/")
+        return cls(int(capacity), float(period))
+
+
+class RateLimitMetrics:
+    """限流相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.checked = registry.counter(
+            "rate_limit_checked_total", "经过限流检查的请求数", ("policy",))
+        self.rejected = registry.counter(
+            "rate_limit_rejected_total", "因令牌桶已空被拒绝 (429) 的请求数", ("policy", "scope"))
+        self.store_errors = registry.counter(
+            "rate_limit_store_errors_total", "限流存储出错、按放行处理的次数")
+
+
+class RateLimitStore:
+    """令牌桶存储接口。"""
+
+    async def consume(self, key: str, limit: RateLimit, cost: float = 1) -> float:
+        """
+        从 key 对应的桶中取走 cost 个令牌。
+
+        Returns:
+            0 表示取到令牌；令牌不足时不扣减，返回还需等待的秒数。
+        """
+        raise NotImplementedError
+
+
+class InMemoryRateLimitStore(RateLimitStore):
+    """
+    进程内令牌桶存储。
+
+    Args:
+        max_keys: 最多保存的桶数，超出时丢弃最久未使用的桶 (相当于该键重新从满桶开始)。
+        clock: 单调时钟 (测试时可替换)。
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_keys = max_keys
+        self.clock = clock
+        # key -> (剩余令牌, 上次更新时间)；按最近使用顺序排列，最早的在前
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def consume(self, key: str, limit: RateLimit, cost: float = 1) -> float:
+        # 读取与写回之间没有 await，在事件循环中是原子的
+        now = self.clock()
+        state = self._buckets.pop(key, None)
+        if state is None:
+            tokens = float(limit.capacity)
+        else:
+            tokens, updated = state
+            tokens = min(float(limit.capacity), tokens + (now - updated) * limit.refill_rate)
+
+        if tokens >= cost:
+            tokens -= cost
+            wait = 0.0
+        else:
+            wait = (cost - tokens) / limit.refill_rate
+
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            del self._buckets[next(iter(self._buckets))]
+        return wait
+
+
+class RateLimiter:
+    """
+    按策略检查 IP 与账号两个令牌桶。
+
+    Args:
+        store: 令牌桶存储。
+        policies: 策略名 -> {"ip": RateLimit, "account": RateLimit}；缺少的维度不限制。
+    """
+
+    def __init__(
+        self,
+        store: RateLimitStore,
+        policies: Dict[str, Dict[str, RateLimit]],
+        metrics: Optional[RateLimitMetrics] = None,
+    ) -> None:
+        self.store = store
+        self.policies = policies
+        self.metrics = metrics or get_rate_limit_metrics()
+
+    async def _consume(self, policy: str, scope: str, value: str) -> None:
+        limit = self.policies[policy].get(scope)
+        if limit is None:
+            return
+        try:
+            wait = await self.store.consume(f"{policy}:{scope}:{value}", limit)
+        except Exception as e:
+            # 存储不可用时放行，限流故障不应导致登录不可用
+            self.metrics.store_errors.inc()
+            logger.warning("Rate limit store failed for policy %s, allowing request: %s", policy, e)
+            return
+        if wait > 0:
+            self.metrics.rejected.inc(policy, scope)
+            raise RateLimitExceededError(wait, policy)
+
+    async def check(self, policy: str, client_ip: Optional[str], account: Optional[str] = None) -> None:
+        """
+        依次检查 IP 桶与账号桶，各取走一个令牌。
+
+        Raises:
+            RateLimitExceededError: 任一桶已空；retry_after 为下一个令牌可用前的秒数。
+        """
+        if policy not in self.policies:
+            return
+        self.metrics.checked.inc(policy)
+        if client_ip:
+            await self._consume(policy, SCOPE_IP, client_ip)
+        if account:
+            await self._consume(policy, SCOPE_ACCOUNT, account)
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """客户端地址；RATE_LIMIT_TRUST_FORWARDED_FOR 时取 X-Forwarded-For 中 (可信代理追加的) 最后一个地址。"""
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip() or None
+    return request.client.host if request.client else None
+
+
+async def _account_from_request(request: Request, field: str) -> Optional[str]:
+    """从表单或 JSON 请求体中取出账号字段 (FastAPI 已读取并缓存请求体，这里不会重复读取)。"""
+    try:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            body = await request.json()
+            value = body.get(field) if isinstance(body, dict) else None
+        else:
+            value = (await request.form()).get(field)
+    except Exception:
+        # 请求体格式错误，交给参数校验返回 422
+        return None
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip().lower()
+
+
+def rate_limit(policy: str, account_field: Optional[str] = None) -> Callable:
+    """
+    生成限流依赖，用于路由的 dependencies=[Depends(rate_limit(...))]。
+
+    Args:
+        policy: RATE_LIMIT_POLICIES 中的策略名。
+        account_field: 请求体中标识账号的字段 (如 email / username)；为 None 时只按 IP 限流。
+    """
+    async def dependency(request: Request) -> None:
+        limiter = get_rate_limiter()
+        if limiter is None:
+            return
+        account = await _account_from_request(request, account_field) if account_field else None
+        await limiter.check(policy, client_ip(request), account)
+
+    return dependency
+
+
+_default_metrics = None
+_default_limiter = None
+
+
+def get_rate_limit_metrics() -> RateLimitMetrics:
+    """全局注册表上的限流指标 (首次使用时注册)。"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = RateLimitMetrics(REGISTRY)
+    return _default_metrics
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """按 settings 创建的进程级限流器；RATE_LIMIT_ENABLED 关闭时返回 None。"""
+    global _default_limiter
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    if _default_limiter is None:
+        policies = {
+            name: {scope: RateLimit.parse(value) for scope, value in limits.items()}
+            for name, limits in settings.RATE_LIMIT_POLICIES.items()
+        }
+        _default_limiter = RateLimiter(InMemoryRateLimitStore(max_keys=settings.RATE_LIMIT_MAX_KEYS), policies)
+    return _default_limiter
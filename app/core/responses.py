@@ -0,0 +1,46 @@
+# app/core/responses.py
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# UUID / datetime / date / time 由 orjson 原生序列化，输出与 jsonable_encoder 一致
+# (UUID 为字符串，datetime 为 ISO 8601)。OPT_NON_STR_KEYS 允许 UUID 等作为字典键。
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """处理 orjson 不能原生序列化的类型。"""
+    if isinstance(obj, Decimal):
+        # 与 jsonable_encoder 保持一致：整数值输出为 int，其余输出为 float
+        if obj.as_tuple().exponent >= 0:
+            return int(obj)
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """将 DAL 返回的行 (含 UUID、Decimal、datetime) 直接序列化为 JSON 字节串。"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    基于 orjson 的 JSON 响应，作为应用的 default_response_class。
+
+    路由直接返回 FastJSONResponse(rows) 时，FastAPI 会跳过 response_model 校验与
+    jsonable_encoder，DAL 行中的 UUID / Decimal / datetime 由 orjson 在 C 层处理；
+    适用于商品列表、管理员列表等大结果集接口。
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
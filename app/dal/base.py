@@ -2,23 +2,70 @@
 import pyodbc
 from app.exceptions import DALError, NotFoundError, IntegrityError, ForbiddenError
 from app.dal.exceptions import map_db_exception # Import the new mapping function
-from uuid import UUID
 import logging
 import asyncio # Import asyncio
 import functools # Import functools
 from typing import List, Dict, Any, Optional
+from pydantic import BaseModel
+from app.dal.row_mappers import RowMapper
+from app.core.metrics import record_db_time # 计入当前请求的数据库耗时
+from app.dal.db_metrics import QueryTimings, observe_query # 按存储过程统计耗时与慢查询
+from app.dal.read_only import check_read_only # 只读连接上拒绝写操作
+from app.dal.param_signatures import input_sizes_for # 存储过程参数签名
+from app.dal.deadline import driver_timeout, effective_timeout # 查询超时与请求截止时间
+from app.dal.circuit_breaker import get_circuit_breaker # 连接中断计入熔断器
 from app.dal.transaction import transaction # Import transaction from its new home
 
 logger = logging.getLogger(__name__)
 
+def _execute(cursor: pyodbc.Cursor, sql: str, params) -> None:
+    """
+    在工作线程中执行语句。已登记参数签名的存储过程先用 setinputsizes 声明参数类型与长度
+    (见 app.dal.param_signatures)，与 execute 在同一次线程池调用中完成。
+    """
+    if not params:
+        cursor.execute(sql)
+        return
+    input_sizes = input_sizes_for(sql, params)
+    if input_sizes is not None:
+        cursor.setinputsizes(input_sizes)
+    cursor.execute(sql, params)
+
+def _open_cursor(conn: pyodbc.Connection, timeout: int) -> pyodbc.Cursor:
+    """
+    在工作线程中设置查询超时并创建游标。pyodbc 的 timeout 是连接属性 (SQL_ATTR_QUERY_TIMEOUT，秒，0 为不限制)，
+    作用于之后创建的游标；只读连接包装设置到底层连接上。
+    """
+    getattr(conn, "raw_connection", conn).timeout = timeout
+    return conn.cursor()
+
+def _observe_connection_error(error: Exception) -> None:
+    """查询中连接中断等错误计入主库熔断器的连续失败次数。"""
+    breaker = get_circuit_breaker()
+    if breaker is not None:
+        breaker.observe_error(error)
+
+def _fetch_result_sets(cursor: pyodbc.Cursor) -> List[List[Dict[str, Any]]]:
+    """在工作线程中依次读取存储过程返回的全部结果集 (nextset)，每个结果集转换为字典列表。"""
+    result_sets = []
+    while True:
+        if cursor.description is not None: # 没有列的结果 (如 UPDATE 的行数) 跳过
+            columns = [column[0] for column in cursor.description]
+            result_sets.append([dict(zip(columns, row)) for row in cursor.fetchall()])
+        if not cursor.nextset():
+            return result_sets
+
 # --- 通用查询执行器 ---
 async def execute_query(
     conn: pyodbc.Connection,
     sql: str,
     params: tuple = None,
     fetchone: bool = False,
-    fetchall: bool = False
-) -> Optional[Dict[str, Any] | List[Dict[str, Any]] | int]:
+    fetchall: bool = False,
+    row_mapper: Optional[RowMapper] = None,
+    fetch_sets: bool = False,
+    timeout: Optional[float] = None
+) -> Optional[Dict[str, Any] | List[Dict[str, Any]] | List[List[Dict[str, Any]]] | BaseModel | List[BaseModel] | int]:
     """
     通用 SQL 查询执行器。
     在线程池中异步执行同步数据库操作，将数据库结果转换为 Python 字典，并处理异常。
@@ -27,31 +74,46 @@ async def execute_query(
     :param params: SQL 参数元组
     :param fetchone: 是否只获取一行结果 (返回 dict 或 None)
     :param fetchall: 是否获取所有结果 (返回 dict 列表)
-    :return: 字典列表、单个字典、受影响的行数或 None
+    :param row_mapper: 结果映射器 (见 app.dal.row_mappers)；提供时按列下标直接构造模型，返回模型 / 模型列表而不是字典
+    :param fetch_sets: 是否读取全部结果集 (返回字典列表的列表，每个结果集一项；忽略 row_mapper)，
+                       用于一次调用返回多个结果集的存储过程
+    :param timeout: 本次调用的超时 (秒)；与路由截止时间、DB_QUERY_TIMEOUT_SECONDS 取最小值 (见 app.dal.deadline)
+    :return: 字典列表、单个字典、模型 (列表)、结果集列表、受影响的行数或 None
+    :raises ReadOnlyViolationError: conn 为只读连接且 sql 不是登记过的只读存储过程
+    :raises QueryTimeoutError: 超过查询超时，或路由的截止时间已过
     """
+    check_read_only(conn, sql)
+    driver_timeout_seconds = driver_timeout(effective_timeout(timeout))
     loop = asyncio.get_event_loop()
-
-    # 在线程池中获取游标，因为 conn.cursor() 是阻塞的同步操作
-    cursor = await loop.run_in_executor(None, conn.cursor)
+    timings = QueryTimings() # 排队 / 执行 / 读取结果 各阶段耗时，见 app.dal.db_metrics
+    rows_returned = None
+    error = None
+    cursor = None
 
     try:
-        logger.debug(f"Executing SQL: {sql} with params: {params}")
+        # 在线程池中设置超时并获取游标，因为 conn.cursor() 是阻塞的同步操作
+        cursor = await timings.run(loop, "execute", functools.partial(_open_cursor, conn, driver_timeout_seconds))
+        cancel = cursor.cancel # 请求被取消时向服务器取消正在执行的语句
+        logger.debug("Executing SQL: %s with params: %s", sql, params)
 
-        # 转换 UUID 对象为字符串，因为 pyodbc 可能不支持直接绑定 UUID 对象
-        processed_params = tuple(str(p) if isinstance(p, UUID) else p for p in params) if params else None
+        # 在线程池中执行 SQL 语句 (cursor.execute 是同步操作)；UUID 参数直接以 GUID 绑定
+        await timings.run(loop, "execute", functools.partial(_execute, cursor, sql, params), cancel)
 
-        # 在线程池中执行 SQL 语句 (cursor.execute 是同步操作)
-        if processed_params is not None:
-            await loop.run_in_executor(None, functools.partial(cursor.execute, sql, processed_params))
-        else:
-            await loop.run_in_executor(None, functools.partial(cursor.execute, sql))
+        if fetch_sets:
+            # 在同一次线程池调用中读取全部结果集
+            result_sets = await timings.run(loop, "fetch", functools.partial(_fetch_result_sets, cursor), cancel)
+            rows_returned = sum(len(rows) for rows in result_sets)
+            return result_sets
 
-        if fetchone:
+        elif fetchone:
             # 在线程池中获取单行结果 (cursor.fetchone 是同步操作)
-            row = await loop.run_in_executor(None, cursor.fetchone)
+            row = await timings.run(loop, "fetch", cursor.fetchone, cancel)
+            rows_returned = 1 if row else 0
             if row:
+                if row_mapper is not None:
+                    return row_mapper.compile([column[0] for column in cursor.description])(row)
                 # 将 pyodbc Row 对象转换为字典
-                columns = await loop.run_in_executor(None, lambda: [column[0] for column in cursor.description])
+                columns = [column[0] for column in cursor.description]
                 result_dict = dict(zip(columns, row))
                 return result_dict if result_dict else None # 返回字典或 None
 
@@ -59,9 +121,12 @@ async def execute_query(
 
         elif fetchall:
             # 在线程池中获取所有结果 (cursor.fetchall 是同步操作)
-            rows = await loop.run_in_executor(None, cursor.fetchall)
+            rows = await timings.run(loop, "fetch", cursor.fetchall, cancel)
+            rows_returned = len(rows) if rows else 0
             if rows:
-                columns = await loop.run_in_executor(None, lambda: [column[0] for column in cursor.description])
+                if row_mapper is not None:
+                    return row_mapper.map_rows([column[0] for column in cursor.description], rows)
+                columns = [column[0] for column in cursor.description]
                 results_list = []
                 for row in rows:
                      result_dict = dict(zip(columns, row))
@@ -73,23 +138,28 @@ async def execute_query(
         else:
             # 对于 INSERT, UPDATE, DELETE 等非 SELECT 语句，返回受影响的行数
             # 在线程池中获取 rowcount (cursor.rowcount 是同步操作)
-            rowcount = await loop.run_in_executor(None, lambda: cursor.rowcount)
+            rowcount = await timings.run(loop, "fetch", lambda: cursor.rowcount)
             return rowcount # 返回受影响的行数
 
 
     except pyodbc.Error as e:
         # Use the new mapping function for pyodbc.Error
-        raise map_db_exception(e) from e
+        error = map_db_exception(e)
+        _observe_connection_error(error)
+        raise error from e
 
     except Exception as e:
         # Catch other unexpected exceptions and wrap them in DALError
-        logger.error(f"Unexpected error executing SQL: {sql} - {e}")
-        raise DALError(f"An unexpected database error occurred: {e}") from e
+        logger.error("Unexpected error executing SQL: %s - %s", sql, e)
+        error = DALError(f"An unexpected database error occurred: {e}")
+        raise error from e
 
     finally:
         # In-executor cursor close
-        if 'cursor' in locals() and cursor:
+        if cursor:
             await loop.run_in_executor(None, cursor.close)
+        record_db_time(timings.total)
+        observe_query(sql, timings, rows=rows_returned, error=error, params=params)
         # 注意：连接不在此处关闭，由依赖注入管理其生命周期
 
         
@@ -113,33 +183,38 @@ async def execute_non_query(conn: pyodbc.Connection, sql: str, params: tuple = (
     """
     Executes a SQL non-query (INSERT, UPDATE, DELETE) with the given parameters asynchronously.
     Returns the number of rows affected.
+    Raises ReadOnlyViolationError when conn is a read-only connection.
     """
+    check_read_only(conn, sql)
+    driver_timeout_seconds = driver_timeout(effective_timeout())
     loop = asyncio.get_event_loop()
+    timings = QueryTimings()
+    error = None
     cursor = None
     try:
-        cursor = await loop.run_in_executor(None, conn.cursor)
-        logger.debug(f"Executing non-query SQL: {sql} with params: {params}")
+        cursor = await timings.run(loop, "execute", functools.partial(_open_cursor, conn, driver_timeout_seconds))
+        logger.debug("Executing non-query SQL: %s with params: %s", sql, params)
 
-        processed_params = tuple(str(p) if isinstance(p, UUID) else p for p in params) if params else None
+        await timings.run(loop, "execute", functools.partial(_execute, cursor, sql, params), cursor.cancel)
 
-        if processed_params is not None:
-            await loop.run_in_executor(None, functools.partial(cursor.execute, sql, processed_params))
-        else:
-            await loop.run_in_executor(None, functools.partial(cursor.execute, sql))
-
-        rowcount = await loop.run_in_executor(None, lambda: cursor.rowcount)
-        await loop.run_in_executor(None, conn.commit)
+        rowcount = await timings.run(loop, "fetch", lambda: cursor.rowcount)
+        await timings.run(loop, "execute", conn.commit)
         return rowcount
 
     except pyodbc.Error as e:
         await loop.run_in_executor(None, conn.rollback)
-        logger.error(f"Database error executing non-query SQL: {sql} - {e}")
+        logger.error("Database error executing non-query SQL: %s - %s", sql, e)
         # Use the new mapping function for pyodbc.Error
-        raise map_db_exception(e) from e
+        error = map_db_exception(e)
+        _observe_connection_error(error)
+        raise error from e
     except Exception as e:
         await loop.run_in_executor(None, conn.rollback)
-        logger.error(f"An unexpected error occurred during non-query execution: {e}")
-        raise DALError(f"An unexpected error occurred during non-query execution: {e}") from e
+        logger.error("An unexpected error occurred during non-query execution: %s", e)
+        error = DALError(f"An unexpected error occurred during non-query execution: {e}")
+        raise error from e
     finally:
         if cursor:
-            await loop.run_in_executor(None, cursor.close)
\ No newline at end of file
+            await loop.run_in_executor(None, cursor.close)
+        record_db_time(timings.total)
+        observe_query(sql, timings, error=error, params=params)
@@ -0,0 +1,160 @@
+"""
+数据库熔断器：数据库不可达时，不让每个请求都去等待 pyodbc.connect 的登录超时。
+
+  closed     正常建立连接；连续失败 (建立连接失败或查询中连接中断) 达到 failure_threshold 次后进入 open。
+  open       直接抛出 DatabaseUnavailableError (503 + Retry-After)，不尝试连接；reset_timeout 秒后进入 half_open。
+  half_open  只放行一个探测连接：成功则回到 closed，失败则重新 open；探测期间其它请求仍直接拒绝。
+
+只保护主库连接；读副本的故障由 app.dal.replica_routing 处理 (副本失败时回退主库)。
+状态只在事件循环中读写，不需要加锁。
+"""
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.config import settings
+from app.core.metrics import REGISTRY, MetricsRegistry
+from app.exceptions import DatabaseUnavailableError, TransientDatabaseError
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_HALF_OPEN = "half_open"
+STATE_OPEN = "open"
+
+# db_circuit_state 指标的取值
+_STATE_VALUES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+# 计入连续失败的瞬时错误原因 (死锁、锁超时、查询超时说明数据库可达，不计入)
+FAILURE_REASONS = frozenset({"connection"})
+
+
+class CircuitBreakerMetrics:
+    """熔断器相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.state = registry.gauge(
+            "db_circuit_state", "数据库熔断器状态 (0 = closed, 1 = half_open, 2 = open)")
+        self.transitions = registry.counter(
+            "db_circuit_transitions_total", "熔断器进入各状态的次数", ("state",))
+        self.rejected = registry.counter(
+            "db_circuit_rejected_total", "熔断器打开期间直接拒绝 (503) 的连接请求数")
+
+
+class CircuitBreaker:
+    """
+    主库连接的熔断器。
+
+    Args:
+        failure_threshold: 连续失败多少次后打开。
+        reset_timeout: 打开后多少秒进入半开、放行一个探测连接。
+        clock: 单调时钟 (测试时可替换)。
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 10.0,
+        metrics: Optional[CircuitBreakerMetrics] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.metrics = metrics or get_circuit_breaker_metrics()
+        self.clock = clock
+        self.state = STATE_CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning("Database circuit breaker %s -> %s (consecutive failures: %d)", self.state, state, self.consecutive_failures)
+        self.state = state
+        self.metrics.state.set(_STATE_VALUES[state])
+        self.metrics.transitions.inc(state)
+
+    def _open(self) -> None:
+        self._opened_at = self.clock()
+        self._probe_in_flight = False
+        self._transition(STATE_OPEN)
+
+    def retry_after(self) -> float:
+        """打开状态下距离下一次探测的秒数；其它状态为 0。"""
+        if self.state != STATE_OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - self.clock())
+
+    def allow(self) -> None:
+        """
+        建立连接前调用。
+
+        Raises:
+            DatabaseUnavailableError: 熔断器打开，或半开状态下已有探测连接在进行。
+        """
+        if self.state == STATE_CLOSED:
+            return
+        if self.state == STATE_OPEN and self.retry_after() <= 0:
+            self._transition(STATE_HALF_OPEN)
+        if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True # 本次调用即探测
+            return
+        self.metrics.rejected.inc()
+        raise DatabaseUnavailableError(retry_after=self.retry_after() or self.reset_timeout)
+
+    def record_success(self) -> None:
+        """连接建立成功。"""
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        self._transition(STATE_CLOSED)
+
+    def record_failure(self) -> None:
+        """连接失败 (建立连接失败，或查询中连接中断)。"""
+        self.consecutive_failures += 1
+        if self.state == STATE_HALF_OPEN:
+            self._open() # 探测失败，重新计时
+        elif self.state == STATE_CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """allow() 之后的调用没有结果 (如请求被取消) 时调用，释放半开状态的探测名额。"""
+        self._probe_in_flight = False
+
+    def observe_error(self, error: BaseException) -> None:
+        """查询出错时调用：连接中断类的瞬时错误计入连续失败。"""
+        if isinstance(error, TransientDatabaseError) and error.reason in FAILURE_REASONS:
+            self.record_failure()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """当前状态 (用于 /health)。"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after_seconds": round(self.retry_after(), 1),
+        }
+
+
+_default_metrics = None
+_default_breaker = None
+
+
+def get_circuit_breaker_metrics() -> CircuitBreakerMetrics:
+    """全局注册表上的熔断器指标 (首次使用时注册)。"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = CircuitBreakerMetrics(REGISTRY)
+    return _default_metrics
+
+
+def get_circuit_breaker() -> Optional[CircuitBreaker]:
+    """按 settings 创建的进程级熔断器；DB_CIRCUIT_BREAKER_ENABLED 关闭时返回 None。"""
+    global _default_breaker
+    if not settings.DB_CIRCUIT_BREAKER_ENABLED:
+        return None
+    if _default_breaker is None:
+        _default_breaker = CircuitBreaker(
+            failure_threshold=settings.DB_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.DB_CIRCUIT_RESET_SECONDS,
+        )
+    return _default_breaker
@@ -1,5 +1,5 @@
 # app/dal/connection.py
-from app.exceptions import DALError
+from app.exceptions import DALError, DatabaseUnavailableError
 
 import pyodbc
 from app.config import settings # Re-import settings to get connection string components
@@ -7,27 +7,104 @@ import logging
 import asyncio # Keep asyncio for `to_thread` if we wrap `pyodbc.connect`
 from app.dal.transaction import transaction # Keep the transaction context manager
 # from app.core.db import get_pooled_connection # Comment out or remove
-from fastapi import Request # Keep Request for dependency injection
+from fastapi import Depends, Request # Keep Request for dependency injection
+import time
+from typing import Optional
+from app.dal.db_metrics import query_metrics # 连接耗时与打开的连接数
+from app.dal.read_only import ReadOnlyConnection # 只读连接包装
+from app.dal.replica_routing import get_replica_router, sticky_key # 只读连接的读副本路由
+from app.core.concurrency import concurrency_slot # 按路由类别的并发预算 (503 load shedding)
+from app.dal.circuit_breaker import get_circuit_breaker # 主库连接熔断器
 
 logger = logging.getLogger(__name__)
 
+# 不修改数据的请求方法；其它方法的请求成功提交后记录写入时间 (read-your-writes)
+_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+def build_connection_string(server: Optional[str] = None) -> str:
+    """
+    构造 ODBC 连接字符串。
+
+    Args:
+        server: 读副本地址；为 None 时连接主库 (DATABASE_SERVER)。副本连接附加 ApplicationIntent=ReadOnly。
+    """
+    conn_str = (
+        f"DRIVER={{{settings.ODBC_DRIVER}}};"
+        f"SERVER={server or settings.DATABASE_SERVER};"
+        f"DATABASE={settings.DATABASE_NAME};"
+        f"UID={settings.DATABASE_UID};"
+        f"PWD={settings.DATABASE_PWD}"
+    )
+    if server:
+        conn_str += ";ApplicationIntent=ReadOnly"
+    return conn_str
+
+
+async def _connect(conn_str: str, autocommit: bool, guarded: bool = True) -> pyodbc.Connection:
+    """
+    在线程池中建立连接 (pyodbc.connect 是阻塞操作)，并记录连接耗时。
+
+    Args:
+        guarded: 是否经过主库熔断器 (见 app.dal.circuit_breaker)；读副本连接传 False。
+
+    Raises:
+        DatabaseUnavailableError: 熔断器打开，未尝试连接。
+    """
+    breaker = get_circuit_breaker() if guarded else None
+    if breaker is not None:
+        breaker.allow()
+    connect_started = time.perf_counter()
+    try:
+        conn = await asyncio.to_thread(lambda: pyodbc.connect(conn_str, autocommit=autocommit))
+    except pyodbc.Error:
+        if breaker is not None:
+            breaker.record_failure()
+        raise
+    except BaseException:
+        if breaker is not None:
+            breaker.release()
+        raise
+    if breaker is not None:
+        breaker.record_success()
+    query_metrics.connect_time.observe(time.perf_counter() - connect_started)
+    query_metrics.connections_open.inc()
+    return conn
+
+
+async def open_connection(autocommit: bool = True) -> pyodbc.Connection:
+    """
+    打开一条不属于任何请求的主库连接 (如后台维护任务使用的连接)，调用方负责用 close_connection 关闭。
+
+    Args:
+        autocommit: 是否以 autocommit 模式打开；默认 True，每条语句各自提交。
+    """
+    return await _connect(build_connection_string(), autocommit=autocommit)
+
+
+async def close_connection(conn: pyodbc.Connection) -> None:
+    """关闭 open_connection 打开的连接。"""
+    await asyncio.to_thread(conn.close)
+    query_metrics.connections_open.dec()
+
+
+def _set_isolation_level(conn: pyodbc.Connection, level: str) -> None:
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SET TRANSACTION ISOLATION LEVEL {level}")
+    finally:
+        cursor.close()
+
+
 # 使用 FastAPI 的依赖注入风格，为每个请求提供一个连接
-async def get_db_connection(request: Request): # Keep request: Request parameter
+async def get_db_connection(request: Request, _slot: None = Depends(concurrency_slot)): # Keep request: Request parameter
     """
     依赖注入函数，提供一个 pyodbc 数据库连接，并在请求结束时管理事务和关闭连接。
+    建立连接前先在路由类别的并发预算内取得名额 (见 app.core.concurrency)，饱和时返回 503 而不是无限排队。
     """
     conn = None
     try:
         # Revert to direct pyodbc.connect
-        conn_str = (
-            f"DRIVER={{{settings.ODBC_DRIVER}}};"
-            f"SERVER={settings.DATABASE_SERVER};"
-            f"DATABASE={settings.DATABASE_NAME};"
-            f"UID={settings.DATABASE_UID};"
-            f"PWD={settings.DATABASE_PWD}"
-        )
-        # Use asyncio.to_thread for blocking pyodbc.connect
-        conn = await asyncio.to_thread(lambda: pyodbc.connect(conn_str, autocommit=False))
+        conn = await _connect(build_connection_string(), autocommit=False)
         request.state.db_connection = conn # Store connection in request state (optional, for debugging)
         logger.debug("Database connection established (direct connect).")
 
@@ -36,14 +113,69 @@ async def get_db_connection(request: Request): # Keep request: Request parameter
             yield trans_conn # Provide the connection to dependent functions
         # The transaction context manager handles commit/rollback upon exiting this block
 
+        if request.method not in _SAFE_METHODS:
+            # 写入已提交：该用户随后的读请求在一段时间内走主库
+            get_replica_router().record_write(sticky_key(request.headers))
+
+    except DatabaseUnavailableError:
+        raise # 熔断器打开，快速失败 (状态变化已记录日志)
     except DALError as e:
-        logger.error(f"Database connection/transaction error: {e}", exc_info=True)
+        logger.error("Database connection/transaction error: %s", e, exc_info=True)
         raise e
     except Exception as e:
-        logger.error(f"An unexpected error occurred during database operation: {e}", exc_info=True)
+        logger.error("An unexpected error occurred during database operation: %s", e, exc_info=True)
         raise DALError(f"服务器内部错误: {e}") from e
     finally:
         # Ensure the connection is closed
         if conn:
             await asyncio.to_thread(conn.close)
-            logger.debug("Database connection closed (direct connect).") 
\ No newline at end of file
+            query_metrics.connections_open.dec()
+            logger.debug("Database connection closed (direct connect).")
+
+
+async def _connect_read_only(request: Request) -> pyodbc.Connection:
+    """连接路由器选出的读副本；未配置副本、用户刚写入过或副本连接失败时连接主库。"""
+    router = get_replica_router()
+    server = router.choose(sticky_key(request.headers)) if router.enabled else None
+    if server is not None:
+        try:
+            return await _connect(build_connection_string(server), autocommit=True, guarded=False)
+        except pyodbc.Error as e:
+            logger.warning("Read replica %s unavailable, falling back to primary: %s", server, e)
+            router.mark_down(server)
+    return await _connect(build_connection_string(), autocommit=True)
+
+
+async def get_read_only_db_connection(request: Request, _slot: None = Depends(concurrency_slot)):
+    """
+    依赖注入函数，为纯读取的路由提供只读连接 (见 app.dal.read_only)。
+
+    连接以 autocommit 模式打开，不包裹在 transaction() 中，请求结束时直接关闭，省去 commit 往返；
+    配置了 DATABASE_READ_ISOLATION_LEVEL (如 SNAPSHOT) 时在连接上设置会话隔离级别。
+    配置了 DATABASE_READ_REPLICAS 时连接读副本 (见 app.dal.replica_routing)。
+    只读连接上执行写操作会抛出 ReadOnlyViolationError。与 get_db_connection 一样受并发预算限制。
+    """
+    conn = None
+    try:
+        conn = await _connect_read_only(request)
+        if settings.DATABASE_READ_ISOLATION_LEVEL:
+            await asyncio.to_thread(_set_isolation_level, conn, settings.DATABASE_READ_ISOLATION_LEVEL)
+        request.state.db_connection = conn
+        logger.debug("Read-only database connection established.")
+
+        yield ReadOnlyConnection(conn)
+        query_metrics.round_trips_saved.inc()
+
+    except DatabaseUnavailableError:
+        raise
+    except DALError as e:
+        logger.error("Database error on read-only connection: %s", e, exc_info=True)
+        raise e
+    except Exception as e:
+        logger.error("An unexpected error occurred during read-only database operation: %s", e, exc_info=True)
+        raise DALError(f"服务器内部错误: {e}") from e
+    finally:
+        if conn:
+            await asyncio.to_thread(conn.close)
+            query_metrics.connections_open.dec()
+            logger.debug("Read-only database connection closed.")
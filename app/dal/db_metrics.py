@@ -0,0 +1,241 @@
+# app/dal/db_metrics.py
+"""
+数据库调用指标：按存储过程统计调用次数、各阶段耗时、返回行数与错误，并记录慢查询日志。
+
+execute_query 的每次阻塞调用都在默认线程池中执行，耗时拆分为:
+  queue    提交到线程池后等待空闲线程的时间 (线程池饱和时上升)
+  execute  获取游标与 cursor.execute (数据库执行存储过程)
+  fetch    fetchone / fetchall / rowcount 与结果转换
+"""
+import asyncio
+import functools
+import logging
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Optional, Sequence
+
+from app.config import settings
+from app.core.metrics import REGISTRY, LATENCY_BUCKETS, MetricsRegistry
+from app.exceptions import QueryTimeoutError
+
+slow_query_logger = logging.getLogger("app.dal.slow_query")
+
+# {CALL sp_Name (?, ?)} / {? = CALL sp_Name} / EXEC sp_Name ...
+_PROCEDURE_PATTERN = re.compile(r"^\s*(?:\{\s*(?:\?\s*=\s*)?CALL|EXEC(?:UTE)?)\s+([\w.\[\]]+)", re.IGNORECASE)
+# 不是存储过程调用的语句统一归入一个标签
+ADHOC_QUERY = "<adhoc>"
+
+# 慢查询日志可以输出参数的存储过程：参数只有 ID、数量、分页与筛选条件，不含密码、验证码、邮箱、手机号等个人信息。
+# 其它过程 (包括以后新增的) 一律输出 <redacted>；新增过程确认参数不含个人信息后再加入这里。
+LOGGABLE_PARAM_PROCEDURES = frozenset({
+    # 商品浏览
+    "sp_GetProductList", "sp_GetProductById", "sp_GetProductImagesByProductId", "sp_GetUserFavoriteProducts",
+    "sp_ActivateProduct", "sp_WithdrawProduct", "sp_DecreaseProductQuantity", "sp_IncreaseProductQuantity",
+    # 订单
+    "sp_CreateOrder", "sp_ConfirmOrder", "sp_CompleteOrder", "sp_GetOrderById", "sp_GetOrdersByUser", "sp_GetOrderHistory",
+    # 评价
+    "sp_GetEvaluationById", "sp_GetEvaluationsByProductId", "sp_GetEvaluationsByBuyerId", "sp_GetEvaluationPage",
+    "sp_GetSellerReputation", "sp_RecomputeSellerStats",
+    # 上传文件与后台维护
+    "sp_GetUnreferencedUploads", "sp_PurgeExpiredOtps", "sp_PurgeExpiredPasswordResetTokens", "sp_PurgeReadNotifications",
+})
+_MAX_PARAM_LENGTH = 64
+
+# 查询被取消时所处的阶段
+CANCELLED_QUEUED = "queued"    # 还在线程池队列中，未访问数据库
+CANCELLED_RUNNING = "running"  # 已在执行，向服务器发送了取消
+
+ROW_BUCKETS = (0, 1, 10, 50, 100, 500, 1000, 5000)
+DB_LATENCY_BUCKETS = (0.001, 0.0025,) + LATENCY_BUCKETS
+
+
+@functools.lru_cache(maxsize=1024)
+def procedure_name(sql: str) -> str:
+    """从 SQL 中取出存储过程名作为指标标签 (去掉方括号与 dbo. 前缀)。"""
+    match = _PROCEDURE_PATTERN.match(sql)
+    if not match:
+        return ADHOC_QUERY
+    name = match.group(1).replace("[", "").replace("]", "")
+    return name.rsplit(".", 1)[-1]
+
+
+class QueryMetrics:
+    """数据库相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.calls = registry.counter(
+            "db_query_total", "存储过程调用次数", ("procedure",))
+        self.errors = registry.counter(
+            "db_query_errors_total", "存储过程调用失败次数 (按映射后的异常类型)", ("procedure", "error"))
+        self.queue_time = registry.histogram(
+            "db_query_queue_seconds", "等待线程池执行的时间 (秒)", ("procedure",), DB_LATENCY_BUCKETS)
+        self.execute_time = registry.histogram(
+            "db_query_execute_seconds", "cursor.execute 耗时 (秒)", ("procedure",), DB_LATENCY_BUCKETS)
+        self.fetch_time = registry.histogram(
+            "db_query_fetch_seconds", "读取结果耗时 (秒)", ("procedure",), DB_LATENCY_BUCKETS)
+        self.rows = registry.histogram(
+            "db_query_rows", "返回的结果行数", ("procedure",), ROW_BUCKETS)
+        self.slow_queries = registry.counter(
+            "db_slow_queries_total", "超过慢查询阈值的调用次数", ("procedure",))
+        self.timeouts = registry.counter(
+            "db_query_timeouts_total", "超过查询超时 / 请求截止时间的调用次数", ("procedure",))
+        self.cancelled = registry.counter(
+            "db_query_cancelled_total", "因请求被取消 (如客户端断开) 而放弃的调用次数 (按所处阶段)", ("procedure", "stage"))
+        self.connect_time = registry.histogram(
+            "db_connect_seconds", "建立数据库连接的耗时 (秒)", (), DB_LATENCY_BUCKETS)
+        self.connections_open = registry.gauge(
+            "db_connections_open", "当前打开的请求级数据库连接数")
+        self.transaction_round_trips = registry.counter(
+            "db_transaction_round_trips_total", "请求级事务结束时 commit / rollback 的往返次数", ("operation",))
+        self.round_trips_saved = registry.counter(
+            "db_round_trips_saved_total", "只读连接省去的 commit 往返次数 (每个只读请求一次)")
+        self.pool_in_use = registry.gauge(
+            "db_pool_connections_in_use", "连接池中已借出的连接数")
+        self.pool_idle = registry.gauge(
+            "db_pool_connections_idle", "连接池中空闲的连接数")
+        self.pool_max = registry.gauge(
+            "db_pool_connections_max", "连接池允许的最大连接数 (0 表示不限)")
+
+
+query_metrics = QueryMetrics(REGISTRY)
+
+
+class QueryTimings:
+    """
+    记录一次查询在线程池中各阶段的耗时。
+
+    run() 替代 loop.run_in_executor：在提交时和工作线程开始执行时各取一次时间，
+    两者之差即排队时间。
+
+
+    调用方的任务被取消 (如客户端断开) 时:
+      - 任务仍在线程池队列中：标记为放弃，工作线程取到后直接跳过，不再访问数据库；
+      - 已在执行：调用 on_cancel (如 cursor.cancel 向服务器发送取消)，并等待工作线程返回后
+        再抛出 CancelledError，确保之后关闭游标 / 连接时没有线程仍在使用它们。
+    cancelled 记录取消发生的阶段 (CANCELLED_QUEUED / CANCELLED_RUNNING)。
+    """
+
+    __slots__ = ("queue", "execute", "fetch", "cancelled")
+
+    def __init__(self) -> None:
+        self.queue = 0.0
+        self.execute = 0.0
+        self.fetch = 0.0
+        self.cancelled: Optional[str] = None
+
+    async def run(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        stage: str,
+        func: Callable[[], Any],
+        on_cancel: Optional[Callable[[], Any]] = None,
+    ) -> Any:
+        submitted = time.perf_counter()
+        started = [0.0]
+        abandoned = [False]
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                if abandoned[0]:
+                    raise asyncio.CancelledError()
+                started[0] = time.perf_counter()
+            return func()
+
+        future = loop.run_in_executor(None, call)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            with lock:
+                abandoned[0] = True
+                running = bool(started[0])
+            if not running:
+                self.cancelled = CANCELLED_QUEUED
+                future.cancel()
+                raise
+            self.cancelled = CANCELLED_RUNNING
+            if on_cancel is not None:
+                try:
+                    on_cancel()
+                except Exception as e:
+                    slow_query_logger.debug("Cancelling running statement failed: %s", e)
+            try:
+                await future
+            except BaseException:
+                pass
+            raise
+        finally:
+            finished = time.perf_counter()
+            if started[0]:
+                self.queue += started[0] - submitted
+                setattr(self, stage, getattr(self, stage) + finished - started[0])
+            else:
+                self.queue += finished - submitted
+
+    @property
+    def total(self) -> float:
+        return self.queue + self.execute + self.fetch
+
+
+def _format_params(procedure: str, params: Optional[Sequence[Any]]) -> str:
+    if not params:
+        return "()"
+    if procedure not in LOGGABLE_PARAM_PROCEDURES:
+        return "<redacted>"
+    parts = []
+    for value in params:
+        text = repr(value)
+        parts.append(text if len(text) <= _MAX_PARAM_LENGTH else text[:_MAX_PARAM_LENGTH] + "...")
+    return "(" + ", ".join(parts) + ")"
+
+
+def observe_query(
+    sql: str,
+    timings: QueryTimings,
+    rows: Optional[int] = None,
+    error: Optional[BaseException] = None,
+    params: Optional[Sequence[Any]] = None,
+    metrics: QueryMetrics = None,
+) -> None:
+    """
+    记录一次查询的指标；耗时超过 DB_SLOW_QUERY_THRESHOLD_MS 时写慢查询日志。
+
+    Args:
+        sql: 执行的 SQL (用于取存储过程名)。
+        timings: 各阶段耗时。
+        rows: 返回的行数 (非查询语句传 None)。
+        error: 映射后的应用异常 (如 IntegrityError)，成功时为 None；QueryTimeoutError 另计入超时次数。
+        params: 查询参数；只有 LOGGABLE_PARAM_PROCEDURES 中的过程、且按 DB_SLOW_QUERY_PARAMS_SAMPLE_RATE 抽中的慢查询才会输出。
+    """
+    metrics = metrics or query_metrics
+    procedure = procedure_name(sql)
+    metrics.calls.inc(procedure)
+    metrics.queue_time.observe(timings.queue, procedure)
+    metrics.execute_time.observe(timings.execute, procedure)
+    metrics.fetch_time.observe(timings.fetch, procedure)
+    if rows is not None:
+        metrics.rows.observe(rows, procedure)
+    if error is not None:
+        metrics.errors.inc(procedure, type(error).__name__)
+        if isinstance(error, QueryTimeoutError):
+            metrics.timeouts.inc(procedure)
+    if timings.cancelled is not None:
+        metrics.cancelled.inc(procedure, timings.cancelled)
+
+    total = timings.total
+    if total * 1000 < settings.DB_SLOW_QUERY_THRESHOLD_MS:
+        return
+    metrics.slow_queries.inc(procedure)
+    if not slow_query_logger.isEnabledFor(logging.WARNING):
+        return
+    if random.random() < settings.DB_SLOW_QUERY_PARAMS_SAMPLE_RATE:
+        params_text = _format_params(procedure, params)
+    else:
+        params_text = "<not sampled>"
+    slow_query_logger.warning(
+        "Slow query %s: %.1f ms (queue %.1f ms, execute %.1f ms, fetch %.1f ms), rows=%s, error=%s, params=%s",
+        procedure, total * 1000, timings.queue * 1000, timings.execute * 1000, timings.fetch * 1000,
+        rows, type(error).__name__ if error is not None else None, params_text,
+    )
@@ -0,0 +1,53 @@
+"""
+数据库调用的超时与截止时间。
+
+每次 execute_query 在创建游标前设置驱动的查询超时 (pyodbc Connection.timeout，即 SQL_ATTR_QUERY_TIMEOUT)，
+到期时由驱动取消语句并抛出 HYT00，映射为 QueryTimeoutError (返回 503，不重试)。超时取以下各项的最小值:
+  - 调用方传入的 timeout (单次调用)；
+  - 路由的截止时间 (query_deadline 依赖设置)，请求内的所有数据库调用共享，剩余时间随调用递减；
+  - DB_QUERY_TIMEOUT_SECONDS (全局默认，0 表示不限制)。
+"""
+import math
+import time
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from app.config import settings
+from app.exceptions import QueryTimeoutError
+
+# 当前请求的截止时间 (time.monotonic)；每个请求在各自的任务中执行，设置后无需还原
+_query_deadline: ContextVar[Optional[float]] = ContextVar("query_deadline", default=None)
+
+
+def query_deadline(seconds: float) -> Callable:
+    """
+    生成路由依赖：本请求中的全部数据库调用须在 seconds 秒内完成，
+    用于 dependencies=[Depends(query_deadline(...))]。
+    """
+    async def dependency() -> None:
+        _query_deadline.set(time.monotonic() + seconds)
+
+    return dependency
+
+
+def effective_timeout(timeout: Optional[float] = None) -> Optional[float]:
+    """
+    本次调用的超时 (秒)：timeout、路由截止时间的剩余时间与 DB_QUERY_TIMEOUT_SECONDS 中的最小值；
+    都未设置时返回 None。
+
+    Raises:
+        QueryTimeoutError: 路由的截止时间已过，不再发起调用。
+    """
+    candidates = [value for value in (timeout, settings.DB_QUERY_TIMEOUT_SECONDS or None) if value]
+    deadline = _query_deadline.get()
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise QueryTimeoutError("请求的数据库截止时间已过")
+        candidates.append(remaining)
+    return min(candidates) if candidates else None
+
+
+def driver_timeout(timeout: Optional[float]) -> int:
+    """转换为驱动接受的整数秒 (向上取整，至少 1 秒)；None 转换为 0 (不限制)。"""
+    return max(1, math.ceil(timeout)) if timeout else 0
@@ -1,8 +1,20 @@
 import pyodbc
-from typing import Optional, Callable, Awaitable, List, Dict, Any
+from datetime import datetime
+from typing import Optional, Callable, Awaitable, List, Dict, Any, NamedTuple, Tuple
 from uuid import UUID
 
 from app.exceptions import DALError, NotFoundError, IntegrityError, ForbiddenError
+from app.dal.row_mappers import get_row_mapper
+from app.schemas.evaluation_schemas import EvaluationResponseSchema
+
+# sp_GetEvaluationPage 支持的查询范围
+EVALUATION_SCOPES = ("Product", "Buyer", "Seller")
+
+class EvaluationPage(NamedTuple):
+    """sp_GetEvaluationPage 的两个结果集。"""
+    evaluations: List[EvaluationResponseSchema] # 至多 page_size + 1 行，多出的一行表示还有下一页
+    evaluation_count: int                       # 符合条件的评价数
+    rating_sum: int                             # 符合条件的评分之和
 
 class EvaluationDAL:
     """Data Access Layer for Evaluations."""
@@ -31,7 +43,7 @@ class EvaluationDAL:
         Assumes sp_CreateEvaluation is modified to SELECT the newly created evaluation data.
         """
         sql = "{CALL sp_CreateEvaluation (?, ?, ?, ?)}"
-        params = (str(order_id), str(buyer_id), rating, comment)
+        params = (order_id, buyer_id, rating, comment)
 
         try:
             result = await self._execute_query(conn, sql, params, fetchone=True)
@@ -57,7 +69,7 @@ class EvaluationDAL:
     ) -> Optional[Dict[str, Any]]:
         """Fetches a single evaluation by its ID."""
         sql = "{CALL sp_GetEvaluationById (?)}"
-        params = (str(evaluation_id),)
+        params = (evaluation_id,)
         try:
             result = await self._execute_query(conn, sql, params, fetchone=True)
             return result
@@ -74,7 +86,7 @@ class EvaluationDAL:
     ) -> List[Dict[str, Any]]:
         """Fetches all evaluations for a specific product."""
         sql = "{CALL sp_GetEvaluationsByProductId (?)}"
-        params = (str(product_id),)
+        params = (product_id,)
         try:
             results = await self._execute_query(conn, sql, params, fetchall=True)
             return results
@@ -91,7 +103,7 @@ class EvaluationDAL:
     ) -> List[Dict[str, Any]]:
         """Fetches all evaluations made by a specific buyer."""
         sql = "{CALL sp_GetEvaluationsByBuyerId (?)}"
-        params = (str(buyer_id),)
+        params = (buyer_id,)
         try:
             results = await self._execute_query(conn, sql, params, fetchall=True)
             return results
@@ -101,6 +113,64 @@ class EvaluationDAL:
         except Exception as e:
             raise DALError(f"获取买家评价时发生意外错误: {e}") from e
 
+    async def get_evaluation_page(
+        self,
+        conn: pyodbc.Connection,
+        scope: str,
+        owner_id: UUID,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        page_size: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> EvaluationPage:
+        """
+        Calls sp_GetEvaluationPage: the count / rating sum of matching evaluations and one keyset page
+        of them, for a product, buyer or seller, in a single round trip.
+
+        Args:
+            scope: "Product", "Buyer" or "Seller" (see EVALUATION_SCOPES).
+            after: (CreateTime, EvaluationID) of the last evaluation on the previous page; None for the first page.
+        """
+        sql = "{CALL sp_GetEvaluationPage (?, ?, ?, ?, ?, ?, ?)}"
+        after_time, after_evaluation_id = after if after else (None, None)
+        params = (
+            scope, owner_id, min_rating, max_rating, page_size,
+            after_time, after_evaluation_id,
+        )
+        try:
+            result_sets = await self._execute_query(conn, sql, params, fetch_sets=True)
+            if len(result_sets) != 2 or not result_sets[0]:
+                raise DALError("sp_GetEvaluationPage did not return a summary and a page.")
+            (summary,), rows = result_sets
+            mapper = get_row_mapper("sp_GetEvaluationPage")
+            return EvaluationPage([mapper.map_dict(row) for row in rows], summary["EvaluationCount"], summary["RatingSum"])
+        except DALError:
+            raise
+        except pyodbc.Error as e:
+            raise DALError(f"获取评价列表失败: {e}") from e
+        except Exception as e:
+            raise DALError(f"获取评价列表时发生意外错误: {e}") from e
+
+    async def get_seller_reputation(
+        self,
+        conn: pyodbc.Connection,
+        seller_id: UUID
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Fetches a seller's reputation summary (credit, evaluation count, rating sum, per-star counts)
+        from the incrementally maintained SellerStats row. Returns None if the user does not exist.
+        """
+        sql = "{CALL sp_GetSellerReputation (?)}"
+        params = (seller_id,)
+        try:
+            return await self._execute_query(conn, sql, params, fetchone=True)
+        except DALError:
+            raise
+        except pyodbc.Error as e:
+            raise DALError(f"获取卖家信誉失败: {e}") from e
+        except Exception as e:
+            raise DALError(f"获取卖家信誉时发生意外错误: {e}") from e
+
 # Example of how this DAL might be used (typically in a Service layer):
 # async def example_usage(db_conn_provider, order_id, buyer_id, rating, comment):
 #     async with db_conn_provider as conn:
@@ -1,4 +1,6 @@
-from app.exceptions import NotFoundError, IntegrityError, DALError, ForbiddenError
+import re
+
+from app.exceptions import NotFoundError, IntegrityError, DALError, ForbiddenError, TransientDatabaseError, QueryTimeoutError
 
 # SQLSTATE 映射到自定义异常
 # 常见的 SQLSTATE 值：
@@ -16,6 +18,42 @@ SQLSERVER_ERROR_CODE_MAP = {
     # Add other SQL Server specific error codes as needed
 }
 
+# 可重试的瞬时错误 (见 app.dal.retry)：错误码 / SQLSTATE -> 原因
+TRANSIENT_ERROR_CODES = {
+    1205: "deadlock",       # Transaction was deadlocked ... chosen as the deadlock victim
+    1222: "lock_timeout",   # Lock request time out period exceeded
+    10053: "connection",    # 连接被主机中止
+    10054: "connection",    # 连接被远程主机重置
+    233: "connection",      # No process is on the other end of the pipe
+}
+TRANSIENT_SQLSTATES = {
+    "40001": "deadlock",    # Serialization failure (SQL Server 死锁牺牲品)
+    "08S01": "connection",  # Communication link failure
+}
+
+# 驱动的查询超时 (SQL_ATTR_QUERY_TIMEOUT 到期)
+QUERY_TIMEOUT_SQLSTATE = "HYT00"
+
+# pyodbc 的消息形如 "[Microsoft][ODBC Driver 17 for SQL Server][SQL Server]... (1205) (SQLExecDirectW)"
+_NATIVE_ERROR_PATTERN = re.compile(r"\((\d+)\)\s*\(SQL\w+\)")
+
+def sqlserver_error_number(e: Exception):
+    """取 pyodbc.Error 中的 SQL Server 错误号 (args[1] 为整数时直接使用，否则从消息中解析)；取不到时返回 None。"""
+    if len(e.args) > 1:
+        if isinstance(e.args[1], int):
+            return e.args[1]
+        match = _NATIVE_ERROR_PATTERN.search(str(e.args[1]))
+        if match:
+            return int(match.group(1))
+    return None
+
+def classify_transient_error(e: Exception):
+    """返回瞬时错误的原因 (deadlock / lock_timeout / connection)；不是瞬时错误时返回 None。"""
+    reason = TRANSIENT_ERROR_CODES.get(sqlserver_error_number(e))
+    if reason is None and e.args:
+        reason = TRANSIENT_SQLSTATES.get(e.args[0])
+    return reason
+
 # 综合映射：优先SQL Server错误码，其次SQLSTATE
 ERROR_MAP = {
     # SQLSTATE mappings (通用)
@@ -34,6 +72,16 @@ def map_db_exception(e: Exception):
     import pyodbc # Import inside function to avoid circular dependency if exceptions are imported in base.py
 
     if isinstance(e, pyodbc.Error):
+        # 死锁、锁超时、连接中断可以整体重试 (见 app.dal.retry)
+        transient_reason = classify_transient_error(e)
+        if transient_reason is not None:
+            return TransientDatabaseError(f"数据库瞬时错误 ({transient_reason}): {e}", reason=transient_reason)
+
+        # 超过查询超时 (HYT00，锁超时 1222 同样使用 HYT00，已在上面识别)：驱动已取消语句，
+        # 不重试 (重试只会加重数据库负载)
+        if e.args and e.args[0] == QUERY_TIMEOUT_SQLSTATE:
+            return QueryTimeoutError(f"数据库查询超时: {e}")
+
         # Prefer checking SQL Server error codes first
         if len(e.args) > 1 and isinstance(e.args[1], int):
             sqlserver_error_code = e.args[1]
@@ -0,0 +1,41 @@
+import pyodbc
+from typing import Optional, Callable, Awaitable, List, Dict, Any
+
+class MaintenanceDAL:
+    """Data Access Layer for background maintenance (batched purges and the leader lock)."""
+
+    def __init__(self, execute_query_func: Callable[..., Awaitable[Optional[Dict[str, Any]] | Optional[List[Dict[str, Any]]] | int]]) -> None:
+        """
+        Initializes the MaintenanceDAL with an asynchronous query execution function.
+
+        Args:
+            execute_query_func: An asynchronous function to execute database queries.
+        """
+        self._execute_query = execute_query_func
+
+    async def try_acquire_leader(self, conn: pyodbc.Connection, resource: str) -> bool:
+        """
+        Tries to take the session-owned exclusive app lock that elects the maintenance leader.
+        Returns True if this connection holds the lock (already or newly acquired); never waits.
+        """
+        sql = "{CALL sp_TryAcquireMaintenanceLeader (?)}"
+        result = await self._execute_query(conn, sql, (resource,), fetchone=True)
+        return bool(result and result.get("IsLeader"))
+
+    async def purge_expired_otps(self, conn: pyodbc.Connection, batch_size: int, grace_hours: int) -> int:
+        """Deletes one batch of expired or used OTPs. Returns the number of rows deleted."""
+        sql = "{CALL sp_PurgeExpiredOtps (?, ?)}"
+        result = await self._execute_query(conn, sql, (batch_size, grace_hours), fetchone=True)
+        return result.get("Purged", 0) if result else 0
+
+    async def purge_expired_password_reset_tokens(self, conn: pyodbc.Connection, batch_size: int, grace_hours: int) -> int:
+        """Deletes one batch of expired or used password reset tokens. Returns the number of rows deleted."""
+        sql = "{CALL sp_PurgeExpiredPasswordResetTokens (?, ?)}"
+        result = await self._execute_query(conn, sql, (batch_size, grace_hours), fetchone=True)
+        return result.get("Purged", 0) if result else 0
+
+    async def purge_read_notifications(self, conn: pyodbc.Connection, batch_size: int, retention_days: int) -> int:
+        """Deletes one batch of read notifications older than the retention period. Returns the number of rows deleted."""
+        sql = "{CALL sp_PurgeReadNotifications (?, ?)}"
+        result = await self._execute_query(conn, sql, (batch_size, retention_days), fetchone=True)
+        return result.get("Purged", 0) if result else 0
@@ -1,10 +1,55 @@
 import pyodbc
-from typing import List, Optional, Dict, Any, Callable, Awaitable
+from typing import List, Optional, Dict, Any, Callable, Awaitable, NamedTuple, Tuple
 from app.dal.base import execute_query, execute_non_query
-from app.exceptions import DALError, NotFoundError, IntegrityError, ForbiddenError
+from app.exceptions import (
+    DALError, NotFoundError, IntegrityError, ForbiddenError, TransientDatabaseError,
+    InsufficientStockError, ProductUnavailableError,
+)
 from uuid import UUID # 导入 UUID
-# 假设订单相关的 Pydantic schemas 在 app.schemas.order_schemas 中定义 (如果需要强类型返回)
-# from app.schemas.order_schemas import OrderSchema # 示例
+from app.dal.row_mappers import get_row_mapper
+from datetime import datetime
+from app.schemas.order_schemas import OrderResponseSchema, OrderSummarySchema
+
+# 订单存储过程 THROW 的业务错误码 -> 应用异常 (见 sql_scripts/procedures/03_trade_procedures.sql)
+ORDER_ERROR_CODES = {
+    "50001": NotFoundError,   # 买家不存在
+    "50002": ProductUnavailableError,  # 商品不存在或非在售状态 (含已售罄)
+    "50003": InsufficientStockError,   # 商品库存不足
+    "50004": NotFoundError,   # 订单不存在或不是该订单的卖家
+    "50005": IntegrityError,  # 订单状态不是"待卖家确认"
+    "50006": NotFoundError,   # 订单不存在
+    "50007": ForbiddenError,  # 无权完成此订单
+    "50008": IntegrityError,  # 订单状态不正确，无法完成
+    "50009": NotFoundError,   # 订单不存在或不是该订单的卖家
+    "50010": IntegrityError,  # 订单状态不是"待处理"，无法拒绝
+    "50016": NotFoundError,   # 订单不存在
+    "50017": ForbiddenError,  # 无权取消此订单
+    "50018": IntegrityError,  # 订单状态不正确，无法取消
+}
+
+class CreatedOrder(NamedTuple):
+    """sp_CreateOrder 的结果：新订单与扣减后的剩余库存 (用于 app.services.stock_gate)。"""
+    order: OrderResponseSchema
+    remaining_quantity: Optional[int]
+
+class OrderHistory(NamedTuple):
+    """sp_GetOrderHistory 的两个结果集。"""
+    orders: List[OrderSummarySchema]         # 至多 page_size + 1 行，多出的一行表示还有下一页
+    status_counts: Dict[str, Dict[str, int]] # {"buyer": {状态: 数量}, "seller": {...}}
+
+def _map_order_error(e: DALError, action: str) -> DALError:
+    """
+    execute_query 把存储过程的 THROW 包装为通用 DALError；按消息中的错误码映射为具体异常。
+    前置条件在存储过程内检查 (不再预先查询订单)，因此订单不存在 / 无权限 / 状态不符都从这里区分。
+    其它错误 (包括瞬时错误) 原样返回。
+    """
+    if isinstance(e, (TransientDatabaseError, NotFoundError)):
+        return e
+    message = str(e)
+    for code, error_cls in ORDER_ERROR_CODES.items():
+        if code in message:
+            return error_cls(f"{action}失败: {message}")
+    return e
 
 class OrdersDAL:
     """
@@ -27,25 +72,23 @@ class OrdersDAL:
         conn: pyodbc.Connection, # Add conn parameter
         buyer_id: UUID, 
         product_id: UUID, 
-        quantity: int, 
-        shipping_address: str, 
-        contact_phone: str
-    ) -> UUID:
+        quantity: int
+    ) -> CreatedOrder:
         """
         Calls the sp_CreateOrder stored procedure to create a new order.
-        Assumes sp_CreateOrder is modified to SELECT SCOPE_IDENTITY() AS OrderID at the end.
+        Stock is reserved with a single conditional UPDATE inside the procedure; the new order row
+        and the remaining stock come back in the same round trip.
         """
-        sql = "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}"
-        params = (str(buyer_id), str(product_id), quantity, shipping_address, contact_phone) # 转换为字符串
+        sql = "{CALL sp_CreateOrder (?, ?, ?)}"
+        params = (buyer_id, product_id, quantity)
         try:
-            # Use the stored generic execution function and pass conn
-            result = await self._execute_query(conn, sql, params, fetchone=True) # Assuming fetchone is supported
-            if result and result.get("OrderID") is not None: # Check if OrderID key exists and is not None
-                return UUID(result["OrderID"]) # 转换为 UUID
-            # This case should ideally not be reached if SP guarantees OrderID or throws error
-            # Consider if the generic execute_query handles this case better.
-            # Re-raising the original exception from _execute_query might be better.
-            raise DALError("Failed to create order or retrieve OrderID: SP did not return OrderID.")
+            row = await self._execute_query(conn, sql, params, fetchone=True)
+            if not row:
+                raise DALError("Failed to create order: sp_CreateOrder did not return the order.")
+            remaining_quantity = row.pop("RemainingQuantity", None)
+            return CreatedOrder(get_row_mapper("sp_CreateOrder").map_dict(row), remaining_quantity)
+        except DALError as e:
+            raise _map_order_error(e, "创建订单")
         except pyodbc.Error as e:
             # Fallback error handling if the generic function doesn't map all errors
             error_msg = str(e)
@@ -54,9 +97,9 @@ class OrdersDAL:
             if "50001" in error_msg: # 买家不存在或角色不正确
                 raise NotFoundError(f"创建订单失败: {error_msg}") from e
             elif "50002" in error_msg: # 商品不存在或已下架
-                raise NotFoundError(f"创建订单失败: {error_msg}") from e
+                raise ProductUnavailableError(f"创建订单失败: {error_msg}") from e
             elif "50003" in error_msg: # 商品库存不足
-                raise IntegrityError(f"创建订单失败: {error_msg}") from e
+                raise InsufficientStockError(f"创建订单失败: {error_msg}") from e
             raise DALError(f"无法创建订单: {error_msg}") from e
         except Exception as e:
             # Catch any other unexpected errors during DAL execution
@@ -67,24 +110,17 @@ class OrdersDAL:
         conn: pyodbc.Connection, # Add conn parameter
         order_id: UUID, 
         seller_id: UUID
-    ) -> None:
+    ) -> OrderResponseSchema:
         """
         Calls the sp_ConfirmOrder stored procedure for a seller to confirm an order.
+        The status precondition is checked inside the UPDATE; the confirmed order row is returned.
         """
         sql = "{CALL sp_ConfirmOrder (?, ?)}"
-        params = (str(order_id), str(seller_id)) # 转换为字符串
+        params = (order_id, seller_id)
         try:
-            # Use the stored generic execution function and pass conn
-            await self._execute_query(conn, sql, params, fetchone=False) # Assuming execute_non_query behavior
+            return await self._transition(conn, sql, params, "sp_ConfirmOrder")
         except DALError as e:
-            raise e
-        except pyodbc.Error as e:
-            error_msg = str(e)
-            if "50004" in error_msg: # 订单不存在或您不是该订单的卖家
-                raise NotFoundError(f"确认订单失败: {error_msg}") from e
-            elif "50005" in error_msg: # 订单状态不是"待处理"
-                raise IntegrityError(f"确认订单失败: {error_msg}") from e
-            raise DALError(f"无法确认订单 {order_id}: {error_msg}") from e
+            raise _map_order_error(e, "确认订单")
         except Exception as e:
             raise DALError(f"确认订单 {order_id} 时发生意外错误: {e}") from e
 
@@ -93,27 +129,17 @@ class OrdersDAL:
         conn: pyodbc.Connection, # Add conn parameter
         order_id: UUID, 
         actor_id: UUID
-    ) -> None:
+    ) -> OrderResponseSchema:
         """
         Calls the sp_CompleteOrder stored procedure to mark an order as completed.
-        ActorID can be the buyer or an admin.
+        ActorID can be the buyer or an admin. The completed order row is returned.
         """
         sql = "{CALL sp_CompleteOrder (?, ?)}"
-        params = (str(order_id), str(actor_id)) # 转换为字符串
+        params = (order_id, actor_id)
         try:
-            # Use the stored generic execution function and pass conn
-            await self._execute_query(conn, sql, params, fetchone=False) # Assuming execute_non_query behavior
+            return await self._transition(conn, sql, params, "sp_CompleteOrder")
         except DALError as e:
-            raise e
-        except pyodbc.Error as e:
-            error_msg = str(e)
-            if "50006" in error_msg: # 订单不存在
-                raise NotFoundError(f"完成订单失败: {error_msg}") from e
-            elif "50007" in error_msg: # 您无权完成此订单
-                raise ForbiddenError(f"完成订单失败: {error_msg}") from e
-            elif "50008" in error_msg: # 订单状态不正确
-                raise IntegrityError(f"完成订单失败: {error_msg}") from e
-            raise DALError(f"无法完成订单 {order_id}: {error_msg}") from e
+            raise _map_order_error(e, "完成订单")
         except Exception as e:
             raise DALError(f"完成订单 {order_id} 时发生意外错误: {e}") from e
 
@@ -123,29 +149,23 @@ class OrdersDAL:
         order_id: UUID, 
         seller_id: UUID, 
         rejection_reason: Optional[str] = None
-    ) -> None:
+    ) -> OrderResponseSchema:
         """
         Calls the sp_RejectOrder stored procedure for a seller to reject an order.
-        (Assumes sp_RejectOrder might take an optional @RejectionReason parameter)
+        @RejectionReason is optional; the rejected (cancelled) order row is returned.
         """
         # Adjust SQL and params if @RejectionReason is definitively part of sp_RejectOrder
         if rejection_reason:
             sql = "{CALL sp_RejectOrder (?, ?, ?)}"
-            params = (str(order_id), str(seller_id), rejection_reason) # 转换为字符串
+            params = (order_id, seller_id, rejection_reason)
         else:
             sql = "{CALL sp_RejectOrder (?, ?)}" # Assuming SP handles NULL or has default for reason if not provided
-            params = (str(order_id), str(seller_id)) # 转换为字符串
+            params = (order_id, seller_id)
         
         try:
-            # Use the stored generic execution function and pass conn
-            await self._execute_query(conn, sql, params, fetchone=False) # Assuming execute_non_query behavior
+            return await self._transition(conn, sql, params, "sp_RejectOrder")
         except DALError as e:
-            raise e
-        except pyodbc.Error as e:
-            error_msg = str(e)
-            # Add specific error code checks for sp_RejectOrder if available
-            # These specific error codes mapping might ideally live in the generic executor
-            raise DALError(f"无法拒绝订单 {order_id}: {error_msg}") from e
+            raise _map_order_error(e, "拒绝订单")
         except Exception as e:
             raise DALError(f"拒绝订单 {order_id} 时发生意外错误: {e}") from e
 
@@ -155,25 +175,27 @@ class OrdersDAL:
         order_id: UUID,
         user_id: UUID,
         cancel_reason: str
-    ) -> None:
+    ) -> OrderResponseSchema:
         """
-        Calls the sp_CancelOrder stored procedure to cancel an order.
-        (Assumes sp_CancelOrder exists as per documentation)
+        Calls the sp_CancelOrder stored procedure to cancel an order (buyer or seller).
+        The cancelled order row is returned.
         """
         sql = "{CALL sp_CancelOrder (?, ?, ?)}"
-        params = (str(order_id), str(user_id), cancel_reason) # 转换为字符串
+        params = (order_id, user_id, cancel_reason)
         try:
-            # Use the stored generic execution function and pass conn
-            await self._execute_query(conn, sql, params, fetchone=False) # Assuming execute_non_query behavior
+            return await self._transition(conn, sql, params, "sp_CancelOrder")
         except DALError as e:
-            raise e
-        except pyodbc.Error as e:
-            error_msg = str(e)
-            # Add specific error code checks for sp_CancelOrder if available
-            raise DALError(f"无法取消订单 {order_id}: {error_msg}") from e
+            raise _map_order_error(e, "取消订单")
         except Exception as e:
             raise DALError(f"取消订单 {order_id} 时发生意外错误: {e}") from e
 
+    async def _transition(self, conn: pyodbc.Connection, sql: str, params: tuple, procedure: str) -> OrderResponseSchema:
+        """执行一个订单状态变更过程并返回它输出的订单行 (一次往返)。"""
+        order = await self._execute_query(conn, sql, params, fetchone=True, row_mapper=get_row_mapper(procedure))
+        if order is None:
+            raise DALError(f"{procedure} did not return the updated order.")
+        return order
+
     async def get_orders_by_user(
         self, 
         conn: pyodbc.Connection, # Add conn parameter
@@ -182,16 +204,17 @@ class OrdersDAL:
         status: Optional[str] = None, 
         page_number: int = 1, 
         page_size: int = 10
-    ) -> List[Dict[str, Any]]:
+    ) -> List[OrderResponseSchema]:
         """
         Calls sp_GetOrdersByUser to retrieve a list of orders for a user (either as buyer or seller).
         (Assumes sp_GetOrdersByUser exists as per documentation)
+        Rows are mapped straight to OrderResponseSchema via the registered row mapper.
         """
         sql = "{CALL sp_GetOrdersByUser (?, ?, ?, ?, ?)}"
-        params = (str(user_id), is_seller, status, page_number, page_size) # 转换为字符串
+        params = (user_id, is_seller, status, page_number, page_size)
         try:
             # Use the stored generic execution function and pass conn
-            orders = await self._execute_query(conn, sql, params, fetchall=True) # Assuming fetchall is supported
+            orders = await self._execute_query(conn, sql, params, fetchall=True, row_mapper=get_row_mapper("sp_GetOrdersByUser"))
             return orders
         except DALError as e:
             raise e
@@ -201,6 +224,42 @@ class OrdersDAL:
         except Exception as e:
             raise DALError(f"获取用户 {user_id} 订单时发生意外错误: {e}") from e
 
+    async def get_order_history(
+        self,
+        conn: pyodbc.Connection,
+        user_id: UUID,
+        as_seller: bool,
+        status: Optional[str] = None,
+        page_size: int = 20,
+        after: Optional[Tuple[datetime, UUID]] = None
+    ) -> OrderHistory:
+        """
+        Calls sp_GetOrderHistory: per-status counts for both roles and one keyset page of order summaries
+        (product snapshot + counterpart username) in a single round trip.
+
+        Args:
+            after: (CreateTime, OrderID) of the last order on the previous page; None for the first page.
+        """
+        sql = "{CALL sp_GetOrderHistory (?, ?, ?, ?, ?, ?)}"
+        after_time, after_order_id = after if after else (None, None)
+        params = (user_id, as_seller, status, page_size, after_time, after_order_id)
+        try:
+            result_sets = await self._execute_query(conn, sql, params, fetch_sets=True)
+            if len(result_sets) != 2:
+                raise DALError(f"sp_GetOrderHistory returned {len(result_sets)} result sets, expected 2.")
+            count_rows, order_rows = result_sets
+            status_counts: Dict[str, Dict[str, int]] = {"buyer": {}, "seller": {}}
+            for row in count_rows:
+                status_counts[row["Role"].lower()][row["OrderStatus"]] = row["OrderCount"]
+            mapper = get_row_mapper("sp_GetOrderHistory")
+            return OrderHistory([mapper.map_dict(row) for row in order_rows], status_counts)
+        except DALError as e:
+            raise e
+        except pyodbc.Error as e:
+            raise DALError(f"无法获取用户 {user_id} 的订单历史: {e}") from e
+        except Exception as e:
+            raise DALError(f"获取用户 {user_id} 订单历史时发生意外错误: {e}") from e
+
     async def get_order_by_id(
         self, 
         conn: pyodbc.Connection, # Add conn parameter
@@ -211,7 +270,7 @@ class OrdersDAL:
         (Assumes sp_GetOrderById exists as per documentation)
         """
         sql = "{CALL sp_GetOrderById (?)}"
-        params = (str(order_id),) # 转换为字符串
+        params = (order_id,)
         try:
             # Use the stored generic execution function and pass conn
             result = await self._execute_query(conn, sql, params, fetchone=True) # Assuming fetchone is supported
@@ -0,0 +1,185 @@
+# app/dal/param_signatures.py
+"""
+存储过程参数签名：为每个 {CALL sp_*} 登记一次参数的 SQL 类型与长度，执行前用 cursor.setinputsizes 声明。
+
+不声明时 pyodbc 按每次调用的 Python 值推断参数类型: 字符串按实际长度绑定为 nvarchar(n)，None 绑定为 varchar，
+UUID 需要先转成字符串再由服务器隐式转换为 UNIQUEIDENTIFIER，float 以 float 传输再转换为 DECIMAL。
+声明签名后参数按存储过程定义的类型与长度传输，服务器端不再做隐式转换；UUID 直接以 GUID (16 字节) 绑定。
+
+签名按 DAL 中传参的顺序登记 (与 sql_scripts 中的参数顺序可能不同)，长度取存储过程的参数定义；
+字符串超过声明长度时数据库会报截断错误，而不是像以前那样在存储过程内被静默截断。
+未登记或参数个数多于签名的调用保持原来的按值推断。
+"""
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from app.dal.db_metrics import procedure_name
+
+# ODBC SQL 类型编号 (与 pyodbc.SQL_* 常量相同)，在这里定义以便不加载 ODBC 驱动也能导入本模块
+SQL_CHAR = 1
+SQL_DECIMAL = 3
+SQL_INTEGER = 4
+SQL_TYPE_TIMESTAMP = 93
+SQL_BIGINT = -5
+SQL_BIT = -7
+SQL_WVARCHAR = -9
+SQL_GUID = -11
+
+# setinputsizes 接受的 (sql_type, column_size, decimal_digits)
+InputSize = Tuple[int, int, int]
+
+UNIQUEIDENTIFIER: InputSize = (SQL_GUID, 0, 0)
+INT: InputSize = (SQL_INTEGER, 0, 0)
+BIGINT: InputSize = (SQL_BIGINT, 0, 0)
+BIT: InputSize = (SQL_BIT, 0, 0)
+DATETIME: InputSize = (SQL_TYPE_TIMESTAMP, 23, 3)
+NVARCHAR_MAX: InputSize = (SQL_WVARCHAR, 0, 0)  # 长度 0 表示 nvarchar(max)
+
+
+def NVARCHAR(length: int) -> InputSize:
+    return (SQL_WVARCHAR, length, 0)
+
+
+def CHAR(length: int) -> InputSize:
+    return (SQL_CHAR, length, 0)
+
+
+def DECIMAL(precision: int, scale: int) -> InputSize:
+    return (SQL_DECIMAL, precision, scale)
+
+
+MONEY = DECIMAL(10, 2)  # 商品价格
+
+
+class ParamSignature:
+    """
+    一个存储过程的参数签名。
+
+    Args:
+        procedure: 存储过程名。
+        sizes: 各参数的 (sql_type, column_size, decimal_digits)，顺序与 DAL 中的传参顺序一致。
+    """
+
+    __slots__ = ("procedure", "sizes", "_prefixes")
+
+    def __init__(self, procedure: str, sizes: Sequence[InputSize]) -> None:
+        self.procedure = procedure
+        self.sizes = tuple(sizes)
+        # 省略末尾可选参数的调用 (如 sp_RejectOrder 不传原因) 使用签名的前缀
+        self._prefixes = [list(self.sizes[:n]) for n in range(len(self.sizes) + 1)]
+
+    def input_sizes(self, param_count: int) -> Optional[list]:
+        """param_count 个参数对应的 setinputsizes 参数；参数多于签名时返回 None。"""
+        if param_count > len(self.sizes):
+            return None
+        return self._prefixes[param_count]
+
+
+_signatures: Dict[str, ParamSignature] = {}
+
+
+def register_param_signature(procedure: str, *sizes: InputSize) -> ParamSignature:
+    """登记存储过程的参数签名 (同名过程重复登记时覆盖)。"""
+    signature = ParamSignature(procedure, sizes)
+    _signatures[procedure] = signature
+    return signature
+
+
+def get_param_signature(procedure: str) -> Optional[ParamSignature]:
+    return _signatures.get(procedure)
+
+
+def input_sizes_for(sql: str, params: Optional[Sequence[Any]]) -> Optional[list]:
+    """
+    返回执行 sql 前应传给 cursor.setinputsizes 的列表；过程未登记、没有参数或参数个数不匹配时返回 None。
+    """
+    if not params:
+        return None
+    signature = _signatures.get(procedure_name(sql))
+    if signature is None:
+        return None
+    return signature.input_sizes(len(params))
+
+
+# --- 用户 ---
+register_param_signature("sp_GetUserProfileById", UNIQUEIDENTIFIER)
+register_param_signature("sp_GetUserByUsernameWithPassword", NVARCHAR(128))
+register_param_signature("sp_GetUserByEmailWithPassword", NVARCHAR(254))
+register_param_signature("sp_CreateUser", NVARCHAR(128), NVARCHAR(128), NVARCHAR(20), NVARCHAR(100))
+register_param_signature(
+    "sp_UpdateUserProfile",
+    UNIQUEIDENTIFIER, NVARCHAR(100), NVARCHAR(255), NVARCHAR(500), NVARCHAR(20), NVARCHAR(254), NVARCHAR(128),
+)
+register_param_signature("sp_GetUserPasswordHashById", UNIQUEIDENTIFIER)
+register_param_signature("sp_UpdateUserPassword", UNIQUEIDENTIFIER, NVARCHAR(128))
+register_param_signature("sp_DeleteUser", UNIQUEIDENTIFIER)
+register_param_signature("sp_GetAllUsers", UNIQUEIDENTIFIER)
+register_param_signature("sp_ChangeUserStatus", UNIQUEIDENTIFIER, NVARCHAR(20), UNIQUEIDENTIFIER)
+register_param_signature("sp_AdjustUserCredit", UNIQUEIDENTIFIER, INT, UNIQUEIDENTIFIER, NVARCHAR(500))
+register_param_signature("sp_UpdateUserStaffStatus", UNIQUEIDENTIFIER, BIT, UNIQUEIDENTIFIER)
+register_param_signature("sp_GetSystemNotificationsByUserId", UNIQUEIDENTIFIER)
+register_param_signature("sp_MarkNotificationAsRead", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER)
+register_param_signature("sp_SetChatMessageVisibility", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER, NVARCHAR(10), BIT)
+register_param_signature("sp_CreateOtpForPasswordReset", UNIQUEIDENTIFIER, NVARCHAR(10), DATETIME, NVARCHAR(50))
+register_param_signature("sp_GetOtpDetailsAndValidate", NVARCHAR(254), NVARCHAR(10))
+register_param_signature("sp_MarkOtpAsUsed", UNIQUEIDENTIFIER)
+
+# --- 商品 ---
+register_param_signature(
+    "sp_GetProductList",
+    NVARCHAR(100), NVARCHAR(20), NVARCHAR(200), MONEY, MONEY, NVARCHAR(50), INT, INT,
+)
+register_param_signature("sp_GetProductById", UNIQUEIDENTIFIER)
+register_param_signature(
+    "sp_CreateProduct",
+    UNIQUEIDENTIFIER, NVARCHAR(100), NVARCHAR(200), NVARCHAR_MAX, INT, MONEY,
+)
+register_param_signature(
+    "sp_UpdateProduct",
+    UNIQUEIDENTIFIER, UNIQUEIDENTIFIER, NVARCHAR(100), NVARCHAR(200), NVARCHAR_MAX, INT, MONEY,
+)
+register_param_signature("sp_DeleteProduct", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER)
+register_param_signature("sp_ActivateProduct", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER)
+register_param_signature("sp_RejectProduct", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER, NVARCHAR(500))
+register_param_signature("sp_WithdrawProduct", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER)
+register_param_signature("sp_DecreaseProductQuantity", UNIQUEIDENTIFIER, INT)
+register_param_signature("sp_IncreaseProductQuantity", UNIQUEIDENTIFIER, INT)
+register_param_signature("sp_BatchActivateProducts", NVARCHAR_MAX, UNIQUEIDENTIFIER)
+register_param_signature("sp_BatchRejectProducts", NVARCHAR_MAX, UNIQUEIDENTIFIER, NVARCHAR(500))
+register_param_signature("sp_AddProductImage", UNIQUEIDENTIFIER, NVARCHAR(255), INT)
+register_param_signature("sp_GetProductImagesByProductId", UNIQUEIDENTIFIER)
+register_param_signature("sp_DeleteProductImage", UNIQUEIDENTIFIER)
+register_param_signature("sp_DeleteProductImagesByProductId", UNIQUEIDENTIFIER)
+register_param_signature("sp_AddUserFavorite", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER)
+register_param_signature("sp_RemoveUserFavorite", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER)
+register_param_signature("sp_GetUserFavoriteProducts", UNIQUEIDENTIFIER)
+
+# --- 订单 ---
+register_param_signature("sp_CreateOrder", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER, INT)
+register_param_signature("sp_ConfirmOrder", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER)
+register_param_signature("sp_CompleteOrder", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER)
+register_param_signature("sp_RejectOrder", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER, NVARCHAR(500))
+register_param_signature("sp_CancelOrder", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER, NVARCHAR(500))
+# sp_GetOrdersByUser 不登记：过程定义为 (@UserID, @UserRole)，而 OrdersDAL.get_orders_by_user 传 5 个参数，
+# 两边对齐之前按签名声明只会把错误的类型绑定到错误的位置，保持按值推断。
+register_param_signature("sp_GetOrderById", UNIQUEIDENTIFIER)
+register_param_signature("sp_GetOrderHistory", UNIQUEIDENTIFIER, BIT, NVARCHAR(50), INT, DATETIME, UNIQUEIDENTIFIER)
+
+# --- 评价 ---
+register_param_signature("sp_CreateEvaluation", UNIQUEIDENTIFIER, UNIQUEIDENTIFIER, INT, NVARCHAR(500))
+register_param_signature("sp_GetEvaluationById", UNIQUEIDENTIFIER)
+register_param_signature("sp_GetEvaluationsByProductId", UNIQUEIDENTIFIER)
+register_param_signature("sp_GetEvaluationsByBuyerId", UNIQUEIDENTIFIER)
+register_param_signature("sp_GetSellerReputation", UNIQUEIDENTIFIER)
+register_param_signature("sp_RecomputeSellerStats", UNIQUEIDENTIFIER)
+register_param_signature("sp_GetEvaluationPage", NVARCHAR(10), UNIQUEIDENTIFIER, INT, INT, INT, DATETIME, UNIQUEIDENTIFIER)
+
+# --- 上传文件 ---
+register_param_signature("sp_RegisterUploadedFile", CHAR(64), NVARCHAR(255), BIGINT)
+register_param_signature("sp_GetUnreferencedUploads", INT)
+register_param_signature("sp_DeleteUploadedFile", NVARCHAR(255))
+
+# --- 后台维护 ---
+register_param_signature("sp_TryAcquireMaintenanceLeader", NVARCHAR(255))
+register_param_signature("sp_PurgeExpiredOtps", INT, INT)
+register_param_signature("sp_PurgeExpiredPasswordResetTokens", INT, INT)
+register_param_signature("sp_PurgeReadNotifications", INT, INT)
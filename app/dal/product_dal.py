@@ -60,13 +60,13 @@ class ProductDAL:
         
         if not new_product_id_str:
             # Handle case where SP executed but did not return the expected ID
-            logger.error(f"DAL: sp_CreateProduct failed to return 新商品ID. Result: {result}")
+            logger.error("DAL: sp_CreateProduct failed to return 新商品ID. Result: %s", result)
             raise DALError("Failed to retrieve new product ID after creation.")
         
         try:
             return UUID(new_product_id_str) # Convert string UUID to UUID object
         except ValueError as e:
-            logger.error(f"DAL: Failed to convert new product ID '{new_product_id_str}' to UUID: {e}")
+            logger.error("DAL: Failed to convert new product ID '%s' to UUID: %s", new_product_id_str, e)
             raise DALError("Failed to convert new product ID to UUID.") from e
 
     async def update_product(self, conn: pyodbc.Connection, product_id: UUID, owner_id: UUID, category_name: str, product_name: str, 
@@ -102,14 +102,14 @@ class ProductDAL:
             # Use execute_query for update, check rowcount for success
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0:
-                logger.warning(f"DAL: Update product {product_id} returned 0 rows affected, possibly not found or no changes.")
+                logger.warning("DAL: Update product %s returned 0 rows affected, possibly not found or no changes.", product_id)
                 # Consider raising NotFoundError or similar if 0 rows affected implies no such product was found for update
                 # For now, let's assume service layer will handle the product existence check before calling DAL update.
         except pyodbc.Error as e:
-            logger.error(f"DAL Error updating product {product_id}: {e}")
+            logger.error("DAL Error updating product %s: %s", product_id, e)
             raise DALError(f"Database error updating product {product_id}: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error updating product {product_id}: {e}")
+            logger.error("Unexpected Error updating product %s: %s", product_id, e)
             raise e
 
     async def delete_product(self, conn: pyodbc.Connection, product_id: UUID, owner_id: UUID) -> None:
@@ -133,14 +133,14 @@ class ProductDAL:
         try:
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0:
-                 logger.warning(f"DAL: Delete product {product_id} returned 0 rows affected, possibly not found or no changes.")
+                 logger.warning("DAL: Delete product %s returned 0 rows affected, possibly not found or no changes.", product_id)
                  raise NotFoundError(f"Product with ID {product_id} not found for deletion or not owned by user {owner_id}.")
             # Consider specific error messages from SP if available
         except pyodbc.Error as e:
-            logger.error(f"DAL Error deleting product {product_id}: {e}")
+            logger.error("DAL Error deleting product %s: %s", product_id, e)
             raise DALError(f"Database error deleting product {product_id}: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error deleting product {product_id}: {e}")
+            logger.error("Unexpected Error deleting product %s: %s", product_id, e)
             raise e
 
     async def activate_product(self, conn: pyodbc.Connection, product_id: UUID, admin_id: UUID) -> None:
@@ -164,16 +164,16 @@ class ProductDAL:
         try:
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0: # This might indicate product not found or no permission etc.
-                logger.warning(f"DAL: Activate product {product_id} returned 0 rows affected. Admin {admin_id}.")
+                logger.warning("DAL: Activate product %s returned 0 rows affected. Admin %s.", product_id, admin_id)
                 # The SP should ideally return specific codes/messages for not found/permission denied.
                 # Assuming 0 rows affected indicates failure for the given product_id/admin_id combo.
                 # For now, rely on service layer to check permissions and product existence prior.
                 raise DALError(f"Failed to activate product {product_id}. Check product ID and admin permissions.")
         except pyodbc.Error as e:
-            logger.error(f"DAL Error activating product {product_id}: {e}")
+            logger.error("DAL Error activating product %s: %s", product_id, e)
             raise DALError(f"Database error activating product {product_id}: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error activating product {product_id}: {e}")
+            logger.error("Unexpected Error activating product %s: %s", product_id, e)
             raise e
 
     async def reject_product(self, conn: pyodbc.Connection, product_id: UUID, admin_id: UUID, reason: Optional[str] = None) -> None:
@@ -191,7 +191,7 @@ class ProductDAL:
             PermissionError: 非管理员尝试操作时抛出
         """
         # Add logging
-        logger.debug(f"DAL: Admin {admin_id} rejecting product {product_id} with reason: {reason}")
+        logger.debug("DAL: Admin %s rejecting product %s with reason: %s", admin_id, product_id, reason)
         # Modify query to include reason
         sql = "{CALL sp_RejectProduct(?, ?, ?)}"
         params = (
@@ -202,16 +202,16 @@ class ProductDAL:
         try:
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0:
-                 logger.warning(f"DAL: Reject product {product_id} returned 0 rows affected. Admin {admin_id}.")
+                 logger.warning("DAL: Reject product %s returned 0 rows affected. Admin %s.", product_id, admin_id)
                  raise DALError(f"Failed to reject product {product_id}. Check product ID and admin permissions.")
             # Add logging for success
-            logger.info(f"DAL: Product {product_id} rejected successfully by admin {admin_id}")
+            logger.info("DAL: Product %s rejected successfully by admin %s", product_id, admin_id)
         except pyodbc.Error as e:
-            logger.error(f"DAL: Database error rejecting product {product_id}: {e}")
+            logger.error("DAL: Database error rejecting product %s: %s", product_id, e)
             raise DALError(f"Database error rejecting product {product_id}: {e}") from e
         except Exception as e:
             # Catch other potential exceptions during execution
-            logger.error(f"DAL: Unexpected error rejecting product {product_id}: {e}")
+            logger.error("DAL: Unexpected error rejecting product %s: %s", product_id, e)
             raise DALError(f"Unexpected error rejecting product {product_id}: {e}") from e
 
     async def withdraw_product(self, conn: pyodbc.Connection, product_id: UUID, owner_id: UUID) -> None:
@@ -235,13 +235,13 @@ class ProductDAL:
         try:
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0:
-                 logger.warning(f"DAL: Withdraw product {product_id} returned 0 rows affected. Owner {owner_id}.")
+                 logger.warning("DAL: Withdraw product %s returned 0 rows affected. Owner %s.", product_id, owner_id)
                  raise NotFoundError(f"Product with ID {product_id} not found for withdrawal or not owned by user {owner_id}.")
         except pyodbc.Error as e:
-            logger.error(f"DAL Error withdrawing product {product_id}: {e}")
+            logger.error("DAL Error withdrawing product %s: %s", product_id, e)
             raise DALError(f"Database error withdrawing product {product_id}: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error withdrawing product {product_id}: {e}")
+            logger.error("Unexpected Error withdrawing product %s: %s", product_id, e)
             raise e
 
     async def get_product_list(self, conn: pyodbc.Connection, category_name: Optional[str] = None, status: Optional[str] = None, 
@@ -283,10 +283,10 @@ class ProductDAL:
             result = await self._execute_query(conn, sql, params, fetchall=True)
             return result if result is not None else []
         except pyodbc.Error as e:
-            logger.error(f"DAL Error getting product list: {e}")
+            logger.error("DAL Error getting product list: %s", e)
             raise DALError(f"Database error getting product list: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error getting product list: {e}")
+            logger.error("Unexpected Error getting product list: %s", e)
             raise e
 
     async def get_product_by_id(self, conn: pyodbc.Connection, product_id: UUID) -> Optional[Dict]:
@@ -309,10 +309,10 @@ class ProductDAL:
             result = await self._execute_query(conn, sql, params, fetchone=True)
             return result
         except pyodbc.Error as e:
-            logger.error(f"DAL Error getting product by ID {product_id}: {e}")
+            logger.error("DAL Error getting product by ID %s: %s", product_id, e)
             raise DALError(f"Database error getting product by ID {product_id}: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error getting product by ID {product_id}: {e}")
+            logger.error("Unexpected Error getting product by ID %s: %s", product_id, e)
             raise e
 
     async def decrease_product_quantity(self, conn: pyodbc.Connection, product_id: UUID, quantity_to_decrease: int) -> None:
@@ -332,14 +332,14 @@ class ProductDAL:
         try:
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0:
-                logger.warning(f"DAL: Decrease product quantity for {product_id} returned 0 rows affected.")
+                logger.warning("DAL: Decrease product quantity for %s returned 0 rows affected.", product_id)
                 # Consider specific error message if the SP returns one for insufficient quantity etc.
                 raise DALError(f"Failed to decrease quantity for product {product_id}. Possibly insufficient stock or product not found.")
         except pyodbc.Error as e:
-            logger.error(f"DAL Error decreasing product quantity for {product_id}: {e}")
+            logger.error("DAL Error decreasing product quantity for %s: %s", product_id, e)
             raise DALError(f"Database error decreasing product quantity: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error decreasing product quantity for {product_id}: {e}")
+            logger.error("Unexpected Error decreasing product quantity for %s: %s", product_id, e)
             raise e
 
     async def increase_product_quantity(self, conn: pyodbc.Connection, product_id: UUID, quantity_to_increase: int) -> None:
@@ -359,13 +359,13 @@ class ProductDAL:
         try:
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0:
-                logger.warning(f"DAL: Increase product quantity for {product_id} returned 0 rows affected.")
+                logger.warning("DAL: Increase product quantity for %s returned 0 rows affected.", product_id)
                 raise DALError(f"Failed to increase quantity for product {product_id}. Product not found.")
         except pyodbc.Error as e:
-            logger.error(f"DAL Error increasing product quantity for {product_id}: {e}")
+            logger.error("DAL Error increasing product quantity for %s: %s", product_id, e)
             raise DALError(f"Database error increasing product quantity: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error increasing product quantity for {product_id}: {e}")
+            logger.error("Unexpected Error increasing product quantity for %s: %s", product_id, e)
             raise e
 
     async def batch_activate_products(self, conn: pyodbc.Connection, product_ids: List[UUID], admin_id: UUID) -> int:
@@ -391,13 +391,13 @@ class ProductDAL:
         try:
             result = await self._execute_query(conn, sql, params, fetchone=True) # Assuming SP returns count
             activated_count = result.get('ActivatedCount', 0) if result else 0 # Check for 'ActivatedCount' key
-            logger.info(f"DAL: Batch activated {activated_count} products by admin {admin_id}")
+            logger.info("DAL: Batch activated %s products by admin %s", activated_count, admin_id)
             return activated_count
         except pyodbc.Error as e:
-            logger.error(f"DAL Error batch activating products: {e}")
+            logger.error("DAL Error batch activating products: %s", e)
             raise DALError(f"Database error batch activating products: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error batch activating products: {e}")
+            logger.error("Unexpected Error batch activating products: %s", e)
             raise e
 
     async def batch_reject_products(self, conn: pyodbc.Connection, product_ids: List[UUID], admin_id: UUID, reason: Optional[str] = None) -> int:
@@ -423,13 +423,13 @@ class ProductDAL:
         try:
             result = await self._execute_query(conn, sql, params, fetchone=True) # Assuming SP returns count
             rejected_count = result.get('RejectedCount', 0) if result else 0 # Check for 'RejectedCount' key
-            logger.info(f"DAL: Batch rejected {rejected_count} products by admin {admin_id}")
+            logger.info("DAL: Batch rejected %s products by admin %s", rejected_count, admin_id)
             return rejected_count
         except pyodbc.Error as e:
-            logger.error(f"DAL Error batch rejecting products: {e}")
+            logger.error("DAL Error batch rejecting products: %s", e)
             raise DALError(f"Database error batch rejecting products: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error batch rejecting products: {e}")
+            logger.error("Unexpected Error batch rejecting products: %s", e)
             raise e
 
 
@@ -464,12 +464,12 @@ class ProductImageDAL:
         try:
             # Use execute_query for non-fetching operation
             await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
-            logger.info(f"DAL: Image {image_url} added for product {product_id}")
+            logger.info("DAL: Image %s added for product %s", image_url, product_id)
         except pyodbc.Error as e:
-            logger.error(f"DAL Error adding product image for product {product_id}: {e}")
+            logger.error("DAL Error adding product image for product %s: %s", product_id, e)
             raise DALError(f"Database error adding product image: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error adding product image for product {product_id}: {e}")
+            logger.error("Unexpected Error adding product image for product %s: %s", product_id, e)
             raise e
 
     async def get_images_by_product_id(self, conn: pyodbc.Connection, product_id: UUID) -> List[Dict]:
@@ -492,10 +492,10 @@ class ProductImageDAL:
             result = await self._execute_query(conn, sql, params, fetchall=True)
             return result if result is not None else []
         except pyodbc.Error as e:
-            logger.error(f"DAL Error getting product images for product {product_id}: {e}")
+            logger.error("DAL Error getting product images for product %s: %s", product_id, e)
             raise DALError(f"Database error getting product images: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error getting product images for product {product_id}: {e}")
+            logger.error("Unexpected Error getting product images for product %s: %s", product_id, e)
             raise e
 
     async def delete_product_image(self, conn: pyodbc.Connection, image_id: int) -> None:
@@ -514,13 +514,13 @@ class ProductImageDAL:
         try:
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0:
-                logger.warning(f"DAL: Delete product image {image_id} returned 0 rows affected, possibly not found.")
+                logger.warning("DAL: Delete product image %s returned 0 rows affected, possibly not found.", image_id)
                 raise NotFoundError(f"Product image with ID {image_id} not found for deletion.")
         except pyodbc.Error as e:
-            logger.error(f"DAL Error deleting product image {image_id}: {e}")
+            logger.error("DAL Error deleting product image %s: %s", image_id, e)
             raise DALError(f"Database error deleting product image: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error deleting product image {image_id}: {e}")
+            logger.error("Unexpected Error deleting product image %s: %s", image_id, e)
             raise e
 
     async def delete_product_images_by_product_id(self, conn: pyodbc.Connection, product_id: UUID) -> None:
@@ -538,12 +538,12 @@ class ProductImageDAL:
         params = (product_id,) # Passed as UUID
         try:
             await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
-            logger.info(f"DAL: All images for product {product_id} deleted.")
+            logger.info("DAL: All images for product %s deleted.", product_id)
         except pyodbc.Error as e:
-            logger.error(f"DAL Error deleting product images for product {product_id}: {e}")
+            logger.error("DAL Error deleting product images for product %s: %s", product_id, e)
             raise DALError(f"Database error deleting product images: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error deleting product images for product {product_id}: {e}")
+            logger.error("Unexpected Error deleting product images for product %s: %s", product_id, e)
             raise e
 
 
@@ -577,15 +577,15 @@ class UserFavoriteDAL:
         params = (user_id, product_id) # Passed as UUID
         try:
             await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
-            logger.info(f"DAL: User {user_id} added favorite product {product_id}")
+            logger.info("DAL: User %s added favorite product %s", user_id, product_id)
         except pyodbc.IntegrityError as e:
-            logger.warning(f"DAL: User {user_id} already favorited product {product_id}")
+            logger.warning("DAL: User %s already favorited product %s", user_id, product_id)
             raise IntegrityError("Product already in favorites.") from e
         except pyodbc.Error as e:
-            logger.error(f"DAL Error adding user favorite for user {user_id}, product {product_id}: {e}")
+            logger.error("DAL Error adding user favorite for user %s, product %s: %s", user_id, product_id, e)
             raise DALError(f"Database error adding user favorite: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error adding user favorite for user {user_id}, product {product_id}: {e}")
+            logger.error("Unexpected Error adding user favorite for user %s, product %s: %s", user_id, product_id, e)
             raise e
 
     async def remove_user_favorite(self, conn: pyodbc.Connection, user_id: UUID, product_id: UUID) -> None:
@@ -605,14 +605,14 @@ class UserFavoriteDAL:
         try:
             rowcount = await self._execute_query(conn, sql, params, fetchone=False, fetchall=False)
             if rowcount == 0:
-                logger.warning(f"DAL: Remove favorite for user {user_id}, product {product_id} returned 0 rows affected, possibly not found.")
+                logger.warning("DAL: Remove favorite for user %s, product %s returned 0 rows affected, possibly not found.", user_id, product_id)
                 raise NotFoundError("Favorite not found.")
-            logger.info(f"DAL: User {user_id} removed favorite product {product_id}")
+            logger.info("DAL: User %s removed favorite product %s", user_id, product_id)
         except pyodbc.Error as e:
-            logger.error(f"DAL Error removing user favorite for user {user_id}, product {product_id}: {e}")
+            logger.error("DAL Error removing user favorite for user %s, product %s: %s", user_id, product_id, e)
             raise DALError(f"Database error removing user favorite: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error removing user favorite for user {user_id}, product {product_id}: {e}")
+            logger.error("Unexpected Error removing user favorite for user %s, product %s: %s", user_id, product_id, e)
             raise e
 
     async def get_user_favorite_products(self, conn: pyodbc.Connection, user_id: UUID) -> List[Dict]:
@@ -635,8 +635,8 @@ class UserFavoriteDAL:
             result = await self._execute_query(conn, sql, params, fetchall=True)
             return result if result is not None else []
         except pyodbc.Error as e:
-            logger.error(f"DAL Error getting user favorite products for user {user_id}: {e}")
+            logger.error("DAL Error getting user favorite products for user %s: %s", user_id, e)
             raise DALError(f"Database error getting user favorite products: {e}") from e
         except Exception as e:
-            logger.error(f"Unexpected Error getting user favorite products for user {user_id}: {e}")
+            logger.error("Unexpected Error getting user favorite products for user %s: %s", user_id, e)
             raise e  
\ No newline at end of file
@@ -0,0 +1,92 @@
+# app/dal/read_only.py
+"""
+只读连接：纯读取的 GET 路由使用 get_read_only_db_connection 注入的连接。
+
+只读连接以 autocommit 模式打开，每条语句各自构成一个事务，请求结束时不需要 commit / rollback，
+省去一次数据库往返。为防止误用，只读连接上只允许调用 READ_ONLY_PROCEDURES 中登记的存储过程，
+其它语句 (以及 commit、transaction()) 会抛出 ReadOnlyViolationError。
+
+新增只读存储过程后需要在这里登记；会写数据的过程 (如登录时更新 LastLoginAt 的
+sp_GetUserByEmailWithPassword) 不能登记。
+"""
+from typing import Any
+
+from app.dal.db_metrics import procedure_name
+from app.exceptions import ReadOnlyViolationError
+
+READ_ONLY_PROCEDURES = frozenset({
+    # 用户
+    "sp_GetAllUsers",
+    "sp_GetUserProfileById",
+    "sp_GetSystemNotificationsByUserId",
+    # 商品
+    "sp_GetProductList",
+    "sp_GetProductById",
+    "sp_GetProductDetail",
+    "sp_GetProductImagesByProductId",
+    "sp_GetImagesByProduct",
+    "sp_GetUserFavoriteProducts",
+    # 订单
+    "sp_GetOrderById",
+    "sp_GetOrdersByUser",
+    "sp_GetOrderHistory",
+    # 评价
+    "sp_GetEvaluationById",
+    "sp_GetEvaluationsByBuyerId",
+    "sp_GetEvaluationsByProductId",
+    "sp_GetSellerReputation",
+    "sp_GetEvaluationPage",
+    # 上传文件
+    "sp_GetUnreferencedUploads",
+})
+
+
+def is_read_only_sql(sql: str) -> bool:
+    """SQL 是否为登记过的只读存储过程调用 (临时 SQL 一律视为写操作)。"""
+    return procedure_name(sql) in READ_ONLY_PROCEDURES
+
+
+def check_read_only(conn: Any, sql: str) -> None:
+    """
+    conn 为只读连接且 sql 不是只读存储过程时抛出 ReadOnlyViolationError。
+
+    Raises:
+        ReadOnlyViolationError: 在只读连接上执行写操作。
+    """
+    if getattr(conn, "read_only", False) and not is_read_only_sql(sql):
+        raise ReadOnlyViolationError(f"只读连接上不允许执行 {procedure_name(sql)}")
+
+
+class ReadOnlyConnection:
+    """
+    包装 autocommit 模式的 pyodbc 连接 (pyodbc.Connection 不允许设置额外属性)。
+
+    cursor() 等调用原样转发；commit() 抛出 ReadOnlyViolationError，rollback() 为空操作
+    (autocommit 模式下没有未提交的事务)。
+    """
+
+    __slots__ = ("_conn",)
+
+    read_only = True
+
+    def __init__(self, conn: Any) -> None:
+        self._conn = conn
+
+    @property
+    def raw_connection(self) -> Any:
+        return self._conn
+
+    def cursor(self):
+        return self._conn.cursor()
+
+    def commit(self) -> None:
+        raise ReadOnlyViolationError("只读连接不能提交事务")
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
@@ -0,0 +1,144 @@
+# app/dal/replica_routing.py
+"""
+读副本路由：只读连接 (get_read_only_db_connection) 优先连接 DATABASE_READ_REPLICAS 中的副本，
+读写连接与事务始终使用主库 (DATABASE_SERVER)。
+
+副本存在复制延迟，因此用户完成一次写请求后的 DATABASE_READ_YOUR_WRITES_SECONDS 秒内，
+该用户的读请求仍然路由到主库 (read-your-writes)。用户以请求的 Authorization 头区分，不需要解析令牌。
+写入记录保存在进程内；多进程部署时同一用户的请求应由同一进程处理 (或把窗口设置得大于复制延迟)。
+
+副本连接失败时在 DATABASE_READ_REPLICA_RETRY_SECONDS 内不再选择该副本，本次请求回退到主库。
+"""
+import time
+from typing import Callable, Dict, Hashable, List, Optional, Sequence
+
+from app.config import settings
+from app.core.metrics import REGISTRY, MetricsRegistry
+
+# 路由结果的 reason 标签
+ROUTE_REPLICA = "replica"
+ROUTE_NO_REPLICA = "no_replica"  # 未配置副本或副本全部不可用
+ROUTE_STICKY = "read_your_writes"
+ROUTE_FALLBACK = "replica_unavailable"
+
+
+class ReplicaRoutingMetrics:
+    """读副本路由相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.routed = registry.counter(
+            "db_read_routing_total", "只读连接的路由结果", ("target", "reason"))
+        self.replica_failures = registry.counter(
+            "db_replica_connect_failures_total", "连接读副本失败的次数", ("server",))
+
+
+class ReplicaRouter:
+    """
+    为只读连接选择目标服务器 (轮询可用的副本)，并记录用户最近一次写入的时间。
+
+    Args:
+        replicas: 副本服务器地址列表 (与 DATABASE_SERVER 格式相同，如 "replica1,1433")。
+        sticky_seconds: 写入后读请求固定到主库的时长 (秒)，0 表示不启用。
+        retry_seconds: 副本连接失败后暂停使用该副本的时长 (秒)。
+        max_sticky_keys: 最多保存的写入记录数，超出时丢弃最早的记录。
+        clock: 单调时钟 (测试时可替换)。
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[str],
+        sticky_seconds: float = 5.0,
+        retry_seconds: float = 30.0,
+        max_sticky_keys: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Optional[ReplicaRoutingMetrics] = None,
+    ) -> None:
+        self.replicas: List[str] = [server for server in replicas if server]
+        self.sticky_seconds = sticky_seconds
+        self.retry_seconds = retry_seconds
+        self.max_sticky_keys = max_sticky_keys
+        self.clock = clock
+        self.metrics = metrics or get_replica_routing_metrics()
+        self._next = 0
+        self._down_until: Dict[str, float] = {}
+        # key -> 固定到主库的截止时间；按写入顺序插入，截止时间单调递增
+        self._sticky_until: Dict[Hashable, float] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self, key: Optional[Hashable] = None) -> Optional[str]:
+        """
+        返回本次只读连接应使用的副本地址；返回 None 表示使用主库。
+
+        Args:
+            key: 用户标识 (见 sticky_key)，匿名请求为 None。
+        """
+        if not self.replicas:
+            return None
+        now = self.clock()
+        if key is not None and self._sticky_until.get(key, 0.0) > now:
+            self.metrics.routed.inc("primary", ROUTE_STICKY)
+            return None
+        for _ in range(len(self.replicas)):
+            server = self.replicas[self._next % len(self.replicas)]
+            self._next += 1
+            if self._down_until.get(server, 0.0) <= now:
+                self.metrics.routed.inc("replica", ROUTE_REPLICA)
+                return server
+        self.metrics.routed.inc("primary", ROUTE_NO_REPLICA)
+        return None
+
+    def record_write(self, key: Optional[Hashable]) -> None:
+        """记录 key 对应的用户刚完成一次写入，之后 sticky_seconds 内的读请求走主库。"""
+        if key is None or not self.replicas or self.sticky_seconds <= 0:
+            return
+        now = self.clock()
+        self._sticky_until.pop(key, None)
+        self._sticky_until[key] = now + self.sticky_seconds
+        self._prune(now)
+
+    def mark_down(self, server: str) -> None:
+        """副本连接失败：retry_seconds 内不再选择该副本。"""
+        self._down_until[server] = self.clock() + self.retry_seconds
+        self.metrics.replica_failures.inc(server)
+        self.metrics.routed.inc("primary", ROUTE_FALLBACK)
+
+    def _prune(self, now: float) -> None:
+        sticky = self._sticky_until
+        while sticky:
+            oldest = next(iter(sticky))
+            if sticky[oldest] > now and len(sticky) <= self.max_sticky_keys:
+                break
+            del sticky[oldest]
+
+
+def sticky_key(headers) -> Optional[int]:
+    """以 Authorization 头 (的哈希) 标识用户；没有该头的请求返回 None。"""
+    authorization = headers.get("authorization")
+    return hash(authorization) if authorization else None
+
+
+_default_metrics = None
+_default_router = None
+
+
+def get_replica_routing_metrics() -> ReplicaRoutingMetrics:
+    """全局注册表上的路由指标 (首次使用时注册)。"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = ReplicaRoutingMetrics(REGISTRY)
+    return _default_metrics
+
+
+def get_replica_router() -> ReplicaRouter:
+    """按 settings 创建的进程级路由器。"""
+    global _default_router
+    if _default_router is None:
+        _default_router = ReplicaRouter(
+            settings.DATABASE_READ_REPLICAS,
+            sticky_seconds=settings.DATABASE_READ_YOUR_WRITES_SECONDS,
+            retry_seconds=settings.DATABASE_READ_REPLICA_RETRY_SECONDS,
+        )
+    return _default_router
@@ -0,0 +1,191 @@
+# app/dal/retry.py
+"""
+瞬时数据库错误的重试策略。
+
+SQL Server 选中死锁牺牲品 (1205) 或锁超时 (1222) 时会回滚整个事务，因此不能只重试出错的那条语句，
+而要回滚后把整个工作单元 (一个 Service 方法中的全部 DAL 调用) 重新执行一遍。
+map_db_exception 把这类错误映射为 TransientDatabaseError；retry_transaction / retry_on_transient
+在工作单元失败时沿异常链查找它，按带抖动的指数退避重试，直到次数或时间预算用完。
+
+连接中断 (08S01 / 10054) 同样是瞬时错误，但请求持有的连接已经不可用，在同一请求内无法重试；
+它会直接抛出，由全局处理器返回 503 + Retry-After，由客户端重试。
+"""
+import asyncio
+import functools
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from app.config import settings
+from app.core.metrics import REGISTRY, MetricsRegistry
+from app.exceptions import TransientDatabaseError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# 在同一连接上回滚后可以重试的原因
+RETRYABLE_REASONS = frozenset({"deadlock", "lock_timeout"})
+
+
+class RetryPolicy:
+    """
+    重试参数。
+
+    Args:
+        max_attempts: 最多执行次数 (包含第一次)。
+        base_delay: 第一次重试前的最大等待时间 (秒)，之后每次翻倍。
+        max_delay: 单次等待的上限 (秒)。
+        budget: 从第一次执行开始计算的总时间预算 (秒)，等待后会超出预算时不再重试。
+    """
+
+    __slots__ = ("max_attempts", "base_delay", "max_delay", "budget")
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.05, max_delay: float = 1.0, budget: float = 3.0) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次失败后的等待时间：[0, min(max_delay, base_delay * 2^(attempt-1))] 内均匀随机 (full jitter)。"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    @classmethod
+    def from_settings(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=settings.DB_RETRY_MAX_ATTEMPTS,
+            base_delay=settings.DB_RETRY_BASE_DELAY_MS / 1000,
+            max_delay=settings.DB_RETRY_MAX_DELAY_MS / 1000,
+            budget=settings.DB_RETRY_BUDGET_MS / 1000,
+        )
+
+
+class RetryMetrics:
+    """事务重试相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.retries = registry.counter(
+            "db_transaction_retries_total", "因瞬时错误重试工作单元的次数", ("unit", "reason"))
+        self.recovered = registry.counter(
+            "db_transaction_retry_recovered_total", "重试后成功的工作单元数", ("unit",))
+        self.exhausted = registry.counter(
+            "db_transaction_retry_exhausted_total", "瞬时错误最终未能恢复的工作单元数 (重试用完或不可重试)", ("unit", "reason"))
+
+
+_default_metrics = None
+_default_policy = None
+
+
+def get_retry_metrics() -> RetryMetrics:
+    """全局注册表上的重试指标 (首次使用时注册)。"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = RetryMetrics(REGISTRY)
+    return _default_metrics
+
+
+def get_retry_policy() -> RetryPolicy:
+    """按 settings 创建的默认重试策略。"""
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = RetryPolicy.from_settings()
+    return _default_policy
+
+
+def find_transient_error(exc: BaseException) -> Optional[TransientDatabaseError]:
+    """
+    沿 __cause__ / __context__ 查找 TransientDatabaseError。
+
+    DAL 与 Service 常把底层异常重新包装为 DALError (raise ... from e)，因此不能只看最外层的异常类型。
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, TransientDatabaseError):
+            return exc
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return None
+
+
+async def _rollback(conn: Any) -> None:
+    try:
+        await asyncio.to_thread(conn.rollback)
+    except Exception as e:  # 连接已不可用时回滚也会失败，保留原始错误
+        logger.warning("Rollback before retry failed: %s", e)
+
+
+async def retry_transaction(
+    conn: Any,
+    work: Callable[[], Awaitable[T]],
+    unit: str,
+    policy: Optional[RetryPolicy] = None,
+    metrics: Optional[RetryMetrics] = None,
+) -> T:
+    """
+    执行工作单元并提交；遇到可重试的瞬时错误时回滚、等待后整体重新执行。
+
+    Args:
+        conn: 请求的数据库连接 (autocommit 关闭)。
+        work: 无参数的协程函数，每次重试都会重新调用。
+        unit: 工作单元名称，用作指标标签 (如 "order.create")。
+        policy: 重试策略，默认 get_retry_policy()。
+
+    Returns:
+        work 的返回值。
+
+    Raises:
+        TransientDatabaseError: 重试用完或不可在同一连接上重试的瞬时错误。
+        Exception: work 抛出的其它异常原样抛出 (不重试)。
+    """
+    policy = policy or get_retry_policy()
+    metrics = metrics or get_retry_metrics()
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            result = await work()
+            await asyncio.to_thread(conn.commit)
+        except Exception as exc:
+            transient = find_transient_error(exc)
+            if transient is None:
+                raise
+            delay = policy.backoff(attempt)
+            if (
+                transient.reason not in RETRYABLE_REASONS
+                or attempt >= policy.max_attempts
+                or time.monotonic() - started + delay > policy.budget
+            ):
+                metrics.exhausted.inc(unit, transient.reason)
+                logger.warning("%s failed after %d attempt(s): %s", unit, attempt, transient.reason)
+                if transient is exc:
+                    raise
+                # 外层可能已被包装为 DALError：重新抛出瞬时错误类型，由全局处理器返回 503
+                raise TransientDatabaseError(transient.message, reason=transient.reason) from exc
+            metrics.retries.inc(unit, transient.reason)
+            logger.info("%s hit %s, retrying in %.0f ms (attempt %d)", unit, transient.reason, delay * 1000, attempt)
+            await _rollback(conn)
+            await asyncio.sleep(delay)
+            continue
+        if attempt > 1:
+            metrics.recovered.inc(unit)
+        return result
+
+
+def retry_on_transient(unit: str, policy: Optional[RetryPolicy] = None):
+    """
+    Service 方法装饰器：把 async def method(self, conn, ...) 作为一个工作单元执行，
+    方法成功返回后提交，遇到死锁 / 锁超时时回滚并重试。
+
+    Args:
+        unit: 工作单元名称 (指标标签)。
+        policy: 重试策略，默认 get_retry_policy()。
+    """
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        @functools.wraps(func)
+        async def wrapper(self, conn, *args, **kwargs):
+            return await retry_transaction(conn, lambda: func(self, conn, *args, **kwargs), unit, policy)
+        return wrapper
+    return decorator
@@ -0,0 +1,288 @@
+# app/dal/row_mappers.py
+"""
+存储过程结果集 → Pydantic 模型的声明式映射。
+
+存储过程返回的列使用中文或 PascalCase 别名 (如 商品ID、用户名、OrderID)。每个过程在这里登记一次
+"列别名 → 字段名" 的映射；第一次看到某个列顺序时编译出按列下标取值的映射函数并缓存，之后每行只做
+下标访问并直接构造模型实例 —— 数据来自数据库，类型已确定，不再重复校验。
+
+信任前提：存储过程返回的列类型与模型字段一致 (NOT NULL 列对应必填字段)，需要转换的类型在 converters 中
+登记。映射器只检查列是否齐全 —— 结果集缺少必填字段对应的列时在编译阶段抛出 ValueError，而不是构造出
+不符合 schema 的实例。
+
+注: 在当前 pydantic 版本中 model_construct 是纯 Python 实现 (逐字段处理默认值与别名)，比完整校验
+还慢，因此这里按 model_construct 的结果直接写入实例的 __dict__ / __pydantic_fields_set__。
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from functools import partial
+from uuid import UUID
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.schemas.user_schemas import UserResponseSchema
+from app.schemas.order_schemas import OrderResponseSchema, OrderSummarySchema
+from app.schemas.evaluation_schemas import EvaluationResponseSchema
+from app.schemas.product import ProductUpdate
+
+
+# 可以在多行之间共用的默认值类型
+_IMMUTABLE_DEFAULTS = (type(None), bool, int, float, str, bytes, Decimal, UUID, date, datetime, frozenset)
+
+
+def decimal_to_float(value: Any) -> Any:
+    """DECIMAL 列映射到 float 字段时使用，避免序列化时出现类型警告。"""
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def to_uuid(value: Any) -> Any:
+    """pyodbc 默认以字符串返回 UNIQUEIDENTIFIER，这里统一转换为 UUID。"""
+    return value if isinstance(value, UUID) else UUID(value)
+
+
+def _trusted_constructor(model: Type[BaseModel], fields_set: Iterable[str]) -> Callable[[Dict[str, Any]], BaseModel]:
+    """
+    返回不做校验的构造函数，效果等同于 model.model_construct(**values)。
+
+    values 必须已包含模型的全部字段；带私有属性或允许额外字段的模型回退到 model_construct。
+    """
+    if model.__private_attributes__ or model.model_config.get("extra") == "allow":
+        return lambda values: model.model_construct(_fields_set=set(fields_set), **values)
+
+    fields_set = frozenset(fields_set)
+    new = object.__new__
+    set_attr = object.__setattr__
+
+    def construct(values: Dict[str, Any]) -> BaseModel:
+        instance = new(model)
+        set_attr(instance, "__dict__", values)
+        set_attr(instance, "__pydantic_fields_set__", set(fields_set))
+        set_attr(instance, "__pydantic_extra__", None)
+        set_attr(instance, "__pydantic_private__", None)
+        return instance
+
+    return construct
+
+
+class RowMapper:
+    """
+    将某个存储过程的结果行映射为指定模型。
+
+    Args:
+        model: 目标 Pydantic 模型。
+        columns: 列别名 → 模型字段名。结果集中缺失的列使用字段默认值；必填字段的列缺失时编译失败。
+        converters: 字段名 → 转换函数，只对非 None 值调用。
+        defaults: 字段名 → 结果集中缺少该列时使用的值 (优先于模型默认值，须为不可变值)。
+    """
+
+    def __init__(
+        self,
+        model: Type[BaseModel],
+        columns: Dict[str, str],
+        converters: Optional[Dict[str, Callable[[Any], Any]]] = None,
+        defaults: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        unknown = set(columns.values()) - set(model.model_fields)
+        if unknown:
+            raise ValueError(f"{model.__name__} 没有字段: {', '.join(sorted(unknown))}")
+        self.model = model
+        self.columns = columns
+        self.converters = converters or {}
+        self.defaults = defaults or {}
+        self._compiled: Dict[Tuple[str, ...], Callable[[Sequence[Any]], BaseModel]] = {}
+
+    def compile(self, column_names: Sequence[str]) -> Callable[[Sequence[Any]], BaseModel]:
+        """
+        返回按列下标取值的映射函数，同一列顺序只编译一次。
+
+        Raises:
+            ValueError: 结果集缺少必填字段对应的列。
+        """
+        key = tuple(column_names)
+        mapper = self._compiled.get(key)
+        if mapper is not None:
+            return mapper
+
+        positions = {name: index for index, name in enumerate(key)}
+        plain: List[Tuple[str, int]] = []
+        converted: List[Tuple[str, int, Callable[[Any], Any]]] = []
+        for column, field in self.columns.items():
+            index = positions.get(column)
+            if index is None:
+                continue
+            converter = self.converters.get(field)
+            if converter is None:
+                plain.append((field, index))
+            else:
+                converted.append((field, index, converter))
+
+        # 结果集中没有的字段：不可变的默认值编译时确定，其余 (default_factory、可变默认值) 每行重新生成
+        present = {field for field, _ in plain} | {field for field, _, _ in converted}
+        static_defaults: Dict[str, Any] = {}
+        per_row_defaults: List[Tuple[str, Callable[[], Any]]] = []
+        missing_required = []
+        for field, info in self.model.model_fields.items():
+            if field in present:
+                continue
+            if field in self.defaults:
+                static_defaults[field] = self.defaults[field]
+            elif info.is_required():
+                missing_required.append(field)
+            elif info.default_factory is None and isinstance(info.default, _IMMUTABLE_DEFAULTS):
+                static_defaults[field] = info.default
+            else:
+                per_row_defaults.append((field, partial(info.get_default, call_default_factory=True)))
+        if missing_required:
+            aliases = {field: column for column, field in self.columns.items()}
+            missing = ", ".join(f"{aliases.get(field, '?')} ({field})" for field in missing_required)
+            raise ValueError(f"结果集缺少 {self.model.__name__} 必填字段对应的列: {missing}")
+        construct = _trusted_constructor(self.model, present)
+
+        def map_row(row: Sequence[Any]) -> BaseModel:
+            values = {field: row[index] for field, index in plain}
+            for field, index, converter in converted:
+                value = row[index]
+                values[field] = converter(value) if value is not None else None
+            if static_defaults:
+                values.update(static_defaults)
+            for field, make_default in per_row_defaults:
+                values[field] = make_default()
+            return construct(values)
+
+        self._compiled[key] = map_row
+        return map_row
+
+    def map_rows(self, column_names: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[BaseModel]:
+        map_row = self.compile(column_names)
+        return [map_row(row) for row in rows]
+
+    def map_dict(self, data: Optional[Dict[str, Any]]) -> Optional[BaseModel]:
+        """映射 execute_query 返回的字典行 (按键顺序编译)。"""
+        if not data:
+            return None
+        return self.compile(tuple(data.keys()))(tuple(data.values()))
+
+
+_ROW_MAPPERS: Dict[str, RowMapper] = {}
+
+
+def register_row_mapper(procedure: str, mapper: RowMapper) -> RowMapper:
+    """登记存储过程的映射器；多个过程返回相同结构时可共用同一个 RowMapper。"""
+    _ROW_MAPPERS[procedure] = mapper
+    return mapper
+
+
+def get_row_mapper(procedure: str) -> RowMapper:
+    try:
+        return _ROW_MAPPERS[procedure]
+    except KeyError:
+        raise KeyError(f"存储过程 {procedure} 没有登记结果映射") from None
+
+
+# --- 用户 ---
+USER_PROFILE_MAPPER = RowMapper(
+    UserResponseSchema,
+    {
+        "用户ID": "user_id",
+        "用户名": "username",
+        "邮箱": "email",
+        "账户状态": "status",
+        "信用分": "credit",
+        "是否管理员": "is_staff",
+        "是否超级管理员": "is_super_admin",
+        "是否已认证": "is_verified",
+        "专业": "major",
+        "头像URL": "avatar_url",
+        "个人简介": "bio",
+        "手机号码": "phone_number",
+        "注册时间": "join_time",
+        "最后登录时间": "last_login_time",
+    },
+    converters={"user_id": to_uuid, "is_staff": bool, "is_super_admin": bool, "is_verified": bool},
+    defaults={"is_staff": False, "is_super_admin": False, "is_verified": False},
+)
+register_row_mapper("sp_GetUserProfileById", USER_PROFILE_MAPPER)
+register_row_mapper("sp_GetAllUsers", USER_PROFILE_MAPPER)
+register_row_mapper("sp_UpdateUserProfile", USER_PROFILE_MAPPER)
+
+# --- 订单 (状态变更类过程返回变更后的订单行，列与列表查询相同) ---
+ORDER_MAPPER = RowMapper(
+    OrderResponseSchema,
+    {
+        "OrderID": "order_id",
+        "ProductID": "product_id",
+        "SellerID": "seller_id",
+        "BuyerID": "buyer_id",
+        "Quantity": "quantity",
+        "TotalPrice": "total_price",
+        "OrderStatus": "status",
+        "CreateTime": "created_at",
+        "UpdateTime": "updated_at",
+        "CompleteTime": "complete_time",
+        "CancelTime": "cancel_time",
+        "CancelReason": "cancel_reason",
+    },
+    converters={
+        "order_id": to_uuid,
+        "product_id": to_uuid,
+        "seller_id": to_uuid,
+        "buyer_id": to_uuid,
+        "total_price": decimal_to_float,
+    },
+)
+register_row_mapper("sp_GetOrdersByUser", ORDER_MAPPER)
+register_row_mapper("sp_CreateOrder", ORDER_MAPPER)
+register_row_mapper("sp_ConfirmOrder", ORDER_MAPPER)
+register_row_mapper("sp_CompleteOrder", ORDER_MAPPER)
+register_row_mapper("sp_RejectOrder", ORDER_MAPPER)
+register_row_mapper("sp_CancelOrder", ORDER_MAPPER)
+
+# --- 订单历史 (订单 + 商品快照 + 对方用户名) ---
+register_row_mapper("sp_GetOrderHistory", RowMapper(
+    OrderSummarySchema,
+    {
+        **ORDER_MAPPER.columns,
+        "ProductName": "product_name",
+        "UnitPrice": "unit_price",
+        "MainImageURL": "main_image_url",
+        "CounterpartID": "counterpart_id",
+        "CounterpartUsername": "counterpart_username",
+    },
+    converters={**ORDER_MAPPER.converters, "unit_price": decimal_to_float, "counterpart_id": to_uuid},
+))
+
+# --- 评价 (分页列表) ---
+register_row_mapper("sp_GetEvaluationPage", RowMapper(
+    EvaluationResponseSchema,
+    {
+        "EvaluationID": "evaluation_id",
+        "OrderID": "order_id",
+        "ProductID": "product_id",
+        "BuyerID": "buyer_id",
+        "SellerID": "seller_id",
+        "Rating": "rating",
+        "Content": "comment",
+        "CreateTime": "created_at",
+    },
+    converters={
+        "evaluation_id": to_uuid,
+        "order_id": to_uuid,
+        "product_id": to_uuid,
+        "buyer_id": to_uuid,
+        "seller_id": to_uuid,
+    },
+))
+
+# --- 商品 (可编辑字段，用于更新时补全未提供的字段) ---
+register_row_mapper("sp_GetProductById", RowMapper(
+    ProductUpdate,
+    {
+        "商品类别": "category_name",
+        "商品名称": "product_name",
+        "商品描述": "description",
+        "库存": "quantity",
+        "价格": "price",
+    },
+    converters={"price": decimal_to_float},
+))
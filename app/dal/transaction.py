@@ -1,7 +1,8 @@
 import pyodbc
 import asyncio
 from contextlib import asynccontextmanager
-from app.exceptions import DALError
+from app.exceptions import DALError, ReadOnlyViolationError
+from app.dal.db_metrics import query_metrics # 提交 / 回滚的往返次数
 import logging
 
 logger = logging.getLogger(__name__)
@@ -13,7 +14,10 @@ async def transaction(conn: pyodbc.Connection):
     在进入上下文时，确保连接处于手动提交模式。
     在成功退出上下文时提交事务。
     在发生异常时回滚事务。
+    只读连接 (见 app.dal.read_only) 不能开启事务。
     """
+    if getattr(conn, "read_only", False):
+        raise ReadOnlyViolationError("只读连接不能开启事务")
     try:
         # Ensure the connection is in manual commit mode if it's from a pool and autocommit is enabled by default
         # For PooledDB connections, conn.autocommit should be False by default, but it's good to be explicit.
@@ -23,11 +27,13 @@ async def transaction(conn: pyodbc.Connection):
         yield conn
         logger.debug("Transaction: Committing changes.")
         # Use asyncio.to_thread for blocking commit operation
+        query_metrics.transaction_round_trips.inc("commit")
         await asyncio.to_thread(conn.commit)
     except Exception as e:
-        logger.error(f"Transaction: Rolling back changes due to error: {e}", exc_info=True)
+        logger.error("Transaction: Rolling back changes due to error: %s", e, exc_info=True)
         # Use asyncio.to_thread for blocking rollback operation
         if conn:
+            query_metrics.transaction_round_trips.inc("rollback")
             await asyncio.to_thread(conn.rollback)
         raise e # Re-raise the exception after rollback
  
\ No newline at end of file
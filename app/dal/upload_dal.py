@@ -0,0 +1,51 @@
+import pyodbc
+from typing import Optional, Callable, Awaitable, List, Dict, Any
+
+from app.exceptions import DALError
+
+class UploadDAL:
+    """Data Access Layer for content-addressed uploaded files."""
+
+    def __init__(self, execute_query_func: Callable[..., Awaitable[Optional[Dict[str, Any]] | Optional[List[Dict[str, Any]]] | int]]) -> None:
+        """
+        Initializes the UploadDAL with an asynchronous query execution function.
+
+        Args:
+            execute_query_func: An asynchronous function to execute database queries.
+        """
+        self._execute_query = execute_query_func
+
+    async def register_uploaded_file(
+        self,
+        conn: pyodbc.Connection,
+        file_hash: str,
+        file_url: str,
+        file_size: int
+    ) -> Dict[str, Any]:
+        """
+        Registers an upload by calling sp_RegisterUploadedFile.
+        Identical content maps to the same URL, so repeated uploads only bump UploadCount.
+        """
+        sql = "{CALL sp_RegisterUploadedFile (?, ?, ?)}"
+        result = await self._execute_query(conn, sql, (file_hash, file_url, file_size), fetchone=True)
+        if not result:
+            raise DALError("登记上传文件失败，未返回文件记录")
+        return result
+
+    async def recalculate_ref_counts(self, conn: pyodbc.Connection) -> int:
+        """Recomputes RefCount for every uploaded file from ProductImage and User.AvatarUrl."""
+        sql = "{CALL sp_RecalculateUploadRefCounts}"
+        result = await self._execute_query(conn, sql, fetchone=True)
+        return result.get("更新记录数", 0) if result else 0
+
+    async def get_unreferenced_uploads(self, conn: pyodbc.Connection, grace_hours: int = 24) -> List[Dict[str, Any]]:
+        """Fetches uploaded files that are no longer referenced and older than the grace period."""
+        sql = "{CALL sp_GetUnreferencedUploads (?)}"
+        result = await self._execute_query(conn, sql, (grace_hours,), fetchall=True)
+        return result or []
+
+    async def delete_uploaded_file(self, conn: pyodbc.Connection, file_url: str) -> bool:
+        """Deletes an uploaded file record if it is still unreferenced. Returns True if a row was deleted."""
+        sql = "{CALL sp_DeleteUploadedFile (?)}"
+        result = await self._execute_query(conn, sql, (file_url,), fetchone=True)
+        return bool(result and result.get("删除记录数", 0) > 0)
@@ -7,6 +7,8 @@ from uuid import UUID
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any
+from app.dal.row_mappers import get_row_mapper
+from app.schemas.user_schemas import UserResponseSchema
 # from datetime import datetime # 如果存储过程返回 datetime 对象
 
 logger = logging.getLogger(__name__)
@@ -21,7 +23,7 @@ class UserDAL:
     async def get_user_by_id(self, conn: pyodbc.Connection, user_id: UUID) -> dict | None:
         """从数据库获取指定 ID 的用户（获取完整资料）。"""
         logger.debug(
-            f"DAL: Attempting to get user by ID: {user_id}")  # Add logging
+            "DAL: Attempting to get user by ID: %s", user_id)  # Add logging
         # 调用 sp_GetUserProfileById 存储过程
         sql = "{CALL sp_GetUserProfileById(?)}"
         try:
@@ -29,24 +31,24 @@ class UserDAL:
             result = await self.execute_query_func(conn, sql, (user_id,), fetchone=True)
             # Add logging
             logger.debug(
-                f"DAL: sp_GetUserProfileById for ID {user_id} returned: {result}")
+                "DAL: sp_GetUserProfileById for ID %s returned: %s", user_id, result)
             # Check for specific messages indicating user not found, handle potential variations
             if result and isinstance(result, dict):
                 if '用户不存在。' in result.values() or 'User not found.' in result.values() or (result.get('OperationResultCode') == -1 if result.get('OperationResultCode') is not None else False):
                     # Add logging
                     logger.debug(
-                        f"DAL: User with ID {user_id} not found according to SP.")
+                        "DAL: User with ID %s not found according to SP.", user_id)
                     return None  # 用户不存在
                  # If it's a dictionary and not an error message, return the result
                 return result
             # Add logging
             logger.warning(
-                f"DAL: sp_GetUserProfileById for ID {user_id} returned unexpected type or None: {result}")
+                "DAL: sp_GetUserProfileById for ID %s returned unexpected type or None: %s", user_id, result)
             return None  # Handle cases where result is not a dict as expected
 
         except Exception as e:
             # Add logging
-            logger.error(f"DAL: Error getting user by ID {user_id}: {e}")
+            logger.error("DAL: Error getting user by ID %s: %s", user_id, e)
             raise DALError(
                 f"Database error while fetching user profile: {e}") from e
 
@@ -54,7 +56,7 @@ class UserDAL:
         """从数据库获取指定用户名的用户（包含密码哈希），用于登录。"""
         logger.debug(
             # Add logging
-            f"DAL: Attempting to get user by username with password: {username}")
+            "DAL: Attempting to get user by username with password: %s", username)
         # 调用 sp_GetUserByUsernameWithPassword 存储过程
         sql = "{CALL sp_GetUserByUsernameWithPassword(?)}"
         try:
@@ -62,42 +64,42 @@ class UserDAL:
             result = await self.execute_query_func(conn, sql, (username,), fetchone=True)
             # Add logging
             logger.debug(
-                f"DAL: sp_GetUserByUsernameWithPassword for {username} returned: {result}")
+                "DAL: sp_GetUserByUsernameWithPassword for %s returned: %s", username, result)
             if result and isinstance(result, dict):
                  if '用户名不能为空。' in result.values() or 'Username cannot be empty.' in result.values():  # 根据存储过程的错误返回判断
                      # Add logging
                      logger.debug(
-                         f"DAL: User with username {username} not found according to SP.")
+                         "DAL: User with username %s not found according to SP.", username)
                      return None  # 用户名为空
                  return result  # Assuming a dict result is the user data
             # Add logging
             logger.warning(
-                f"DAL: sp_GetUserByUsernameWithPassword for {username} returned unexpected type or None: {result}")
+                "DAL: sp_GetUserByUsernameWithPassword for %s returned unexpected type or None: %s", username, result)
             return None
         except Exception as e:
             # Add logging
             logger.error(
-                f"DAL: Error getting user by username {username}: {e}")
+                "DAL: Error getting user by username %s: %s", username, e)
             raise DALError(
                 f"Database error while fetching user by username: {e}") from e
 
     async def create_user(self, conn: pyodbc.Connection, username: str, hashed_password: str, phone_number: str, major: Optional[str] = None) -> dict:
         """在数据库中创建新用户并返回其数据。"""
-        logger.debug(f"DAL: Attempting to create user: {username}")
+        logger.debug("DAL: Attempting to create user: %s", username)
         sql = "{CALL sp_CreateUser(?, ?, ?, ?)}"
         try:
             # 调用 sp_CreateUser 存储过程
             logger.debug(
-                f"DAL: Executing sp_CreateUser for {username} with phone: {phone_number}, major: {major}")
+                "DAL: Executing sp_CreateUser for %s with phone: %s, major: %s", username, phone_number, major)
             # sp_CreateUser returns a single row with NewUserID and potentially Message/Error
             result = await self.execute_query_func(conn, sql, (username, hashed_password, phone_number, major), fetchone=True)
             logger.debug(
-                f"DAL: sp_CreateUser for {username} returned raw result: {result}")
+                "DAL: sp_CreateUser for %s returned raw result: %s", username, result)
 
             # 1. 检查结果是否为 None 或非字典类型
             if not result or not isinstance(result, dict):
                 logger.error(
-                    f"DAL: sp_CreateUser for {username} returned invalid result: {result}")
+                    "DAL: sp_CreateUser for %s returned invalid result: %s", username, result)
                 raise DALError(
                     f"User creation failed: Unexpected response from database: {result}")
 
@@ -115,27 +117,27 @@ class UserDAL:
                           new_user_id = UUID(str(new_user_id))
                       except (ValueError, TypeError) as e:
                            logger.error(
-                               f"DAL: Returned NewUserID is not a valid UUID: {new_user_id}. Error: {e}")
+                               "DAL: Returned NewUserID is not a valid UUID: %s. Error: %s", new_user_id, e)
                            raise DALError(
                                f"User creation failed: Invalid User ID format returned: {new_user_id}") from e
 
                  logger.info(
-                     f"DAL: User {username} created with NewUserID: {new_user_id}. Fetching full info.")
+                     "DAL: User %s created with NewUserID: %s. Fetching full info.", username, new_user_id)
 
                  # 4. 获取完整用户信息 using the created ID
                  # This step is necessary to return the full UserResponseSchema as expected by the service/router
                  full_user_info = await self.get_user_by_id(conn, new_user_id)
                  logger.debug(
-                     f"DAL: get_user_by_id for new user {new_user_id} returned: {full_user_info}")
+                     "DAL: get_user_by_id for new user %s returned: %s", new_user_id, full_user_info)
 
                  if not full_user_info:
                      # This indicates a subsequent read failed right after creation
                      logger.error(
-                         f"DAL: Failed to retrieve full user info after creation for ID: {new_user_id}")
+                         "DAL: Failed to retrieve full user info after creation for ID: %s", new_user_id)
                      raise DALError(
                          f"Failed to retrieve full user info after creation for ID: {new_user_id}")
 
-                 logger.info(f"DAL: Full info retrieved for new user: {username}")
+                 logger.info("DAL: Full info retrieved for new user: %s", username)
                  return full_user_info  # Return the fetched dictionary
 
             else:
@@ -150,17 +152,17 @@ class UserDAL:
                 # Check for error messages from SP
                 if error_message:
                     logger.debug(
-                        f"DAL: sp_CreateUser for {username} returned message: {error_message}")
+                        "DAL: sp_CreateUser for %s returned message: %s", username, error_message)
                     if '用户名已存在' in error_message or 'Duplicate username' in error_message:
-                        logger.warning(f"DAL: Username {username} already exists")
+                        logger.warning("DAL: Username %s already exists", username)
                         raise IntegrityError("Username already exists.")
                     elif '手机号码已存在' in error_message or '手机号已存在' in error_message or 'Duplicate phone' in error_message:
                         logger.warning(
-                            f"DAL: Phone number {phone_number} already exists")
+                            "DAL: Phone number %s already exists", phone_number)
                         raise IntegrityError("Phone number already exists.")
                     # Handle other potential SP-specific errors
                     logger.error(
-                        f"DAL: Stored procedure error during user creation: {error_message}")
+                        "DAL: Stored procedure error during user creation: %s", error_message)
                     raise DALError(
                         f"Stored procedure error during user creation: {error_message}")
 
@@ -168,7 +170,7 @@ class UserDAL:
                 if result_code is not None:
                      if result_code != 0:  # Assuming 0 is success
                           logger.error(
-                              f"DAL: sp_CreateUser for {username} returned non-zero result code: {result_code}. Result: {result}")
+                              "DAL: sp_CreateUser for %s returned non-zero result code: %s. Result: %s", username, result_code, result)
                           # Map result code to specific error if possible, otherwise raise generic DALError
                           # Example: User already exists (though messages above should catch this)
                           if result_code == -1:
@@ -183,7 +185,7 @@ class UserDAL:
             if not new_user_id:
                 # This could happen if SP executed without explicit error but didn't return the ID as expected
                 logger.error(
-                    f"DAL: sp_CreateUser for {username} completed but did not return NewUserID. Result: {result}")
+                    "DAL: sp_CreateUser for %s completed but did not return NewUserID. Result: %s", username, result)
                 raise DALError(
                     "User creation failed: User ID not returned from database.")
 
@@ -194,27 +196,27 @@ class UserDAL:
                      new_user_id = UUID(str(new_user_id))
                  except (ValueError, TypeError) as e:
                       logger.error(
-                          f"DAL: Returned NewUserID is not a valid UUID: {new_user_id}. Error: {e}")
+                          "DAL: Returned NewUserID is not a valid UUID: %s. Error: %s", new_user_id, e)
                       raise DALError(
                           f"User creation failed: Invalid User ID format returned: {new_user_id}") from e
 
             logger.info(
-                f"DAL: User {username} created with NewUserID: {new_user_id}. Fetching full info.")
+                "DAL: User %s created with NewUserID: %s. Fetching full info.", username, new_user_id)
 
             # 5. 获取完整用户信息 using the created ID
             # This step is necessary to return the full UserResponseSchema as expected by the service/router
             full_user_info = await self.get_user_by_id(conn, new_user_id)
             logger.debug(
-                f"DAL: get_user_by_id for new user {new_user_id} returned: {full_user_info}")
+                "DAL: get_user_by_id for new user %s returned: %s", new_user_id, full_user_info)
 
             if not full_user_info:
                 # This indicates a subsequent read failed right after creation
                 logger.error(
-                    f"DAL: Failed to retrieve full user info after creation for ID: {new_user_id}")
+                    "DAL: Failed to retrieve full user info after creation for ID: %s", new_user_id)
                 raise DALError(
                     f"Failed to retrieve full user info after creation for ID: {new_user_id}")
 
-            logger.info(f"DAL: Full info retrieved for new user: {username}")
+            logger.info("DAL: Full info retrieved for new user: %s", username)
             return full_user_info  # Return the fetched dictionary
 
         except IntegrityError:
@@ -224,7 +226,7 @@ class UserDAL:
         except pyodbc.IntegrityError as e:
             # Catch pyodbc.IntegrityError raised by the driver for constraint violations
             logger.error(
-                f"DAL: pyodbc.IntegrityError during user creation for {username}: {e}")
+                "DAL: pyodbc.IntegrityError during user creation for %s: %s", username, e)
             error_message = str(e)
             # Check for specific error messages related to unique constraints
             error_message_lower = error_message.lower()
@@ -234,11 +236,11 @@ class UserDAL:
                  raise IntegrityError("Phone number already exists.") from e
             else:
                 logger.error(
-                    f"DAL: Unexpected pyodbc.IntegrityError during user creation: {e}")
+                    "DAL: Unexpected pyodbc.IntegrityError during user creation: %s", e)
                 raise DALError(
                     f"Database integrity error during user creation: {e}") from e
         except Exception as e:
-            logger.error(f"DAL: Generic Error creating user {username}: {e}")
+            logger.error("DAL: Generic Error creating user %s: %s", username, e)
             # Catch any other unexpected exceptions during the DAL operation
             raise DALError(f"Database error during user creation: {e}") from e
 
@@ -246,12 +248,12 @@ class UserDAL:
         """更新现有用户的个人资料，返回更新后的用户数据。"""
         logger.debug(
             # Add logging
-            f"DAL: Attempting to update profile for user ID: {user_id}")
+            "DAL: Attempting to update profile for user ID: %s", user_id)
         sql = "{CALL sp_UpdateUserProfile(?, ?, ?, ?, ?, ?, ?)}"
         try:
             # Add logging
             logger.debug(
-                f"DAL: Executing sp_UpdateUserProfile for ID {user_id}")
+                "DAL: Executing sp_UpdateUserProfile for ID %s", user_id)
             # sp_UpdateUserProfile should return the updated user data (a dict) or indicate error/not found
             result = await self.execute_query_func(
                 conn, sql,
@@ -260,7 +262,7 @@ class UserDAL:
             )
             # Add logging
             logger.debug(
-                f"DAL: sp_UpdateUserProfile for ID {user_id} returned: {result}")
+                "DAL: sp_UpdateUserProfile for ID %s returned: %s", user_id, result)
 
             # Assuming SP returns the updated user data or a success indicator
             if result and isinstance(result, dict):
@@ -272,7 +274,7 @@ class UserDAL:
                 if error_message:
                     # Add logging
                     logger.warning(
-                        f"DAL: sp_UpdateUserProfile for ID {user_id} returned error: {error_message}")
+                        "DAL: sp_UpdateUserProfile for ID %s returned error: %s", user_id, error_message)
                     if '用户未找到' in error_message or 'User not found.' in error_message:
                         raise NotFoundError(
                             f"User with ID {user_id} not found for update.")
@@ -287,7 +289,7 @@ class UserDAL:
 
                 if result_code is not None and result_code != 0:
                     logger.warning(
-                        f"DAL: sp_UpdateUserProfile for ID {user_id} returned non-zero result code: {result_code}. Result: {result}")
+                        "DAL: sp_UpdateUserProfile for ID %s returned non-zero result code: %s. Result: %s", user_id, result_code, result)
                     # Handle specific result codes if necessary
                     raise DALError(
                         f"Stored procedure failed with result code: {result_code}")
@@ -295,13 +297,13 @@ class UserDAL:
                 # If no error message and no non-zero result code, assume success and return the fetched data
                 # Add logging
                 logger.debug(
-                    f"DAL: Profile update for ID {user_id} successful.")
+                    "DAL: Profile update for ID %s successful.", user_id)
                 # Return the dictionary fetched by execute_query(fetchone=True) which should be the updated user data
                 return result
             elif result is None:
                  # Add logging
                  logger.debug(
-                     f"DAL: Profile update for ID {user_id} returned None.")
+                     "DAL: Profile update for ID %s returned None.", user_id)
                  # If SP is designed to return None for user not found
                  raise NotFoundError(
                      f"User with ID {user_id} not found for update.")
@@ -309,7 +311,7 @@ class UserDAL:
             # If result is not None and not a dict with an error message, assume success and return the data
             # Add logging
             logger.warning(
-                f"DAL: Profile update for ID {user_id} returned unexpected non-dict result: {result}")
+                "DAL: Profile update for ID %s returned unexpected non-dict result: %s", user_id, result)
             # Decide how to handle this - maybe raise an error or return None assuming failure
             raise DALError(
                 f"Database error during profile update: {result}")
@@ -317,13 +319,13 @@ class UserDAL:
         except (NotFoundError, IntegrityError) as e:
              # Add logging
              logger.error(
-                 f"DAL: Specific Error during profile update for ID {user_id}: {e}")
+                 "DAL: Specific Error during profile update for ID %s: %s", user_id, e)
              raise e  # Re-raise specific errors caught from our checks
         except pyodbc.IntegrityError as e:
              # Catch pyodbc.IntegrityError raised by the driver
              # Add logging
              logger.error(
-                 f"DAL: pyodbc.IntegrityError during profile update for ID {user_id}: {e}")
+                 "DAL: pyodbc.IntegrityError during profile update for ID %s: %s", user_id, e)
              error_message = str(e)
              # Check for specific error messages related to duplicate phone number from the driver
              # These might be different depending on the database and driver configuration
@@ -335,13 +337,13 @@ class UserDAL:
              else:
                  # Re-raise other IntegrityErrors as DALError or a more specific error
                  logger.error(
-                     f"DAL: Unexpected pyodbc.IntegrityError during profile update: {e}")
+                     "DAL: Unexpected pyodbc.IntegrityError during profile update: %s", e)
                  raise DALError(
                      f"Database integrity error during profile update: {e}") from e
         except Exception as e:
             # Add logging
             logger.error(
-                f"DAL: Generic Error updating user profile for {user_id}: {e}")
+                "DAL: Generic Error updating user profile for %s: %s", user_id, e)
             # Catch any other unexpected exceptions during the DAL operation
             raise DALError(
                 f"Database error during user profile update: {e}") from e
@@ -350,18 +352,18 @@ class UserDAL:
         """更新用户密码。"""
         logger.debug(
             # Add logging
-            f"DAL: Attempting to update password for user ID: {user_id}")
+            "DAL: Attempting to update password for user ID: %s", user_id)
         sql = "{CALL sp_UpdateUserPassword(?, ?)}"
         try:
             # 调用 sp_UpdateUserPassword 存储过程
             # Use the injected execute_query function. SP returns a single row result.
             # Add logging
             logger.debug(
-                f"DAL: Executing sp_UpdateUserPassword for ID {user_id}")
+                "DAL: Executing sp_UpdateUserPassword for ID %s", user_id)
             result = await self.execute_query_func(conn, sql, (user_id, hashed_password), fetchone=True)
             # Add logging
             logger.debug(
-                f"DAL: sp_UpdateUserPassword for ID {user_id} returned: {result}")
+                "DAL: sp_UpdateUserPassword for ID %s returned: %s", user_id, result)
 
             if result and isinstance(result, dict):
                  error_message = result.get('') or result.get(
@@ -370,7 +372,7 @@ class UserDAL:
 
                  if error_message:
                      logger.warning(
-                         f"DAL: Password update failed for ID {user_id}: SP returned error: {error_message}")
+                         "DAL: Password update failed for ID %s: SP returned error: %s", user_id, error_message)
                      if '用户未找到。' in error_message and result_code == -1: # Check code as well
                           raise NotFoundError(
                               f"User with ID {user_id} not found for password update.")
@@ -380,12 +382,12 @@ class UserDAL:
                               "Password update failed in stored procedure.")
                      # If the message is a success message but caught here as an error, it's a logic error in the SP/DAL mapping
                      if '密码更新成功' in error_message or 'Password updated successfully' in error_message:
-                          logger.info(f"DAL: Password updated successfully for user ID: {user_id} (via success message)")
+                          logger.info("DAL: Password updated successfully for user ID: %s (via success message)", user_id)
                           return True # Indicate success based on success message
 
                  # If result is a dict and no handled error_message was found, assume success if result_code is 0 or absent.
                  if result_code is None or result_code == 0:
-                     logger.info(f"DAL: Password updated successfully for user ID: {user_id}")
+                     logger.info("DAL: Password updated successfully for user ID: %s", user_id)
                      return True # Indicate success
                  else:
                       # If there's an unhandled error message or a non-zero result code, raise generic DALError
@@ -393,7 +395,7 @@ class UserDAL:
 
             # If result is None or not a dict (and no exception from execute_query_func), it's an unexpected scenario.
             logger.error(
-                f"DAL: sp_UpdateUserPassword for ID {user_id} returned unexpected result: {result}")
+                "DAL: sp_UpdateUserPassword for ID %s returned unexpected result: %s", user_id, result)
             raise DALError("Password update failed: Unexpected response from database.")
 
         except (NotFoundError, DALError) as e:
@@ -401,7 +403,7 @@ class UserDAL:
              raise e
         except Exception as e:
              # Catch any other unexpected exceptions during the DAL operation
-             logger.error(f"DAL: Unexpected error updating password for ID {user_id}: {e}")
+             logger.error("DAL: Unexpected error updating password for ID %s: %s", user_id, e)
              raise DALError(f"Database error during password update: {e}") from e
 
     # New method: Get user password hash by ID
@@ -409,18 +411,18 @@ class UserDAL:
         """根据用户 ID 获取密码哈希。"""
         logger.debug(
             # Add logging
-            f"DAL: Attempting to get password hash for user ID: {user_id}")
+            "DAL: Attempting to get password hash for user ID: %s", user_id)
         sql = "{CALL sp_GetUserPasswordHashById(?)}"
         try:
             # Use the injected execute_query function
             # Add logging
             logger.debug(
-                f"DAL: Executing sp_GetUserPasswordHashById for ID {user_id}")
+                "DAL: Executing sp_GetUserPasswordHashById for ID %s", user_id)
             # SP returns a single row with the Password hash or an error message
             result = await self.execute_query_func(conn, sql, (user_id,), fetchone=True)
             # Add logging
             logger.debug(
-                f"DAL: sp_GetUserPasswordHashById for ID {user_id} returned: {result}")
+                "DAL: sp_GetUserPasswordHashById for ID %s returned: %s", user_id, result)
 
             if result and isinstance(result, dict):
                 error_message = result.get('') or result.get(
@@ -429,7 +431,7 @@ class UserDAL:
                 if error_message:
                      # Add logging
                      logger.debug(
-                         f"DAL: Password hash not found for ID {user_id}: SP returned message: {error_message}")
+                         "DAL: Password hash not found for ID %s: SP returned message: %s", user_id, error_message)
                      # If message indicates user not found specifically
                      if '用户不存在。' in error_message or 'User not found.' in error_message:
                           return None  # User not found
@@ -439,25 +441,25 @@ class UserDAL:
 
                 if 'Password' in result:
                     # Add logging
-                    logger.debug(f"DAL: Password hash found for ID {user_id}.")
+                    logger.debug("DAL: Password hash found for ID %s.", user_id)
                     return result['Password']
 
                 if 'PasswordHash' in result: # Also check for PasswordHash key
                     # Add logging
-                    logger.debug(f"DAL: Password hash found for ID {user_id} (using PasswordHash key).")
+                    logger.debug("DAL: Password hash found for ID %s (using PasswordHash key).", user_id)
                     return result['PasswordHash']
 
                 # If result is a dict but doesn't contain 'Password' and no error message, unexpected
                 # Add logging
                 logger.warning(
-                    f"DAL: sp_GetUserPasswordHashById for ID {user_id} returned dict without 'Password' key or error: {result}")
+                    "DAL: sp_GetUserPasswordHashById for ID %s returned dict without 'Password' key or error: %s", user_id, result)
                 # Treat as not found or DAL error? Let's return None assuming hash wasn't found as expected
                 return None
 
             # If result is None or not a dict
             # Add logging
             logger.warning(
-                f"DAL: sp_GetUserPasswordHashById for ID {user_id} returned unexpected result: {result}")
+                "DAL: sp_GetUserPasswordHashById for ID %s returned unexpected result: %s", user_id, result)
             return None  # Assume hash not found due to unexpected result
 
         except DALError:
@@ -465,13 +467,13 @@ class UserDAL:
         except Exception as e:
             # Add logging
             logger.error(
-                f"DAL: Generic Error getting password hash for user ID {user_id}: {e}")
+                "DAL: Generic Error getting password hash for user ID %s: %s", user_id, e)
             raise DALError(
                 f"Database error while fetching password hash: {e}") from e
 
     async def delete_user(self, conn: pyodbc.Connection, user_id: UUID) -> bool:
         """Deletes a user by their ID using sp_DeleteUser, processing a single combined debug and result code output."""
-        logger.info(f"DAL: Attempting to delete user with ID: {user_id}")
+        logger.info("DAL: Attempting to delete user with ID: %s", user_id)
 
         try:
             # Use the injected execute_query function
@@ -479,7 +481,7 @@ class UserDAL:
             result_data = await self.execute_query_func(conn, "{CALL sp_DeleteUser(?)}", (user_id,), fetchone=True)
 
             logger.debug(
-                f"DAL: sp_DeleteUser for user {user_id} returned: {result_data}")
+                "DAL: sp_DeleteUser for user %s returned: %s", user_id, result_data)
 
             # Process the single result row
             if result_data and isinstance(result_data, dict):
@@ -492,49 +494,49 @@ class UserDAL:
                 if operation_result_code == 0:
                     # conn.commit() # Commit handled by execute_query implicitly if commit=True
                     logger.info(
-                        f"DAL: User {user_id} deleted successfully (OperationResultCode: 0).")
+                        "DAL: User %s deleted successfully (OperationResultCode: 0).", user_id)
                     return True
                 elif operation_result_code == -1:
                     logger.warning(
-                        f"DAL: User {user_id} not found by sp_DeleteUser (OperationResultCode: -1). Debug: {debug_message}")
+                        "DAL: User %s not found by sp_DeleteUser (OperationResultCode: -1). Debug: %s", user_id, debug_message)
                     # conn.rollback() # Rollback handled by execute_query implicitly on error/non-commit
                     raise NotFoundError(
                         f"User with ID {user_id} not found for deletion.")
                 elif operation_result_code == -2:
                     logger.warning(
-                        f"DAL: User {user_id} could not be deleted due to dependencies (OperationResultCode: -2). Debug: {debug_message}")
+                        "DAL: User %s could not be deleted due to dependencies (OperationResultCode: -2). Debug: %s", user_id, debug_message)
                     # conn.rollback()
                     # Raise a specific error for dependencies, or a generic Forbidden/DAL error
                     raise ForbiddenError(
                         f"Cannot delete user with ID {user_id} due to existing dependencies.")
                 elif operation_result_code == -3:
                     logger.warning(
-                        f"DAL: User {user_id} was found but DELETE operation failed (OperationResultCode: -3). Debug: {debug_message}")
+                        "DAL: User %s was found but DELETE operation failed (OperationResultCode: -3). Debug: %s", user_id, debug_message)
                     # conn.rollback()
                     raise DALError(
                         f"Database failed to delete user with ID {user_id} (code -3).")
                 elif operation_result_code == -4:
                     logger.warning(
-                        f"DAL: Database error during sp_DeleteUser's transaction (OperationResultCode: -4). Debug: {debug_message}")
+                        "DAL: Database error during sp_DeleteUser's transaction (OperationResultCode: -4). Debug: %s", debug_message)
                     # conn.rollback()
                     raise DALError(
                         f"Database transaction error during user deletion for ID {user_id} (code -4).")
                 elif operation_result_code == -90:
                     logger.warning(
-                        f"DAL: Database error during sp_DeleteUser's initial user check (OperationResultCode: -90). Debug: {debug_message}")
+                        "DAL: Database error during sp_DeleteUser's initial user check (OperationResultCode: -90). Debug: %s", debug_message)
                     # conn.rollback()
                     raise DALError(
                         f"Database error during initial user check for ID {user_id} (code -90).")
                 elif operation_result_code is None:
                      # Handle case where OperationResultCode was not found in the result
                      logger.error(
-                         f"DAL: sp_DeleteUser for user {user_id} returned result data but no OperationResultCode. Result: {result_data}")
+                         "DAL: sp_DeleteUser for user %s returned result data but no OperationResultCode. Result: %s", user_id, result_data)
                      # conn.rollback()
                      raise DALError(
                          f"Database error during user deletion: Missing result code. Result: {result_data}")
                 else:
                     logger.warning(
-                        f"DAL: sp_DeleteUser for user {user_id} returned an unexpected OperationResultCode: {operation_result_code}. Debug: {debug_message}. Rolling back.")
+                        "DAL: sp_DeleteUser for user %s returned an unexpected OperationResultCode: %s. Debug: %s. Rolling back.", user_id, operation_result_code, debug_message)
                     # conn.rollback()
                     raise DALError(
                         f"Database error during user deletion: Unexpected result code {operation_result_code}. Debug: {debug_message}")
@@ -542,17 +544,17 @@ class UserDAL:
         except (NotFoundError, ForbiddenError, DALError) as e:
              # Catch and re-raise specific exceptions raised above
              logger.error(
-                 f"DAL: Specific error during user deletion for {user_id}: {e}")
+                 "DAL: Specific error during user deletion for %s: %s", user_id, e)
              # Rollback is handled by execute_query implicitly on exception
              raise e
         except pyodbc.Error as e:
             logger.error(
-                f"DAL: Database error during user deletion for {user_id}: {e}")
+                "DAL: Database error during user deletion for %s: %s", user_id, e)
             # Rollback is handled by execute_query implicitly on exception
             raise DALError(f"Database error during user deletion: {e}") from e
         except Exception as ex:
             logger.error(
-                f"DAL: Unexpected Python error during user deletion for {user_id}: {ex}")
+                "DAL: Unexpected Python error during user deletion for %s: %s", user_id, ex)
             # Rollback is handled by execute_query implicitly on exception
             raise DALError(
                 f"Unexpected server error during user deletion: {ex}") from ex
@@ -560,50 +562,50 @@ class UserDAL:
 
     async def get_system_notifications_by_user_id(self, conn: pyodbc.Connection, user_id: UUID) -> list[dict]:
         """获取某个用户的系统通知列表。"""
-        logger.debug(f"DAL: Getting system notifications for user {user_id}.")
+        logger.debug("DAL: Getting system notifications for user %s.", user_id)
         sql = "{CALL sp_GetSystemNotificationsByUserId(?)}"
         try:
             # Use the injected execute_query function
             result = await self.execute_query_func(conn, sql, (user_id,), fetchall=True)
-            logger.debug(f"DAL: sp_GetSystemNotificationsByUserId for user {user_id} returned: {result}")
+            logger.debug("DAL: sp_GetSystemNotificationsByUserId for user %s returned: %s", user_id, result)
 
             if result and isinstance(result, list):
                  # Check if the list contains an error message indicator from SP
                  if any(isinstance(row, dict) and ('用户不存在。' in row.values() or 'User not found.' in row.values()) for row in result):
-                      logger.debug(f"DAL: User {user_id} not found according to SP, no notifications returned.")
+                      logger.debug("DAL: User %s not found according to SP, no notifications returned.", user_id)
                       return [] # User not found or no notifications
                  # Assuming a list of dicts is the expected notification data
                  # Map keys if necessary (though SP columns seem mapped in Service)
                  return result
             elif result is None:
-                 logger.debug(f"DAL: sp_GetSystemNotificationsByUserId for user {user_id} returned None.")
+                 logger.debug("DAL: sp_GetSystemNotificationsByUserId for user %s returned None.", user_id)
                  return [] # No users or no notifications
             else:
-                 logger.warning(f"DAL: sp_GetSystemNotificationsByUserId for user {user_id} returned unexpected result type: {result}")
+                 logger.warning("DAL: sp_GetSystemNotificationsByUserId for user %s returned unexpected result type: %s", user_id, result)
                  # Decide how to handle unexpected types - empty list or raise error
                  raise DALError("Database error while fetching system notifications: Unexpected data format.")
 
         except DALError:
              raise # Re-raise DAL errors
         except Exception as e:
-            logger.error(f"Error getting system notifications for user {user_id}: {e}")
+            logger.error("Error getting system notifications for user %s: %s", user_id, e)
             raise DALError(f"Database error while fetching system notifications: {e}") from e
 
     async def mark_notification_as_read(self, conn: pyodbc.Connection, notification_id: UUID, user_id: UUID) -> bool:
         """标记系统通知为已读。"""
-        logger.debug(f"DAL: Marking notification {notification_id} as read for user {user_id}")
+        logger.debug("DAL: Marking notification %s as read for user %s", notification_id, user_id)
         sql = "{CALL sp_MarkNotificationAsRead(?, ?)}"
         try:
             # Use the injected execute_query function. SP returns a single row result.
             result = await self.execute_query_func(conn, sql, (notification_id, user_id), fetchone=True)
-            logger.debug(f"DAL: sp_MarkNotificationAsRead for notification {notification_id}, user {user_id} returned: {result}")
+            logger.debug("DAL: sp_MarkNotificationAsRead for notification %s, user %s returned: %s", notification_id, user_id, result)
 
             if result and isinstance(result, dict):
                 error_message = result.get('') or result.get('Error') or result.get('Message')
                 result_code = result.get('OperationResultCode')
 
                 if error_message:
-                     logger.warning(f"DAL: Mark notification as read failed: SP returned error: {error_message}")
+                     logger.warning("DAL: Mark notification as read failed: SP returned error: %s", error_message)
                      if '通知不存在。' in error_message or 'Notification not found.' in error_message:
                           raise NotFoundError(f"Notification with ID {notification_id} not found.")
                      if '无权标记此通知为已读。' in error_message or 'No permission to mark this notification as read.' in error_message:
@@ -611,20 +613,20 @@ class UserDAL:
                      raise DALError(f"Stored procedure error marking notification as read: {error_message}")
 
                 if result_code is not None and result_code != 0:
-                      logger.warning(f"DAL: sp_MarkNotificationAsRead for notif {notification_id}, user {user_id} returned non-zero result code: {result_code}. Result: {result}")
+                      logger.warning("DAL: sp_MarkNotificationAsRead for notif %s, user %s returned non-zero result code: %s. Result: %s", notification_id, user_id, result_code, result)
                       raise DALError(f"Stored procedure failed with result code: {result_code}")
 
 
                 if '通知标记为已读成功。' in result.values() or 'Notification marked as read successfully.' in result.values():
-                     logger.info(f"DAL: Notification {notification_id} marked as read for user {user_id}")
+                     logger.info("DAL: Notification %s marked as read for user %s", notification_id, user_id)
                      return True
                 else:
-                     logger.warning(f"DAL: sp_MarkNotificationAsRead for notif {notification_id}, user {user_id} returned ambiguous success indicator: {result}")
+                     logger.warning("DAL: sp_MarkNotificationAsRead for notif %s, user %s returned ambiguous success indicator: %s", notification_id, user_id, result)
                      # Assume success if no error and result is a dict
                      return True
 
             # If result is None or not a dict
-            logger.warning(f"DAL: sp_MarkNotificationAsRead for notif {notification_id}, user {user_id} returned unexpected result: {result}")
+            logger.warning("DAL: sp_MarkNotificationAsRead for notif %s, user %s returned unexpected result: %s", notification_id, user_id, result)
             # If not found/forbidden, an exception should have been raised by message check.
             # If update truly failed without an SP error message, return False or raise DAL error.
             raise DALError(f"Database error while marking notification as read: {result}")
@@ -632,24 +634,24 @@ class UserDAL:
         except (NotFoundError, ForbiddenError, DALError) as e:
             raise e # Re-raise specific exceptions
         except Exception as e:
-            logger.error(f"DAL: Error marking notification {notification_id} as read for user {user_id}: {e}")
+            logger.error("DAL: Error marking notification %s as read for user %s: %s", notification_id, user_id, e)
             raise DALError(f"Database error while marking notification as read: {e}") from e
 
     async def set_chat_message_visibility(self, conn: pyodbc.Connection, message_id: UUID, user_id: UUID, visible_to: str, is_visible: bool) -> bool:
         """设置聊天消息对发送者或接收者的可见性（逻辑删除）。"""
-        logger.debug(f"DAL: Setting chat message {message_id} visibility for user {user_id}.")
+        logger.debug("DAL: Setting chat message %s visibility for user %s.", message_id, user_id)
         sql = "{CALL sp_SetChatMessageVisibility(?, ?, ?, ?)}"
         try:
             # Use the injected execute_query function. SP returns a single row result.
             result = await self.execute_query_func(conn, sql, (message_id, user_id, visible_to, is_visible), fetchone=True)
-            logger.debug(f"DAL: sp_SetChatMessageVisibility for message {message_id}, user {user_id} returned: {result}")
+            logger.debug("DAL: sp_SetChatMessageVisibility for message %s, user %s returned: %s", message_id, user_id, result)
 
             if result and isinstance(result, dict):
                  error_message = result.get('') or result.get('Error') or result.get('Message')
                  result_code = result.get('OperationResultCode')
 
                  if error_message:
-                     logger.warning(f"DAL: Set message visibility failed: SP returned error: {error_message}")
+                     logger.warning("DAL: Set message visibility failed: SP returned error: %s", error_message)
                      if '消息不存在。' in error_message or 'Message not found.' in error_message:
                           raise NotFoundError(f"Message with ID {message_id} not found.")
                      if '无权修改此消息的可见性。' in error_message or 'No permission to modify this message visibility.' in error_message:
@@ -657,44 +659,44 @@ class UserDAL:
                      raise DALError(f"Stored procedure error setting message visibility: {error_message}")
 
                  if result_code is not None and result_code != 0:
-                      logger.warning(f"DAL: sp_SetChatMessageVisibility for msg {message_id}, user {user_id} returned non-zero result code: {result_code}. Result: {result}")
+                      logger.warning("DAL: sp_SetChatMessageVisibility for msg %s, user %s returned non-zero result code: %s. Result: %s", message_id, user_id, result_code, result)
                       raise DALError(f"Stored procedure failed with result code: {result_code}")
 
 
                  if '消息可见性设置成功' in result.values() or 'Message visibility set successfully' in result.values():
-                      logger.info(f"DAL: Message {message_id} visibility set successfully for user {user_id}.")
+                      logger.info("DAL: Message %s visibility set successfully for user %s.", message_id, user_id)
                       return True
                  else:
-                      logger.warning(f"DAL: sp_SetChatMessageVisibility for msg {message_id}, user {user_id} returned ambiguous success indicator: {result}")
+                      logger.warning("DAL: sp_SetChatMessageVisibility for msg %s, user %s returned ambiguous success indicator: %s", message_id, user_id, result)
                       return True
 
             # If result is None or not a dict
-            logger.warning(f"DAL: sp_SetChatMessageVisibility for msg {message_id}, user {user_id} returned unexpected result: {result}")
+            logger.warning("DAL: sp_SetChatMessageVisibility for msg %s, user %s returned unexpected result: %s", message_id, user_id, result)
             raise DALError(f"Database error while setting message visibility: {result}")
 
 
         except (NotFoundError, ForbiddenError, DALError) as e:
              raise e # Re-raise specific exceptions
         except Exception as e:
-            logger.error(f"DAL: Error setting message visibility for message {message_id}, user {user_id}: {e}")
+            logger.error("DAL: Error setting message visibility for message %s, user %s: %s", message_id, user_id, e)
             raise DALError(f"Database error while setting message visibility: {e}") from e
 
     # New admin methods for user management
     async def change_user_status(self, conn: pyodbc.Connection, user_id: UUID, new_status: str, admin_id: UUID) -> bool:
         """管理员禁用/启用用户账户。"""
-        logger.debug(f"DAL: Admin {admin_id} attempting to change status of user {user_id} to {new_status}")
+        logger.debug("DAL: Admin %s attempting to change status of user %s to %s", admin_id, user_id, new_status)
         sql = "{CALL sp_ChangeUserStatus(?, ?, ?)}"
         try:
             # Use the injected execute_query function. SP returns a single row result.
             result = await self.execute_query_func(conn, sql, (user_id, new_status, admin_id), fetchone=True)
-            logger.debug(f"DAL: sp_ChangeUserStatus for user {user_id}, admin {admin_id} returned: {result}")
+            logger.debug("DAL: sp_ChangeUserStatus for user %s, admin %s returned: %s", user_id, admin_id, result)
 
             if result and isinstance(result, dict):
                  error_message = result.get('') or result.get('Error') or result.get('Message')
                  result_code = result.get('OperationResultCode')
 
                  if error_message:
-                     logger.warning(f"DAL: Change user status failed: SP returned error: {error_message}")
+                     logger.warning("DAL: Change user status failed: SP returned error: %s", error_message)
                      if '用户不存在。' in error_message or 'User not found.' in error_message:
                           raise NotFoundError(f"User with ID {user_id} not found.")
                      if '无权限执行此操作' in error_message or 'Only administrators can change user status.' in error_message:
@@ -705,35 +707,35 @@ class UserDAL:
                      raise DALError(f"Stored procedure error changing user status: {error_message}")
 
                  if result_code is not None and result_code != 0:
-                      logger.warning(f"DAL: sp_ChangeUserStatus for user {user_id}, admin {admin_id} returned non-zero result code: {result_code}. Result: {result}")
+                      logger.warning("DAL: sp_ChangeUserStatus for user %s, admin %s returned non-zero result code: %s. Result: %s", user_id, admin_id, result_code, result)
                       raise DALError(f"Stored procedure failed with result code: {result_code}")
 
                  if '用户状态更新成功。' in result.values() or 'User status updated successfully.' in result.values():
-                      logger.info(f"DAL: User {user_id} status changed to {new_status} by admin {admin_id}")
+                      logger.info("DAL: User %s status changed to %s by admin %s", user_id, new_status, admin_id)
                       return True
                  else:
-                      logger.warning(f"DAL: sp_ChangeUserStatus for user {user_id}, admin {admin_id} returned ambiguous success indicator: {result}")
+                      logger.warning("DAL: sp_ChangeUserStatus for user %s, admin %s returned ambiguous success indicator: %s", user_id, admin_id, result)
                       return True
 
             # If result is None or not a dict
-            logger.warning(f"DAL: sp_ChangeUserStatus for user {user_id}, admin {admin_id} returned unexpected result: {result}")
+            logger.warning("DAL: sp_ChangeUserStatus for user %s, admin %s returned unexpected result: %s", user_id, admin_id, result)
             raise DALError(f"Database error while changing user status: {result}")
 
 
         except (NotFoundError, ForbiddenError, ValueError, DALError) as e:
              raise e # Re-raise specific exceptions
         except Exception as e:
-            logger.error(f"DAL: Error changing user status for user {user_id}, admin {admin_id}: {e}")
+            logger.error("DAL: Error changing user status for user %s, admin %s: %s", user_id, admin_id, e)
             raise DALError(f"Database error while changing user status: {e}") from e
 
     async def adjust_user_credit(self, conn: pyodbc.Connection, user_id: UUID, credit_adjustment: int, admin_id: UUID, reason: str) -> bool:
         """管理员手动调整用户信用分。"""
-        logger.debug(f"DAL: Admin {admin_id} attempting to adjust credit for user {user_id} by {credit_adjustment} with reason: {reason}")
+        logger.debug("DAL: Admin %s attempting to adjust credit for user %s by %s with reason: %s", admin_id, user_id, credit_adjustment, reason)
         sql = "{CALL sp_AdjustUserCredit(?, ?, ?, ?)}"
         try:
             # Use the injected execute_query function. SP returns a single row result.
             result = await self.execute_query_func(conn, sql, (user_id, credit_adjustment, admin_id, reason), fetchone=True)
-            logger.debug(f"DAL: sp_AdjustUserCredit for user {user_id}, admin {admin_id} returned: {result}")
+            logger.debug("DAL: sp_AdjustUserCredit for user %s, admin %s returned: %s", user_id, admin_id, result)
 
             if result and isinstance(result, dict):
                  error_message = result.get('') or result.get('Error') or result.get('Message')
@@ -741,7 +743,7 @@ class UserDAL:
 
                  # Check for known error messages first
                  if error_message:
-                      logger.warning(f"DAL: sp_AdjustUserCredit for user {user_id}, admin {admin_id}: SP returned message: {error_message}") # Log as message
+                      logger.warning("DAL: sp_AdjustUserCredit for user %s, admin %s: SP returned message: %s", user_id, admin_id, error_message) # Log as message
                       if '用户未找到。' in error_message:
                            raise NotFoundError(f"User with ID {user_id} not found for credit adjustment.") # More specific message
                       if '无权限执行此操作' in error_message or 'Only administrators can adjust user credit.' in error_message:
@@ -760,7 +762,7 @@ class UserDAL:
                  # The SP is expected to return a dictionary like {'OperationResultCode': 0, '': '成功消息'} on success.
                  # We don't need to check OperationResultCode specifically here if the error message checks handle failures.
                  if result_code is None or result_code == 0:
-                      logger.info(f"DAL: Credit adjusted successfully for user ID: {user_id}")
+                      logger.info("DAL: Credit adjusted successfully for user ID: %s", user_id)
                       return True # Indicate success
                  else:
                       # If there's an unhandled error message or a non-zero result code, raise generic DALError
@@ -768,39 +770,39 @@ class UserDAL:
 
             # If result is None or not a dict, it's an unexpected scenario.
             logger.error(
-                f"DAL: sp_AdjustUserCredit for user {user_id} returned unexpected result: {result}")
+                "DAL: sp_AdjustUserCredit for user %s returned unexpected result: %s", user_id, result)
             raise DALError("Credit adjustment failed: Unexpected response from database.")
 
         except (NotFoundError, ForbiddenError, ValueError, DALError) as e:
              # Re-raise known errors
              raise e
         except Exception as e:
-             logger.error(f"DAL: Unexpected error adjusting user credit for user {user_id}: {e}")
+             logger.error("DAL: Unexpected error adjusting user credit for user %s: %s", user_id, e)
              raise DALError(f"Database error during user credit adjustment: {e}") from e
 
-    async def get_all_users(self, conn: pyodbc.Connection, admin_id: UUID) -> list[dict]:
-        """DAL: 管理员获取所有用户列表。"""
-        logger.debug(f"DAL: Attempting to get all users by admin {admin_id}")
+    async def get_all_users(self, conn: pyodbc.Connection, admin_id: UUID) -> list[UserResponseSchema]:
+        """DAL: 管理员获取所有用户列表，结果行直接映射为 UserResponseSchema。"""
+        logger.debug("DAL: Attempting to get all users by admin %s", admin_id)
         sql = "{CALL sp_GetAllUsers(?)}"
         try:
-            results = await self.execute_query_func(conn, sql, (admin_id,), fetchall=True)
-            logger.debug(f"DAL: sp_GetAllUsers returned {len(results) if results else 0} users.")
+            results = await self.execute_query_func(conn, sql, (admin_id,), fetchall=True, row_mapper=get_row_mapper("sp_GetAllUsers"))
+            logger.debug("DAL: sp_GetAllUsers returned %s users.", len(results) if results else 0)
             return results
         except Exception as e:
-            logger.error(f"DAL: Error getting all users: {e}")
+            logger.error("DAL: Error getting all users: %s", e)
             raise DALError(f"Failed to get all users: {e}") from e
 
     async def update_user_staff_status(self, conn: pyodbc.Connection, user_id: UUID, new_is_staff: bool, admin_id: UUID) -> bool:
         """DAL: 更新用户的staff状态。"""
-        logger.debug(f"DAL: Attempting to update staff status for user {user_id} to {new_is_staff} by admin {admin_id}")
+        logger.debug("DAL: Attempting to update staff status for user %s to %s by admin %s", user_id, new_is_staff, admin_id)
         sql = "{CALL sp_UpdateUserStaffStatus(?, ?, ?)}"
         try:
             # sp_UpdateUserStaffStatus returns 1 for success, -1 if user not found, -2 if admin not found/not super admin
             result = await self.execute_query_func(conn, sql, (user_id, new_is_staff, admin_id), fetchone=True)
-            logger.debug(f"DAL: sp_UpdateUserStaffStatus returned: {result}")
+            logger.debug("DAL: sp_UpdateUserStaffStatus returned: %s", result)
             
             if result and isinstance(result, dict) and result.get('OperationResultCode') == 1:
-                 logger.info(f"DAL: Staff status updated successfully for user {user_id}.")
+                 logger.info("DAL: Staff status updated successfully for user %s.", user_id)
                  return True
             
             # Handle sp specific error codes
@@ -811,64 +813,64 @@ class UserDAL:
                  raise PermissionError(f"Admin with ID {admin_id} not authorized or not found.") # Use PermissionError for authorization issues
             else:
                  # Log unexpected result and raise a generic error
-                 logger.error(f"DAL: Unexpected result from sp_UpdateUserStaffStatus: {result}")
+                 logger.error("DAL: Unexpected result from sp_UpdateUserStaffStatus: %s", result)
                  raise DALError(f"Failed to update staff status for user {user_id}: Unexpected result code {error_code}")
 
         except (pyodbc.ProgrammingError, pyodbc.IntegrityError) as e:
-            logger.error(f"DAL: Database error updating staff status for user {user_id}: {e}")
+            logger.error("DAL: Database error updating staff status for user %s: %s", user_id, e)
             raise DALError(f"Database error updating staff status for user {user_id}: {e}") from e
         except Exception as e:
-            logger.error(f"DAL: Unexpected error updating staff status for user {user_id}: {e}")
+            logger.error("DAL: Unexpected error updating staff status for user %s: %s", user_id, e)
             raise DALError(f"Failed to update staff status for user {user_id}: {e}") from e
 
     async def get_user_by_email_with_password(self, conn: pyodbc.Connection, email: str) -> dict | None:
         """DAL: 根据邮箱获取用户（包括密码哈希）。"""
-        logger.debug(f"DAL: Attempting to get user by email {email}")
+        logger.debug("DAL: Attempting to get user by email %s", email)
         sql = "{CALL sp_GetUserByEmailWithPassword(?)}"
         try:
             result = await self.execute_query_func(conn, sql, (email,), fetchone=True)
-            logger.debug(f"DAL: sp_GetUserByEmailWithPassword returned: {result}")
+            logger.debug("DAL: sp_GetUserByEmailWithPassword returned: %s", result)
             return result
         except Exception as e:
-            logger.error(f"DAL: Error getting user by email {email}: {e}")
+            logger.error("DAL: Error getting user by email %s: %s", email, e)
             raise DALError(f"Failed to get user by email {email}: {e}") from e
 
     async def create_otp(self, conn: pyodbc.Connection, user_id: UUID, otp_code: str, expires_at: datetime, otp_type: str) -> dict | None:
         """DAL: 为指定用户创建并存储 OTP。"""
-        logger.debug(f"DAL: Attempting to create OTP for user {user_id} with type {otp_type}")
+        logger.debug("DAL: Attempting to create OTP for user %s with type %s", user_id, otp_type)
         sql = "{CALL sp_CreateOtpForPasswordReset(?, ?, ?, ?)}"
         try:
             result = await self.execute_query_func(conn, sql, (user_id, otp_code, expires_at, otp_type), fetchone=True)
-            logger.debug(f"DAL: sp_CreateOtpForPasswordReset returned: {result}")
+            logger.debug("DAL: sp_CreateOtpForPasswordReset returned: %s", result)
 
             if result and isinstance(result, dict):
                 operation_result_code = result.get('OperationResultCode')
                 debug_message = result.get('Debug_Message')
 
                 if operation_result_code == 0:
-                    logger.info(f"DAL: OTP created successfully for user {user_id}.")
+                    logger.info("DAL: OTP created successfully for user %s.", user_id)
                     return result
                 elif operation_result_code == -1:
                     raise NotFoundError(f"User with ID {user_id} not found for OTP creation.")
                 else:
                     raise DALError(f"Stored procedure error creating OTP: {debug_message}")
             
-            logger.error(f"DAL: sp_CreateOtpForPasswordReset returned unexpected result: {result}")
+            logger.error("DAL: sp_CreateOtpForPasswordReset returned unexpected result: %s", result)
             raise DALError("Failed to create OTP: Unexpected database response.")
 
         except (NotFoundError, DALError) as e:
             raise e
         except Exception as e:
-            logger.error(f"DAL: Error creating OTP for user {user_id}: {e}")
+            logger.error("DAL: Error creating OTP for user %s: %s", user_id, e)
             raise DALError(f"Database error creating OTP: {e}") from e
 
     async def get_otp_details(self, conn: pyodbc.Connection, email: str, otp_code: str) -> dict | None:
         """DAL: 根据邮箱和 OTP 获取 OTP 详情并验证有效性。"""
-        logger.debug(f"DAL: Attempting to get OTP details for email {email} with code {otp_code}")
+        logger.debug("DAL: Attempting to get OTP details for email %s with code %s", email, otp_code)
         sql = "{CALL sp_GetOtpDetailsAndValidate(?, ?)}"
         try:
             result = await self.execute_query_func(conn, sql, (email, otp_code), fetchone=True)
-            logger.debug(f"DAL: sp_GetOtpDetailsAndValidate returned: {result}")
+            logger.debug("DAL: sp_GetOtpDetailsAndValidate returned: %s", result)
             
             if result and isinstance(result, dict) and 'OperationResultCode' in result and result['OperationResultCode'] == -1:
                 # Specific error from SP indicating invalid/expired OTP
@@ -878,38 +880,38 @@ class UserDAL:
                 return result
             else:
                 # Unexpected result from SP
-                logger.warning(f"DAL: sp_GetOtpDetailsAndValidate returned unexpected type or None: {result}")
+                logger.warning("DAL: sp_GetOtpDetailsAndValidate returned unexpected type or None: %s", result)
                 return None # Treat as not found/invalid
         except Exception as e:
-            logger.error(f"DAL: Error getting OTP details for email {email} with code {otp_code}: {e}")
+            logger.error("DAL: Error getting OTP details for email %s with code %s: %s", email, otp_code, e)
             raise DALError(f"Database error while fetching OTP details: {e}") from e
 
     async def mark_otp_as_used(self, conn: pyodbc.Connection, otp_id: UUID) -> bool:
         """DAL: 标记 OTP 为已使用。"""
-        logger.debug(f"DAL: Attempting to mark OTP {otp_id} as used")
+        logger.debug("DAL: Attempting to mark OTP %s as used", otp_id)
         sql = "{CALL sp_MarkOtpAsUsed(?)}"
         try:
             result = await self.execute_query_func(conn, sql, (otp_id,), fetchone=True)
-            logger.debug(f"DAL: sp_MarkOtpAsUsed returned: {result}")
+            logger.debug("DAL: sp_MarkOtpAsUsed returned: %s", result)
 
             if result and isinstance(result, dict):
                 operation_result_code = result.get('OperationResultCode')
                 debug_message = result.get('Debug_Message')
 
                 if operation_result_code == 0:
-                    logger.info(f"DAL: OTP {otp_id} successfully marked as used.")
+                    logger.info("DAL: OTP %s successfully marked as used.", otp_id)
                     return True
                 elif operation_result_code == -1:
-                    logger.warning(f"DAL: OTP {otp_id} not found or already used when marking as used. Debug: {debug_message}")
+                    logger.warning("DAL: OTP %s not found or already used when marking as used. Debug: %s", otp_id, debug_message)
                     return False # Not found or already used
                 else:
                     raise DALError(f"Stored procedure error marking OTP as used: {debug_message}")
             
-            logger.error(f"DAL: sp_MarkOtpAsUsed returned unexpected result: {result}")
+            logger.error("DAL: sp_MarkOtpAsUsed returned unexpected result: %s", result)
             raise DALError("Failed to mark OTP as used: Unexpected database response.")
 
         except DALError as e:
             raise e
         except Exception as e:
-            logger.error(f"DAL: Error marking OTP {otp_id} as used: {e}")
+            logger.error("DAL: Error marking OTP %s as used: %s", otp_id, e)
             raise DALError(f"Database error marking OTP as used: {e}") from e 
\ No newline at end of file
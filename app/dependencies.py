@@ -1,5 +1,5 @@
 # app/dependencies.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt # 导入 JWT 相关的库
 from datetime import datetime, timedelta # 导入时间相关的库
@@ -9,27 +9,20 @@ import pyodbc
 
 from app.config import settings # 导入配置
 from app.schemas.user_schemas import TokenData # 导入 TokenData schema
-from app.dal.connection import get_db_connection # 导入数据库连接依赖
-from app.dal.user_dal import UserDAL # 导入UserDAL
+from app.dal.connection import get_db_connection, get_read_only_db_connection # 导入数据库连接依赖 (读写 / 只读)
 from app.services.user_service import UserService # 导入UserService
-from app.dal.base import execute_query # Import execute_query from base.py
-from app.dal.orders_dal import OrdersDAL # 导入 OrdersDAL
 from app.services.order_service import OrderService # 导入 OrderService
-from app.dal.evaluation_dal import EvaluationDAL # 导入 EvaluationDAL
 from app.services.evaluation_service import EvaluationService # 导入 EvaluationService
 # from app.utils.auth import verify_password, get_password_hash, create_access_token # 如果需要在这里处理token，需要导入
-from app.dal.product_dal import ProductDAL, ProductImageDAL, UserFavoriteDAL # Import ProductDAL, ProductImageDAL, UserFavoriteDAL
 from app.services.product_service import ProductService # Import ProductService
+from app.services.upload_service import UploadService # 导入 UploadService
+from app.core.container import AppContainer # 应用级 DAL/Service 单例
+from app.core.concurrency import register_admin_dependency # 管理员路由归入 admin 并发预算
 # from app.utils.auth import verify_password, get_password_hash, create_access_token # 如果需要在这里处理token，需要导入
 
 import logging # Import logging
 logger = logging.getLogger(__name__) # Get logger instance
 
-# Instantiate DAL and Service (consider dependency injection container for larger apps)
-# 注意：这里的实例化UserDAL和UserService可能需要在获取数据库连接后再进行
-# user_dal_instance = UserDAL()
-# user_service_instance = UserService(user_dal_instance)
-
 # Dependency to get a database connection
 # 直接使用 get_db_connection，无需在此重复定义 get_db_conn
 # async def get_db_conn():
@@ -45,54 +38,35 @@ logger = logging.getLogger(__name__) # Get logger instance
 #             conn.close()
 
 
-# Dependency to get a UserService instance
-# Inject execute_query into UserDAL when creating UserService
-async def get_user_service() -> UserService:
-    """Dependency injector for UserService, injecting UserDAL with execute_query."""
-    logger.debug("Attempting to get UserService instance.") # Add logging
-    # Instantiate UserDAL, injecting the execute_query function
-    user_dal_instance = UserDAL(execute_query_func=execute_query)
-    logger.debug("UserDAL instance created.") # Add logging
-    # Instantiate UserService, injecting the UserDAL instance
-    service = UserService(user_dal=user_dal_instance)
-    logger.debug("UserService instance created.") # Add logging
-    return service # Return the UserService instance
-
-# Dependency to get a ProductService instance
-async def get_product_service() -> ProductService:
-    """Dependency injector for ProductService, injecting DALs with execute_query."""
-    logger.debug("Attempting to get ProductService instance.")
-    product_dal_instance = ProductDAL(execute_query_func=execute_query)
-    product_image_dal_instance = ProductImageDAL(execute_query_func=execute_query)
-    user_favorite_dal_instance = UserFavoriteDAL(execute_query_func=execute_query)
-    logger.debug("Product DAL instances created.")
-    service = ProductService(
-        product_dal=product_dal_instance,
-        product_image_dal=product_image_dal_instance,
-        user_favorite_dal=user_favorite_dal_instance
-    )
-    logger.debug("ProductService instance created.")
-    return service
-
-# Dependency to get an OrderService instance
-async def get_order_service() -> OrderService:
-    """Dependency injector for OrderService, injecting OrdersDAL with execute_query."""
-    logger.debug("Attempting to get OrderService instance.")
-    order_dal_instance = OrdersDAL(execute_query_func=execute_query)
-    logger.debug("OrdersDAL instance created.")
-    service = OrderService(order_dal=order_dal_instance)
-    logger.debug("OrderService instance created.")
-    return service
-
-# Dependency to get an EvaluationService instance
-async def get_evaluation_service() -> EvaluationService:
-    """Dependency injector for EvaluationService, injecting EvaluationDAL with execute_query."""
-    logger.debug("Attempting to get EvaluationService instance.")
-    evaluation_dal_instance = EvaluationDAL(execute_query_func=execute_query)
-    logger.debug("EvaluationDAL instance created.")
-    service = EvaluationService(evaluation_dal=evaluation_dal_instance)
-    logger.debug("EvaluationService instance created.")
-    return service
+# --- Service 依赖 ---
+# DAL 与 Service 是无状态的 execute_query 封装，由 lifespan 中创建的 AppContainer 持有单例，
+# 这里的依赖函数只负责取出实例 (async def，避免被放进线程池执行)。
+def get_container(request: Request) -> AppContainer:
+    """返回应用容器；未经过 lifespan 启动时 (如未使用 with 的 TestClient) 按需创建。"""
+    container = getattr(request.app.state, "container", None)
+    if container is None:
+        container = request.app.state.container = AppContainer()
+    return container
+
+async def get_user_service(request: Request) -> UserService:
+    """Dependency injector for the shared UserService instance."""
+    return get_container(request).user_service
+
+async def get_product_service(request: Request) -> ProductService:
+    """Dependency injector for the shared ProductService instance."""
+    return get_container(request).product_service
+
+async def get_order_service(request: Request) -> OrderService:
+    """Dependency injector for the shared OrderService instance."""
+    return get_container(request).order_service
+
+async def get_evaluation_service(request: Request) -> EvaluationService:
+    """Dependency injector for the shared EvaluationService instance."""
+    return get_container(request).evaluation_service
+
+async def get_upload_service(request: Request) -> UploadService:
+    """Dependency injector for the shared UploadService instance."""
+    return get_container(request).upload_service
 
 # 从配置文件获取 JWT 密钥和算法
 SECRET_KEY = settings.SECRET_KEY # Assumes settings is imported
@@ -152,6 +126,9 @@ async def get_current_active_admin_user(current_user: dict = Depends(get_current
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="需要管理员权限")
     return current_user # Return the user dict (containing user_id, is_staff, etc.)
 
+# 依赖管理员身份的路由使用 admin 类别的并发预算
+register_admin_dependency(get_current_active_admin_user)
+
 # Dependency to get the current active user (authenticated and verified/active status)
 async def get_current_authenticated_user(current_user: dict = Depends(get_current_user)):
     # Check if user exists and is marked as verified (assuming 'Active' status is handled during login token creation)
@@ -168,9 +145,9 @@ async def get_current_authenticated_user(current_user: dict = Depends(get_curren
 # New dependency to get the current active user (only if super admin)
 async def get_current_super_admin_user(current_user: dict = Depends(get_current_user)):
     # Check if the user exists and has the is_super_admin flag set
-    logger.debug(f"get_current_super_admin_user received current_user: {current_user}") # Add logging
+    logger.debug("get_current_super_admin_user received current_user: %s", current_user) # Add logging
     is_super_admin = current_user.get('is_super_admin', False) # Get the flag
-    logger.debug(f"get_current_super_admin_user check result: {is_super_admin}") # Add logging
+    logger.debug("get_current_super_admin_user check result: %s", is_super_admin) # Add logging
     if current_user is None or not is_super_admin:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="需要超级管理员权限")
     return current_user # Return the user dict
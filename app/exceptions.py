@@ -1,4 +1,5 @@
 # app/exceptions.py
+import math
 from fastapi import HTTPException, status, Request
 from fastapi.responses import JSONResponse
 
@@ -23,6 +24,16 @@ class IntegrityError(DALError):
     def __init__(self, message="Integrity constraint violation"):
         super().__init__(message)
 
+class InsufficientStockError(IntegrityError):
+    """Raised when a product does not have enough stock left for an order."""
+    def __init__(self, message="商品库存不足"):
+        super().__init__(message)
+
+class ProductUnavailableError(NotFoundError):
+    """Raised when ordering a product that does not exist or is not on sale."""
+    def __init__(self, message="商品不存在或非在售状态"):
+        super().__init__(message)
+
 # ... 您可以根据业务需求添加更多特定异常，例如 AuthorizationError, ValidationError (for business logic)
 
 class DatabaseError(DALError):
@@ -30,6 +41,44 @@ class DatabaseError(DALError):
     def __init__(self, message="Database error"):
         super().__init__(message)
 
+class TransientDatabaseError(DatabaseError):
+    """Raised for errors that may succeed on retry (deadlock victim, lock timeout, dropped connection)."""
+    def __init__(self, message="Transient database error", reason="transient"):
+        super().__init__(message)
+        self.reason = reason
+
+class DatabaseUnavailableError(TransientDatabaseError):
+    """Raised without attempting a connection while the database circuit breaker is open (see app.dal.circuit_breaker)."""
+    def __init__(self, message="数据库暂不可用，请稍后重试", retry_after: float = 1):
+        super().__init__(message, reason="circuit_open")
+        self.retry_after = retry_after
+
+class QueryTimeoutError(TransientDatabaseError):
+    """Raised when a query exceeds its deadline (driver query timeout or the route's deadline). Not retried; returned as 503."""
+    def __init__(self, message="Query timeout expired"):
+        super().__init__(message, reason="timeout")
+
+class ReadOnlyViolationError(DALError):
+    """Raised when a write is attempted on a read-only connection."""
+    def __init__(self, message="Write operation attempted on a read-only connection"):
+        super().__init__(message)
+
+class RateLimitExceededError(Exception):
+    """Raised when a client or account has used up its request budget (see app.core.rate_limit)."""
+    def __init__(self, retry_after: float, policy: str = "", message="请求过于频繁，请稍后重试"):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+        self.policy = policy
+
+class ServiceOverloadedError(Exception):
+    """Raised when a route class has no concurrency budget left and its wait queue is full or timed out (see app.core.concurrency)."""
+    def __init__(self, retry_after: float = 1, route_class: str = "", message="服务繁忙，请稍后重试"):
+        super().__init__(message)
+        self.message = message
+        self.retry_after = retry_after
+        self.route_class = route_class
+
 class EmailSendingError(Exception):
     """Raised when there is an error sending email."""
     def __init__(self, message="Email sending failed", detail=None):
@@ -55,6 +104,13 @@ class PermissionError(Exception):
         self.message = message
         super().__init__(self.message)
 
+class FileTooLargeError(Exception):
+    """Raised when an uploaded file exceeds the configured size limit."""
+    def __init__(self, message="File too large", max_size=None):
+        self.message = message
+        self.max_size = max_size
+        super().__init__(self.message)
+
 class InternalServerError(Exception):
     """Raised for unexpected internal server errors."""
     def __init__(self, message="Internal server error"):
@@ -75,6 +131,31 @@ async def integrity_exception_handler(request: Request, exc: IntegrityError):
         content={"detail": str(exc)}
     )
 
+async def transient_database_exception_handler(request: Request, exc: TransientDatabaseError):
+    # 重试后仍失败的死锁 / 锁超时 / 连接中断，或熔断器打开：提示客户端稍后重试
+    retry_after = getattr(exc, "retry_after", 1)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "数据库繁忙，请稍后重试"},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+async def rate_limit_exception_handler(request: Request, exc: RateLimitExceededError):
+    # 令牌桶已空：Retry-After 为下一个令牌可用前的秒数 (向上取整)
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": exc.message},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
+async def service_overloaded_exception_handler(request: Request, exc: ServiceOverloadedError):
+    # 并发预算耗尽时快速拒绝，而不是让请求无限排队等待数据库连接
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": exc.message},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
 async def dal_exception_handler(request: Request, exc: DALError):
     # 捕获所有未被更具体处理器捕获的 DAL 错误
     return JSONResponse(
@@ -4,117 +4,65 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.encoders import jsonable_encoder
+from app.core.responses import FastJSONResponse
+from app.middleware import InstrumentationMiddleware, DisconnectCancellationMiddleware
 from app.exceptions import (
-    NotFoundError, IntegrityError, DALError,
+    NotFoundError, IntegrityError, DALError, TransientDatabaseError, RateLimitExceededError, ServiceOverloadedError,
     not_found_exception_handler, integrity_exception_handler, dal_exception_handler,
-    forbidden_exception_handler
+    forbidden_exception_handler, transient_database_exception_handler, rate_limit_exception_handler,
+    service_overloaded_exception_handler
 )
 
-# Import standard logging and dictConfig
+# Import standard logging
 import logging
 import os
-from logging.config import dictConfig
+from contextlib import asynccontextmanager
 
-# Import StaticFiles
-from fastapi.staticfiles import StaticFiles
-
-# Import uvicorn.logging for potential formatters
-try:
-    import uvicorn.logging
-except ImportError:
-    uvicorn = None # Handle case where uvicorn might not be installed in this env
+# Import the static files app used for /uploads
+from app.utils.uploads_static import UploadsStaticFiles
 
 # Import all module routes
-from app.routers import users, auth, order, evaluation, product_routes, upload_routes
+from app.routers import users, auth, order, evaluation, product_routes, upload_routes, monitoring
+from app.config import settings
+from app.core.logging import setup_logging, shutdown_logging
+from app.core.container import AppContainer
 # from app.core.db import initialize_db_pool, close_db_pool # Commented out connection pool functions
 
-# Define a comprehensive logging configuration dictionary
-LOGGING_CONFIG = {
-    "version": 1,
-    "disable_existing_loggers": False, # Crucial: Prevents Uvicorn from silencing other loggers
-    "formatters": {
-        "default": { # Formatter for general application logs
-            "()": "uvicorn.logging.DefaultFormatter" if uvicorn and hasattr(uvicorn.logging, "DefaultFormatter") else "logging.Formatter",
-            "fmt": "%(levelprefix)s %(asctime)s | %(name)s | %(message)s",
-            "datefmt": "%Y-%m-%d %H:%M:%S",
-            "use_colors": True if uvicorn and hasattr(uvicorn.logging, "DefaultFormatter") else False,
-        },
-        "access": { # Formatter for Uvicorn's access logs
-            "()": "uvicorn.logging.AccessFormatter" if uvicorn and hasattr(uvicorn.logging, "AccessFormatter") else "logging.Formatter",
-            "fmt": '%(levelprefix)s %(asctime)s | %(name)s | %(client_addr)s - "%(request_line)s" %(status_code)s',
-            "datefmt": "%Y-%m-%d %H:%M:%S",
-            "use_colors": True if uvicorn and hasattr(uvicorn.logging, "AccessFormatter") else False,
-        },
-    },
-    "handlers": {
-        "default": { # Handler for general logs (e.g., to stderr)
-            "formatter": "default",
-            "class": "logging.StreamHandler",
-            "stream": "ext://sys.stderr", # Directs to standard error stream
-        },
-        # Add a file handler if you need logs written to a file in production
-        # "file": {
-        #     "formatter": "default",
-        #     "class": "logging.FileHandler",
-        #     "filename": "app.log",
-        #     "encoding": "utf-8",
-        # },
-        "access": { # Handler for access logs (e.g., to stdout)
-            "formatter": "access",
-            "class": "logging.StreamHandler",
-            "stream": "ext://sys.stdout", # Directs to standard output stream
-        },
-    },
-    "loggers": {
-        "": { # Root logger: catches logs from any unconfigured logger
-            "handlers": ["default"], # Send root logs to the default handler
-            "level": "INFO", # Default level
-            "propagate": False,
-        },
-        "app": { # Logger specifically for your application code (e.g., app.main, app.routers)
-             "handlers": ["default"], # Send app logs to the default handler
-             "level": "DEBUG", # Set application logger to DEBUG for verbose output
-             "propagate": False,
-        },
-        "uvicorn.error": { # Uvicorn's internal error logger
-            "level": "INFO",
-            "handlers": ["default"],
-            "propagate": False,
-        },
-        "uvicorn.access": { # Uvicorn's HTTP access logger
-            "level": "INFO",
-            "handlers": ["access"],
-            "propagate": False,
-        },
-    },
-}
-
-# Apply the configuration as early as possible
-dictConfig(LOGGING_CONFIG)
+# 日志配置见 logging_config.json (队列化输出 + JSON 格式 + DEBUG 限流)，尽早加载
+setup_logging(settings.LOG_CONFIG_FILE, level=settings.LOG_LEVEL)
 
 # Get the logger for this module (app.main)
 logger = logging.getLogger(__name__)
 
 
+# 应用生命周期：启动时创建 DAL/Service 单例容器，关闭时释放进程池、连接池并输出剩余日志
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Application startup...")
+    container = AppContainer()
+    await container.startup()
+    app.state.container = container
+    try:
+        yield
+    finally:
+        logger.info("Application shutdown...")
+        await container.shutdown()
+        shutdown_logging() # 输出日志队列中剩余的记录
+
+
 app = FastAPI(
+    lifespan=lifespan,
     title="[思源淘] 交大校园二手交易平台 API",
     description="基于 FastAPI 和原生 SQL 构建的后端 API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=FastJSONResponse # orjson 序列化 UUID/Decimal/datetime
 )
 
 logger.info("FastAPI application instance created.") # Changed from print to logger
 
-logger.info(f"FastAPI app instance created with id: {id(app)}")
-
-# Custom Middleware to log requests
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.debug(f"Middleware: Request received for path: {request.url.path}")
-    response = await call_next(request)
-    logger.debug(f"Middleware: Response status code: {response.status_code} for path: {request.url.path}")
-    return response
+logger.info("FastAPI app instance created with id: %s", id(app))
 
 # 注册 CORS 中间件 (生产环境中请限制 allow_origins)
 app.add_middleware(
@@ -124,12 +72,21 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# 请求计时与指标 (纯 ASGI 中间件，替代原来的 @app.middleware("http") log_requests)
+# 最后注册的中间件位于最外层，耗时统计包含 CORS 处理
+app.add_middleware(InstrumentationMiddleware)
+# 客户端断开时取消请求的处理 (最外层：取消时指标中间件记录 499)
+if settings.CANCEL_ON_CLIENT_DISCONNECT:
+    app.add_middleware(DisconnectCancellationMiddleware)
 
 # 注册全局异常处理器
 app.add_exception_handler(NotFoundError, not_found_exception_handler)
 app.add_exception_handler(IntegrityError, integrity_exception_handler)
+app.add_exception_handler(TransientDatabaseError, transient_database_exception_handler)
 app.add_exception_handler(DALError, dal_exception_handler)
 app.add_exception_handler(PermissionError, forbidden_exception_handler)
+app.add_exception_handler(RateLimitExceededError, rate_limit_exception_handler)
+app.add_exception_handler(ServiceOverloadedError, service_overloaded_exception_handler)
 # 对于未捕获的 HTTPException (例如 Pydantic 验证失败)
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc: HTTPException):
@@ -158,25 +115,11 @@ app.include_router(product_routes.router, prefix="/api/v1/products", tags=["Prod
 app.include_router(order.router, prefix="/api/v1/orders", tags=["Orders"])
 app.include_router(evaluation.router, prefix="/api/v1/evaluations", tags=["Evaluations"])
 app.include_router(auth.router, prefix="/api/v1")
+app.include_router(monitoring.router) # /metrics (Prometheus), /health
 # Mount the uploads directory to serve static files
-app.mount("/uploads", StaticFiles(directory=os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'uploads'))), name="uploads")
+app.mount("/uploads", UploadsStaticFiles(directory=os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'uploads'))), name="uploads")
 # ... 注册其他模块路由
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Campus Exchange API!"}
-
-# 您可以添加一些启动和关闭事件 (例如，初始化数据库连接池)
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Application startup...")
-    # # Initialize database connection pool
-    # initialize_db_pool()
-    # logger.info("Database connection pool initialized.")
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    logger.info("Application shutdown...")
-    # # Close database connection pool
-    # close_db_pool()
-    # logger.info("Database connection pool closed.")
\ No newline at end of file
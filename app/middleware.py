@@ -1 +1,212 @@
- 
\ No newline at end of file
+# app/middleware.py
+import asyncio
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    REGISTRY, LATENCY_BUCKETS, RATIO_BUCKETS, SIZE_BUCKETS, MetricsRegistry,
+    start_db_timer, stop_db_timer,
+)
+
+logger = logging.getLogger(__name__)
+
+# 未匹配到任何路由 (404) 的请求统一归入一个标签，避免任意 URL 造成标签数量膨胀
+UNMATCHED_ROUTE = "<unmatched>"
+# 客户端在响应发出前断开、请求被取消时记录的状态码 (沿用 nginx 的 499 Client Closed Request)
+CLIENT_CLOSED_REQUEST = 499
+
+
+class RequestMetrics:
+    """HTTP 请求相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.requests = registry.counter(
+            "http_requests_total", "HTTP 请求总数", ("method", "route", "status"))
+        self.duration = registry.histogram(
+            "http_request_duration_seconds", "HTTP 请求处理耗时 (秒)", ("method", "route"), LATENCY_BUCKETS)
+        self.in_progress = registry.gauge(
+            "http_requests_in_progress", "正在处理的 HTTP 请求数")
+        self.request_size = registry.histogram(
+            "http_request_size_bytes", "HTTP 请求体大小 (字节)", ("route",), SIZE_BUCKETS)
+        self.response_size = registry.histogram(
+            "http_response_size_bytes", "HTTP 响应体大小 (字节)", ("route",), SIZE_BUCKETS)
+        self.db_time = registry.histogram(
+            "http_request_db_seconds", "单个请求中数据库调用的累计耗时 (秒)", ("route",), LATENCY_BUCKETS)
+        self.db_time_ratio = registry.histogram(
+            "http_request_db_time_ratio", "数据库耗时占请求总耗时的比例", ("route",), RATIO_BUCKETS)
+
+
+_default_metrics = None
+
+
+def get_request_metrics() -> RequestMetrics:
+    """全局注册表上的请求指标 (首次使用时注册)。"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = RequestMetrics(REGISTRY)
+    return _default_metrics
+
+
+def route_label(scope: Scope, root_path: str) -> str:
+    """
+    取路由模板 (如 /api/v1/products/{product_id}) 作为标签，而不是实际 URL。
+
+    FastAPI 路由匹配后会在 scope 中写入 "route"；Mount (如 /uploads) 会延长 root_path。
+    """
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+    mounted = scope.get("root_path", "")
+    if mounted != root_path and mounted.startswith(root_path):
+        return mounted[len(root_path):] or "/"
+    return UNMATCHED_ROUTE
+
+
+class InstrumentationMiddleware:
+    """
+    纯 ASGI 的请求计时与指标中间件，替代原来基于 BaseHTTPMiddleware 的 log_requests。
+
+    BaseHTTPMiddleware 会为每个请求额外创建任务和内存流来转发响应体；这里只包装 receive / send
+    统计字节数和状态码，不改变响应的发送方式 (流式响应、zerocopysend 照常工作)。
+
+    记录: 请求数 (方法/路由/状态码)、延迟直方图、处理中请求数、请求/响应体大小、数据库耗时及其占比。
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = None) -> None:
+        self.app = app
+        self.metrics = metrics or get_request_metrics()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        root_path = scope.get("root_path", "")
+        state = [500, 0, 0]  # status_code, request_bytes, response_bytes
+
+        async def receive_wrapper() -> Message:
+            message = await receive()
+            if message["type"] == "http.request":
+                state[1] += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            message_type = message["type"]
+            if message_type == "http.response.start":
+                state[0] = message["status"]
+            elif message_type == "http.response.body":
+                state[2] += len(message.get("body", b""))
+            elif message_type == "http.response.zerocopysend":
+                state[2] += message.get("count") or 0
+            await send(message)
+
+        metrics.in_progress.inc()
+        token = start_db_timer()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except asyncio.CancelledError:
+            if state[0] == 500 and state[2] == 0:
+                state[0] = CLIENT_CLOSED_REQUEST
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            db_seconds = stop_db_timer(token)
+            metrics.in_progress.dec()
+
+            method = scope["method"]
+            route = route_label(scope, root_path)
+            status_code, request_bytes, response_bytes = state
+            metrics.requests.inc(method, route, str(status_code))
+            metrics.duration.observe(duration, method, route)
+            metrics.request_size.observe(request_bytes, route)
+            metrics.response_size.observe(response_bytes, route)
+            if db_seconds:
+                metrics.db_time.observe(db_seconds, route)
+                metrics.db_time_ratio.observe(min(db_seconds / duration, 1.0) if duration else 0.0, route)
+
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("%s %s -> %d in %.1f ms (db %.1f ms)", method, scope["path"], status_code, duration * 1000, db_seconds * 1000)
+
+
+class DisconnectMetrics:
+    """客户端断开相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.cancelled = registry.counter(
+            "http_requests_cancelled_total", "客户端在响应发出前断开、处理被取消的请求数")
+
+
+_default_disconnect_metrics = None
+
+
+def get_disconnect_metrics() -> DisconnectMetrics:
+    """全局注册表上的客户端断开指标 (首次使用时注册)。"""
+    global _default_disconnect_metrics
+    if _default_disconnect_metrics is None:
+        _default_disconnect_metrics = DisconnectMetrics(REGISTRY)
+    return _default_disconnect_metrics
+
+
+class DisconnectCancellationMiddleware:
+    """
+    客户端在响应发送完成前断开连接时，取消该请求的处理任务。
+
+    uvicorn 不会因为客户端断开而取消普通请求，处理会继续执行到结束并一直占用数据库连接。
+    这里在单独的任务中运行应用，由一个监听任务独占读取 receive：请求体消息经容量为 1 的队列转交给应用
+    (保持流式上传的背压)，收到 http.disconnect 且响应尚未发送完成时取消应用任务。
+    取消会传到正在等待的数据库调用 (见 app.dal.db_metrics.QueryTimings)：排队中的调用不再执行，
+    执行中的语句发送取消；请求的连接随依赖清理关闭，未提交的事务回滚。
+    响应发送完成后的断开 (如后台任务仍在运行) 不会取消任务。
+    """
+
+    def __init__(self, app: ASGIApp, metrics: DisconnectMetrics = None) -> None:
+        self.app = app
+        self.metrics = metrics or get_disconnect_metrics()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue(maxsize=1)
+        state = {"disconnected": False, "response_complete": False, "cancelled": False}
+
+        async def app_receive() -> Message:
+            if state["disconnected"] and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def app_send(message: Message) -> None:
+            if message["type"] in ("http.response.body", "http.response.zerocopysend") and not message.get("more_body", False):
+                state["response_complete"] = True
+            await send(message)
+
+        app_task = asyncio.ensure_future(self.app(scope, app_receive, app_send))
+
+        async def watch_disconnect() -> None:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    state["disconnected"] = True
+                    if not state["response_complete"] and not app_task.done():
+                        state["cancelled"] = True
+                        self.metrics.cancelled.inc()
+                        logger.info("Client disconnected, cancelling %s %s", scope.get("method"), scope.get("path"))
+                        app_task.cancel()
+                    elif messages.empty():
+                        messages.put_nowait(message)
+                    return
+                await messages.put(message)
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await app_task
+        except asyncio.CancelledError:
+            if not state["cancelled"]:
+                raise
+        finally:
+            watcher.cancel()
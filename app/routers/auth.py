@@ -20,6 +20,7 @@ from app.schemas.user_schemas import (
 from app.services.user_service import UserService
 from app.dal.connection import get_db_connection # Import the DB connection dependency
 from app.dependencies import get_user_service # Import the Service dependency
+from app.core.rate_limit import rate_limit # 按 IP / 账号的令牌桶限流，超出时 429
 from app.exceptions import AuthenticationError, ForbiddenError, IntegrityError, DALError # Import exceptions, including DALError
 
 from fastapi.security import OAuth2PasswordRequestForm # Import OAuth2PasswordRequestForm
@@ -57,7 +58,7 @@ async def register(
         # Catch any other unexpected errors
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit("login", account_field="username"))])
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(), # Use OAuth2PasswordRequestForm for form data
     conn: pyodbc.Connection = Depends(get_db_connection), # Inject DB connection
@@ -115,7 +116,7 @@ async def login(
         # Catch any other unexpected errors
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
 
-@router.post("/request-verification-email", status_code=status.HTTP_200_OK, summary="请求学生身份验证OTP") # Changed summary
+@router.post("/request-verification-email", status_code=status.HTTP_200_OK, summary="请求学生身份验证OTP", dependencies=[Depends(rate_limit("email", account_field="email"))]) # Changed summary
 async def request_verification_email_api(
     request_data: RequestOtpSchema, # Changed schema to RequestOtpSchema
     conn: pyodbc.Connection = Depends(get_db_connection), # Inject DB connection
@@ -168,7 +169,7 @@ async def verify_email_otp_api(
         logger.error(f"API: Email OTP verification failed for {verify_data.email} due to unexpected error: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
 
-@router.post("/request-password-reset", status_code=status.HTTP_200_OK)
+@router.post("/request-password-reset", status_code=status.HTTP_200_OK, dependencies=[Depends(rate_limit("email", account_field="email"))])
 async def request_password_reset_api(
     request_data: RequestOtpSchema, # Changed schema to RequestOtpSchema
     conn: pyodbc.Connection = Depends(get_db_connection), # Inject DB connection
@@ -192,7 +193,7 @@ async def request_password_reset_api(
         # For security, still return a generic success message, even if an error occurred after the initial user check
         return {"message": "如果邮箱存在，您将很快收到一封包含密码重置链接的邮件。"}
 
-@router.post("/request-otp-password-reset", status_code=status.HTTP_200_OK)
+@router.post("/request-otp-password-reset", status_code=status.HTTP_200_OK, dependencies=[Depends(rate_limit("email", account_field="email"))])
 async def request_otp_password_reset_api(
     request_data: RequestOtpSchema,
     conn: pyodbc.Connection = Depends(get_db_connection),
@@ -241,7 +242,7 @@ async def verify_otp_and_reset_password_api(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
 
 # New endpoint for requesting login OTP
-@router.post("/request-login-otp", status_code=status.HTTP_200_OK, summary="请求登录OTP")
+@router.post("/request-login-otp", status_code=status.HTTP_200_OK, summary="请求登录OTP", dependencies=[Depends(rate_limit("email", account_field="identifier"))])
 async def request_login_otp_api(
     request_data: RequestLoginOtpSchema,
     conn: pyodbc.Connection = Depends(get_db_connection),
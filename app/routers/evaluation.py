@@ -1,13 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List, Optional
 from uuid import UUID
 import pyodbc # 导入 pyodbc
 
-from app.schemas.evaluation_schemas import EvaluationCreateSchema, EvaluationResponseSchema
+from app.schemas.evaluation_schemas import EvaluationCreateSchema, EvaluationResponseSchema, SellerReputationSchema, EvaluationPageSchema
 from app.dependencies import get_evaluation_service, get_current_user # 导入 Service 的依赖函数
 from app.services.evaluation_service import EvaluationService
-from app.exceptions import IntegrityError, ForbiddenError, NotFoundError, DALError
-from app.dal.connection import get_db_connection # 导入 get_db_connection
+from app.exceptions import IntegrityError, ForbiddenError, NotFoundError, DALError, TransientDatabaseError
+from app.dal.connection import get_db_connection, get_read_only_db_connection # 导入数据库连接依赖 (读取路由使用只读连接)
+from app.utils.keyset import InvalidCursorError
 
 router = APIRouter()
 
@@ -37,6 +38,8 @@ async def create_new_evaluation(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
     except NotFoundError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except TransientDatabaseError:
+        raise # 重试后仍失败，由全局处理器返回 503
     except DALError as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"数据库操作失败: {e}")
     except Exception as e:
@@ -47,7 +50,7 @@ async def create_new_evaluation(
 @router.get("/{evaluation_id}", response_model=EvaluationResponseSchema)
 async def get_evaluation_by_id_route(
     evaluation_id: UUID, # Path parameter
-    conn: pyodbc.Connection = Depends(get_db_connection),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
     evaluation_service: EvaluationService = Depends(get_evaluation_service)
 ):
     """
@@ -68,7 +71,7 @@ async def get_evaluation_by_id_route(
 @router.get("/product/{product_id}", response_model=List[EvaluationResponseSchema])
 async def get_evaluations_by_product_id_route(
     product_id: UUID, # Path parameter
-    conn: pyodbc.Connection = Depends(get_db_connection),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
     evaluation_service: EvaluationService = Depends(get_evaluation_service)
 ):
     """
@@ -89,7 +92,7 @@ async def get_evaluations_by_product_id_route(
 @router.get("/buyer/{buyer_id}", response_model=List[EvaluationResponseSchema])
 async def get_evaluations_by_buyer_id_route(
     buyer_id: UUID, # Path parameter
-    conn: pyodbc.Connection = Depends(get_db_connection),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
     evaluation_service: EvaluationService = Depends(get_evaluation_service)
 ):
     """
@@ -107,6 +110,99 @@ async def get_evaluations_by_buyer_id_route(
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
 
+@router.get("/seller/{seller_id}/reputation", response_model=SellerReputationSchema)
+async def get_seller_reputation_route(
+    seller_id: UUID, # Path parameter
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
+    evaluation_service: EvaluationService = Depends(get_evaluation_service)
+):
+    """
+    获取卖家信誉汇总 (平均评分、评价数、星级分布、最近评价时间)。
+    对应存储过程: `sp_GetSellerReputation`，读取由触发器维护的 SellerStats 汇总行。
+    """
+    try:
+        return await evaluation_service.get_seller_reputation(conn, seller_id)
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except TransientDatabaseError:
+        raise # 由全局处理器返回 503
+    except DALError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"数据库操作失败: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
+
+async def _evaluation_page(
+    evaluation_service: EvaluationService,
+    conn: pyodbc.Connection,
+    scope: str,
+    owner_id: UUID,
+    min_rating: Optional[int],
+    max_rating: Optional[int],
+    page_size: int,
+    cursor: Optional[str]
+) -> EvaluationPageSchema:
+    """评价分页路由的公共部分：调用 Service 并把异常转换为 HTTP 响应。"""
+    try:
+        return await evaluation_service.get_evaluation_page(
+            conn, scope, owner_id, min_rating=min_rating, max_rating=max_rating, page_size=page_size, cursor=cursor
+        )
+    except (InvalidCursorError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except TransientDatabaseError:
+        raise # 由全局处理器返回 503
+    except DALError as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"数据库操作失败: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
+
+@router.get("/product/{product_id}/page", response_model=EvaluationPageSchema)
+async def get_product_evaluation_page_route(
+    product_id: UUID,
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    max_rating: Optional[int] = Query(None, ge=1, le=5),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None), # 上一页返回的 next_cursor
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
+    evaluation_service: EvaluationService = Depends(get_evaluation_service)
+):
+    """
+    分页获取商品的评价 (按时间倒序)，附带评价数与平均分。
+    对应存储过程: `sp_GetEvaluationPage`
+    """
+    return await _evaluation_page(evaluation_service, conn, "Product", product_id, min_rating, max_rating, page_size, cursor)
+
+@router.get("/buyer/{buyer_id}/page", response_model=EvaluationPageSchema)
+async def get_buyer_evaluation_page_route(
+    buyer_id: UUID,
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    max_rating: Optional[int] = Query(None, ge=1, le=5),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
+    evaluation_service: EvaluationService = Depends(get_evaluation_service)
+):
+    """
+    分页获取买家发出的评价 (按时间倒序)，附带评价数与平均分。
+    对应存储过程: `sp_GetEvaluationPage`
+    """
+    return await _evaluation_page(evaluation_service, conn, "Buyer", buyer_id, min_rating, max_rating, page_size, cursor)
+
+@router.get("/seller/{seller_id}/page", response_model=EvaluationPageSchema)
+async def get_seller_evaluation_page_route(
+    seller_id: UUID,
+    min_rating: Optional[int] = Query(None, ge=1, le=5),
+    max_rating: Optional[int] = Query(None, ge=1, le=5),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
+    evaluation_service: EvaluationService = Depends(get_evaluation_service)
+):
+    """
+    分页获取卖家收到的评价 (按时间倒序)，附带评价数与平均分 (不过滤评分时读取 SellerStats 汇总)。
+    对应存储过程: `sp_GetEvaluationPage`
+    """
+    return await _evaluation_page(evaluation_service, conn, "Seller", seller_id, min_rating, max_rating, page_size, cursor)
+
 # 您可以在此添加更多评价相关的路由，例如：
 # - 获取某个商品的所有评价
 # - 获取用户的所有评价
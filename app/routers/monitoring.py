@@ -0,0 +1,49 @@
+# app/routers/monitoring.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+from app.dal.db_metrics import query_metrics
+from app.dal.circuit_breaker import get_circuit_breaker, STATE_OPEN
+
+import logging
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["Monitoring"])
+
+
+def _update_pool_metrics() -> None:
+    """抓取时刷新连接池指标 (连接池未启用或 DBUtils 不可用时保持为 0)。"""
+    try:
+        from app.core.db import get_pool_stats
+    except ImportError:
+        return
+    stats = get_pool_stats()
+    if stats is None:
+        return
+    query_metrics.pool_in_use.set(stats["in_use"])
+    query_metrics.pool_idle.set(stats["idle"])
+    query_metrics.pool_max.set(stats["max"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Prometheus 抓取端点：HTTP 请求指标、按存储过程统计的数据库指标与连接池状态。
+    """
+    _update_pool_metrics()
+    return PlainTextResponse(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@router.get("/health", include_in_schema=False)
+async def health():
+    """
+    健康检查：不访问数据库，进程能处理请求即返回 200。
+    database 给出主库熔断器状态；熔断器打开时 status 为 degraded (依赖数据库的接口返回 503)。
+    """
+    breaker = get_circuit_breaker()
+    database = breaker.snapshot() if breaker is not None else {"state": "disabled"}
+    return {
+        "status": "degraded" if database["state"] == STATE_OPEN else "ok",
+        "database": database,
+    }
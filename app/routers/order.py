@@ -5,13 +5,14 @@ import uuid # For User ID and Order ID
 import fastapi
 
 # 假设的Schema路径，请根据您的项目结构调整
-from app.schemas.order_schemas import OrderCreateSchema, OrderResponseSchema, OrderStatusUpdateSchema 
+from app.schemas.order_schemas import OrderCreateSchema, OrderResponseSchema, OrderStatusUpdateSchema, OrderHistoryPageSchema
 # 假设的Service和依赖路径，请根据您的项目结构调整
 from app.services.order_service import OrderService
-from app.dependencies import get_current_user, get_db_connection, get_order_service
+from app.dependencies import get_current_user, get_db_connection, get_read_only_db_connection, get_order_service
 
 # 假设的异常类路径，请根据您的项目结构调整
-from app.exceptions import IntegrityError, ForbiddenError, NotFoundError, DALError
+from app.exceptions import IntegrityError, ForbiddenError, NotFoundError, DALError, TransientDatabaseError
+from app.utils.keyset import InvalidCursorError
 
 router = APIRouter()
 
@@ -43,6 +44,8 @@ async def create_new_order(
         raise HTTPException(status_code=fastapi.status.HTTP_403_FORBIDDEN, detail=str(e))
     except NotFoundError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail=str(e))
+    except TransientDatabaseError:
+        raise # 重试后仍失败，由全局处理器返回 503
     except DALError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.detail if e.detail else str(e))
     except Exception as e:
@@ -84,6 +87,8 @@ async def update_order_status_route(
         raise HTTPException(status_code=fastapi.status.HTTP_403_FORBIDDEN, detail=str(e))
     except NotFoundError as e: # 订单未找到
         raise HTTPException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail=str(e))
+    except TransientDatabaseError:
+        raise # 重试后仍失败，由全局处理器返回 503
     except DALError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.detail if e.detail else str(e))
     except Exception as e:
@@ -92,7 +97,7 @@ async def update_order_status_route(
 @router.get("/mine", response_model=List[OrderResponseSchema])
 async def get_my_orders(
     current_user: dict = Depends(get_current_user),
-    conn: pyodbc.Connection = Depends(get_db_connection),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
     order_service: OrderService = Depends(get_order_service),
     status: str = Query(None), # 添加status查询参数
     page_number: int = Query(1, ge=1), # 添加page_number查询参数
@@ -118,11 +123,44 @@ async def get_my_orders(
     except Exception as e:
         raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
 
+@router.get("/history", response_model=OrderHistoryPageSchema)
+async def get_my_order_history(
+    current_user: dict = Depends(get_current_user),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
+    order_service: OrderService = Depends(get_order_service),
+    as_seller: bool = Query(False), # 卖家标签页
+    status: str = Query(None),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: str = Query(None) # 上一页返回的 next_cursor
+):
+    """
+    订单历史页：订单摘要 (商品名称、单价、主图、对方用户名) 与买家 / 卖家标签页的状态计数。
+    使用 keyset 分页，下一页传入上一页返回的 next_cursor。
+    对应存储过程: `sp_GetOrderHistory` (通过Service层调用)
+    """
+    user_id_str = current_user.get("user_id")
+    if not user_id_str:
+        raise HTTPException(status_code=fastapi.status.HTTP_401_UNAUTHORIZED, detail="无法获取当前用户信息")
+
+    try:
+        user_id = uuid.UUID(user_id_str)
+        return await order_service.get_order_history(
+            conn, user_id, as_seller=as_seller, status=status, page_size=page_size, cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=fastapi.status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except TransientDatabaseError:
+        raise # 由全局处理器返回 503
+    except DALError as e:
+        raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.detail if e.detail else str(e))
+    except Exception as e:
+        raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
+
 @router.get("/{order_id}", response_model=OrderResponseSchema) # Added GET for single order retrieval
 async def get_order_by_id_route(
     order_id: uuid.UUID = Path(..., title="The ID of the order to retrieve"),
     current_user: dict = Depends(get_current_user),
-    conn: pyodbc.Connection = Depends(get_db_connection),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
     order_service: OrderService = Depends(get_order_service)
 ):
     """
@@ -181,6 +219,8 @@ async def delete_order_route(
         raise HTTPException(status_code=fastapi.status.HTTP_400_BAD_REQUEST, detail=str(e))
     except IntegrityError as e: # Add IntegrityError handling
         raise HTTPException(status_code=fastapi.status.HTTP_409_CONFLICT, detail=str(e))
+    except TransientDatabaseError:
+        raise # 重试后仍失败，由全局处理器返回 503
     except DALError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.detail if e.detail else str(e))
     except Exception as e:
@@ -221,6 +261,8 @@ async def cancel_order_route(
         raise HTTPException(status_code=fastapi.status.HTTP_400_BAD_REQUEST, detail=str(e))
     except IntegrityError as e: # Add IntegrityError handling
         raise HTTPException(status_code=fastapi.status.HTTP_409_CONFLICT, detail=str(e))
+    except TransientDatabaseError:
+        raise # 重试后仍失败，由全局处理器返回 503
     except DALError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.detail if e.detail else str(e))
     except Exception as e:
@@ -252,6 +294,8 @@ async def confirm_order_route(
         raise HTTPException(status_code=fastapi.status.HTTP_403_FORBIDDEN, detail=str(e))
     except NotFoundError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail=str(e))
+    except TransientDatabaseError:
+        raise # 重试后仍失败，由全局处理器返回 503
     except DALError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.detail if e.detail else str(e))
     except Exception as e:
@@ -284,6 +328,8 @@ async def complete_order_route(
         raise HTTPException(status_code=fastapi.status.HTTP_403_FORBIDDEN, detail=str(e))
     except NotFoundError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail=str(e))
+    except TransientDatabaseError:
+        raise # 重试后仍失败，由全局处理器返回 503
     except DALError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.detail if e.detail else str(e))
     except Exception as e:
@@ -321,6 +367,8 @@ async def reject_order_route(
         raise HTTPException(status_code=fastapi.status.HTTP_403_FORBIDDEN, detail=str(e))
     except NotFoundError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_404_NOT_FOUND, detail=str(e))
+    except TransientDatabaseError:
+        raise # 重试后仍失败，由全局处理器返回 503
     except DALError as e:
         raise HTTPException(status_code=fastapi.status.HTTP_500_INTERNAL_SERVER_ERROR, detail=e.detail if e.detail else str(e))
     except Exception as e:
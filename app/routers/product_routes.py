@@ -2,16 +2,19 @@ from fastapi import APIRouter, Depends, HTTPException
 from ..services.product_service import ProductService
 from ..dal.product_dal import ProductDAL
 from ..schemas.product import ProductCreate, ProductUpdate
-from ..dependencies import get_current_authenticated_user, get_current_active_admin_user, get_product_service, get_db_connection
+from ..dependencies import get_current_authenticated_user, get_current_active_admin_user, get_product_service, get_db_connection, get_read_only_db_connection
 import pyodbc
 from fastapi import status
 from typing import List, Optional
 import os # Import os for file operations
 from fastapi import UploadFile, File # Import UploadFile and File
-from app.exceptions import NotFoundError, IntegrityError, DALError, ForbiddenError, PermissionError # Import specific exceptions
+from app.exceptions import NotFoundError, IntegrityError, DALError, ForbiddenError, PermissionError, TransientDatabaseError # Import specific exceptions
 import logging # Import logging
 import uuid # Import uuid for UUID conversion
 from uuid import UUID
+from app.core.responses import FastJSONResponse
+from app.config import settings
+from app.dal.deadline import query_deadline # 请求内数据库调用的截止时间
 
 # Configure logging for this module
 logger = logging.getLogger(__name__)
@@ -22,7 +25,7 @@ router = APIRouter()
 async def get_user_favorites(
     user = Depends(get_current_authenticated_user),
     product_service: ProductService = Depends(get_product_service),
-    conn: pyodbc.Connection = Depends(get_db_connection)
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection)
 ):
     """
     获取当前用户收藏的商品列表
@@ -41,7 +44,8 @@ async def get_user_favorites(
     user_id = user.user_id # Directly access user_id
     try:
         favorites = await product_service.get_user_favorites(conn, user_id)
-        return favorites
+        # 直接返回 orjson 响应，跳过 jsonable_encoder 对每一行的遍历
+        return FastJSONResponse(favorites)
     except NotFoundError as e:
         logger.error(f"User favorites not found for user {user_id}: {e}")
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -56,11 +60,11 @@ async def get_user_favorites(
         logger.error(f"An unexpected error occurred while getting user favorites for user {log_user_id}: {e}", exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"服务器内部错误: {e}")
 
-@router.get("/", response_model=List[dict], summary="获取商品列表", tags=["Products"])
-@router.get("", response_model=List[dict], summary="获取商品列表 (无斜杠)", include_in_schema=False)
+@router.get("/", response_model=List[dict], summary="获取商品列表", tags=["Products"], dependencies=[Depends(query_deadline(settings.DB_PRODUCT_LIST_TIMEOUT_SECONDS))])
+@router.get("", response_model=List[dict], summary="获取商品列表 (无斜杠)", include_in_schema=False, dependencies=[Depends(query_deadline(settings.DB_PRODUCT_LIST_TIMEOUT_SECONDS))])
 async def get_product_list(category_name: str = None, status: str = None, keyword: str = None, min_price: float = None, max_price: float = None, order_by: str = 'PostTime', page_number: int = 1, page_size: int = 10,
                             product_service: ProductService = Depends(get_product_service),
-                            conn: pyodbc.Connection = Depends(get_db_connection)):
+                            conn: pyodbc.Connection = Depends(get_read_only_db_connection)):
     """
     获取商品列表，支持多种筛选条件和分页
     
@@ -84,7 +88,10 @@ async def get_product_list(category_name: str = None, status: str = None, keywor
     """
     try:
         products = await product_service.get_product_list(conn, category_name, status, keyword, min_price, max_price, order_by, page_number, page_size)
-        return products
+        # 直接返回 orjson 响应，跳过 jsonable_encoder 对每一行的遍历
+        return FastJSONResponse(products)
+    except TransientDatabaseError:
+        raise # 查询超时 / 数据库繁忙：由全局处理器返回 503
     except (ValueError, DALError) as e:
         logger.error(f"Error getting product list: {e}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -382,7 +389,7 @@ async def remove_favorite(product_id: UUID, user = Depends(get_current_authentic
 @router.get("/{product_id}")
 async def get_product_detail(product_id: UUID,
                               product_service: ProductService = Depends(get_product_service),
-                              conn: pyodbc.Connection = Depends(get_db_connection)):
+                              conn: pyodbc.Connection = Depends(get_read_only_db_connection)):
     """
     根据商品ID获取商品详情
     
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, HTTPException, status, BackgroundTasks, Depends
 from typing import List
 import os
+import pyodbc
 
 router = APIRouter()
 
@@ -9,10 +10,19 @@ UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 # Import the file upload utility
-from ..utils.file_upload import save_upload_file, UPLOAD_DIR # Import UPLOAD_DIR to construct the URL
+from ..exceptions import FileTooLargeError
+from ..utils.image_processing import generate_image_derivatives
+from ..dal.connection import get_db_connection
+from ..dependencies import get_upload_service
+from ..services.upload_service import UploadService
 
 @router.post("/api/v1/upload/image")
-async def upload_image(file: UploadFile = File(...)):
+async def upload_image(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    conn: pyodbc.Connection = Depends(get_db_connection),
+    upload_service: UploadService = Depends(get_upload_service)
+):
     """
     Uploads an image file.
     
@@ -20,7 +30,8 @@ async def upload_image(file: UploadFile = File(...)):
         file: The image file to upload.
     
     Returns:
-        A dictionary containing the URL or path of the uploaded image.
+        A dictionary containing the URL or path of the uploaded image and of its
+        thumbnail (generated in the background after the response is sent).
     
     Raises:
         HTTPException: If the file type is not allowed or upload fails.
@@ -34,15 +45,17 @@ async def upload_image(file: UploadFile = File(...)):
         )
     
     try:
-        # Use the utility function to save the file
-        file_path = await save_upload_file(file)
+        # Store the file in the content-addressed store (identical images are deduplicated)
+        saved = await upload_service.save_upload(conn, file)
         
-        # Construct the URL based on the UPLOAD_DIR and filename
-        file_name = os.path.basename(file_path)
-        image_url = f"/{UPLOAD_DIR}/{file_name}"
+        # Generate thumbnail / WebP variants in the process pool after responding
+        if saved["needs_derivatives"]:
+            background_tasks.add_task(generate_image_derivatives, saved["path"])
         
-        return {"filename": file_name, "url": image_url}
+        return {"filename": os.path.basename(saved["path"]), "url": saved["url"], "thumbnail_url": saved["thumbnail_url"]}
         
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to upload image: {e}")
 
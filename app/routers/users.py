@@ -1,5 +1,5 @@
 # app/routers/users.py
-from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Request
+from fastapi import APIRouter, Depends, status, HTTPException, UploadFile, File, Request, BackgroundTasks
 # from app.schemas.user_schemas import UserCreate, UserResponse, UserLogin, Token, UserUpdate, RequestVerificationEmail, VerifyEmail, UserPasswordUpdate # Import schemas from here
 from app.schemas.user_schemas import (
     UserResponseSchema, 
@@ -12,12 +12,13 @@ from app.schemas.user_schemas import (
 # from app.dal import users as user_dal # No longer needed
 # from app.services import user_service # No longer needed (using dependency)
 from app.services.user_service import UserService # Import Service class for type hinting
-from app.dal.connection import get_db_connection
+from app.dal.connection import get_db_connection, get_read_only_db_connection
 # from app.exceptions import NotFoundError, IntegrityError, DALError # Import exceptions directly or via dependencies
 import pyodbc
 from uuid import UUID
 # from datetime import timedelta # Not directly needed in router for this logic
 import os # Import the 'os' module
+from app.core.responses import FastJSONResponse
 
 # Import auth dependencies from dependencies.py
 from app.dependencies import (
@@ -25,12 +26,14 @@ from app.dependencies import (
     get_current_active_admin_user, # For admin-only endpoints
     get_user_service, # Dependency for UserService
     get_current_authenticated_user, # For active authenticated users
-    get_current_super_admin_user # Added for super admin authentication
+    get_current_super_admin_user, # Added for super admin authentication
+    get_upload_service # Dependency for UploadService
 )
-from app.exceptions import NotFoundError, IntegrityError, DALError, AuthenticationError, ForbiddenError # Import necessary exceptions
+from app.exceptions import NotFoundError, IntegrityError, DALError, AuthenticationError, ForbiddenError, FileTooLargeError # Import necessary exceptions
 
-# Import file upload utility
-from ..utils.file_upload import save_upload_file, UPLOAD_DIR # Import UPLOAD_DIR to construct the URL
+# Import upload service and image processing utility
+from app.services.upload_service import UploadService
+from ..utils.image_processing import generate_image_derivatives
 
 import logging # Import logging
 logger = logging.getLogger(__name__) # Get logger instance
@@ -41,7 +44,7 @@ router = APIRouter(prefix="/users", tags=["Users"])
 async def read_users_me(
     # current_user: dict = Depends(get_current_user) # Requires JWT authentication
     current_user: dict = Depends(get_current_authenticated_user), # Use dependency from dependencies.py - ensures user is active
-    conn: pyodbc.Connection = Depends(get_db_connection), # Inject DB connection
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection), # Inject DB connection
     user_service: UserService = Depends(get_user_service) # Inject Service
 ):
     """
@@ -128,10 +131,12 @@ async def update_current_user_password(
 
 @router.put("/me/avatar", response_model=UserResponseSchema)
 async def upload_my_avatar(
+    background_tasks: BackgroundTasks,
     avatar_file: UploadFile = File(...), # Let FastAPI handle the file upload directly
     current_user: dict = Depends(get_current_authenticated_user),
     conn: pyodbc.Connection = Depends(get_db_connection),
-    user_service: UserService = Depends(get_user_service)
+    user_service: UserService = Depends(get_user_service),
+    upload_service: UploadService = Depends(get_upload_service)
 ):
     """
     上传或更新当前登录用户的头像。
@@ -139,19 +144,21 @@ async def upload_my_avatar(
     user_id = current_user['user_id']
     
     try:
-        # 1. Save the uploaded file using the utility function
-        file_path = await save_upload_file(avatar_file)
+        # 1. Save the uploaded file to the content-addressed store and register it
+        saved = await upload_service.save_upload(conn, avatar_file)
         
-        # 2. Construct the URL for the saved file
-        file_name = os.path.basename(file_path)
-        avatar_url = f"/{UPLOAD_DIR}/{file_name}"
+        # 2. Call the UserService method to update the user's avatar URL in the database
+        updated_user = await user_service.update_user_avatar(conn, user_id, saved["url"])
         
-        # 3. Call the UserService method to update the user's avatar URL in the database
-        updated_user = await user_service.update_user_avatar(conn, user_id, avatar_url)
+        # Generate thumbnail / WebP variants of the avatar after responding
+        if saved["needs_derivatives"]:
+            background_tasks.add_task(generate_image_derivatives, saved["path"])
         
         # Return the updated user profile (which includes the new avatar URL)
         return updated_user
         
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except NotFoundError as e:
         # This should be caught by the service layer, but handle as a safeguard
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
@@ -165,7 +172,7 @@ async def upload_my_avatar(
 @router.get("/{user_id}", response_model=UserResponseSchema)
 async def get_user_profile_by_id(
     user_id: UUID, # Path parameter here
-    conn: pyodbc.Connection = Depends(get_db_connection), # Inject DB connection
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection), # Inject DB connection
     user_service: UserService = Depends(get_user_service), # Inject Service
     # Note: Authentication check is handled by the dependency itself.
     current_admin_user: dict = Depends(get_current_active_admin_user)
@@ -245,7 +252,7 @@ async def delete_user_by_id(
 # Admin endpoint to get all users
 @router.get("/", response_model=list[UserResponseSchema])
 async def get_all_users_api(
-    conn: pyodbc.Connection = Depends(get_db_connection),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
     user_service: UserService = Depends(get_user_service),
     current_admin_user: dict = Depends(get_current_active_admin_user) # Requires admin authentication
 ):
@@ -254,7 +261,8 @@ async def get_all_users_api(
     """
     try:
         users = await user_service.get_all_users(conn, current_admin_user["user_id"])
-        return users
+        # Service 已返回校验过的 UserResponseSchema，直接用 orjson 序列化
+        return FastJSONResponse(users)
     except (ForbiddenError, DALError) as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN if isinstance(e, ForbiddenError) else status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -364,7 +372,7 @@ async def adjust_user_credit_by_id(
 # Admin endpoint to get all users
 @router.get("/", response_model=list[UserResponseSchema])
 async def get_all_users_api(
-    conn: pyodbc.Connection = Depends(get_db_connection),
+    conn: pyodbc.Connection = Depends(get_read_only_db_connection),
     user_service: UserService = Depends(get_user_service),
     current_admin_user: dict = Depends(get_current_active_admin_user) # Requires admin authentication
 ):
@@ -373,7 +381,8 @@ async def get_all_users_api(
     """
     try:
         users = await user_service.get_all_users(conn, current_admin_user["user_id"])
-        return users
+        # Service 已返回校验过的 UserResponseSchema，直接用 orjson 序列化
+        return FastJSONResponse(users)
     except (ForbiddenError, DALError) as e:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN if isinstance(e, ForbiddenError) else status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,6 +1,6 @@
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, Field
 
 class EvaluationCreateSchema(BaseModel):
@@ -30,4 +30,36 @@ class EvaluationResponseSchema(BaseModel):
     created_at: datetime = Field(..., description="评价创建时间")
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SellerReputationSchema(BaseModel):
+    """
+    卖家信誉汇总Schema
+    对应存储过程：sp_GetSellerReputation (SellerStats 表由评价触发器增量维护)
+    """
+    seller_id: UUID = Field(..., description="卖家ID")
+    credit: Optional[int] = Field(None, description="信用分 (0-100)")
+    evaluation_count: int = Field(0, description="收到的评价数")
+    average_rating: Optional[float] = Field(None, description="平均评分，保留两位小数；没有评价时为 null")
+    rating_distribution: Dict[int, int] = Field(..., description="各星级 (1-5) 的评价数")
+    last_evaluation_time: Optional[datetime] = Field(None, description="最近一次收到评价的时间")
+
+    class Config:
+        from_attributes = True
+
+class EvaluationSummarySchema(BaseModel):
+    """
+    评价列表汇总Schema
+    符合查询条件 (含评分过滤) 的评价数与平均分
+    """
+    evaluation_count: int = Field(..., description="评价数")
+    average_rating: Optional[float] = Field(None, description="平均评分，保留两位小数；没有评价时为 null")
+
+class EvaluationPageSchema(BaseModel):
+    """
+    评价分页Schema
+    对应存储过程：sp_GetEvaluationPage (keyset 分页)
+    """
+    summary: EvaluationSummarySchema = Field(..., description="汇总")
+    items: List[EvaluationResponseSchema] = Field(..., description="本页评价，按时间倒序")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，最后一页为 null")
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 from datetime import datetime
 from pydantic import BaseModel, Field, ValidationError, model_validator
@@ -34,7 +34,7 @@ class OrderResponseSchema(BaseModel):
     total_price: float = Field(..., description="Total price of the order") # 使用 float 对应 DECIMAL(10, 2)
     status: str = Field(..., description="Current status of the order")
     created_at: datetime = Field(..., description="Timestamp when the order was created")
-    updated_at: datetime = Field(..., description="Timestamp when the order was last updated")
+    updated_at: Optional[datetime] = Field(None, description="Timestamp when the order was last updated (the Order table has no such column; procedures do not return it)")
     complete_time: Optional[datetime] = Field(None, description="Timestamp when the order was completed")
     cancel_time: Optional[datetime] = Field(None, description="Timestamp when the order was cancelled")
     cancel_reason: Optional[str] = Field(None, description="Reason for order cancellation")
@@ -42,6 +42,27 @@ class OrderResponseSchema(BaseModel):
     class Config:
         orm_mode = True
 
+class OrderSummarySchema(OrderResponseSchema):
+    """
+    Order history row: the order plus a snapshot of the product and the counterpart user.
+    Based on the second result set of sp_GetOrderHistory.
+    """
+    product_name: str = Field(..., description="Name of the product ordered")
+    unit_price: float = Field(..., description="Current unit price of the product")
+    main_image_url: Optional[str] = Field(None, description="URL of the product's main image")
+    counterpart_id: UUID = Field(..., description="ID of the other party (seller for buyers, buyer for sellers)")
+    counterpart_username: str = Field(..., description="Username of the other party")
+
+class OrderHistoryPageSchema(BaseModel):
+    """
+    One page of a user's order history, with per-status counts for the buyer / seller tabs.
+    """
+    items: List[OrderSummarySchema] = Field(..., description="Orders on this page, newest first")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page; null on the last page")
+    status_counts: Dict[str, Dict[str, int]] = Field(
+        ..., description="Order counts by status for each role, e.g. {'buyer': {'Completed': 3}, 'seller': {}}"
+    )
+
 class OrderStatusUpdateSchema(BaseModel):
     """
     Schema for updating the status of an order.
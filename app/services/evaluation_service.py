@@ -2,14 +2,20 @@ import pyodbc
 from uuid import UUID
 from typing import Optional, List
 
-from app.dal.evaluation_dal import EvaluationDAL # Assuming EvaluationDAL is in app.dal.evaluation_dal
+from datetime import datetime
+from app.dal.evaluation_dal import EvaluationDAL, EVALUATION_SCOPES # Assuming EvaluationDAL is in app.dal.evaluation_dal
 from app.schemas.evaluation_schemas import ( # Assuming evaluation-related Pydantic schemas are in app.schemas.evaluation_schemas
     EvaluationCreateSchema,
-    EvaluationResponseSchema
+    EvaluationResponseSchema,
+    SellerReputationSchema,
+    EvaluationPageSchema,
+    EvaluationSummarySchema
 )
 # If needed, import Order related schemas or services for validation (e.g., to check if order can be evaluated)
 # from app.services.order_service import OrderService 
 from app.exceptions import DALError, NotFoundError, ForbiddenError, IntegrityError # Import IntegrityError
+from app.dal.retry import retry_on_transient # 死锁 / 锁超时时整体重试
+from app.utils.keyset import decode_cursor, encode_cursor
 
 class EvaluationService:
     """Service layer for evaluation management."""
@@ -25,6 +31,7 @@ class EvaluationService:
         # If cross-service logic is needed, e.g., to check order status before allowing evaluation:
         # self.order_service = order_service 
 
+    @retry_on_transient("evaluation.create")
     async def create_evaluation(
         self,
         conn: pyodbc.Connection,
@@ -137,6 +144,73 @@ class EvaluationService:
             return EvaluationResponseSchema(**evaluation_data)
         return None
 
+    async def get_evaluation_page(
+        self,
+        conn: pyodbc.Connection,
+        scope: str,
+        owner_id: UUID,
+        min_rating: Optional[int] = None,
+        max_rating: Optional[int] = None,
+        page_size: int = 20,
+        cursor: Optional[str] = None
+    ) -> EvaluationPageSchema:
+        """
+        按商品 / 买家 / 卖家分页获取评价，附带符合条件的评价数与平均分。
+
+        Args:
+            scope: "Product"、"Buyer" 或 "Seller"。
+            min_rating / max_rating: 评分范围 (含端点)，None 表示不限。
+            cursor: 上一页返回的 next_cursor；None 表示第一页。
+
+        Raises:
+            ValueError: scope 无效或评分范围为空。
+            InvalidCursorError: cursor 无法解码。
+        """
+        if scope not in EVALUATION_SCOPES:
+            raise ValueError(f"无效的评价查询范围: {scope}")
+        if min_rating is not None and max_rating is not None and min_rating > max_rating:
+            raise ValueError("最低评分不能高于最高评分。")
+        after = decode_cursor(cursor, datetime.fromisoformat, UUID) if cursor else None
+        page = await self.evaluation_dal.get_evaluation_page(
+            conn, scope, owner_id, min_rating, max_rating, page_size, after
+        )
+        items = page.evaluations[:page_size]
+        next_cursor = None
+        if len(page.evaluations) > page_size:
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.evaluation_id)
+        count = page.evaluation_count
+        summary = EvaluationSummarySchema(
+            evaluation_count=count,
+            average_rating=round(page.rating_sum / count, 2) if count else None,
+        )
+        return EvaluationPageSchema(summary=summary, items=items, next_cursor=next_cursor)
+
+    async def get_seller_reputation(
+        self,
+        conn: pyodbc.Connection,
+        seller_id: UUID
+    ) -> SellerReputationSchema:
+        """
+        获取卖家信誉汇总：平均评分、评价数、各星级分布与最近评价时间。
+        汇总由触发器随评价增量维护，只读取一行，与卖家收到的评价数量无关。
+
+        Raises:
+            NotFoundError: 卖家不存在。
+        """
+        row = await self.evaluation_dal.get_seller_reputation(conn, seller_id)
+        if not row:
+            raise NotFoundError(f"卖家 {seller_id} 不存在")
+        count = row.get("EvaluationCount") or 0
+        return SellerReputationSchema(
+            seller_id=row["SellerID"],
+            credit=row.get("Credit"),
+            evaluation_count=count,
+            average_rating=round(row["RatingSum"] / count, 2) if count else None,
+            rating_distribution={star: row.get(f"Rating{star}Count") or 0 for star in range(1, 6)},
+            last_evaluation_time=row.get("LastEvaluationTime"),
+        )
+
     # Potentially, add other methods like:
     # async def get_evaluations_for_order(self, conn: pyodbc.Connection, order_id: int) -> List[EvaluationResponseSchema]: ...
     # async def get_evaluations_by_user(self, conn: pyodbc.Connection, user_id: UUID) -> List[EvaluationResponseSchema]: ...
@@ -0,0 +1,202 @@
+"""
+后台维护任务：定时分批清理过期 OTP、过期密码重置 Token 与旧的已读通知。
+
+多个应用进程 (worker) 各自运行调度器，但每一轮只有持有数据库应用锁 (sp_TryAcquireMaintenanceLeader)
+的一个进程执行清理。锁的所有者是该进程长期保持的一条维护连接，进程退出或连接断开时锁自动释放，
+其它进程在下一轮获得锁并接管。
+
+每次调用清理过程只删除一批 (batch_size 行，低于 SQL Server 的锁升级阈值)，各批在 autocommit 下
+单独提交；批次之间暂停 batch_pause 秒，让在线请求有机会拿到这些页上的锁。某批删除的行数少于
+batch_size 表示已清理完；单轮最多执行 max_batches 批，剩余的留到下一轮。
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.metrics import REGISTRY, MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+# 选举 leader 的应用锁资源名
+LEADER_RESOURCE = "siyuantao:maintenance"
+
+# 单轮清理结果标签
+OUTCOME_COMPLETED = "completed"  # 已清理完
+OUTCOME_PARTIAL = "partial"      # 达到 max_batches，剩余的留到下一轮
+OUTCOME_FAILED = "failed"        # 清理过程出错
+
+MAINTENANCE_DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class MaintenanceMetrics:
+    """后台维护相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.rows_purged = registry.counter(
+            "maintenance_rows_purged_total", "维护任务删除的行数", ("task",))
+        self.runs = registry.counter(
+            "maintenance_runs_total", "维护任务执行次数 (按结果)", ("task", "outcome"))
+        self.duration = registry.histogram(
+            "maintenance_run_seconds", "单个维护任务一轮的耗时 (秒)", ("task",), MAINTENANCE_DURATION_BUCKETS)
+        self.leader = registry.gauge(
+            "maintenance_leader", "本进程是否为执行维护任务的 leader (1 / 0)")
+
+
+class MaintenanceRunner:
+    """
+    执行一轮维护：确认本进程是 leader 后依次运行各清理任务。
+
+    Args:
+        maintenance_dal: MaintenanceDAL (或提供相同方法的对象)。
+        connect: 打开维护连接的协程函数 (autocommit 连接)。
+        disconnect: 关闭维护连接的协程函数。
+        batch_size: 每批删除的行数。
+        max_batches: 每个任务单轮最多执行的批数。
+        batch_pause: 批次之间的暂停 (秒)。
+        token_grace_hours: OTP / 密码重置 Token 过期或使用后保留的小时数。
+        notification_retention_days: 已读通知的保留天数。
+        sleep: 暂停函数 (测试时可替换)。
+        clock: 计时时钟 (测试时可替换)。
+    """
+
+    def __init__(
+        self,
+        maintenance_dal: Any,
+        connect: Callable[[], Awaitable[Any]],
+        disconnect: Callable[[Any], Awaitable[None]],
+        batch_size: int = 1000,
+        max_batches: int = 50,
+        batch_pause: float = 0.05,
+        token_grace_hours: int = 24,
+        notification_retention_days: int = 90,
+        metrics: Optional[MaintenanceMetrics] = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.maintenance_dal = maintenance_dal
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.batch_pause = batch_pause
+        self.token_grace_hours = token_grace_hours
+        self.notification_retention_days = notification_retention_days
+        self.metrics = metrics or get_maintenance_metrics()
+        self._connect = connect
+        self._disconnect = disconnect
+        self._sleep = sleep
+        self._clock = clock
+        self._conn = None
+
+    def _tasks(self) -> Tuple[Tuple[str, Callable[[Any], Awaitable[int]]], ...]:
+        dal = self.maintenance_dal
+        return (
+            ("otp", lambda conn: dal.purge_expired_otps(conn, self.batch_size, self.token_grace_hours)),
+            ("password_reset_token", lambda conn: dal.purge_expired_password_reset_tokens(conn, self.batch_size, self.token_grace_hours)),
+            ("read_notification", lambda conn: dal.purge_read_notifications(conn, self.batch_size, self.notification_retention_days)),
+        )
+
+    async def _ensure_leader(self) -> bool:
+        """确认本进程持有 leader 锁；不是 leader 时关闭维护连接，不长期占用数据库连接。"""
+        is_leader = False
+        try:
+            if self._conn is None:
+                self._conn = await self._connect()
+            is_leader = await self.maintenance_dal.try_acquire_leader(self._conn, LEADER_RESOURCE)
+        except Exception as e:
+            # 连接断开时锁已随会话释放，丢弃连接，下一轮重新连接并竞选
+            logger.warning("Maintenance leader check failed: %s", e)
+        if not is_leader:
+            await self.close()
+        self.metrics.leader.set(1 if is_leader else 0)
+        return is_leader
+
+    async def _purge(self, task: str, purge: Callable[[Any], Awaitable[int]]) -> int:
+        """循环执行一个清理任务的批次，返回删除的总行数。"""
+        started = self._clock()
+        total = 0
+        outcome = OUTCOME_PARTIAL
+        try:
+            for batch in range(self.max_batches):
+                if batch and self.batch_pause > 0:
+                    await self._sleep(self.batch_pause)
+                purged = await purge(self._conn)
+                total += purged
+                if purged < self.batch_size:
+                    outcome = OUTCOME_COMPLETED
+                    break
+        except Exception as e:
+            outcome = OUTCOME_FAILED
+            logger.error("Maintenance task %s failed after purging %d rows: %s", task, total, e, exc_info=True)
+        duration = self._clock() - started
+        self.metrics.rows_purged.inc(task, amount=total)
+        self.metrics.runs.inc(task, outcome)
+        self.metrics.duration.observe(duration, task)
+        logger.info("Maintenance task %s %s: purged %d rows in %.2fs", task, outcome, total, duration)
+        return total
+
+    async def run_once(self) -> Optional[Dict[str, int]]:
+        """
+        执行一轮维护。
+
+        Returns:
+            各任务删除的行数；本进程不是 leader 时返回 None (不执行任何清理)。
+        """
+        if not await self._ensure_leader():
+            logger.debug("Not the maintenance leader, skipping this run.")
+            return None
+        return {task: await self._purge(task, purge) for task, purge in self._tasks()}
+
+    async def close(self) -> None:
+        """关闭维护连接 (同时释放 leader 锁)。可重复调用。"""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await self._disconnect(conn)
+            except Exception as e:
+                logger.warning("Failed to close maintenance connection: %s", e)
+
+
+def start_maintenance_scheduler(runner: MaintenanceRunner, interval_seconds: float) -> Any:
+    """
+    在当前事件循环上启动 APScheduler，按固定间隔执行 runner.run_once。
+
+    上一轮未结束时不会重叠执行 (max_instances=1)，错过的多轮只补执行一次 (coalesce)。
+    返回调度器，关闭时调用 scheduler.shutdown(wait=False)。
+    """
+    # 延迟导入：APScheduler 只在启用维护任务时加载，不计入应用的导入耗时
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(
+        runner.run_once, "interval", seconds=interval_seconds,
+        id="maintenance", max_instances=1, coalesce=True,
+    )
+    scheduler.start()
+    logger.info("Maintenance scheduler started (every %ss).", interval_seconds)
+    return scheduler
+
+
+_default_metrics = None
+
+
+def get_maintenance_metrics() -> MaintenanceMetrics:
+    """全局注册表上的维护指标 (首次使用时注册)。"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = MaintenanceMetrics(REGISTRY)
+    return _default_metrics
+
+
+def build_maintenance_runner(maintenance_dal: Any, connect: Callable[[], Awaitable[Any]], disconnect: Callable[[Any], Awaitable[None]]) -> MaintenanceRunner:
+    """按 settings 创建维护任务执行器。"""
+    return MaintenanceRunner(
+        maintenance_dal,
+        connect,
+        disconnect,
+        batch_size=settings.MAINTENANCE_BATCH_SIZE,
+        max_batches=settings.MAINTENANCE_MAX_BATCHES,
+        batch_pause=settings.MAINTENANCE_BATCH_PAUSE_MS / 1000,
+        token_grace_hours=settings.MAINTENANCE_TOKEN_GRACE_HOURS,
+        notification_retention_days=settings.MAINTENANCE_NOTIFICATION_RETENTION_DAYS,
+    )
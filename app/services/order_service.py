@@ -1,21 +1,27 @@
 import pyodbc
 from uuid import UUID
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 
-from app.dal.orders_dal import OrdersDAL
+from app.dal.orders_dal import OrdersDAL, CreatedOrder
 from app.schemas.order_schemas import (
     OrderCreateSchema, 
     OrderResponseSchema,
-    OrderStatusUpdateSchema
+    OrderStatusUpdateSchema,
+    OrderHistoryPageSchema
 )
 from app.schemas.user_schemas import UserResponseSchema
-from app.exceptions import DALError, NotFoundError, ForbiddenError
+from app.exceptions import DALError, NotFoundError, ForbiddenError, InsufficientStockError, ProductUnavailableError
+from app.dal.retry import retry_on_transient # 死锁 / 锁超时时整体重试
+from app.services.stock_gate import StockAdmissionGate
+from app.utils.keyset import decode_cursor, encode_cursor
 
 class OrderService:
     """Service layer for order management."""
 
-    def __init__(self, order_dal: OrdersDAL):
+    def __init__(self, order_dal: OrdersDAL, stock_gate: Optional[StockAdmissionGate] = None):
         self.order_dal = order_dal
+        self.stock_gate = stock_gate # 可选的进程内下单准入 (见 app.services.stock_gate)
 
     async def create_order(
         self, 
@@ -23,22 +29,39 @@ class OrderService:
         order_data: OrderCreateSchema, 
         buyer_id: UUID
     ) -> OrderResponseSchema:
+        gate = self.stock_gate
+        if gate is None:
+            return (await self._create_order(conn, order_data, buyer_id)).order
+
+        product_id = order_data.product_id
+        async with gate.admit(product_id, order_data.quantity):
+            try:
+                created = await self._create_order(conn, order_data, buyer_id)
+            except InsufficientStockError:
+                gate.record_insufficient(product_id, order_data.quantity)
+                raise
+            except ProductUnavailableError:
+                gate.record_unavailable(product_id)
+                raise
+            # 在让出位置前记录剩余库存，排队中的请求据此判断是否还有必要访问数据库
+            gate.record_remaining(product_id, created.remaining_quantity)
+        return created.order
+
+    @retry_on_transient("order.create")
+    async def _create_order(
+        self, 
+        conn: pyodbc.Connection, 
+        order_data: OrderCreateSchema, 
+        buyer_id: UUID
+    ) -> CreatedOrder:
         try:
-            created_order_id = await self.order_dal.create_order(
+            # sp_CreateOrder 原子扣减库存并直接返回新订单，无需再查询
+            return await self.order_dal.create_order(
                 conn=conn,
                 product_id=order_data.product_id,
                 buyer_id=buyer_id,
                 quantity=order_data.quantity
             )
-            
-            if created_order_id is None:
-                raise ValueError("Failed to create order, stored procedure did not return an order ID.")
-
-            order = await self.order_dal.get_order_by_id(conn, created_order_id)
-            if not order:
-                raise NotFoundError(f"Order with ID {created_order_id} not found after creation.")
-            
-            return order
         except pyodbc.Error as db_err:
             raise DALError(f"Database error during order creation: {db_err}") from db_err
         except DALError:
@@ -50,6 +73,7 @@ class OrderService:
         except Exception as e:
             raise DALError(f"An unexpected error occurred during order creation: {e}") from e
 
+    @retry_on_transient("order.confirm")
     async def confirm_order(
         self, 
         conn: pyodbc.Connection, 
@@ -57,16 +81,8 @@ class OrderService:
         user_id: UUID # Typically seller_id
     ) -> OrderResponseSchema:
         try:
-            order_to_update = await self.order_dal.get_order_by_id(conn, order_id)
-            if not order_to_update:
-                raise NotFoundError(f"Order with ID {order_id} not found.")
-
-            await self.order_dal.confirm_order(conn, order_id, user_id)
-            
-            updated_order = await self.order_dal.get_order_by_id(conn, order_id)
-            if not updated_order:
-                 raise NotFoundError(f"Order with ID {order_id} not found after confirmation.")
-            return updated_order
+            # 订单是否存在、是否为卖家、状态是否允许都在 sp_ConfirmOrder 内检查，并返回确认后的订单
+            return await self.order_dal.confirm_order(conn, order_id, user_id)
         except pyodbc.Error as db_err:
             raise DALError(f"Database error confirming order {order_id}: {db_err}") from db_err
         except (NotFoundError, ForbiddenError, ValueError, DALError):
@@ -74,6 +90,7 @@ class OrderService:
         except Exception as e:
             raise DALError(f"An unexpected error occurred confirming order {order_id}: {e}") from e
 
+    @retry_on_transient("order.complete")
     async def complete_order(
         self, 
         conn: pyodbc.Connection, 
@@ -81,11 +98,7 @@ class OrderService:
         user_id: UUID # Typically buyer_id or system
     ) -> OrderResponseSchema:
         try:
-            await self.order_dal.complete_order(conn, order_id, user_id)
-            updated_order = await self.order_dal.get_order_by_id(conn, order_id)
-            if not updated_order:
-                 raise NotFoundError(f"Order with ID {order_id} not found after completion.")
-            return updated_order
+            return await self.order_dal.complete_order(conn, order_id, user_id)
         except pyodbc.Error as db_err:
             raise DALError(f"Database error completing order {order_id}: {db_err}") from db_err
         except (NotFoundError, ForbiddenError, ValueError, DALError):
@@ -93,6 +106,7 @@ class OrderService:
         except Exception as e:
             raise DALError(f"An unexpected error occurred completing order {order_id}: {e}") from e
 
+    @retry_on_transient("order.reject")
     async def reject_order(
         self, 
         conn: pyodbc.Connection, 
@@ -101,11 +115,10 @@ class OrderService:
         reason: Optional[str] = None # Optional reason for rejection
     ) -> OrderResponseSchema:
         try:
-            await self.order_dal.reject_order(conn, order_id, user_id, reason)
-            updated_order = await self.order_dal.get_order_by_id(conn, order_id)
-            if not updated_order:
-                 raise NotFoundError(f"Order with ID {order_id} not found after rejection.")
-            return updated_order
+            order = await self.order_dal.reject_order(conn, order_id, user_id, reason)
+            if self.stock_gate is not None:
+                self.stock_gate.forget(order.product_id) # 库存已由触发器恢复
+            return order
         except pyodbc.Error as db_err:
             raise DALError(f"Database error rejecting order {order_id}: {db_err}") from db_err
         except (NotFoundError, ForbiddenError, ValueError, DALError):
@@ -113,20 +126,20 @@ class OrderService:
         except Exception as e:
             raise DALError(f"An unexpected error occurred rejecting order {order_id}: {e}") from e
 
+    @retry_on_transient("order.cancel")
     async def cancel_order(
         self,
         conn: pyodbc.Connection,
         order_id: UUID,
         user_id: UUID,
         cancel_reason: str
-    ) -> None:
+    ) -> OrderResponseSchema:
         try:
-            order_to_update = await self.order_dal.get_order_by_id(conn, order_id)
-            if not order_to_update:
-                raise NotFoundError(f"Order with ID {order_id} not found.")
-
-            await self.order_dal.cancel_order(conn, order_id, user_id, cancel_reason)
-
+            # 存在性、权限与状态检查都在 sp_CancelOrder 内完成
+            order = await self.order_dal.cancel_order(conn, order_id, user_id, cancel_reason)
+            if self.stock_gate is not None:
+                self.stock_gate.forget(order.product_id) # 库存已由触发器恢复
+            return order
         except pyodbc.Error as db_err:
             raise DALError(f"Database error canceling order {order_id}: {db_err}") from db_err
         except (NotFoundError, ForbiddenError, ValueError, DALError):
@@ -167,6 +180,33 @@ class OrderService:
         except Exception as e:
             raise DALError(f"An unexpected error occurred fetching orders for user {user_id}: {e}") from e
 
+    async def get_order_history(
+        self,
+        conn: pyodbc.Connection,
+        user_id: UUID,
+        as_seller: bool = False,
+        status: Optional[str] = None,
+        page_size: int = 20,
+        cursor: Optional[str] = None
+    ) -> OrderHistoryPageSchema:
+        """
+        订单历史页：一页订单摘要 (商品快照 + 对方用户名) 与买家 / 卖家标签页的状态计数，一次数据库往返。
+
+        Args:
+            cursor: 上一页返回的 next_cursor；None 表示第一页。
+
+        Raises:
+            InvalidCursorError: cursor 无法解码。
+        """
+        after = decode_cursor(cursor, datetime.fromisoformat, UUID) if cursor else None
+        history = await self.order_dal.get_order_history(conn, user_id, as_seller, status, page_size, after)
+        items = history.orders[:page_size]
+        next_cursor = None
+        if len(history.orders) > page_size:
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.order_id)
+        return OrderHistoryPageSchema(items=items, next_cursor=next_cursor, status_counts=history.status_counts)
+
     async def get_order_by_id(
         self,
         conn: pyodbc.Connection,
@@ -192,6 +232,7 @@ class OrderService:
         except Exception as e:
             raise DALError(f"An unexpected error occurred getting order {order_id}: {e}") from e
 
+    @retry_on_transient("order.update_status")
     async def update_order_status(
         self,
         conn: pyodbc.Connection,
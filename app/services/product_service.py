@@ -4,6 +4,8 @@ from ..schemas.product import ProductUpdate
 from ..dal.product_dal import ProductDAL, ProductImageDAL, UserFavoriteDAL
 import pyodbc
 from app.exceptions import DALError, NotFoundError, IntegrityError, PermissionError, InternalServerError
+from app.utils.image_processing import thumbnail_url_for
+from app.dal.row_mappers import get_row_mapper
 import logging # Import logging
 
 logger = logging.getLogger(__name__) # Initialize logger
@@ -88,23 +90,17 @@ class ProductService:
             # Only update fields that are provided in product_update_data
             update_data = product_update_data.model_dump(exclude_unset=True)
 
-            # Retrieve current product details to fill missing fields in update_data
-            current_category_name = product.get("商品类别") if "商品类别" in product else None
-            current_product_name = product.get("商品名称") if "商品名称" in product else ""
-            current_description = product.get("商品描述") if "商品描述" in product else None
-            current_quantity = product.get("库存") if "库存" in product and product["库存"] is not None else 0
-            current_price = product.get("价格") if "价格" in product and product["价格"] is not None else 0.0
-            
-            # Use provided data or fallback to current data
-            category_name = update_data.get("category_name", current_category_name)
-            product_name = update_data.get("product_name", current_product_name)
-            description = update_data.get("description", current_description)
-            quantity = update_data.get("quantity", current_quantity)
-            price = update_data.get("price", current_price)
+            # Fill fields missing from update_data with the current product details
+            current = get_row_mapper("sp_GetProductById").map_dict(product)
+            category_name = update_data.get("category_name", current.category_name)
+            product_name = update_data.get("product_name", current.product_name or "")
+            description = update_data.get("description", current.description)
+            quantity = update_data.get("quantity", current.quantity if current.quantity is not None else 0)
+            price = update_data.get("price", current.price if current.price is not None else 0.0)
 
             await self.product_dal.update_product(conn, product_id, owner_id, 
                                                 category_name, product_name, description, quantity, price)
-            logger.info(f"Product {product_id} updated by owner {owner_id}")
+            logger.info("Product %s updated by owner %s", product_id, owner_id)
 
             # Handle image updates if image_urls is provided
             if product_update_data.image_urls is not None:
@@ -114,16 +110,16 @@ class ProductService:
                 # Then, add new images
                 for i, image_url in enumerate(product_update_data.image_urls):
                     await self.product_image_dal.add_product_image(conn, product_id, image_url, i)
-                    logger.debug(f"Added image {image_url} for product {product_id} during update")
+                    logger.debug("Added image %s for product %s during update", image_url, product_id)
         except NotFoundError:
             raise
         except PermissionError:
             raise
         except DALError as e:
-            logger.error(f"DAL error updating product {product_id}: {e}")
+            logger.error("DAL error updating product %s: %s", product_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error updating product {product_id}: {e}", exc_info=True)
+            logger.error("Unexpected error updating product %s: %s", product_id, e, exc_info=True)
             raise InternalServerError("更新商品失败")
 
     async def delete_product(self, conn: pyodbc.Connection, product_id: UUID, owner_id: UUID) -> None:
@@ -151,20 +147,20 @@ class ProductService:
         
         try:
             await self.product_dal.delete_product(conn, product_id, owner_id)
-            logger.info(f"Product {product_id} deleted by owner {owner_id}")
+            logger.info("Product %s deleted by owner %s", product_id, owner_id)
 
             # Optionally delete associated images
             await self.product_image_dal.delete_product_images_by_product_id(conn, product_id)
-            logger.debug(f"Deleted images for product {product_id}")
+            logger.debug("Deleted images for product %s", product_id)
         except NotFoundError:
             raise
         except PermissionError:
             raise
         except DALError as e:
-            logger.error(f"DAL error deleting product {product_id}: {e}")
+            logger.error("DAL error deleting product %s: %s", product_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error deleting product {product_id}: {e}", exc_info=True)
+            logger.error("Unexpected error deleting product %s: %s", product_id, e, exc_info=True)
             raise InternalServerError("删除商品失败")
 
     async def activate_product(self, conn: pyodbc.Connection, product_id: UUID, admin_id: UUID) -> None:
@@ -174,14 +170,14 @@ class ProductService:
         
         try:
             await self.product_dal.activate_product(conn, product_id, admin_id)
-            logger.info(f"Product {product_id} activated by admin {admin_id}")
+            logger.info("Product %s activated by admin %s", product_id, admin_id)
         except NotFoundError:
             raise
         except DALError as e:
-            logger.error(f"DAL error activating product {product_id}: {e}")
+            logger.error("DAL error activating product %s: %s", product_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error activating product {product_id}: {e}", exc_info=True)
+            logger.error("Unexpected error activating product %s: %s", product_id, e, exc_info=True)
             raise InternalServerError("激活商品失败") # Modified: Specific error message
 
     async def reject_product(self, conn: pyodbc.Connection, product_id: UUID, admin_id: UUID, reason: Optional[str] = None) -> None:
@@ -191,14 +187,14 @@ class ProductService:
 
         try:
             await self.product_dal.reject_product(conn, product_id, admin_id, reason)
-            logger.info(f"Product {product_id} rejected by admin {admin_id} with reason: {reason}")
+            logger.info("Product %s rejected by admin %s with reason: %s", product_id, admin_id, reason)
         except NotFoundError:
             raise
         except DALError as e:
-            logger.error(f"DAL error rejecting product {product_id}: {e}")
+            logger.error("DAL error rejecting product %s: %s", product_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error rejecting product {product_id}: {e}", exc_info=True)
+            logger.error("Unexpected error rejecting product %s: %s", product_id, e, exc_info=True)
             raise InternalServerError("拒绝商品失败") # Modified: Specific error message
 
     async def withdraw_product(self, conn: pyodbc.Connection, product_id: UUID, owner_id: UUID) -> None:
@@ -224,16 +220,27 @@ class ProductService:
 
         try:
             await self.product_dal.withdraw_product(conn, product_id, owner_id)
-            logger.info(f"Product {product_id} withdrawn by owner {owner_id}")
+            logger.info("Product %s withdrawn by owner %s", product_id, owner_id)
         except NotFoundError:
             raise
         except DALError as e:
-            logger.error(f"DAL error withdrawing product {product_id}: {e}")
+            logger.error("DAL error withdrawing product %s: %s", product_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error withdrawing product {product_id}: {e}", exc_info=True)
+            logger.error("Unexpected error withdrawing product %s: %s", product_id, e, exc_info=True)
             raise InternalServerError("下架商品失败") # Modified: Specific error message
 
+    @staticmethod
+    def _attach_thumbnail_urls(products: List[Dict]) -> List[Dict]:
+        """
+        为列表中的每个商品补充 '主图缩略图URL' (按命名约定计算，不访问文件系统；
+        缩略图尚未生成时该 URL 返回 404，由客户端回退到 '主图URL')。
+        """
+        for product in products or []:
+            if "主图URL" in product:
+                product["主图缩略图URL"] = thumbnail_url_for(product["主图URL"])
+        return products
+
     async def get_product_list(self, conn: pyodbc.Connection, category_name: Optional[str] = None, status: Optional[str] = None, 
                               keyword: Optional[str] = None, min_price: Optional[float] = None, 
                               max_price: Optional[float] = None, order_by: str = 'PostTime', 
@@ -262,12 +269,12 @@ class ProductService:
             # category_name is now directly passed to DAL
             products_data = await self.product_dal.get_product_list(conn, category_name, status, keyword, min_price, max_price, order_by, page_number, page_size)
             
-            return products_data
+            return self._attach_thumbnail_urls(products_data)
         except DALError as e:
-            logger.error(f"DAL error getting product list: {e}")
+            logger.error("DAL error getting product list: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error getting product list: {e}", exc_info=True)
+            logger.error("Unexpected error getting product list: %s", e, exc_info=True)
             raise InternalServerError("获取商品列表失败") # Modified: Specific error message
 
     async def get_product_detail(self, conn: pyodbc.Connection, product_id: UUID) -> Optional[Dict]:
@@ -291,10 +298,10 @@ class ProductService:
                 return product_data
             return None
         except DALError as e:
-            logger.error(f"DAL error getting product detail for {product_id}: {e}")
+            logger.error("DAL error getting product detail for %s: %s", product_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error getting product detail for {product_id}: {e}", exc_info=True)
+            logger.error("Unexpected error getting product detail for %s: %s", product_id, e, exc_info=True)
             raise InternalServerError("获取商品详情失败") # Modified: Specific error message
 
     async def add_favorite(self, conn: pyodbc.Connection, user_id: UUID, product_id: UUID) -> None:
@@ -312,14 +319,14 @@ class ProductService:
         """
         try:
             await self.user_favorite_dal.add_user_favorite(conn, user_id, product_id)
-            logger.info(f"User {user_id} added favorite product {product_id}")
+            logger.info("User %s added favorite product %s", user_id, product_id)
         except IntegrityError:
             raise # Re-raise IntegrityError for API layer to handle as 409 Conflict
         except DALError as e:
-            logger.error(f"DAL error adding favorite for user {user_id}, product {product_id}: {e}")
+            logger.error("DAL error adding favorite for user %s, product %s: %s", user_id, product_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error adding favorite for user {user_id}, product {product_id}: {e}", exc_info=True)
+            logger.error("Unexpected error adding favorite for user %s, product %s: %s", user_id, product_id, e, exc_info=True)
             raise InternalServerError("添加收藏失败") # Modified: Specific error message
 
     async def remove_favorite(self, conn: pyodbc.Connection, user_id: UUID, product_id: UUID) -> None:
@@ -337,14 +344,14 @@ class ProductService:
         """
         try:
             await self.user_favorite_dal.remove_user_favorite(conn, user_id, product_id)
-            logger.info(f"User {user_id} removed favorite product {product_id}")
+            logger.info("User %s removed favorite product %s", user_id, product_id)
         except NotFoundError:
             raise # Re-raise NotFoundError for API layer to handle as 404
         except DALError as e:
-            logger.error(f"DAL error removing favorite for user {user_id}, product {product_id}: {e}")
+            logger.error("DAL error removing favorite for user %s, product %s: %s", user_id, product_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error removing favorite for user {user_id}, product {product_id}: {e}", exc_info=True)
+            logger.error("Unexpected error removing favorite for user %s, product %s: %s", user_id, product_id, e, exc_info=True)
             raise InternalServerError("移除收藏失败") # Modified: Specific error message
 
     async def get_user_favorites(self, conn: pyodbc.Connection, user_id: UUID) -> List[Dict]:
@@ -364,12 +371,12 @@ class ProductService:
         try:
             favorites_data = await self.user_favorite_dal.get_user_favorite_products(conn, user_id)
             
-            return favorites_data
+            return self._attach_thumbnail_urls(favorites_data)
         except DALError as e:
-            logger.error(f"DAL error getting user favorites for user {user_id}: {e}")
+            logger.error("DAL error getting user favorites for user %s: %s", user_id, e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error getting user favorites for user {user_id}: {e}", exc_info=True)
+            logger.error("Unexpected error getting user favorites for user %s: %s", user_id, e, exc_info=True)
             raise InternalServerError("获取用户收藏失败") # Modified: Specific error message
 
     async def batch_activate_products(self, conn: pyodbc.Connection, product_ids: List[UUID], admin_id: UUID) -> int:
@@ -379,13 +386,13 @@ class ProductService:
 
         try:
             affected_count = await self.product_dal.batch_activate_products(conn, product_ids, admin_id)
-            logger.info(f"Batch activated {affected_count} products by admin {admin_id}")
+            logger.info("Batch activated %s products by admin %s", affected_count, admin_id)
             return affected_count
         except DALError as e:
-            logger.error(f"DAL error batch activating products: {e}")
+            logger.error("DAL error batch activating products: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error batch activating products: {e}", exc_info=True)
+            logger.error("Unexpected error batch activating products: %s", e, exc_info=True)
             raise InternalServerError("批量激活商品失败") # Modified: Specific error message
 
     async def batch_reject_products(self, conn: pyodbc.Connection, product_ids: List[UUID], admin_id: UUID, reason: Optional[str] = None) -> int:
@@ -395,11 +402,11 @@ class ProductService:
 
         try:
             affected_count = await self.product_dal.batch_reject_products(conn, product_ids, admin_id, reason)
-            logger.info(f"Batch rejected {affected_count} products by admin {admin_id}")
+            logger.info("Batch rejected %s products by admin %s", affected_count, admin_id)
             return affected_count
         except DALError as e:
-            logger.error(f"DAL error batch rejecting products: {e}")
+            logger.error("DAL error batch rejecting products: %s", e)
             raise
         except Exception as e:
-            logger.error(f"Unexpected error batch rejecting products: {e}", exc_info=True)
+            logger.error("Unexpected error batch rejecting products: %s", e, exc_info=True)
             raise InternalServerError("批量拒绝商品失败") # Modified: Specific error message
\ No newline at end of file
@@ -0,0 +1,179 @@
+# app/services/stock_gate.py
+"""
+下单库存准入：热门商品 (如低价教材限时抢购) 同时有大量买家下单时，在进程内按商品排队，
+并在已知库存不足时直接拒绝，不访问数据库。
+
+库存的检查与扣减由 sp_CreateOrder 中的单条条件 UPDATE 原子完成，这里只是它前面的一层过滤:
+- 每个商品同时进入数据库的下单请求不超过 concurrency 个，其余请求在进程内等待，
+  而不是在数据库的行锁队列里等待 (锁等待过长会触发锁超时与事务重试)；
+- 下单成功后记录剩余库存，库存不足 / 商品不可购买时记录库存上限；之后 ttl 秒内购买数量超过
+  该上限的请求 (包括正在排队的请求) 直接以 InsufficientStockError 拒绝，与数据库返回的 409 相同。
+
+记录只是进程内的提示：其它进程的下单、卖家补货不会通知这里，因此记录在 ttl 后失效；
+本进程内取消 / 拒绝订单 (库存由触发器恢复) 后会立即清除该商品的记录。
+"""
+import asyncio
+import contextlib
+import time
+from typing import AsyncIterator, Callable, Dict, Hashable, Optional, Tuple
+
+from app.config import settings
+from app.core.metrics import REGISTRY, MetricsRegistry
+from app.exceptions import InsufficientStockError
+
+# 拒绝原因标签
+REJECT_SOLD_OUT = "sold_out"          # 已知库存为 0 或商品不可购买
+REJECT_INSUFFICIENT = "insufficient"  # 已知库存少于购买数量
+
+
+class StockGateMetrics:
+    """下单准入相关的指标集合。"""
+
+    def __init__(self, registry: MetricsRegistry) -> None:
+        self.admitted = registry.counter(
+            "order_stock_gate_admitted_total", "通过准入、进入数据库的下单请求数")
+        self.rejected = registry.counter(
+            "order_stock_gate_rejected_total", "因已知库存不足在进程内直接拒绝的下单请求数", ("reason",))
+        self.waiting = registry.gauge(
+            "order_stock_gate_waiting", "在进程内排队等待同一商品的下单请求数")
+
+
+class _ProductSlot:
+    """一个商品的排队信号量与使用者计数 (持有 + 等待)，计数归零时移除。"""
+
+    __slots__ = ("semaphore", "users")
+
+    def __init__(self, concurrency: int) -> None:
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.users = 0
+
+
+class StockAdmissionGate:
+    """
+    按商品限制同时下单的请求数，并缓存已知的库存上限。
+
+    Args:
+        concurrency: 每个商品同时进入数据库的请求数。
+        ttl: 库存记录的有效期 (秒)。
+        max_products: 最多保存库存记录的商品数，超出时丢弃最早的记录。
+        clock: 单调时钟 (测试时可替换)。
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 1,
+        ttl: float = 5.0,
+        max_products: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Optional[StockGateMetrics] = None,
+    ) -> None:
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.max_products = max_products
+        self.clock = clock
+        self.metrics = metrics or get_stock_gate_metrics()
+        self._slots: Dict[Hashable, _ProductSlot] = {}
+        # product_id -> (库存上限, 过期时间)；按写入顺序插入
+        self._bounds: Dict[Hashable, Tuple[int, float]] = {}
+
+    @contextlib.asynccontextmanager
+    async def admit(self, product_id: Hashable, quantity: int) -> AsyncIterator[None]:
+        """
+        排队进入 product_id 的下单临界区；退出时让出位置。
+
+        Raises:
+            InsufficientStockError: 已知库存少于 quantity (进入前或排队结束时检查)。
+        """
+        self._check(product_id, quantity)
+        slot = self._slots.get(product_id)
+        if slot is None:
+            slot = self._slots[product_id] = _ProductSlot(self.concurrency)
+        slot.users += 1
+        try:
+            if slot.semaphore.locked():
+                self.metrics.waiting.inc()
+                try:
+                    await slot.semaphore.acquire()
+                finally:
+                    self.metrics.waiting.dec()
+            else:
+                await slot.semaphore.acquire()
+            try:
+                # 排队期间前面的请求可能已经买完
+                self._check(product_id, quantity)
+                self.metrics.admitted.inc()
+                yield
+            finally:
+                slot.semaphore.release()
+        finally:
+            slot.users -= 1
+            if slot.users == 0 and self._slots.get(product_id) is slot:
+                del self._slots[product_id]
+
+    def known_stock(self, product_id: Hashable) -> Optional[int]:
+        """返回未过期的库存上限；没有记录时返回 None。"""
+        bound = self._bounds.get(product_id)
+        if bound is None:
+            return None
+        if bound[1] <= self.clock():
+            del self._bounds[product_id]
+            return None
+        return bound[0]
+
+    def record_remaining(self, product_id: Hashable, remaining: Optional[int]) -> None:
+        """下单成功，扣减后的剩余库存为 remaining。"""
+        if remaining is not None:
+            self._set_bound(product_id, remaining)
+
+    def record_insufficient(self, product_id: Hashable, quantity: int) -> None:
+        """数据库报告库存不足：库存少于 quantity。"""
+        known = self.known_stock(product_id)
+        bound = quantity - 1 if known is None else min(known, quantity - 1)
+        self._set_bound(product_id, bound)
+
+    def record_unavailable(self, product_id: Hashable) -> None:
+        """商品已售罄 (Sold)、下架或不存在。"""
+        self._set_bound(product_id, 0)
+
+    def forget(self, product_id: Hashable) -> None:
+        """库存可能增加 (订单取消 / 拒绝)：清除记录，下次下单访问数据库。"""
+        self._bounds.pop(product_id, None)
+
+    def _check(self, product_id: Hashable, quantity: int) -> None:
+        known = self.known_stock(product_id)
+        if known is not None and quantity > known:
+            self.metrics.rejected.inc(REJECT_SOLD_OUT if known <= 0 else REJECT_INSUFFICIENT)
+            raise InsufficientStockError("创建订单失败：商品库存不足。")
+
+    def _set_bound(self, product_id: Hashable, bound: int) -> None:
+        bounds = self._bounds
+        bounds.pop(product_id, None)
+        bounds[product_id] = (max(bound, 0), self.clock() + self.ttl)
+        while len(bounds) > self.max_products:
+            del bounds[next(iter(bounds))]
+
+
+_default_metrics = None
+_default_gate = None
+
+
+def get_stock_gate_metrics() -> StockGateMetrics:
+    """全局注册表上的准入指标 (首次使用时注册)。"""
+    global _default_metrics
+    if _default_metrics is None:
+        _default_metrics = StockGateMetrics(REGISTRY)
+    return _default_metrics
+
+
+def get_stock_gate() -> Optional[StockAdmissionGate]:
+    """按 settings 创建的进程级准入器；ORDER_STOCK_GATE_ENABLED 关闭时返回 None。"""
+    global _default_gate
+    if not settings.ORDER_STOCK_GATE_ENABLED:
+        return None
+    if _default_gate is None:
+        _default_gate = StockAdmissionGate(
+            concurrency=settings.ORDER_STOCK_GATE_CONCURRENCY,
+            ttl=settings.ORDER_STOCK_GATE_TTL_SECONDS,
+            max_products=settings.ORDER_STOCK_GATE_MAX_PRODUCTS,
+        )
+    return _default_gate
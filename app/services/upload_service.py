@@ -0,0 +1,55 @@
+import os
+import pyodbc
+import logging
+from fastapi import UploadFile
+from typing import Dict, Any
+
+from app.dal.upload_dal import UploadDAL
+from app.utils.file_upload import store_upload_file, upload_url_for
+from app.utils.image_processing import derivative_paths
+
+logger = logging.getLogger(__name__)
+
+class UploadService:
+    """Service layer for storing uploads in the content-addressed store."""
+
+    def __init__(self, upload_dal: UploadDAL):
+        """
+        Initializes the UploadService with an UploadDAL instance.
+
+        Args:
+            upload_dal: An instance of UploadDAL for database interactions.
+        """
+        self.upload_dal = upload_dal
+
+    async def save_upload(self, conn: pyodbc.Connection, upload_file: UploadFile) -> Dict[str, Any]:
+        """
+        Stores an uploaded file (deduplicated by content hash) and registers it for reference tracking.
+
+        Args:
+            conn: The database connection object.
+            upload_file: The UploadFile object received from the request.
+
+        Returns:
+            A dict with path, url, thumbnail_url, size, sha256, deduplicated and
+            needs_derivatives (False when identical content was already processed).
+
+        Raises:
+            FileTooLargeError: If the file exceeds the configured size limit.
+            DALError: If registering the file fails.
+        """
+        saved = await store_upload_file(upload_file)
+        url = upload_url_for(saved.path)
+        await self.upload_dal.register_uploaded_file(conn, saved.sha256, url, saved.size)
+        logger.info("Stored upload %s (%d bytes, deduplicated=%s)", url, saved.size, saved.deduplicated)
+
+        thumbnail_path, _ = derivative_paths(saved.path)
+        return {
+            "path": saved.path,
+            "url": url,
+            "thumbnail_url": upload_url_for(thumbnail_path),
+            "size": saved.size,
+            "sha256": saved.sha256,
+            "deduplicated": saved.deduplicated,
+            "needs_derivatives": not (saved.deduplicated and os.path.exists(thumbnail_path)),
+        }
@@ -1,20 +1,50 @@
 # app/utils/email_sender.py
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.header import Header
+import functools
 import logging
 from app.config import settings
 from app.exceptions import EmailSendingError # Assuming you have a custom exception for email sending failures
 
-# Import Aliyun Direct Mail SDK (ensure you have installed it: pip install alibabacloud_dm20151123)
-from alibabacloud_dm20151123.client import Client
-from alibabacloud_dm20151123.models import SingleSendMailRequest
-from alibabacloud_tea_openapi.models import Config as OpenApiConfig # Use alias to avoid conflict with app.config
-from alibabacloud_tea_util.models import RuntimeOptions # 导入 RuntimeOptions
+# 邮件服务的 SDK 只在第一次发送时按 EMAIL_PROVIDER 加载：
+# EMAIL_PROVIDER=smtp 的进程不会导入阿里云 Direct Mail SDK (alibabacloud_dm20151123 / tea openapi)，
+# 反之亦然，从而缩短每个 worker 的启动时间和内存占用。
 
 logger = logging.getLogger(__name__)
 
+
+@functools.lru_cache(maxsize=None)
+def _load_aliyun_sdk():
+    """
+    导入阿里云 Direct Mail SDK (pip install alibabacloud_dm20151123)，结果在进程内缓存。
+
+    Raises:
+        EmailSendingError: SDK 未安装。
+    """
+    try:
+        from alibabacloud_dm20151123.client import Client
+        from alibabacloud_dm20151123.models import SingleSendMailRequest
+        from alibabacloud_tea_openapi.models import Config as OpenApiConfig # Use alias to avoid conflict with app.config
+        from alibabacloud_tea_util.models import RuntimeOptions # 导入 RuntimeOptions
+    except ImportError as e:
+        logger.error("Aliyun Direct Mail SDK is not installed: %s", e)
+        raise EmailSendingError("阿里云邮件服务 SDK 未安装。") from e
+    return Client, SingleSendMailRequest, OpenApiConfig, RuntimeOptions
+
+
+@functools.lru_cache(maxsize=4)
+def _get_aliyun_client(access_key_id: str, access_key_secret: str):
+    """按凭据缓存 Direct Mail 客户端，避免每封邮件重新创建。"""
+    Client, _, OpenApiConfig, _ = _load_aliyun_sdk()
+    config = OpenApiConfig(
+        # 您的Access Key ID
+        access_key_id=access_key_id,
+        # 您的Access Key Secret
+        access_key_secret=access_key_secret,
+        # Endpoint 请参考阿里云官方文档，这里使用泛型域名，会自动解析到对应区域
+        endpoint='dm.aliyuncs.com'
+    )
+    # 创建 Direct Mail 客户端
+    return Client(config)
+
 async def send_email_smtp(recipient_email: str, subject: str, body: str):
     """使用 SMTP 发送邮件。"""
     logger.info(f"Attempting to send email via SMTP to {recipient_email}")
@@ -34,6 +64,11 @@ async def send_email_smtp(recipient_email: str, subject: str, body: str):
         logger.error(f"Invalid SMTP port: {settings.SMTP_PORT}")
         raise EmailSendingError("SMTP 端口配置无效。")
 
+    # smtplib 会连带导入 ssl 等模块，只在使用 SMTP 时导入
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.header import Header
+
     try:
         message = MIMEText(body, 'html', 'utf-8')
         message['From'] = Header(f'您的应用 <{sender_email}>', 'utf-8') # Replace '您的应用' with your app name
@@ -72,19 +107,10 @@ async def send_email_aliyun(recipient_email: str, subject: str, body: str):
          logger.error("Aliyun Direct Mail configuration is incomplete.")
          raise EmailSendingError("阿里云邮件服务配置不完整。")
 
-    try:
-        # Aliyun SDK Configuration
-        config = OpenApiConfig(
-            # 您的Access Key ID
-            access_key_id=access_key_id,
-            # 您的Access Key Secret
-            access_key_secret=access_key_secret,
-            # Endpoint 请参考阿里云官方文档，这里使用泛型域名，会自动解析到对应区域
-            endpoint='dm.aliyuncs.com'
-        )
+    _, SingleSendMailRequest, _, RuntimeOptions = _load_aliyun_sdk()
 
-        # 创建 Direct Mail 客户端
-        client = Client(config)
+    try:
+        client = _get_aliyun_client(access_key_id, access_key_secret)
 
         # 创建发送邮件请求
         request = SingleSendMailRequest(
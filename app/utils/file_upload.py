@@ -1,37 +1,179 @@
 from fastapi import UploadFile
 import os
 import uuid
+import hashlib
+import asyncio
+import logging
+from typing import NamedTuple, Optional
+
+import aiofiles
+import aiofiles.os
+
+from app.config import settings
+from app.exceptions import FileTooLargeError
+
+logger = logging.getLogger(__name__)
 
 # Configuration for upload directory (create if it doesn't exist)
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+
+class WrittenUpload(NamedTuple):
+    """已写入临时文件、尚未落到最终位置的上传内容。"""
+    temp_path: str
+    size: int
+    sha256: str
+
+
+class SavedUpload(NamedTuple):
+    """已原子落盘的上传文件信息。"""
+    path: str
+    size: int
+    sha256: str
+    deduplicated: bool = False
+
+
+async def write_upload_to_temp(
+    upload_file: UploadFile,
+    directory: str = UPLOAD_DIR,
+    max_size: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> WrittenUpload:
+    """
+    将上传文件按固定大小分块流式写入 directory 下的临时文件，同时计算 SHA-256。
+
+    不会把整个文件读入内存；磁盘写入通过 aiofiles 在线程池中完成，不阻塞事件循环。
+    超过 max_size 时立即中止并删除临时文件。
+
+    Args:
+        upload_file: The UploadFile object received from the request.
+        directory: 临时文件所在目录 (应与最终目录在同一文件系统，以便原子 rename)。
+        max_size: 允许的最大字节数，默认取 settings.UPLOAD_MAX_SIZE_BYTES。
+        chunk_size: 每次读取/写入的字节数，默认取 settings.UPLOAD_CHUNK_SIZE_BYTES。
+
+    Returns:
+        WrittenUpload(temp_path, size, sha256)
+
+    Raises:
+        FileTooLargeError: 文件超过大小上限。
+    """
+    max_size = max_size or settings.UPLOAD_MAX_SIZE_BYTES
+    chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE_BYTES
+
+    # 如果多部分解析器已经给出了文件大小，直接拒绝超限文件，无需读取任何内容
+    declared_size = getattr(upload_file, "size", None)
+    if declared_size is not None and declared_size > max_size:
+        raise FileTooLargeError(f"文件大小超过上限 {max_size} 字节", max_size=max_size)
+
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{uuid.uuid4().hex}.part")
+    hasher = hashlib.sha256()
+    total = 0
+
+    try:
+        async with aiofiles.open(temp_path, "wb") as f:
+            while True:
+                chunk = await upload_file.read(chunk_size)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_size:
+                    raise FileTooLargeError(f"文件大小超过上限 {max_size} 字节", max_size=max_size)
+                hasher.update(chunk)
+                await f.write(chunk)
+            await f.flush()
+            # 确保数据落盘后再 rename，避免崩溃后出现内容不完整的同名文件
+            await asyncio.to_thread(os.fsync, f.fileno())
+    except BaseException:
+        await _remove_quietly(temp_path)
+        raise
+
+    return WrittenUpload(temp_path=temp_path, size=total, sha256=hasher.hexdigest())
+
+
+async def _remove_quietly(path: str) -> None:
+    try:
+        await aiofiles.os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning("Failed to remove temporary upload file %s: %s", path, e)
+
+
+def normalize_extension(filename: Optional[str]) -> str:
+    """只保留短小的字母数字扩展名，并统一为小写，保证相同内容得到相同的存储路径。"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension == ".jpeg":
+        extension = ".jpg"
+    if len(extension) > 10 or not extension[1:].isalnum():
+        return ""
+    return extension
+
+
+def content_addressed_path(sha256: str, extension: str = "") -> str:
+    """
+    根据内容哈希计算相对于 UPLOAD_DIR 的存储路径。
+
+    使用两级前缀目录分片 (ab/cd/abcd...ext)，避免单一目录下文件过多导致查找变慢。
+    """
+    return os.path.join(sha256[:2], sha256[2:4], f"{sha256}{extension}")
+
+
+def upload_url_for(file_path: str) -> str:
+    """将 UPLOAD_DIR 下的文件路径转换为通过 /uploads 挂载点访问的 URL。"""
+    relative_path = os.path.relpath(file_path, UPLOAD_DIR)
+    return f"/uploads/{relative_path.replace(os.sep, '/')}"
+
+
+async def store_upload_file(upload_file: UploadFile, max_size: Optional[int] = None) -> SavedUpload:
+    """
+    流式保存上传文件到内容寻址存储：分块写入临时文件，按内容哈希命名并原子地落到分片目录。
+
+    内容相同的文件只保存一份；再次上传时直接丢弃临时文件并复用已有路径。
+
+    Args:
+        upload_file: The UploadFile object received from the request.
+        max_size: 允许的最大字节数，默认取 settings.UPLOAD_MAX_SIZE_BYTES。
+
+    Returns:
+        SavedUpload(path, size, sha256, deduplicated)
+
+    Raises:
+        FileTooLargeError: 文件超过大小上限。
+    """
+    written = await write_upload_to_temp(upload_file, UPLOAD_DIR, max_size=max_size)
+    extension = normalize_extension(upload_file.filename)
+    file_path = os.path.join(UPLOAD_DIR, content_addressed_path(written.sha256, extension))
+
+    try:
+        if await aiofiles.os.path.exists(file_path):
+            await _remove_quietly(written.temp_path)
+            return SavedUpload(path=file_path, size=written.size, sha256=written.sha256, deduplicated=True)
+
+        await aiofiles.os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        # 并发上传相同内容时两边写入的字节完全一致，rename 覆盖是安全的
+        await aiofiles.os.replace(written.temp_path, file_path)
+    except BaseException:
+        await _remove_quietly(written.temp_path)
+        raise
+
+    return SavedUpload(path=file_path, size=written.size, sha256=written.sha256, deduplicated=False)
+
+
 async def save_upload_file(upload_file: UploadFile) -> str:
     """
     Saves an uploaded file to the local file system and returns its path.
-    
+
     Args:
         upload_file: The UploadFile object received from the request.
-        
+
     Returns:
         The path where the file was saved.
-        
+
     Raises:
+        FileTooLargeError: If the file exceeds the configured size limit.
         Exception: If file saving fails.
     """
-    try:
-        file_extension = os.path.splitext(upload_file.filename)[1]
-        file_name = f"{uuid.uuid4()}{file_extension}"
-        file_path = os.path.join(UPLOAD_DIR, file_name)
-
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
-        with open(file_path, "wb") as f:
-            f.write(await upload_file.read())
-            
-        return file_path
-        
-    except Exception as e:
-        # You might want more specific error handling or logging here
-        raise e 
\ No newline at end of file
+    saved = await store_upload_file(upload_file)
+    return saved.path
@@ -0,0 +1,159 @@
+import os
+import re
+import asyncio
+import posixpath
+import logging
+import concurrent.futures
+from typing import Dict, Optional, Tuple
+
+from app.config import settings
+from app.utils.file_upload import UPLOAD_DIR
+
+logger = logging.getLogger(__name__)
+
+# 派生图片命名约定: <stem>_thumb.webp 为缩略图，<stem>.webp 为全尺寸 WebP 版本
+THUMBNAIL_SUFFIX = "_thumb.webp"
+WEBP_SUFFIX = ".webp"
+
+UPLOADS_URL_PREFIX = "/uploads/"
+
+# 内容寻址存储的文件名: <sha256><扩展名> (见 app.utils.file_upload.content_addressed_path)
+_CONTENT_ADDRESSED_NAME = re.compile(r"^[0-9a-f]{64}(\.[0-9a-z]+)?$")
+
+_process_pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+_job_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def is_image_processing_available() -> bool:
+    """Pillow 是可选依赖，未安装时跳过派生图片生成。"""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def derivative_paths(source_path: str) -> Tuple[str, str]:
+    """
+    根据原图路径计算派生图片路径。
+
+    Returns:
+        (thumbnail_path, webp_path)；如果原图本身就是 WebP，webp_path 即原图。
+    """
+    stem, ext = os.path.splitext(source_path)
+    thumbnail_path = f"{stem}{THUMBNAIL_SUFFIX}"
+    webp_path = source_path if ext.lower() == WEBP_SUFFIX else f"{stem}{WEBP_SUFFIX}"
+    return thumbnail_path, webp_path
+
+
+def _save_atomically(image, path: str, quality: int) -> None:
+    # 先写临时文件再 rename，列表接口只会看到完整的派生图片
+    temp_path = f"{path}.part"
+    try:
+        image.save(temp_path, "WEBP", quality=quality, method=4)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _generate_derivatives(source_path: str, thumbnail_size: int, quality: int) -> Dict[str, str]:
+    """
+    在子进程中执行：解码原图，生成缩略图与 WebP 版本。
+
+    必须是模块级函数，才能被 ProcessPoolExecutor pickle。
+    """
+    from PIL import Image, ImageOps
+
+    thumbnail_path, webp_path = derivative_paths(source_path)
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            has_alpha = "A" in image.getbands() or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        if webp_path != source_path:
+            _save_atomically(image, webp_path, quality)
+
+        thumbnail = image.copy()
+        thumbnail.thumbnail((thumbnail_size, thumbnail_size), Image.LANCZOS)
+        _save_atomically(thumbnail, thumbnail_path, quality)
+
+    return {"thumbnail": thumbnail_path, "webp": webp_path}
+
+
+def _get_process_pool() -> concurrent.futures.ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        workers = settings.IMAGE_PROCESS_WORKERS or max(1, min(2, os.cpu_count() or 1))
+        _process_pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+        logger.info("Image processing pool started with %d workers", workers)
+    return _process_pool
+
+
+def _get_job_semaphore() -> asyncio.Semaphore:
+    global _job_semaphore
+    if _job_semaphore is None:
+        _job_semaphore = asyncio.Semaphore(settings.IMAGE_MAX_CONCURRENT_JOBS)
+    return _job_semaphore
+
+
+async def generate_image_derivatives(source_path: str) -> Optional[Dict[str, str]]:
+    """
+    在进程池中为上传的图片生成缩略图与 WebP 版本，供 BackgroundTasks 在响应返回后调用。
+
+    并发任务数受 IMAGE_MAX_CONCURRENT_JOBS 限制，避免上传高峰把 CPU 占满；
+    生成失败只记录日志，不影响原图的可用性。
+
+    Args:
+        source_path: 原图在磁盘上的路径。
+
+    Returns:
+        派生图片路径字典，Pillow 不可用或处理失败时返回 None。
+    """
+    if not is_image_processing_available():
+        logger.warning("Pillow is not installed, skipping image derivatives for %s", source_path)
+        return None
+
+    loop = asyncio.get_running_loop()
+    async with _get_job_semaphore():
+        try:
+            return await loop.run_in_executor(
+                _get_process_pool(),
+                _generate_derivatives,
+                source_path,
+                settings.IMAGE_THUMBNAIL_SIZE,
+                settings.IMAGE_WEBP_QUALITY,
+            )
+        except Exception as e:
+            logger.error("Failed to generate image derivatives for %s: %s", source_path, e)
+            return None
+
+
+def thumbnail_url_for(image_url: Optional[str]) -> Optional[str]:
+    """
+    返回图片 URL 对应的缩略图 URL，只做字符串处理，不访问文件系统 (列表接口每行都会调用)。
+
+    内容寻址存储中的上传文件 (<sha256>.<ext>) 的缩略图路径是确定的 (<sha256>_thumb.webp)，
+    直接返回该 URL；缩略图由后台任务生成，尚未生成或生成失败时该 URL 返回 404，由客户端回退到原图。
+    其它 URL (外部链接、旧的非哈希命名文件) 原样返回。
+    """
+    if not image_url or not image_url.startswith(UPLOADS_URL_PREFIX):
+        return image_url
+
+    relative_path = image_url[len(UPLOADS_URL_PREFIX):]
+    if not _CONTENT_ADDRESSED_NAME.match(posixpath.basename(relative_path)):
+        return image_url
+    thumbnail_relative, _ = derivative_paths(relative_path)
+    return f"{UPLOADS_URL_PREFIX}{thumbnail_relative}"
+
+
+def shutdown_image_pool() -> None:
+    """应用关闭时调用，等待进行中的任务完成后关闭进程池。"""
+    global _process_pool, _job_semaphore
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+        logger.info("Image processing pool shut down")
+    _job_semaphore = None
@@ -0,0 +1,52 @@
+"""
+keyset 分页游标。
+
+列表按若干列 (如 CreateTime DESC, OrderID DESC) 排序时，下一页从上一页最后一行的这些列值之后开始，
+不使用 OFFSET：数据库只需按索引定位到该位置，翻页深度不影响查询开销，翻页期间插入的新行也不会让
+后面的页重复或遗漏。游标把这些列值编码为一个不透明的字符串 (base64url 编码的 JSON 数组)，
+客户端原样传回即可，不应解析其内容。
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Tuple
+from uuid import UUID
+
+
+class InvalidCursorError(ValueError):
+    """游标无法解码或与期望的列不匹配 (路由返回 400)。"""
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """把最后一行的排序列值编码为游标。"""
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[Any], Any]) -> Tuple[Any, ...]:
+    """
+    解码 encode_cursor 生成的游标，按顺序用 parsers 还原每个值 (如 datetime.fromisoformat, UUID)。
+
+    Raises:
+        InvalidCursorError: 游标格式错误，或值的个数 / 类型不符。
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise InvalidCursorError("无效的分页游标")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursorError("无效的分页游标") from e
@@ -0,0 +1,217 @@
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_type
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from app.config import settings
+from app.utils.image_processing import WEBP_SUFFIX
+
+# 内容寻址存储中的原图以自身内容的 SHA-256 命名，文件名本身就是强 ETag
+_SHA256_STEM = re.compile(r"^[0-9a-f]{64}$")
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def is_derivative(full_path: str) -> bool:
+    """
+    是否可能是派生图片 (<stem>_thumb.webp / <stem>.webp)。
+
+    派生图片沿用原图的文件名，内容却取决于 IMAGE_THUMBNAIL_SIZE / IMAGE_WEBP_QUALITY，调整后会在同一 URL 重新生成。
+    直接上传的 WebP 原图与派生图片无法仅凭文件名区分，一并按派生图片处理。
+    """
+    return full_path.lower().endswith(WEBP_SUFFIX)
+
+
+def build_etag(full_path: str, stat_result: os.stat_result) -> str:
+    """哈希命名的原图直接使用内容哈希；派生图片与其它文件使用大小与修改时间组合。"""
+    stem = os.path.splitext(os.path.basename(full_path))[0]
+    if _SHA256_STEM.match(stem) and not is_derivative(full_path):
+        return f'"{stem}"'
+    return f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+
+
+def parse_range(range_header: str, file_size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析单个字节范围，返回闭区间 (start, end)。
+
+    多段范围等不支持的格式返回 None，由调用方回退为完整响应 (RFC 9110 允许忽略 Range)。
+
+    Raises:
+        ValueError: 范围不可满足 (调用方应返回 416)。
+    """
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N: 最后 N 个字节
+        suffix_length = int(last)
+        if suffix_length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(file_size - suffix_length, 0), file_size - 1
+    start = int(first)
+    end = min(int(last), file_size - 1) if last else file_size - 1
+    if start >= file_size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+class UploadFileResponse(Response):
+    """
+    上传文件响应：支持单段 Range，在服务器提供 zerocopysend 扩展时使用 sendfile 零拷贝发送。
+    """
+
+    def __init__(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        headers: dict,
+        status_code: int = 200,
+        byte_range: Optional[Tuple[int, int]] = None,
+    ) -> None:
+        self.full_path = full_path
+        self.status_code = status_code
+        self.background = None
+        self.body = b""
+        if byte_range is None:
+            byte_range = (0, stat_result.st_size - 1)
+        self.offset = byte_range[0]
+        self.count = byte_range[1] - byte_range[0] + 1
+        headers = dict(headers)
+        headers["content-length"] = str(self.count)
+        if status_code == 206:
+            headers["content-range"] = f"bytes {byte_range[0]}-{byte_range[1]}/{stat_result.st_size}"
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"] == "HEAD" or self.count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if ZEROCOPY_EXTENSION in scope.get("extensions", {}):
+            # 文件描述符交给服务器，由其调用 os.sendfile，数据不经过 Python
+            with open(self.full_path, "rb") as f:
+                await send({"type": ZEROCOPY_EXTENSION, "file": f, "offset": self.offset, "count": self.count, "more_body": False})
+            return
+
+        async with await anyio.open_file(self.full_path, mode="rb") as f:
+            await f.seek(self.offset)
+            remaining = self.count
+            while remaining > 0:
+                chunk = await f.read(min(STREAM_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class UploadsStaticFiles(StaticFiles):
+    """
+    /uploads 的静态文件服务。
+
+    上传的文件按内容哈希 / UUID 命名，写入后不再修改，因此可以：
+    - 返回长期有效的 immutable Cache-Control 与强 ETag (派生图片可能重新生成，见 is_derivative，
+      只缓存 UPLOADS_DERIVATIVE_CACHE_MAX_AGE 秒且不标记 immutable)；
+    - 对 If-None-Match / If-Modified-Since 直接返回 304；
+    - 支持 Range (含 If-Range)；
+    - 配置 UPLOADS_ACCEL_REDIRECT_PREFIX 后只返回 X-Accel-Redirect 头，交给前置代理 (如 nginx) 发送文件。
+    """
+
+    def __init__(
+        self,
+        *args,
+        cache_max_age: Optional[int] = None,
+        derivative_cache_max_age: Optional[int] = None,
+        accel_redirect_prefix: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.cache_max_age = settings.UPLOADS_CACHE_MAX_AGE if cache_max_age is None else cache_max_age
+        self.derivative_cache_max_age = (
+            settings.UPLOADS_DERIVATIVE_CACHE_MAX_AGE if derivative_cache_max_age is None else derivative_cache_max_age
+        )
+        self.accel_redirect_prefix = accel_redirect_prefix if accel_redirect_prefix is not None else settings.UPLOADS_ACCEL_REDIRECT_PREFIX
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        full_path = str(full_path)
+        request_headers = Headers(scope=scope)
+        etag = build_etag(full_path, stat_result)
+        if is_derivative(full_path):
+            cache_control = f"public, max-age={self.derivative_cache_max_age}"
+        else:
+            cache_control = f"public, max-age={self.cache_max_age}, immutable"
+        headers = {
+            "etag": etag,
+            "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+            "cache-control": cache_control,
+            "accept-ranges": "bytes",
+        }
+
+        if self._is_not_modified(request_headers, etag, stat_result):
+            return Response(status_code=304, headers=headers)
+
+        content_type, _ = guess_type(full_path)
+        headers["content-type"] = content_type or "application/octet-stream"
+
+        if self.accel_redirect_prefix:
+            relative_path = os.path.relpath(full_path, str(self.directory)).replace(os.sep, "/")
+            headers["x-accel-redirect"] = f"{self.accel_redirect_prefix.rstrip('/')}/{relative_path}"
+            return Response(status_code=status_code, headers=headers)
+
+        byte_range = None
+        range_header = request_headers.get("range")
+        if range_header and status_code == 200 and self._if_range_matches(request_headers, etag):
+            try:
+                byte_range = parse_range(range_header, stat_result.st_size)
+            except ValueError:
+                return Response(
+                    status_code=416,
+                    headers={**headers, "content-range": f"bytes */{stat_result.st_size}"},
+                )
+            if byte_range is not None:
+                status_code = 206
+
+        return UploadFileResponse(full_path, stat_result, headers, status_code=status_code, byte_range=byte_range)
+
+    @staticmethod
+    def _is_not_modified(request_headers: Headers, etag: str, stat_result: os.stat_result) -> bool:
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match is not None:
+            # If-None-Match 优先于 If-Modified-Since
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags
+
+        if_modified_since = request_headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                return int(stat_result.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    @staticmethod
+    def _if_range_matches(request_headers: Headers, etag: str) -> bool:
+        # If-Range 不匹配时忽略 Range，返回完整内容；这里只支持强 ETag 形式
+        if_range = request_headers.get("if-range")
+        return if_range is None or if_range.strip() == etag
+
@@ -0,0 +1,74 @@
+"""
+图片派生流水线吞吐量基准测试 (images/sec/core)。
+
+用法:
+    python -m benchmarks.bench_image_pipeline --images 64 --size 3000x2000 --workers 1 2 4
+
+生成指定尺寸的合成照片，通过 app.utils.image_processing 的进程池生成缩略图与 WebP 版本，
+分别报告每种进程数下的总吞吐量与单核吞吐量。
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+from PIL import Image
+
+from app.config import settings
+from app.utils import image_processing
+
+
+def _make_sample_images(directory: str, count: int, width: int, height: int):
+    # 使用噪声图，避免纯色图片编码过快导致结果失真
+    base = Image.effect_noise((width, height), 64).convert("RGB")
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"sample_{i}.jpg")
+        base.save(path, "JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+async def _run(paths, workers: int) -> float:
+    settings.IMAGE_PROCESS_WORKERS = workers
+    settings.IMAGE_MAX_CONCURRENT_JOBS = workers * 2
+    image_processing.shutdown_image_pool()
+    # 预热进程池，不计入启动开销
+    await image_processing.generate_image_derivatives(paths[0])
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(image_processing.generate_image_derivatives(p) for p in paths))
+    elapsed = time.perf_counter() - start
+    image_processing.shutdown_image_pool()
+
+    failed = sum(1 for r in results if r is None)
+    if failed:
+        raise RuntimeError(f"{failed} images failed to process")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=32)
+    parser.add_argument("--size", default="3000x2000", help="WIDTHxHEIGHT of the synthetic source images")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    directory = tempfile.mkdtemp(prefix="bench_images_")
+    try:
+        paths = _make_sample_images(directory, args.images, width, height)
+        print(f"{args.images} images, {width}x{height}, thumbnail {settings.IMAGE_THUMBNAIL_SIZE}px, webp q={settings.IMAGE_WEBP_QUALITY}")
+        print(f"{'workers':>8} {'seconds':>9} {'img/s':>8} {'img/s/core':>11}")
+        for workers in sorted(set(args.workers)):
+            elapsed = asyncio.run(_run(paths, workers))
+            rate = args.images / elapsed
+            print(f"{workers:>8} {elapsed:>9.2f} {rate:>8.1f} {rate / workers:>11.2f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
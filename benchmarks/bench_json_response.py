@@ -0,0 +1,66 @@
+"""
+JSON 响应序列化基准测试：FastAPI 默认路径 (jsonable_encoder + JSONResponse) 与 FastJSONResponse (orjson) 对比。
+
+用法:
+    python -m benchmarks.bench_json_response --page-sizes 10 50 200 --iterations 500
+
+使用与 sp_GetProductList 结构一致的行 (UUID、Decimal 价格、datetime、中文列名) 构造商品列表页。
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.responses import FastJSONResponse
+
+
+def make_product_page(page_size: int):
+    now = datetime.now()
+    rows = []
+    for i in range(page_size):
+        rows.append({
+            "商品ID": uuid4(),
+            "商品名称": f"九成新二手教材 第{i}册",
+            "商品描述": "课程用书，笔记很少，可小刀。" * 3,
+            "库存": random.randint(0, 5),
+            "价格": Decimal(random.randint(100, 99999)) / 100,
+            "发布时间": now - timedelta(minutes=i),
+            "商品状态": "Active",
+            "发布者用户名": f"user{i}",
+            "商品类别": "书籍",
+            "主图URL": f"/uploads/ab/cd/{uuid4().hex * 2}.jpg",
+            "主图缩略图URL": f"/uploads/ab/cd/{uuid4().hex * 2}_thumb.webp",
+            "发布者ID": uuid4(),
+            "总商品数": 1234,
+        })
+    return rows
+
+
+def _time(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--iterations", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'jsonable_encoder+JSONResponse (us)':>36} {'FastJSONResponse (us)':>22} {'speedup':>8}")
+    for page_size in args.page_sizes:
+        rows = make_product_page(page_size)
+        baseline = _time(lambda: JSONResponse(jsonable_encoder(rows)), args.iterations)
+        fast = _time(lambda: FastJSONResponse(rows), args.iterations)
+        print(f"{page_size:>6} {baseline:>36.1f} {fast:>22.1f} {baseline / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+日志开销基准测试 (每次日志调用的微秒数，在调用线程中测量)。
+
+用法:
+    python -m benchmarks.bench_logging --calls 20000 2>/dev/null
+
+对比:
+  sync-fstring     原配置：app logger 为 DEBUG，StreamHandler 同步写 stderr，f-string 立即格式化
+  queue-fstring    队列处理器 + JSON，但调用处仍使用 f-string
+  queue-lazy       队列处理器 + JSON + DEBUG 限流，调用处使用 %s 延迟格式化
+  info-lazy        app logger 为 INFO (默认配置)，DEBUG 日志在 isEnabledFor 处直接返回
+
+stderr 重定向到 /dev/null 时同步写几乎不阻塞；输出到终端或管道阻塞时，sync-fstring 的耗时随之上升，
+而队列方式只受队列容量影响。queue-fstring 不限流，监听线程格式化 JSON 时会与调用线程争用 GIL。
+"""
+import argparse
+import logging
+import sys
+import time
+from uuid import uuid4
+
+from app.core.logging import JsonFormatter, QueueListenerHandler, SamplingFilter, shutdown_logging
+
+RESULT = {"用户ID": uuid4(), "用户名": "alice", "邮箱": "alice@sjtu.edu.cn", "信用分": 100, "是否已认证": True}
+
+
+def configure(variant: str) -> logging.Logger:
+    logger = logging.getLogger(f"app.bench.{variant}")
+    logger.handlers.clear()
+    logger.propagate = False
+    if variant == "sync-fstring":
+        handler = logging.StreamHandler(sys.stderr)
+        handler.setFormatter(logging.Formatter("%(asctime)s | %(name)s | %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.DEBUG)
+        return logger
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(JsonFormatter())
+    console.name = f"bench_console_{variant}"
+    logging._handlers[console.name] = console
+    queue_handler = QueueListenerHandler(handlers=[console.name], queue_size=100_000)
+    if variant != "queue-fstring":
+        queue_handler.addFilter(SamplingFilter(level="DEBUG", max_per_second=100))
+    logger.addHandler(queue_handler)
+    logger.setLevel(logging.INFO if variant == "info-lazy" else logging.DEBUG)
+    return logger
+
+
+def run(variant: str, calls: int) -> float:
+    logger = configure(variant)
+    user_id = uuid4()
+    lazy = variant != "sync-fstring" and variant != "queue-fstring"
+    start = time.perf_counter()
+    for _ in range(calls):
+        if lazy:
+            logger.debug("DAL: sp_GetUserProfileById for ID %s returned: %s", user_id, RESULT)
+        else:
+            logger.debug(f"DAL: sp_GetUserProfileById for ID {user_id} returned: {RESULT}")
+    elapsed = time.perf_counter() - start
+    shutdown_logging()
+    return elapsed / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    for variant in ("sync-fstring", "queue-fstring", "queue-lazy", "info-lazy"):
+        print(f"{variant:<14} {run(variant, args.calls):8.2f} us/call", file=sys.stdout, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+请求中间件开销基准测试 (每个请求的微秒数)。
+
+用法:
+    python -m benchmarks.bench_middleware --requests 5000
+
+直接以 ASGI 方式调用一个最小的 FastAPI 应用 (不经过网络和 HTTP 解析)，对比:
+  none             不加中间件
+  log_requests     原来的 @app.middleware("http") (BaseHTTPMiddleware) 实现
+  instrumentation  InstrumentationMiddleware (纯 ASGI，记录全部指标)
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from fastapi import FastAPI, Request
+
+from app.core.metrics import MetricsRegistry
+from app.middleware import InstrumentationMiddleware, RequestMetrics
+
+logger = logging.getLogger("benchmarks.middleware")
+
+
+def build_app(variant: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/products/{product_id}")
+    async def get_product(product_id: int):
+        return {"product_id": product_id, "name": "教材"}
+
+    if variant == "log_requests":
+        @app.middleware("http")
+        async def log_requests(request: Request, call_next):
+            logger.debug(f"Middleware: Request received for path: {request.url.path}")
+            response = await call_next(request)
+            logger.debug(f"Middleware: Response status code: {response.status_code} for path: {request.url.path}")
+            return response
+    elif variant == "instrumentation":
+        app.add_middleware(InstrumentationMiddleware, metrics=RequestMetrics(MetricsRegistry()))
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    never = asyncio.Event()
+
+    def make_receive():
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await never.wait()  # 客户端保持连接，直到响应发送完毕
+
+        return receive
+
+    async def send(message):
+        pass
+
+    def make_scope(i: int) -> dict:
+        return {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/api/v1/products/{i}", "raw_path": f"/api/v1/products/{i}".encode(),
+            "root_path": "", "query_string": b"", "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", 12345), "server": ("bench", 80),
+        }
+
+    for i in range(200):  # 预热 (构建中间件栈)
+        await app(make_scope(i), make_receive(), send)
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(make_scope(i), make_receive(), send)
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    results = {variant: asyncio.run(run(build_app(variant), args.requests))
+               for variant in ("none", "log_requests", "instrumentation")}
+    baseline = results["none"]
+    for variant, per_request in results.items():
+        print(f"{variant:<16} {per_request:8.1f} us/request   (+{per_request - baseline:6.1f} us middleware)")
+
+
+if __name__ == "__main__":
+    main()
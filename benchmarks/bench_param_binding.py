@@ -0,0 +1,91 @@
+"""
+存储过程参数绑定开销基准测试 (µs/call)。
+
+用法:
+    python -m benchmarks.bench_param_binding --calls 100000
+    python -m benchmarks.bench_param_binding --db --calls 2000   # 额外连接 .env 中配置的数据库
+
+对比两种参数准备方式 (execute_query 在调用 cursor.execute 前所做的工作):
+  str-uuid     旧路径：逐个参数检查，把 UUID 转成字符串并生成新元组，由 pyodbc 按值推断类型
+  signature    新路径：按存储过程名查出登记的签名 (setinputsizes 参数)，UUID 原样传入
+
+--db 时还会对真实数据库分别以两种方式执行 sp_GetProductById / sp_GetOrdersByUser，
+输出每次调用的往返耗时 (包含驱动绑定参数与服务器端类型转换)。
+"""
+import argparse
+import time
+from uuid import UUID, uuid4
+
+from app.dal.param_signatures import input_sizes_for
+
+CALLS = [
+    ("{CALL sp_GetProductById(?)}", (uuid4(),)),
+    ("{CALL sp_GetOrdersByUser (?, ?, ?, ?, ?)}", (uuid4(), False, "Completed", 1, 10)),
+    ("{CALL sp_UpdateProduct(?, ?, ?, ?, ?, ?, ?)}", (uuid4(), uuid4(), "书籍", "二手教材", "九成新" * 20, 2, 25.5)),
+]
+
+
+def str_uuid_path(sql, params):
+    return tuple(str(p) if isinstance(p, UUID) else p for p in params), None
+
+
+def signature_path(sql, params):
+    return params, input_sizes_for(sql, params)
+
+
+def bench_prepare(calls: int) -> None:
+    print(f"{'procedure':<28} {'str-uuid':>10} {'signature':>10}   (µs/call, parameter preparation only)")
+    for sql, params in CALLS:
+        timings = []
+        for path in (str_uuid_path, signature_path):
+            path(sql, params)
+            start = time.perf_counter()
+            for _ in range(calls):
+                path(sql, params)
+            timings.append((time.perf_counter() - start) / calls * 1e6)
+        name = sql.split("CALL ")[1].split("(")[0].strip()
+        print(f"{name:<28} {timings[0]:>10.2f} {timings[1]:>10.2f}")
+
+
+def bench_database(calls: int) -> None:
+    import pyodbc
+    from app.dal.connection import build_connection_string
+
+    conn = pyodbc.connect(build_connection_string(), autocommit=True)
+    try:
+        print(f"\n{'procedure':<28} {'str-uuid':>10} {'signature':>10}   (µs/call, database round trip)")
+        for sql, params in CALLS[:2]:
+            timings = []
+            for path in (str_uuid_path, signature_path):
+                cursor = conn.cursor()
+                try:
+                    start = time.perf_counter()
+                    for _ in range(calls):
+                        bound, input_sizes = path(sql, params)
+                        if input_sizes is not None:
+                            cursor.setinputsizes(input_sizes)
+                        cursor.execute(sql, bound)
+                        while cursor.nextset():
+                            pass
+                    timings.append((time.perf_counter() - start) / calls * 1e6)
+                finally:
+                    cursor.close()
+            name = sql.split("CALL ")[1].split("(")[0].strip()
+            print(f"{name:<28} {timings[0]:>10.1f} {timings[1]:>10.1f}")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--db", action="store_true", help="同时测量真实数据库上的调用耗时")
+    args = parser.parse_args()
+
+    bench_prepare(args.calls)
+    if args.db:
+        bench_database(max(args.calls // 50, 1))
+
+
+if __name__ == "__main__":
+    main()
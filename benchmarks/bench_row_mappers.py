@@ -0,0 +1,89 @@
+"""
+存储过程结果行映射基准测试 (rows/sec)。
+
+用法:
+    python -m benchmarks.bench_row_mappers --rows 1000 --repeat 20
+
+对比三种方式把 pyodbc 行转换为响应模型:
+  dict+validate  旧路径：dict(zip(columns, row)) → 逐字段 .get() → Model(**data) (完整校验；
+                 结果集中没有的必填字段用固定值补齐，仅为让校验通过)
+  dict+mapper    execute_query 返回字典，再用 RowMapper.map_dict 构造
+  index+mapper   execute_query(row_mapper=...) 按列下标直接构造 (无中间字典)
+"""
+import argparse
+import time
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from app.dal.row_mappers import get_row_mapper
+from app.schemas.order_schemas import OrderResponseSchema
+from app.schemas.product import ProductUpdate
+from app.schemas.user_schemas import UserResponseSchema
+
+
+def user_result_set(n):
+    columns = ["用户ID", "用户名", "账户状态", "信用分", "是否管理员", "是否超级管理员", "是否已认证",
+               "专业", "邮箱", "头像URL", "个人简介", "手机号码", "注册时间"]
+    rows = [(str(uuid4()).upper(), f"user{i}", "Active", 100, False, False, True, "CS",
+             f"user{i}@sjtu.edu.cn", None, "hello", None, datetime.now()) for i in range(n)]
+    return "sp_GetAllUsers", columns, rows, UserResponseSchema, {}
+
+
+def order_result_set(n):
+    columns = ["OrderID", "ProductID", "ProductName", "Quantity", "TotalPrice", "OrderStatus",
+               "CreateTime", "CompleteTime", "CancelTime", "CancelReason", "SellerID", "BuyerID", "SellerUsername"]
+    rows = [(str(uuid4()).upper(), str(uuid4()).upper(), "教材", 1, Decimal("25.00"), "Completed",
+             datetime.now(), datetime.now(), None, None, str(uuid4()).upper(), str(uuid4()).upper(), "seller")
+            for _ in range(n)]
+    return "sp_GetOrdersByUser", columns, rows, OrderResponseSchema, {}
+
+
+def product_result_set(n):
+    columns = ["商品ID", "商品名称", "商品描述", "库存", "价格", "发布时间", "商品状态", "发布者用户名", "商品类别"]
+    rows = [(str(uuid4()).upper(), f"商品{i}", "描述" * 10, 3, Decimal("99.90"), datetime.now(), "Active",
+             "seller", "书籍") for i in range(n)]
+    return "sp_GetProductById", columns, rows, ProductUpdate, {}
+
+
+def validate_path(procedure, columns, rows, model, extra):
+    mapper = get_row_mapper(procedure)
+    out = []
+    for row in rows:
+        data = dict(zip(columns, row))
+        values = {field: data.get(column) for column, field in mapper.columns.items() if data.get(column) is not None}
+        out.append(model(**values, **extra))
+    return out
+
+
+def dict_mapper_path(procedure, columns, rows, model, extra):
+    mapper = get_row_mapper(procedure)
+    return [mapper.map_dict(dict(zip(columns, row))) for row in rows]
+
+
+def index_mapper_path(procedure, columns, rows, model, extra):
+    return get_row_mapper(procedure).map_rows(columns, rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    paths = [("dict+validate", validate_path), ("dict+mapper", dict_mapper_path), ("index+mapper", index_mapper_path)]
+    print(f"{'result set':<12} " + " ".join(f"{name:>16}" for name, _ in paths) + "   (rows/sec)")
+    for name, factory in (("user", user_result_set), ("order", order_result_set), ("product", product_result_set)):
+        result_set = factory(args.rows)
+        rates = []
+        for _, path in paths:
+            path(*result_set)  # 预热 (包含编译)
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                path(*result_set)
+            rates.append(args.rows * args.repeat / (time.perf_counter() - start))
+        print(f"{name:<12} " + " ".join(f"{rate:>16,.0f}" for rate in rates))
+
+
+if __name__ == "__main__":
+    main()
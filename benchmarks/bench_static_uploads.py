@@ -0,0 +1,104 @@
+"""
+/uploads 静态文件服务基准测试 (images served/sec)。
+
+用法:
+    python -m benchmarks.bench_static_uploads --requests 2000 --size 200000
+    python -m benchmarks.bench_static_uploads --base-url http://127.0.0.1:8000 --path /uploads/ab/cd/<hash>.jpg
+
+默认在进程内通过 ASGI 直接对比 starlette StaticFiles 与 UploadsStaticFiles：
+完整下载、带 If-None-Match 的重复访问 (浏览器缓存重新验证) 以及 Range 请求。
+进程内测试无法体现 sendfile 零拷贝的收益；要测量它，请用支持 zerocopysend 的服务器启动应用并传入 --base-url。
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from app.utils.uploads_static import UploadsStaticFiles
+
+
+async def _run(client: httpx.AsyncClient, url: str, headers: dict, total: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.get(url, headers=headers)
+            if response.status_code not in (200, 206, 304):
+                raise RuntimeError(f"Unexpected status {response.status_code}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def _scenarios(etag: str):
+    return [
+        ("full download", {}),
+        ("revalidate (304)", {"If-None-Match": etag}),
+        ("range 64KiB", {"Range": "bytes=0-65535"}),
+    ]
+
+
+async def bench_in_process(args) -> None:
+    directory = tempfile.mkdtemp(prefix="bench_uploads_")
+    try:
+        content = os.urandom(args.size)
+        sha256 = hashlib.sha256(content).hexdigest()
+        relative_path = f"{sha256[:2]}/{sha256[2:4]}/{sha256}.jpg"
+        os.makedirs(os.path.join(directory, sha256[:2], sha256[2:4]))
+        with open(os.path.join(directory, relative_path), "wb") as f:
+            f.write(content)
+
+        apps = {
+            "StaticFiles": StaticFiles(directory=directory),
+            "UploadsStaticFiles": UploadsStaticFiles(directory=directory),
+        }
+        print(f"{args.requests} requests, {args.size} bytes, concurrency {args.concurrency}")
+        print(f"{'server':<20} {'scenario':<18} {'req/s':>10}")
+        for name, static_app in apps.items():
+            app = Starlette(routes=[Mount("/uploads", static_app)])
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+                etag = (await client.get(f"/uploads/{relative_path}")).headers["etag"]
+                for scenario, headers in _scenarios(etag):
+                    rate = await _run(client, f"/uploads/{relative_path}", headers, args.requests, args.concurrency)
+                    print(f"{name:<20} {scenario:<18} {rate:>10.0f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+async def bench_remote(args) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url) as client:
+        etag = (await client.get(args.path)).headers.get("etag", '"none"')
+        print(f"{args.requests} requests against {args.base_url}{args.path}, concurrency {args.concurrency}")
+        for scenario, headers in _scenarios(etag):
+            rate = await _run(client, args.path, headers, args.requests, args.concurrency)
+            print(f"{scenario:<18} {rate:>10.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--size", type=int, default=200_000, help="size in bytes of the synthetic image")
+    parser.add_argument("--base-url", help="benchmark a running server instead of the in-process ASGI app")
+    parser.add_argument("--path", help="path of an existing upload when using --base-url")
+    args = parser.parse_args()
+
+    if args.base_url:
+        if not args.path:
+            parser.error("--path is required with --base-url")
+        asyncio.run(bench_remote(args))
+    else:
+        asyncio.run(bench_in_process(args))
+
+
+if __name__ == "__main__":
+    main()
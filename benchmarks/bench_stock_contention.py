@@ -0,0 +1,170 @@
+"""
+热门商品下单并发基准测试：N 个买家同时购买同一商品。
+
+用法:
+    python -m benchmarks.bench_stock_contention --buyers 500 --stock 20
+    python -m benchmarks.bench_stock_contention --db --product-id <商品ID> --buyer-id <买家ID> --buyers 200
+
+默认在进程内模拟数据库：商品行锁用 asyncio.Lock 表示，每条语句耗时 --statement-ms，
+客户端与数据库之间的往返耗时 --rtt-ms (COMMIT 也是一次往返，期间行锁仍被持有)。对比:
+  updlock   原来的 sp_CreateOrder：SELECT ... WITH (UPDLOCK) → sp_DecreaseProductQuantity (SELECT + UPDATE)
+            → 触发器更新状态 → INSERT 订单，行锁从第一条语句持有到 COMMIT
+  atomic    单条条件 UPDATE (WHERE Quantity >= @Quantity) 扣减库存 → INSERT 订单
+  gated     atomic + StockAdmissionGate：进程内按商品排队，售罄后直接拒绝，不再访问数据库
+输出成功 / 失败数、实际访问数据库的请求数、总耗时与请求延迟分位数。
+
+--db 时改为用线程并发调用真实数据库上的 sp_CreateOrder (每个请求一个连接，成功后提交)，
+需要事先准备一个在售商品与一个买家账号；注意这会真实扣减库存并创建订单。
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.core.metrics import MetricsRegistry
+from app.exceptions import InsufficientStockError
+from app.services.stock_gate import StockAdmissionGate, StockGateMetrics
+
+
+class SimulatedDatabase:
+    """一个商品行：库存、行锁与访问计数。"""
+
+    def __init__(self, stock: int, statement_ms: float, rtt_ms: float) -> None:
+        self.stock = stock
+        self.row_lock = asyncio.Lock()
+        self.statement = statement_ms / 1000
+        self.rtt = rtt_ms / 1000
+        self.calls = 0
+
+    async def updlock_order(self, quantity: int) -> int:
+        self.calls += 1
+        await asyncio.sleep(self.rtt / 2)
+        async with self.row_lock:
+            await asyncio.sleep(self.statement)          # SELECT ... WITH (UPDLOCK)
+            if self.stock < quantity:
+                raise InsufficientStockError()
+            await asyncio.sleep(self.statement * 2)      # sp_DecreaseProductQuantity: SELECT + UPDATE
+            await asyncio.sleep(self.statement)          # tr_Product_AfterUpdate_QuantityStatus
+            self.stock -= quantity
+            await asyncio.sleep(self.statement)          # INSERT [Order]
+            await asyncio.sleep(self.rtt)                # 返回结果 + COMMIT 往返
+        await asyncio.sleep(self.rtt / 2)
+        return self.stock
+
+    async def atomic_order(self, quantity: int) -> int:
+        self.calls += 1
+        await asyncio.sleep(self.rtt / 2)
+        async with self.row_lock:
+            await asyncio.sleep(self.statement)          # UPDATE ... WHERE Quantity >= @Quantity
+            if self.stock < quantity:
+                raise InsufficientStockError()
+            self.stock -= quantity
+            await asyncio.sleep(self.statement)          # INSERT [Order] (OUTPUT INTO)
+            await asyncio.sleep(self.rtt)                # 返回结果 + COMMIT 往返
+        await asyncio.sleep(self.rtt / 2)
+        return self.stock
+
+
+async def run_variant(variant: str, args) -> dict:
+    db = SimulatedDatabase(args.stock, args.statement_ms, args.rtt_ms)
+    gate = StockAdmissionGate(concurrency=args.concurrency, metrics=StockGateMetrics(MetricsRegistry()))
+    order = db.updlock_order if variant == "updlock" else db.atomic_order
+    latencies = []
+    results = {"ok": 0, "rejected": 0}
+
+    async def buyer():
+        start = time.perf_counter()
+        try:
+            if variant == "gated":
+                async with gate.admit("hot-product", 1):
+                    try:
+                        remaining = await order(1)
+                    except InsufficientStockError:
+                        gate.record_insufficient("hot-product", 1)
+                        raise
+                    gate.record_remaining("hot-product", remaining)
+            else:
+                await order(1)
+            results["ok"] += 1
+        except InsufficientStockError:
+            results["rejected"] += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(buyer() for _ in range(args.buyers)))
+    results["wall_ms"] = (time.perf_counter() - start) * 1000
+    results["db_calls"] = db.calls
+    latencies.sort()
+    results["p50"] = statistics.median(latencies)
+    results["p99"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return results
+
+
+def bench_simulated(args) -> None:
+    print(f"{args.buyers} buyers, stock {args.stock}, statement {args.statement_ms} ms, rtt {args.rtt_ms} ms")
+    print(f"{'variant':<10} {'ok':>5} {'rejected':>9} {'db calls':>9} {'wall ms':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for variant in ("updlock", "atomic", "gated"):
+        r = asyncio.run(run_variant(variant, args))
+        print(f"{variant:<10} {r['ok']:>5} {r['rejected']:>9} {r['db_calls']:>9} {r['wall_ms']:>9.0f} {r['p50']:>8.1f} {r['p99']:>8.1f}")
+
+
+def bench_database(args) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pyodbc
+    from app.dal.connection import build_connection_string
+
+    conn_str = build_connection_string()
+
+    def place_order(_):
+        start = time.perf_counter()
+        conn = pyodbc.connect(conn_str, autocommit=False)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("{CALL sp_CreateOrder (?, ?, ?)}", (args.buyer_id, args.product_id, 1))
+            cursor.fetchall()
+            conn.commit()
+            outcome = "ok"
+        except pyodbc.Error as e:
+            conn.rollback()
+            outcome = "50003" if "50003" in str(e) else "50002" if "50002" in str(e) else type(e).__name__
+        finally:
+            conn.close()
+        return outcome, (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(place_order, range(args.buyers)))
+    wall_ms = (time.perf_counter() - start) * 1000
+    latencies = sorted(latency for _, latency in results)
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    print(f"{args.buyers} buyers / {args.threads} threads: {outcomes}")
+    print(f"wall {wall_ms:.0f} ms, p50 {statistics.median(latencies):.1f} ms, "
+          f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buyers", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=20)
+    parser.add_argument("--statement-ms", type=float, default=0.5)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    parser.add_argument("--concurrency", type=int, default=1, help="gated 变体每个商品同时进入数据库的请求数")
+    parser.add_argument("--db", action="store_true", help="对真实数据库并发调用 sp_CreateOrder")
+    parser.add_argument("--product-id")
+    parser.add_argument("--buyer-id")
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    if args.db:
+        if not (args.product_id and args.buyer_id):
+            parser.error("--db 需要 --product-id 与 --buyer-id")
+        bench_database(args)
+    else:
+        bench_simulated(args)
+
+
+if __name__ == "__main__":
+    main()
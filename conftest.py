@@ -75,10 +75,11 @@ def mock_evaluation_service(mocker: pytest_mock.MockerFixture) -> AsyncMock:
 # Accept mock_order_service fixture
 def client(mock_order_service: AsyncMock, mock_evaluation_service: AsyncMock, mock_db_connection: MagicMock, mocker: pytest_mock.MockerFixture):
     from app.main import app # Import the main app instance
-    from app.dependencies import get_current_user, get_db_connection, get_order_service, get_evaluation_service # Import dependencies
+    from app.dependencies import get_current_user, get_db_connection, get_read_only_db_connection, get_order_service, get_evaluation_service # Import dependencies
 
     # Override dependencies before creating the client
     app.dependency_overrides[get_db_connection] = lambda: mock_db_connection
+    app.dependency_overrides[get_read_only_db_connection] = lambda: mock_db_connection
     app.dependency_overrides[get_order_service] = lambda: mock_order_service
     app.dependency_overrides[get_evaluation_service] = lambda: mock_evaluation_service
 
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+上传文件迁移脚本：将旧的扁平 uploads/<uuid>.<ext> 布局迁移到内容寻址存储 uploads/ab/cd/<sha256>.<ext>。
+
+步骤:
+  1. 扫描 UPLOAD_DIR 顶层的原图（跳过 *_thumb.webp 等派生图片与临时文件），计算 SHA-256；
+  2. 复制到分片目录（内容相同的文件只保留一份）；
+  3. 在一个事务中登记 UploadedFile，改写 ProductImage.ImageURL 与 User.AvatarUrl，并重算引用计数；
+  4. 提交成功后删除旧文件及其派生图片（--keep-legacy 时保留）。
+
+Usage: python scripts/migrate_uploads_to_cas.py [--dry-run] [--keep-legacy] [--with-derivatives]
+"""
+
+import os
+import sys
+import shutil
+import hashlib
+import logging
+import argparse
+
+import pyodbc
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.config import settings
+from app.utils.file_upload import UPLOAD_DIR, content_addressed_path, upload_url_for, normalize_extension
+from app.utils.image_processing import THUMBNAIL_SUFFIX, WEBP_SUFFIX, derivative_paths
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("migrate_uploads_to_cas")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def find_legacy_originals(upload_dir: str):
+    """返回顶层目录中需要迁移的原图路径（派生图片会在迁移后重新生成）。"""
+    entries = [e for e in os.scandir(upload_dir) if e.is_file() and not e.name.startswith(".")]
+    stems_with_original = {
+        os.path.splitext(e.name)[0] for e in entries
+        if not e.name.endswith(THUMBNAIL_SUFFIX) and not e.name.lower().endswith(WEBP_SUFFIX)
+    }
+    originals = []
+    for entry in entries:
+        if entry.name.endswith(THUMBNAIL_SUFFIX):
+            continue
+        stem, ext = os.path.splitext(entry.name)
+        # <stem>.webp 且存在同名原图时，它只是上传后生成的派生图片
+        if ext.lower() == WEBP_SUFFIX and stem in stems_with_original:
+            continue
+        originals.append(entry.path)
+    return sorted(originals)
+
+
+def plan_migration(upload_dir: str):
+    """计算每个旧文件的新路径，返回 [(old_path, new_path, sha256, size)]。"""
+    plan = []
+    for old_path in find_legacy_originals(upload_dir):
+        sha256 = _hash_file(old_path)
+        new_path = os.path.join(upload_dir, content_addressed_path(sha256, normalize_extension(old_path)))
+        plan.append((old_path, new_path, sha256, os.path.getsize(old_path)))
+    return plan
+
+
+def copy_into_store(plan, dry_run: bool) -> int:
+    copied = 0
+    for old_path, new_path, _, _ in plan:
+        if os.path.exists(new_path):
+            continue
+        copied += 1
+        if dry_run:
+            continue
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        temp_path = f"{new_path}.part"
+        shutil.copyfile(old_path, temp_path)
+        os.replace(temp_path, new_path)
+    return copied
+
+
+def legacy_url_for(old_path: str) -> str:
+    return f"/uploads/{os.path.basename(old_path)}"
+
+
+def update_database(conn, plan) -> None:
+    cursor = conn.cursor()
+    try:
+        for old_path, new_path, sha256, size in plan:
+            old_url = legacy_url_for(old_path)
+            new_url = upload_url_for(new_path)
+            cursor.execute("{CALL sp_RegisterUploadedFile (?, ?, ?)}", (sha256, new_url, size))
+            while cursor.nextset():
+                pass
+            cursor.execute("UPDATE [ProductImage] SET ImageURL = ? WHERE ImageURL = ?", (new_url, old_url))
+            images = cursor.rowcount
+            cursor.execute("UPDATE [User] SET AvatarUrl = ? WHERE AvatarUrl = ?", (new_url, old_url))
+            avatars = cursor.rowcount
+            if images or avatars:
+                logger.info("%s -> %s (%d product images, %d avatars)", old_url, new_url, images, avatars)
+        # 触发器会在 UPDATE 时维护引用计数，这里再整体重算一次，修正迁移前没有记录的引用
+        cursor.execute("{CALL sp_RecalculateUploadRefCounts}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def remove_legacy_files(plan) -> None:
+    for old_path, _, _, _ in plan:
+        thumbnail_path, webp_path = derivative_paths(old_path)
+        for path in {old_path, thumbnail_path, webp_path}:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def regenerate_derivatives(plan) -> None:
+    from app.utils.image_processing import _generate_derivatives
+
+    for new_path in sorted({new_path for _, new_path, _, _ in plan}):
+        try:
+            _generate_derivatives(new_path, settings.IMAGE_THUMBNAIL_SIZE, settings.IMAGE_WEBP_QUALITY)
+        except Exception as e:
+            logger.warning("Failed to generate derivatives for %s: %s", new_path, e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将 uploads 目录迁移到内容寻址存储")
+    parser.add_argument('--dry-run', action='store_true', help='只输出迁移计划，不修改文件和数据库')
+    parser.add_argument('--keep-legacy', action='store_true', help='迁移后保留旧文件')
+    parser.add_argument('--with-derivatives', action='store_true', help='为迁移后的文件重新生成缩略图与 WebP 版本 (需要 Pillow)')
+    args = parser.parse_args()
+
+    plan = plan_migration(UPLOAD_DIR)
+    unique_targets = {new_path for _, new_path, _, _ in plan}
+    logger.info("Found %d legacy files, %d unique contents", len(plan), len(unique_targets))
+    if not plan:
+        return 0
+
+    copied = copy_into_store(plan, args.dry_run)
+    logger.info("%s %d files into the content-addressed store", "Would copy" if args.dry_run else "Copied", copied)
+    if args.dry_run:
+        for old_path, new_path, _, _ in plan:
+            logger.info("%s -> %s", legacy_url_for(old_path), upload_url_for(new_path))
+        return 0
+
+    conn_str = (
+        f"DRIVER={{{settings.ODBC_DRIVER}}};"
+        f"SERVER={settings.DATABASE_SERVER};"
+        f"DATABASE={settings.DATABASE_NAME};"
+        f"UID={settings.DATABASE_UID};"
+        f"PWD={settings.DATABASE_PWD}"
+    )
+    conn = pyodbc.connect(conn_str, autocommit=False)
+    try:
+        update_database(conn, plan)
+    except pyodbc.Error as e:
+        logger.error("数据库更新失败，旧文件保持不变: %s", e)
+        return 1
+    finally:
+        conn.close()
+
+    if args.with_derivatives:
+        regenerate_derivatives(plan)
+    if not args.keep_legacy:
+        remove_legacy_files(plan)
+        logger.info("Removed legacy files")
+
+    logger.info("迁移完成")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
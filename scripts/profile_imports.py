@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+"""
+导入耗时分析与预算检查：在子进程中以 python -X importtime 导入 app.main，汇总每个模块的导入耗时。
+
+输出:
+  - 总导入耗时；
+  - 按累计耗时 (含子模块) 与自身耗时排序的前 N 个模块；
+  - 预算检查结果：总耗时超过上限、或导入了不应在启动时加载的模块 (如未使用的邮件服务 SDK) 时返回 1。
+
+预算定义在 scripts/import_budget.json，可用命令行参数覆盖。耗时与机器相关，CI 中建议取多次运行的最小值 (--runs)。
+
+Usage: python scripts/profile_imports.py [--module app.main] [--top 25] [--runs 3] [--budget-ms 1500] [--no-check]
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List, NamedTuple
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DEFAULT_BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budget.json')
+
+# import time:     self [us] |  cumulative | imported package
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+class ImportRecord(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> List[ImportRecord]:
+    """解析 -X importtime 的输出 (忽略表头与其它 stderr 内容)。"""
+    records = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def measure(module: str) -> List[ImportRecord]:
+    """在全新的解释器中导入 module 并返回各模块的导入耗时。"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        tail = "\n".join(line for line in result.stderr.splitlines() if not line.startswith("import time:"))[-2000:]
+        raise RuntimeError(f"导入 {module} 失败:\n{tail}")
+    return parse_importtime(result.stderr)
+
+
+def total_ms(records: List[ImportRecord]) -> float:
+    """顶层导入 (depth 0) 的累计耗时之和。"""
+    return sum(r.cumulative_us for r in records if r.depth == 0) / 1000
+
+
+def best_of(module: str, runs: int) -> List[ImportRecord]:
+    """多次运行取总耗时最小的一次，降低磁盘缓存与系统负载的影响。"""
+    return min((measure(module) for _ in range(runs)), key=total_ms)
+
+
+def load_budget(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_budget(records: List[ImportRecord], budget: Dict) -> List[str]:
+    """返回违反预算的描述列表 (为空表示通过)。"""
+    violations = []
+    imported = {r.module for r in records}
+    max_total_ms = budget.get("max_total_ms")
+    if max_total_ms is not None and total_ms(records) > max_total_ms:
+        violations.append(f"总导入耗时 {total_ms(records):.0f} ms 超过预算 {max_total_ms} ms")
+    for module in budget.get("forbidden_modules", []):
+        if module in imported:
+            violations.append(f"启动时不应导入 {module}")
+    return violations
+
+
+def print_report(records: List[ImportRecord], top: int) -> None:
+    print(f"Imported {len(records)} modules in {total_ms(records):.1f} ms\n")
+    print(f"Top {top} by cumulative time:")
+    for r in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        print(f"  {r.cumulative_us / 1000:9.1f} ms  {r.module}")
+    print(f"\nTop {top} by self time:")
+    for r in sorted(records, key=lambda r: r.self_us, reverse=True)[:top]:
+        print(f"  {r.self_us / 1000:9.1f} ms  {r.module}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分析导入耗时并检查导入预算")
+    parser.add_argument('--module', default=None, help='要分析的模块 (默认取预算文件中的 module，或 app.main)')
+    parser.add_argument('--top', type=int, default=25, help='输出耗时最多的前 N 个模块')
+    parser.add_argument('--runs', type=int, default=3, help='运行次数，取总耗时最小的一次')
+    parser.add_argument('--budget-file', default=DEFAULT_BUDGET_FILE, help='预算文件路径')
+    parser.add_argument('--budget-ms', type=float, default=None, help='覆盖总导入耗时预算 (毫秒)')
+    parser.add_argument('--no-check', action='store_true', help='只输出报告，不检查预算')
+    args = parser.parse_args()
+
+    budget = load_budget(args.budget_file)
+    if args.budget_ms is not None:
+        budget["max_total_ms"] = args.budget_ms
+    module = args.module or budget.get("module", "app.main")
+
+    try:
+        records = best_of(module, max(args.runs, 1))
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    print_report(records, args.top)
+    if args.no_check:
+        return 0
+
+    violations = check_budget(records, budget)
+    if violations:
+        print("\nImport budget exceeded:")
+        for violation in violations:
+            print(f"  - {violation}")
+        return 1
+    print("\nImport budget OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+卖家评价汇总回填 / 重算脚本。
+
+SellerStats 由触发器 tr_Evaluation_AfterChange_UpdateSellerStats 随评价增量维护；部署前已有的评价
+不会自动计入，需要执行一次本脚本回填。之后如怀疑汇总与 Evaluation 不一致 (例如手工修改过数据)，
+也可以重新执行：sp_RecomputeSellerStats 在一个事务中按 Evaluation 重算并覆盖汇总，可重复执行。
+
+Usage: python scripts/recompute_seller_stats.py [--seller-id SELLER_ID]
+"""
+
+import os
+import sys
+import logging
+import argparse
+import uuid
+
+import pyodbc
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.dal.connection import build_connection_string
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+logger = logging.getLogger("recompute_seller_stats")
+
+
+def recompute(conn, seller_id=None) -> int:
+    """调用 sp_RecomputeSellerStats，返回被写入 / 删除的汇总行数 (过程内部自行提交)。"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("{CALL sp_RecomputeSellerStats (?)}", (str(seller_id) if seller_id else None,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+    finally:
+        cursor.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="按 Evaluation 重算卖家评价汇总 (SellerStats)")
+    parser.add_argument('--seller-id', type=uuid.UUID, help='只重算该卖家；默认重算全部卖家')
+    args = parser.parse_args()
+
+    conn = pyodbc.connect(build_connection_string(), autocommit=True)
+    try:
+        affected = recompute(conn, args.seller_id)
+    except pyodbc.Error as e:
+        logger.error("重算失败，汇总保持不变: %s", e)
+        return 1
+    finally:
+        conn.close()
+
+    logger.info("Recomputed seller stats for %s: %d rows written or removed",
+                args.seller_id or "all sellers", affected)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
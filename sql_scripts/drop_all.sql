@@ -13,6 +13,9 @@ IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'tr_Product_AfterUpdate_Quant
 IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'tr_Order_AfterCancel_RestoreQuantity') DROP TRIGGER [tr_Order_AfterCancel_RestoreQuantity];
 IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'tr_Order_AfterComplete_UpdateSellerCredit') DROP TRIGGER [tr_Order_AfterComplete_UpdateSellerCredit];
 IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'tr_Evaluation_AfterInsert_UpdateSellerCredit') DROP TRIGGER [tr_Evaluation_AfterInsert_UpdateSellerCredit];
+IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'tr_Evaluation_AfterChange_UpdateSellerStats') DROP TRIGGER [tr_Evaluation_AfterChange_UpdateSellerStats];
+IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'tr_ProductImage_AfterChange_UploadRefCount') DROP TRIGGER [tr_ProductImage_AfterChange_UploadRefCount];
+IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'tr_User_AfterChange_AvatarRefCount') DROP TRIGGER [tr_User_AfterChange_AvatarRefCount];
 GO
 
 -- Step 2: Drop all known procedures
@@ -50,13 +53,29 @@ IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_GetChatMessagesByProduc
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_CreateOrder') DROP PROCEDURE [sp_CreateOrder];
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_ConfirmOrder') DROP PROCEDURE [sp_ConfirmOrder];
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_RejectOrder') DROP PROCEDURE [sp_RejectOrder];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_CancelOrder') DROP PROCEDURE [sp_CancelOrder];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_GetOrderHistory') DROP PROCEDURE [sp_GetOrderHistory];
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_GetChatMessagesByTransaction') DROP PROCEDURE [sp_GetChatMessagesByTransaction];
+-- Evaluation Procedures
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_GetSellerReputation') DROP PROCEDURE [sp_GetSellerReputation];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_RecomputeSellerStats') DROP PROCEDURE [sp_RecomputeSellerStats];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_GetEvaluationPage') DROP PROCEDURE [sp_GetEvaluationPage];
 -- Image Procedures
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_GetImageById') DROP PROCEDURE [sp_GetImageById];
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_GetImagesByObject') DROP PROCEDURE [sp_GetImagesByObject];
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_CreateImage') DROP PROCEDURE [sp_CreateImage];
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_UpdateImage') DROP PROCEDURE [sp_UpdateImage];
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_DeleteImage') DROP PROCEDURE [sp_DeleteImage];
+-- Upload Procedures
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_RegisterUploadedFile') DROP PROCEDURE [sp_RegisterUploadedFile];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_RecalculateUploadRefCounts') DROP PROCEDURE [sp_RecalculateUploadRefCounts];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_GetUnreferencedUploads') DROP PROCEDURE [sp_GetUnreferencedUploads];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_DeleteUploadedFile') DROP PROCEDURE [sp_DeleteUploadedFile];
+-- Maintenance Procedures
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_TryAcquireMaintenanceLeader') DROP PROCEDURE [sp_TryAcquireMaintenanceLeader];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_PurgeExpiredOtps') DROP PROCEDURE [sp_PurgeExpiredOtps];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_PurgeExpiredPasswordResetTokens') DROP PROCEDURE [sp_PurgeExpiredPasswordResetTokens];
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_PurgeReadNotifications') DROP PROCEDURE [sp_PurgeReadNotifications];
 -- Old/Renamed procedures just in case
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_UpdateUser') DROP PROCEDURE [sp_UpdateUser];
 IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_CreateOrUpdateStudentAuthProfile') DROP PROCEDURE [sp_CreateOrUpdateStudentAuthProfile];
@@ -69,8 +88,10 @@ PRINT N'Dropping all tables (custom first, then Django-managed)...';
 -- Drop custom application specific tables (order matters due to FKs)
 PRINT N'Dropping custom application tables...';
 -- Order reversed based on FK dependencies to ensure tables are dropped before those they reference.
+DROP TABLE IF EXISTS [UploadedFile]; -- No FKs
 DROP TABLE IF EXISTS [Report]; -- FK to User, Product, Order
 DROP TABLE IF EXISTS [ReturnRequest]; -- FK to Order
+DROP TABLE IF EXISTS [SellerStats]; -- FK to User
 DROP TABLE IF EXISTS [Evaluation]; -- FK to Order, User
 DROP TABLE IF EXISTS [ChatMessage]; -- FK to User, Product - Note: ChatMessage FK to Transaction is in the original, updated FK is to Product.
 DROP TABLE IF EXISTS [UserFavorite]; -- FK to User, Product
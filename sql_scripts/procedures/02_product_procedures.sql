@@ -761,7 +761,7 @@ END;
 GO
 
 -- sp_DecreaseProductQuantity: 减少商品库存
--- 新增存储过程
+-- 库存检查与扣减在同一条 UPDATE 中完成 (WHERE Quantity >= @quantityToDecrease)，并发调用不会超卖
 DROP PROCEDURE IF EXISTS [sp_DecreaseProductQuantity];
 GO
 CREATE PROCEDURE [sp_DecreaseProductQuantity]
@@ -772,45 +772,27 @@ BEGIN
     SET NOCOUNT ON;
     SET XACT_ABORT ON; -- 遇到错误自动回滚
 
-    DECLARE @currentQuantity INT;
+    DECLARE @Updated TABLE (Quantity INT);
 
-    -- 检查商品是否存在并获取当前库存
-    SELECT @currentQuantity = Quantity FROM [Product] WHERE ProductID = @productId;
-
-    IF @currentQuantity IS NULL
-    BEGIN
-        RAISERROR('商品不存在', 16, 1);
-        RETURN;
-    END
+    -- 减少库存；单条 UPDATE (连同触发器) 本身是原子的，无需显式事务
+    -- 售罄时同时设为 Sold，触发器 tr_Product_AfterUpdate_QuantityStatus 无需再更新
+    UPDATE [Product]
+    SET Quantity = Quantity - @quantityToDecrease,
+        Status = CASE WHEN Quantity = @quantityToDecrease AND Status = 'Active' THEN 'Sold' ELSE Status END
+    OUTPUT inserted.Quantity INTO @Updated
+    WHERE ProductID = @productId AND Quantity >= @quantityToDecrease;
 
-    -- 检查库存是否足够
-    IF @currentQuantity < @quantityToDecrease
+    IF @@ROWCOUNT = 0
     BEGIN
-        RAISERROR('库存不足，无法减少指定数量', 16, 1);
+        IF NOT EXISTS (SELECT 1 FROM [Product] WHERE ProductID = @productId)
+            RAISERROR('商品不存在', 16, 1);
+        ELSE
+            RAISERROR('库存不足，无法减少指定数量', 16, 1);
         RETURN;
     END
 
-    BEGIN TRY
-        BEGIN TRANSACTION;
-
-        -- 减少库存
-        UPDATE [Product]
-        SET Quantity = Quantity - @quantityToDecrease
-        WHERE ProductID = @productId;
-
-        -- TODO: 触发器 tr_Product_AfterUpdate_QuantityStatus 会处理 Quantity=0 时状态变为Sold
-
-        COMMIT TRANSACTION;
-
-        -- 返回成功信息或新库存
-        SELECT '库存减少成功。' AS Result, Quantity AS 新库存 FROM [Product] WHERE ProductID = @productId;
-
-    END TRY
-    BEGIN CATCH
-        IF @@TRANCOUNT > 0
-            ROLLBACK TRANSACTION;
-        THROW;
-    END CATCH
+    -- 返回成功信息或新库存
+    SELECT '库存减少成功。' AS Result, Quantity AS 新库存 FROM @Updated;
 END;
 GO
 
@@ -2,8 +2,16 @@
  * 交易管理模块 - 订单存储过程
  */
 
+-- 订单状态变更类存储过程 (创建 / 确认 / 完成 / 拒绝 / 取消) 都在最后返回变更后的订单行，
+-- 列与 sp_GetOrdersByUser 一致 (TotalPrice, OrderStatus 等)，调用方无需再调用 sp_GetOrderById。
+-- [Order] 表上有触发器，OUTPUT 不能直接返回给客户端，先 OUTPUT INTO 表变量再查询。
+-- 状态前置条件写在 UPDATE 的 WHERE 中：并发修改时不会出现 "检查通过但更新时状态已变" 的情况；
+-- 只有没有行被更新时才再查一次订单，判断具体的失败原因。
+
 -- sp_CreateOrder: 创建新订单
--- 功能: 验证买家和商品信息，扣减库存，创建订单记录
+-- 功能: 验证买家，原子扣减库存，创建订单记录，返回新订单 (RemainingQuantity 为扣减后的库存)
+-- 库存检查与扣减在同一条 UPDATE 中完成 (WHERE Quantity >= @Quantity)，商品行的排他锁只在这条语句
+-- 到事务提交之间持有，不再先 SELECT ... WITH (UPDLOCK) 再调用 sp_DecreaseProductQuantity。
 DROP PROCEDURE IF EXISTS [sp_CreateOrder];
 GO
 CREATE PROCEDURE [sp_CreateOrder]
@@ -14,48 +22,61 @@ AS
 BEGIN
     SET NOCOUNT ON;
     DECLARE @ProductPrice DECIMAL(10, 2);
-    DECLARE @ProductStock INT;
     DECLARE @SellerID UNIQUEIDENTIFIER;
+    DECLARE @RemainingQuantity INT;
     DECLARE @OrderStatus NVARCHAR(50) = 'PendingSellerConfirmation'; -- 初始状态为待处理
     DECLARE @ErrorMessage NVARCHAR(4000);
+    DECLARE @Reserved TABLE (Price DECIMAL(10, 2), OwnerID UNIQUEIDENTIFIER, RemainingQuantity INT);
+    DECLARE @Result TABLE (
+        OrderID UNIQUEIDENTIFIER, SellerID UNIQUEIDENTIFIER, BuyerID UNIQUEIDENTIFIER, ProductID UNIQUEIDENTIFIER,
+        Quantity INT, Status NVARCHAR(50), CreateTime DATETIME, CompleteTime DATETIME, CancelTime DATETIME, CancelReason NVARCHAR(500)
+    );
 
     BEGIN TRY
         BEGIN TRANSACTION;
 
-        -- 检查买家是否存在
+        -- 检查买家是否存在 (在锁定商品行之前完成)
         IF NOT EXISTS (SELECT 1 FROM [User] WHERE UserID = @BuyerID)
         BEGIN
             SET @ErrorMessage = '创建订单失败：买家不存在。';
             THROW 50001, @ErrorMessage, 1;
         END
 
-        -- 获取商品信息并锁定商品行以防止并发问题
-        SELECT @ProductPrice = Price, @ProductStock = Quantity, @SellerID = OwnerID
-        FROM [Product]
-        WITH (UPDLOCK) -- 在事务中锁定行，直到事务结束
-        WHERE ProductID = @ProductID AND Status = 'Active';
+        -- 原子扣减库存：在售且库存充足时才更新
+        -- 售罄时同时把状态改为 Sold，触发器 tr_Product_AfterUpdate_QuantityStatus 无需再更新一次
+        UPDATE [Product]
+        SET Quantity = Quantity - @Quantity,
+            Status = CASE WHEN Quantity = @Quantity THEN 'Sold' ELSE Status END
+        OUTPUT inserted.Price, inserted.OwnerID, inserted.Quantity INTO @Reserved
+        WHERE ProductID = @ProductID AND Status = 'Active' AND Quantity >= @Quantity;
 
-        IF @ProductPrice IS NULL
+        IF @@ROWCOUNT = 0
         BEGIN
+            IF EXISTS (SELECT 1 FROM [Product] WHERE ProductID = @ProductID AND Status = 'Active')
+            BEGIN
+                SET @ErrorMessage = '创建订单失败：商品库存不足。';
+                THROW 50003, @ErrorMessage, 1;
+            END
+
             SET @ErrorMessage = '创建订单失败：商品不存在或非在售状态。';
             THROW 50002, @ErrorMessage, 1;
         END
 
-        -- 检查库存是否充足
-        IF @ProductStock < @Quantity
-        BEGIN
-            SET @ErrorMessage = '创建订单失败：商品库存不足。';
-            THROW 50003, @ErrorMessage, 1;
-        END
-
-        -- 扣减库存
-        EXEC sp_DecreaseProductQuantity @productId = @ProductID, @quantityToDecrease = @Quantity;
+        SELECT @ProductPrice = Price, @SellerID = OwnerID, @RemainingQuantity = RemainingQuantity FROM @Reserved;
 
         -- 创建订单
         INSERT INTO [Order] (OrderID, BuyerID, SellerID, ProductID, Quantity, CreateTime, Status)
+        OUTPUT inserted.OrderID, inserted.SellerID, inserted.BuyerID, inserted.ProductID, inserted.Quantity,
+               inserted.Status, inserted.CreateTime, inserted.CompleteTime, inserted.CancelTime, inserted.CancelReason
+        INTO @Result
         VALUES (NEWID(), @BuyerID, @SellerID, @ProductID, @Quantity, GETDATE(), @OrderStatus);
 
         COMMIT TRANSACTION;
+
+        SELECT R.OrderID, R.SellerID, R.BuyerID, R.ProductID, R.Quantity, R.Quantity * @ProductPrice AS TotalPrice,
+               R.Status AS OrderStatus, R.CreateTime, R.CompleteTime, R.CancelTime, R.CancelReason,
+               @RemainingQuantity AS RemainingQuantity
+        FROM @Result R;
     END TRY
     BEGIN CATCH
         IF @@TRANCOUNT > 0
@@ -67,7 +88,7 @@ END;
 GO
 
 -- sp_ConfirmOrder: 卖家确认订单
--- 功能: 卖家确认订单，订单状态变为 'Confirmed'
+-- 功能: 卖家确认订单，订单状态变为 'ConfirmedBySeller'，返回确认后的订单
 DROP PROCEDURE IF EXISTS [sp_ConfirmOrder];
 GO
 CREATE PROCEDURE [sp_ConfirmOrder]
@@ -78,29 +99,41 @@ BEGIN
     SET NOCOUNT ON;
     DECLARE @CurrentStatus NVARCHAR(50);
     DECLARE @ErrorMessage NVARCHAR(4000);
+    DECLARE @Result TABLE (
+        OrderID UNIQUEIDENTIFIER, SellerID UNIQUEIDENTIFIER, BuyerID UNIQUEIDENTIFIER, ProductID UNIQUEIDENTIFIER,
+        Quantity INT, Status NVARCHAR(50), CreateTime DATETIME, CompleteTime DATETIME, CancelTime DATETIME, CancelReason NVARCHAR(500)
+    );
 
     BEGIN TRY
         BEGIN TRANSACTION;
 
-        SELECT @CurrentStatus = Status FROM [Order] WHERE OrderID = @OrderID AND SellerID = @SellerID;
+        UPDATE [Order]
+        SET Status = 'ConfirmedBySeller'
+        OUTPUT inserted.OrderID, inserted.SellerID, inserted.BuyerID, inserted.ProductID, inserted.Quantity,
+               inserted.Status, inserted.CreateTime, inserted.CompleteTime, inserted.CancelTime, inserted.CancelReason
+        INTO @Result
+        WHERE OrderID = @OrderID AND SellerID = @SellerID AND Status = 'PendingSellerConfirmation';
 
-        IF @CurrentStatus IS NULL
+        IF @@ROWCOUNT = 0
         BEGIN
-            SET @ErrorMessage = '确认订单失败：订单不存在或您不是该订单的卖家。';
-            THROW 50004, @ErrorMessage, 1;
-        END
+            SELECT @CurrentStatus = Status FROM [Order] WHERE OrderID = @OrderID AND SellerID = @SellerID;
+
+            IF @CurrentStatus IS NULL
+            BEGIN
+                SET @ErrorMessage = '确认订单失败：订单不存在或您不是该订单的卖家。';
+                THROW 50004, @ErrorMessage, 1;
+            END
 
-        IF @CurrentStatus != 'PendingSellerConfirmation'
-        BEGIN
             SET @ErrorMessage = '确认订单失败：订单状态不是"待卖家确认"，无法确认。当前状态：' + @CurrentStatus;
             THROW 50005, @ErrorMessage, 1;
         END
 
-        UPDATE [Order]
-        SET Status = 'ConfirmedBySeller'
-        WHERE OrderID = @OrderID;
-
         COMMIT TRANSACTION;
+
+        SELECT R.OrderID, R.SellerID, R.BuyerID, R.ProductID, R.Quantity, R.Quantity * P.Price AS TotalPrice,
+               R.Status AS OrderStatus, R.CreateTime, R.CompleteTime, R.CancelTime, R.CancelReason
+        FROM @Result R
+        JOIN [Product] P ON P.ProductID = R.ProductID;
     END TRY
     BEGIN CATCH
         IF @@TRANCOUNT > 0
@@ -111,7 +144,7 @@ END;
 GO
 
 -- sp_CompleteOrder: 订单完成
--- 功能: 订单交易完成，状态变为 'Completed'
+-- 功能: 订单交易完成，状态变为 'Completed'，返回完成后的订单
 DROP PROCEDURE IF EXISTS [sp_CompleteOrder];
 GO
 CREATE PROCEDURE [sp_CompleteOrder]
@@ -122,43 +155,54 @@ BEGIN
     SET NOCOUNT ON;
     DECLARE @CurrentStatus NVARCHAR(50);
     DECLARE @BuyerID UNIQUEIDENTIFIER;
-    DECLARE @SellerID UNIQUEIDENTIFIER;
     DECLARE @IsAdmin BIT = 0;
     DECLARE @ErrorMessage NVARCHAR(4000);
+    DECLARE @Result TABLE (
+        OrderID UNIQUEIDENTIFIER, SellerID UNIQUEIDENTIFIER, BuyerID UNIQUEIDENTIFIER, ProductID UNIQUEIDENTIFIER,
+        Quantity INT, Status NVARCHAR(50), CreateTime DATETIME, CompleteTime DATETIME, CancelTime DATETIME, CancelReason NVARCHAR(500)
+    );
 
     BEGIN TRY
         BEGIN TRANSACTION;
 
-        SELECT @CurrentStatus = Status, @BuyerID = BuyerID, @SellerID = SellerID FROM [Order] WHERE OrderID = @OrderID;
-        
         IF EXISTS (SELECT 1 FROM [User] WHERE UserID = @ActorID AND IsStaff = 1)
             SET @IsAdmin = 1;
 
-        IF @CurrentStatus IS NULL
-        BEGIN
-            SET @ErrorMessage = '完成订单失败：订单不存在。';
-            THROW 50006, @ErrorMessage, 1;
-        END
+        UPDATE [Order]
+        SET Status = 'Completed', CompleteTime = GETDATE()
+        OUTPUT inserted.OrderID, inserted.SellerID, inserted.BuyerID, inserted.ProductID, inserted.Quantity,
+               inserted.Status, inserted.CreateTime, inserted.CompleteTime, inserted.CancelTime, inserted.CancelReason
+        INTO @Result
+        WHERE OrderID = @OrderID AND Status = 'ConfirmedBySeller' AND (BuyerID = @ActorID OR @IsAdmin = 1);
 
-        IF (@ActorID != @BuyerID AND @IsAdmin = 0)
+        IF @@ROWCOUNT = 0
         BEGIN
-            SET @ErrorMessage = '完成订单失败：您无权完成此订单。';
-            THROW 50007, @ErrorMessage, 1;
-        END
+            SELECT @CurrentStatus = Status, @BuyerID = BuyerID FROM [Order] WHERE OrderID = @OrderID;
+
+            IF @CurrentStatus IS NULL
+            BEGIN
+                SET @ErrorMessage = '完成订单失败：订单不存在。';
+                THROW 50006, @ErrorMessage, 1;
+            END
+
+            IF (@ActorID != @BuyerID AND @IsAdmin = 0)
+            BEGIN
+                SET @ErrorMessage = '完成订单失败：您无权完成此订单。';
+                THROW 50007, @ErrorMessage, 1;
+            END
 
-        IF @CurrentStatus NOT IN ('ConfirmedBySeller')
-        BEGIN
             SET @ErrorMessage = '完成订单失败：订单状态不正确，无法完成。当前状态：' + @CurrentStatus;
             THROW 50008, @ErrorMessage, 1;
         END
 
-        UPDATE [Order]
-        SET Status = 'Completed', CompleteTime = GETDATE()
-        WHERE OrderID = @OrderID;
-
         -- 注意：卖家信用分更新逻辑已移至触发器 tr_Order_AfterComplete_UpdateSellerCredit
 
         COMMIT TRANSACTION;
+
+        SELECT R.OrderID, R.SellerID, R.BuyerID, R.ProductID, R.Quantity, R.Quantity * P.Price AS TotalPrice,
+               R.Status AS OrderStatus, R.CreateTime, R.CompleteTime, R.CancelTime, R.CancelReason
+        FROM @Result R
+        JOIN [Product] P ON P.ProductID = R.ProductID;
     END TRY
     BEGIN CATCH
         IF @@TRANCOUNT > 0
@@ -169,7 +213,7 @@ END;
 GO
 
 -- sp_RejectOrder: 卖家拒绝订单
--- 功能: 卖家拒绝订单，订单状态变为 'Rejected'，库存需要恢复 (通过触发器实现)
+-- 功能: 卖家拒绝订单，订单状态变为 'Cancelled'，库存需要恢复 (通过触发器实现)，返回拒绝后的订单
 DROP PROCEDURE IF EXISTS [sp_RejectOrder];
 GO
 CREATE PROCEDURE [sp_RejectOrder]
@@ -181,33 +225,112 @@ BEGIN
     SET NOCOUNT ON;
     DECLARE @CurrentStatus NVARCHAR(50);
     DECLARE @ErrorMessage NVARCHAR(4000);
+    DECLARE @Result TABLE (
+        OrderID UNIQUEIDENTIFIER, SellerID UNIQUEIDENTIFIER, BuyerID UNIQUEIDENTIFIER, ProductID UNIQUEIDENTIFIER,
+        Quantity INT, Status NVARCHAR(50), CreateTime DATETIME, CompleteTime DATETIME, CancelTime DATETIME, CancelReason NVARCHAR(500)
+    );
 
     BEGIN TRY
         BEGIN TRANSACTION;
 
-        SELECT @CurrentStatus = Status FROM [Order] WHERE OrderID = @OrderID AND SellerID = @SellerID;
+        UPDATE [Order]
+        SET Status = 'Cancelled', CancelTime = GETDATE(), CancelReason = ISNULL(@RejectionReason, 'No reason provided.')
+        OUTPUT inserted.OrderID, inserted.SellerID, inserted.BuyerID, inserted.ProductID, inserted.Quantity,
+               inserted.Status, inserted.CreateTime, inserted.CompleteTime, inserted.CancelTime, inserted.CancelReason
+        INTO @Result
+        WHERE OrderID = @OrderID AND SellerID = @SellerID AND Status = 'PendingSellerConfirmation';
 
-        IF @CurrentStatus IS NULL
+        IF @@ROWCOUNT = 0
         BEGIN
-            SET @ErrorMessage = '拒绝订单失败：订单不存在或您不是该订单的卖家。';
-            THROW 50009, @ErrorMessage, 1;
-        END
+            SELECT @CurrentStatus = Status FROM [Order] WHERE OrderID = @OrderID AND SellerID = @SellerID;
+
+            IF @CurrentStatus IS NULL
+            BEGIN
+                SET @ErrorMessage = '拒绝订单失败：订单不存在或您不是该订单的卖家。';
+                THROW 50009, @ErrorMessage, 1;
+            END
 
-        IF @CurrentStatus != 'PendingSellerConfirmation'
-        BEGIN
             SET @ErrorMessage = '拒绝订单失败：订单状态不是"待处理"，无法拒绝。当前状态：' + @CurrentStatus;
             THROW 50010, @ErrorMessage, 1;
         END
 
-        UPDATE [Order]
-        SET Status = 'Cancelled', CancelTime = GETDATE(), CancelReason = ISNULL(@RejectionReason, 'No reason provided.')
-        WHERE OrderID = @OrderID;
-
         -- 库存恢复逻辑已移至触发器 tr_Order_AfterCancel_RestoreQuantity (假设 Rejected 和 Cancelled 都触发库存恢复)
         -- 如果 Rejected 状态的库存恢复逻辑不同，需要单独的触发器或在此处处理。
         -- 根据设计文档，tr_Order_AfterCancel_RestoreQuantity 应该处理 'Cancelled' 和 'Rejected' 状态。
 
         COMMIT TRANSACTION;
+
+        SELECT R.OrderID, R.SellerID, R.BuyerID, R.ProductID, R.Quantity, R.Quantity * P.Price AS TotalPrice,
+               R.Status AS OrderStatus, R.CreateTime, R.CompleteTime, R.CancelTime, R.CancelReason
+        FROM @Result R
+        JOIN [Product] P ON P.ProductID = R.ProductID;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        THROW;
+    END CATCH
+END;
+GO
+
+-- sp_CancelOrder: 买家或卖家取消订单
+-- 功能: 待卖家确认或卖家已确认的订单可由买卖双方取消，状态变为 'Cancelled'，库存由触发器恢复，返回取消后的订单
+DROP PROCEDURE IF EXISTS [sp_CancelOrder];
+GO
+CREATE PROCEDURE [sp_CancelOrder]
+    @OrderID UNIQUEIDENTIFIER,
+    @UserID UNIQUEIDENTIFIER,
+    @CancelReason NVARCHAR(500)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @CurrentStatus NVARCHAR(50);
+    DECLARE @BuyerID UNIQUEIDENTIFIER;
+    DECLARE @SellerID UNIQUEIDENTIFIER;
+    DECLARE @ErrorMessage NVARCHAR(4000);
+    DECLARE @Result TABLE (
+        OrderID UNIQUEIDENTIFIER, SellerID UNIQUEIDENTIFIER, BuyerID UNIQUEIDENTIFIER, ProductID UNIQUEIDENTIFIER,
+        Quantity INT, Status NVARCHAR(50), CreateTime DATETIME, CompleteTime DATETIME, CancelTime DATETIME, CancelReason NVARCHAR(500)
+    );
+
+    BEGIN TRY
+        BEGIN TRANSACTION;
+
+        UPDATE [Order]
+        SET Status = 'Cancelled', CancelTime = GETDATE(), CancelReason = @CancelReason
+        OUTPUT inserted.OrderID, inserted.SellerID, inserted.BuyerID, inserted.ProductID, inserted.Quantity,
+               inserted.Status, inserted.CreateTime, inserted.CompleteTime, inserted.CancelTime, inserted.CancelReason
+        INTO @Result
+        WHERE OrderID = @OrderID
+          AND (BuyerID = @UserID OR SellerID = @UserID)
+          AND Status IN ('PendingSellerConfirmation', 'ConfirmedBySeller');
+
+        IF @@ROWCOUNT = 0
+        BEGIN
+            SELECT @CurrentStatus = Status, @BuyerID = BuyerID, @SellerID = SellerID FROM [Order] WHERE OrderID = @OrderID;
+
+            IF @CurrentStatus IS NULL
+            BEGIN
+                SET @ErrorMessage = '取消订单失败：订单不存在。';
+                THROW 50016, @ErrorMessage, 1;
+            END
+
+            IF (@UserID != @BuyerID AND @UserID != @SellerID)
+            BEGIN
+                SET @ErrorMessage = '取消订单失败：您无权取消此订单。';
+                THROW 50017, @ErrorMessage, 1;
+            END
+
+            SET @ErrorMessage = '取消订单失败：订单状态不正确，无法取消。当前状态：' + @CurrentStatus;
+            THROW 50018, @ErrorMessage, 1;
+        END
+
+        COMMIT TRANSACTION;
+
+        SELECT R.OrderID, R.SellerID, R.BuyerID, R.ProductID, R.Quantity, R.Quantity * P.Price AS TotalPrice,
+               R.Status AS OrderStatus, R.CreateTime, R.CompleteTime, R.CancelTime, R.CancelReason
+        FROM @Result R
+        JOIN [Product] P ON P.ProductID = R.ProductID;
     END TRY
     BEGIN CATCH
         IF @@TRANCOUNT > 0
@@ -230,7 +353,7 @@ BEGIN
 
     IF @UserRole = 'Buyer'
     BEGIN
-        SELECT O.OrderID, O.ProductID, P.ProductName, O.Quantity, O.Quantity * P.Price AS TotalPrice, O.Status AS OrderStatus, O.CreateTime, O.CompleteTime, O.CancelTime, O.SellerID, US.UserName AS SellerUsername
+        SELECT O.OrderID, O.ProductID, P.ProductName, O.Quantity, O.Quantity * P.Price AS TotalPrice, O.Status AS OrderStatus, O.CreateTime, O.CompleteTime, O.CancelTime, O.CancelReason, O.SellerID, O.BuyerID, US.UserName AS SellerUsername
         FROM [Order] O
         JOIN [Product] P ON O.ProductID = P.ProductID
         JOIN [User] US ON O.SellerID = US.UserID
@@ -239,7 +362,7 @@ BEGIN
     END
     ELSE IF @UserRole = 'Seller'
     BEGIN
-        SELECT O.OrderID, O.ProductID, P.ProductName, O.Quantity, O.Quantity * P.Price AS TotalPrice, O.Status AS OrderStatus, O.CreateTime, O.CompleteTime, O.CancelTime, O.BuyerID, UB.UserName AS BuyerUsername
+        SELECT O.OrderID, O.ProductID, P.ProductName, O.Quantity, O.Quantity * P.Price AS TotalPrice, O.Status AS OrderStatus, O.CreateTime, O.CompleteTime, O.CancelTime, O.CancelReason, O.SellerID, O.BuyerID, UB.UserName AS BuyerUsername
         FROM [Order] O
         JOIN [Product] P ON O.ProductID = P.ProductID
         JOIN [User] UB ON O.BuyerID = UB.UserID
@@ -252,4 +375,88 @@ BEGIN
         THROW 50011, @ErrorMessage, 1;
     END
 END;
-GO
\ No newline at end of file
+GO
+
+-- sp_GetOrderHistory: 订单历史页 (只读)
+-- 功能: 一次调用返回两个结果集，订单历史页只需一次数据库往返:
+--   1. 当前用户作为买家 / 卖家时各状态的订单数 (Role, OrderStatus, OrderCount)，用于买家 / 卖家标签页的计数；
+--   2. 一页订单摘要：订单字段 + 商品快照 (名称、单价、主图) + 对方用户名。
+-- 分页使用 keyset (CreateTime DESC, OrderID DESC)：调用方传入上一页最后一行的 CreateTime / OrderID，
+-- 不使用 OFFSET，翻到后面的页也只读取一页的行 (索引 IX_Order_Buyer_CreateTime / IX_Order_Seller_CreateTime)。
+-- 返回 @PageSize + 1 行，多出的一行表示还有下一页。
+DROP PROCEDURE IF EXISTS [sp_GetOrderHistory];
+GO
+CREATE PROCEDURE [sp_GetOrderHistory]
+    @UserID UNIQUEIDENTIFIER,
+    @AsSeller BIT = 0,
+    @Status NVARCHAR(50) = NULL,          -- NULL 表示全部状态
+    @PageSize INT = 20,
+    @AfterCreateTime DATETIME = NULL,     -- 上一页最后一行的 CreateTime，NULL 表示第一页
+    @AfterOrderID UNIQUEIDENTIFIER = NULL -- 上一页最后一行的 OrderID
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- 第一页：从最大时间开始，下面的 keyset 条件对所有行成立
+    IF @AfterCreateTime IS NULL
+    BEGIN
+        SET @AfterCreateTime = '9999-12-31T23:59:59.997';
+        SET @AfterOrderID = NULL;
+    END
+
+    -- 结果集 1: 各标签页的状态计数
+    SELECT 'Buyer' AS Role, O.Status AS OrderStatus, COUNT(*) AS OrderCount
+    FROM [Order] O
+    WHERE O.BuyerID = @UserID
+    GROUP BY O.Status
+    UNION ALL
+    SELECT 'Seller' AS Role, O.Status AS OrderStatus, COUNT(*) AS OrderCount
+    FROM [Order] O
+    WHERE O.SellerID = @UserID
+    GROUP BY O.Status;
+
+    -- 结果集 2: 一页订单摘要 (买家 / 卖家分开写，各自按索引定位)
+    IF @AsSeller = 1
+    BEGIN
+        SELECT TOP (@PageSize + 1)
+            O.OrderID, O.SellerID, O.BuyerID, O.ProductID, O.Quantity, O.Quantity * P.Price AS TotalPrice,
+            O.Status AS OrderStatus, O.CreateTime, O.CompleteTime, O.CancelTime, O.CancelReason,
+            P.ProductName, P.Price AS UnitPrice, MI.ImageURL AS MainImageURL,
+            O.BuyerID AS CounterpartID, U.UserName AS CounterpartUsername
+        FROM [Order] O
+        JOIN [Product] P ON O.ProductID = P.ProductID
+        JOIN [User] U ON O.BuyerID = U.UserID
+        OUTER APPLY (
+            SELECT TOP 1 PI.ImageURL FROM [ProductImage] PI
+            WHERE PI.ProductID = O.ProductID
+            ORDER BY PI.SortOrder, PI.UploadTime
+        ) MI
+        WHERE O.SellerID = @UserID
+          AND (@Status IS NULL OR O.Status = @Status)
+          AND O.CreateTime <= @AfterCreateTime
+          AND (O.CreateTime < @AfterCreateTime OR @AfterOrderID IS NULL OR O.OrderID < @AfterOrderID)
+        ORDER BY O.CreateTime DESC, O.OrderID DESC;
+    END
+    ELSE
+    BEGIN
+        SELECT TOP (@PageSize + 1)
+            O.OrderID, O.SellerID, O.BuyerID, O.ProductID, O.Quantity, O.Quantity * P.Price AS TotalPrice,
+            O.Status AS OrderStatus, O.CreateTime, O.CompleteTime, O.CancelTime, O.CancelReason,
+            P.ProductName, P.Price AS UnitPrice, MI.ImageURL AS MainImageURL,
+            O.SellerID AS CounterpartID, U.UserName AS CounterpartUsername
+        FROM [Order] O
+        JOIN [Product] P ON O.ProductID = P.ProductID
+        JOIN [User] U ON O.SellerID = U.UserID
+        OUTER APPLY (
+            SELECT TOP 1 PI.ImageURL FROM [ProductImage] PI
+            WHERE PI.ProductID = O.ProductID
+            ORDER BY PI.SortOrder, PI.UploadTime
+        ) MI
+        WHERE O.BuyerID = @UserID
+          AND (@Status IS NULL OR O.Status = @Status)
+          AND O.CreateTime <= @AfterCreateTime
+          AND (O.CreateTime < @AfterCreateTime OR @AfterOrderID IS NULL OR O.OrderID < @AfterOrderID)
+        ORDER BY O.CreateTime DESC, O.OrderID DESC;
+    END
+END;
+GO
@@ -67,4 +67,192 @@ BEGIN
         THROW;
     END CATCH
 END;
-GO
\ No newline at end of file
+GO
+
+-- sp_GetSellerReputation: 获取卖家信誉汇总 (只读)
+-- 功能: 返回卖家的信用分与评价汇总 (评价数、评分之和、各星级数量、最近评价时间)。
+-- 汇总由触发器 tr_Evaluation_AfterChange_UpdateSellerStats 维护，这里只按主键读取一行，不扫描 Evaluation。
+-- 卖家没有收到过评价时各计数为 0；用户不存在时不返回行。
+DROP PROCEDURE IF EXISTS [sp_GetSellerReputation];
+GO
+CREATE PROCEDURE [sp_GetSellerReputation]
+    @SellerID UNIQUEIDENTIFIER
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    SELECT U.UserID AS SellerID,
+           U.Credit,
+           ISNULL(S.EvaluationCount, 0) AS EvaluationCount,
+           ISNULL(S.RatingSum, 0) AS RatingSum,
+           ISNULL(S.Rating1Count, 0) AS Rating1Count,
+           ISNULL(S.Rating2Count, 0) AS Rating2Count,
+           ISNULL(S.Rating3Count, 0) AS Rating3Count,
+           ISNULL(S.Rating4Count, 0) AS Rating4Count,
+           ISNULL(S.Rating5Count, 0) AS Rating5Count,
+           S.LastEvaluationTime
+    FROM [User] U
+    LEFT JOIN [SellerStats] S ON S.SellerID = U.UserID
+    WHERE U.UserID = @SellerID;
+END;
+GO
+
+-- sp_RecomputeSellerStats: 按 Evaluation 重算卖家评价汇总
+-- 功能: 回填已有评价 (部署 SellerStats 之前的数据) 或修正不一致的汇总。
+--       @SellerID 为 NULL 时重算所有卖家，否则只重算该卖家；返回被写入 / 删除的汇总行数。
+-- 重算前先锁住要覆盖的汇总行 (全部重算时锁整张表)，期间新评价的触发器等待重算提交后再累加，增量不会被覆盖。
+DROP PROCEDURE IF EXISTS [sp_RecomputeSellerStats];
+GO
+CREATE PROCEDURE [sp_RecomputeSellerStats]
+    @SellerID UNIQUEIDENTIFIER = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Locked INT;
+    DECLARE @Affected INT;
+
+    BEGIN TRY
+        BEGIN TRANSACTION;
+
+        IF @SellerID IS NULL
+            SELECT @Locked = COUNT(*) FROM [SellerStats] WITH (TABLOCKX, HOLDLOCK);
+        ELSE
+            SELECT @Locked = COUNT(*) FROM [SellerStats] WITH (UPDLOCK, HOLDLOCK) WHERE SellerID = @SellerID;
+
+        MERGE [SellerStats] WITH (HOLDLOCK) AS T
+        USING (
+            SELECT E.SellerID, COUNT(*) AS EvaluationCount, SUM(E.Rating) AS RatingSum,
+                   SUM(CASE WHEN E.Rating = 1 THEN 1 ELSE 0 END) AS Rating1Count,
+                   SUM(CASE WHEN E.Rating = 2 THEN 1 ELSE 0 END) AS Rating2Count,
+                   SUM(CASE WHEN E.Rating = 3 THEN 1 ELSE 0 END) AS Rating3Count,
+                   SUM(CASE WHEN E.Rating = 4 THEN 1 ELSE 0 END) AS Rating4Count,
+                   SUM(CASE WHEN E.Rating = 5 THEN 1 ELSE 0 END) AS Rating5Count,
+                   MAX(E.CreateTime) AS LastEvaluationTime
+            FROM [Evaluation] E
+            WHERE @SellerID IS NULL OR E.SellerID = @SellerID
+            GROUP BY E.SellerID
+        ) AS S
+        ON T.SellerID = S.SellerID
+        WHEN MATCHED THEN
+            UPDATE SET T.EvaluationCount = S.EvaluationCount, T.RatingSum = S.RatingSum,
+                       T.Rating1Count = S.Rating1Count, T.Rating2Count = S.Rating2Count, T.Rating3Count = S.Rating3Count,
+                       T.Rating4Count = S.Rating4Count, T.Rating5Count = S.Rating5Count,
+                       T.LastEvaluationTime = S.LastEvaluationTime, T.UpdateTime = GETDATE()
+        WHEN NOT MATCHED BY TARGET THEN
+            INSERT (SellerID, EvaluationCount, RatingSum, Rating1Count, Rating2Count, Rating3Count,
+                    Rating4Count, Rating5Count, LastEvaluationTime, UpdateTime)
+            VALUES (S.SellerID, S.EvaluationCount, S.RatingSum, S.Rating1Count, S.Rating2Count, S.Rating3Count,
+                    S.Rating4Count, S.Rating5Count, S.LastEvaluationTime, GETDATE())
+        WHEN NOT MATCHED BY SOURCE AND (@SellerID IS NULL OR T.SellerID = @SellerID) THEN
+            DELETE;
+
+        SET @Affected = @@ROWCOUNT;
+
+        COMMIT TRANSACTION;
+
+        SELECT @Affected AS AffectedSellers;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        THROW;
+    END CATCH
+END;
+GO
+
+-- sp_GetEvaluationPage: 评价列表分页 (只读)
+-- 功能: 按商品 / 买家 / 卖家列出评价，可按评分范围过滤。一次调用返回两个结果集:
+--   1. 汇总：符合条件的评价数与评分之和 (平均分 = RatingSum / EvaluationCount)；
+--      卖家且不过滤评分时直接读取 SellerStats，其它情况由索引 IX_Evaluation_Seller_CreateTime /
+--      IX_Evaluation_Buyer_CreateTime / IX_Order_ProductID 计算；
+--   2. 一页评价，按 (CreateTime DESC, EvaluationID DESC) 做 keyset 分页，返回 @PageSize + 1 行，
+--      多出的一行表示还有下一页。调用方传入上一页最后一行的 CreateTime / EvaluationID。
+DROP PROCEDURE IF EXISTS [sp_GetEvaluationPage];
+GO
+CREATE PROCEDURE [sp_GetEvaluationPage]
+    @Scope NVARCHAR(10),                       -- 'Product' / 'Buyer' / 'Seller'
+    @OwnerID UNIQUEIDENTIFIER,                 -- 商品ID / 买家ID / 卖家ID
+    @MinRating INT = NULL,                     -- NULL 表示不限
+    @MaxRating INT = NULL,
+    @PageSize INT = 20,
+    @AfterCreateTime DATETIME = NULL,          -- 上一页最后一行的 CreateTime，NULL 表示第一页
+    @AfterEvaluationID UNIQUEIDENTIFIER = NULL -- 上一页最后一行的 EvaluationID
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @ErrorMessage NVARCHAR(4000);
+
+    IF @Scope NOT IN ('Product', 'Buyer', 'Seller')
+    BEGIN
+        SET @ErrorMessage = '获取评价失败：无效的查询范围。';
+        THROW 50019, @ErrorMessage, 1;
+    END
+
+    SET @MinRating = ISNULL(@MinRating, 1);
+    SET @MaxRating = ISNULL(@MaxRating, 5);
+
+    -- 第一页：从最大时间开始，下面的 keyset 条件对所有行成立
+    IF @AfterCreateTime IS NULL
+    BEGIN
+        SET @AfterCreateTime = '9999-12-31T23:59:59.997';
+        SET @AfterEvaluationID = NULL;
+    END
+
+    -- 结果集 1: 汇总
+    IF @Scope = 'Seller' AND @MinRating <= 1 AND @MaxRating >= 5
+        SELECT ISNULL(S.EvaluationCount, 0) AS EvaluationCount, ISNULL(S.RatingSum, 0) AS RatingSum
+        FROM (SELECT @OwnerID AS SellerID) X
+        LEFT JOIN [SellerStats] S ON S.SellerID = X.SellerID;
+    ELSE IF @Scope = 'Seller'
+        SELECT COUNT(*) AS EvaluationCount, ISNULL(SUM(E.Rating), 0) AS RatingSum
+        FROM [Evaluation] E
+        WHERE E.SellerID = @OwnerID AND E.Rating BETWEEN @MinRating AND @MaxRating;
+    ELSE IF @Scope = 'Buyer'
+        SELECT COUNT(*) AS EvaluationCount, ISNULL(SUM(E.Rating), 0) AS RatingSum
+        FROM [Evaluation] E
+        WHERE E.BuyerID = @OwnerID AND E.Rating BETWEEN @MinRating AND @MaxRating;
+    ELSE
+        SELECT COUNT(*) AS EvaluationCount, ISNULL(SUM(E.Rating), 0) AS RatingSum
+        FROM [Order] O
+        JOIN [Evaluation] E ON E.OrderID = O.OrderID
+        WHERE O.ProductID = @OwnerID AND E.Rating BETWEEN @MinRating AND @MaxRating;
+
+    -- 结果集 2: 一页评价 (按范围分开写，各自按索引定位)
+    IF @Scope = 'Seller'
+    BEGIN
+        SELECT TOP (@PageSize + 1)
+            E.EvaluationID, E.OrderID, O.ProductID, E.BuyerID, E.SellerID, E.Rating, E.Content, E.CreateTime
+        FROM [Evaluation] E
+        JOIN [Order] O ON E.OrderID = O.OrderID
+        WHERE E.SellerID = @OwnerID
+          AND E.Rating BETWEEN @MinRating AND @MaxRating
+          AND E.CreateTime <= @AfterCreateTime
+          AND (E.CreateTime < @AfterCreateTime OR @AfterEvaluationID IS NULL OR E.EvaluationID < @AfterEvaluationID)
+        ORDER BY E.CreateTime DESC, E.EvaluationID DESC;
+    END
+    ELSE IF @Scope = 'Buyer'
+    BEGIN
+        SELECT TOP (@PageSize + 1)
+            E.EvaluationID, E.OrderID, O.ProductID, E.BuyerID, E.SellerID, E.Rating, E.Content, E.CreateTime
+        FROM [Evaluation] E
+        JOIN [Order] O ON E.OrderID = O.OrderID
+        WHERE E.BuyerID = @OwnerID
+          AND E.Rating BETWEEN @MinRating AND @MaxRating
+          AND E.CreateTime <= @AfterCreateTime
+          AND (E.CreateTime < @AfterCreateTime OR @AfterEvaluationID IS NULL OR E.EvaluationID < @AfterEvaluationID)
+        ORDER BY E.CreateTime DESC, E.EvaluationID DESC;
+    END
+    ELSE
+    BEGIN
+        SELECT TOP (@PageSize + 1)
+            E.EvaluationID, E.OrderID, O.ProductID, E.BuyerID, E.SellerID, E.Rating, E.Content, E.CreateTime
+        FROM [Evaluation] E
+        JOIN [Order] O ON E.OrderID = O.OrderID
+        WHERE O.ProductID = @OwnerID
+          AND E.Rating BETWEEN @MinRating AND @MaxRating
+          AND E.CreateTime <= @AfterCreateTime
+          AND (E.CreateTime < @AfterCreateTime OR @AfterEvaluationID IS NULL OR E.EvaluationID < @AfterEvaluationID)
+        ORDER BY E.CreateTime DESC, E.EvaluationID DESC;
+    END
+END;
+GO
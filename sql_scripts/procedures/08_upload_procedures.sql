@@ -0,0 +1,126 @@
+/*
+ * 上传文件管理模块 - 存储过程
+ * 功能: 内容寻址存储的文件登记、引用计数重算、未引用文件查询与清理
+ * 注意: 文件实际写入/删除在应用层处理，这里只记录元数据
+ */
+
+-- sp_RegisterUploadedFile: 登记一次上传 (相同URL的文件只保留一条记录)
+-- 输入: @fileHash CHAR(64), @fileUrl NVARCHAR(255), @fileSize BIGINT
+-- 输出: 文件记录及是否为新文件
+DROP PROCEDURE IF EXISTS [sp_RegisterUploadedFile];
+GO
+CREATE PROCEDURE [sp_RegisterUploadedFile]
+    @fileHash CHAR(64),
+    @fileUrl NVARCHAR(255),
+    @fileSize BIGINT
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+
+    DECLARE @isNew BIT = 0;
+
+    BEGIN TRY
+        BEGIN TRANSACTION;
+
+        -- UPDLOCK + HOLDLOCK 防止并发上传相同内容时重复插入
+        UPDATE [UploadedFile] WITH (UPDLOCK, HOLDLOCK)
+        SET UploadCount = UploadCount + 1,
+            LastUploadTime = GETDATE()
+        WHERE FileUrl = @fileUrl;
+
+        IF @@ROWCOUNT = 0
+        BEGIN
+            INSERT INTO [UploadedFile] (FileHash, FileUrl, FileSize)
+            VALUES (@fileHash, @fileUrl, @fileSize);
+            SET @isNew = 1;
+        END
+
+        COMMIT TRANSACTION;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        THROW;
+    END CATCH
+
+    SELECT
+        UploadedFileID AS 文件ID,
+        FileHash AS 文件哈希,
+        FileUrl AS 文件URL,
+        FileSize AS 文件大小,
+        RefCount AS 引用次数,
+        UploadCount AS 上传次数,
+        @isNew AS 是否新文件
+    FROM [UploadedFile]
+    WHERE FileUrl = @fileUrl;
+END;
+GO
+
+-- sp_RecalculateUploadRefCounts: 根据 ProductImage 与 User.AvatarUrl 的实际引用重算引用计数
+-- 用于迁移之后或触发器被禁用期间的数据修复
+DROP PROCEDURE IF EXISTS [sp_RecalculateUploadRefCounts];
+GO
+CREATE PROCEDURE [sp_RecalculateUploadRefCounts]
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    UPDATE uf
+    SET RefCount = ISNULL(refs.Cnt, 0)
+    FROM [UploadedFile] uf
+    LEFT JOIN (
+        SELECT FileUrl, COUNT(*) AS Cnt
+        FROM (
+            SELECT ImageURL AS FileUrl FROM [ProductImage]
+            UNION ALL
+            SELECT AvatarUrl FROM [User] WHERE AvatarUrl IS NOT NULL
+        ) AS AllRefs
+        GROUP BY FileUrl
+    ) AS refs ON refs.FileUrl = uf.FileUrl;
+
+    SELECT @@ROWCOUNT AS 更新记录数;
+END;
+GO
+
+-- sp_GetUnreferencedUploads: 获取没有任何引用、且超过宽限期的文件
+-- 输入: @graceHours INT (上传后多少小时内不视为孤立文件，给前端留出提交表单的时间)
+-- 输出: 文件列表
+DROP PROCEDURE IF EXISTS [sp_GetUnreferencedUploads];
+GO
+CREATE PROCEDURE [sp_GetUnreferencedUploads]
+    @graceHours INT = 24
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    SELECT
+        UploadedFileID AS 文件ID,
+        FileHash AS 文件哈希,
+        FileUrl AS 文件URL,
+        FileSize AS 文件大小,
+        LastUploadTime AS 最近上传时间
+    FROM [UploadedFile]
+    WHERE RefCount = 0
+      AND LastUploadTime < DATEADD(HOUR, -@graceHours, GETDATE())
+    ORDER BY LastUploadTime ASC;
+END;
+GO
+
+-- sp_DeleteUploadedFile: 删除未被引用的文件记录
+-- 输入: @fileUrl NVARCHAR(255)
+-- 输出: 受影响行数 (文件重新被引用时为 0，应用层据此决定是否删除物理文件)
+DROP PROCEDURE IF EXISTS [sp_DeleteUploadedFile];
+GO
+CREATE PROCEDURE [sp_DeleteUploadedFile]
+    @fileUrl NVARCHAR(255)
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    DELETE FROM [UploadedFile]
+    WHERE FileUrl = @fileUrl AND RefCount = 0;
+
+    SELECT @@ROWCOUNT AS 删除记录数;
+END;
+GO
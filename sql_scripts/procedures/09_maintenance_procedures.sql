@@ -0,0 +1,101 @@
+/*
+ * 后台维护 - 存储过程
+ * 功能: 分批清理过期 OTP、过期密码重置 Token 与旧的已读通知；维护任务的单实例 (leader) 锁
+ * 注意: 每次调用只删除一批 (DELETE TOP (@BatchSize))，由应用层循环调用并在批次之间暂停。
+ *       每批在 autocommit 下各自提交，事务短、持有的行锁少 (批量保持在 5000 以下，不会升级为表锁)，
+ *       不会长时间阻塞登录、找回密码等请求。
+ */
+
+-- 找回密码 Token 表在 01_user_procedures.sql 中创建，这里补充按过期时间清理使用的索引
+IF OBJECT_ID('[dbo].[PasswordResetTokens]') IS NOT NULL
+   AND NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'IX_PasswordResetTokens_ExpiresAt' AND object_id = OBJECT_ID('[dbo].[PasswordResetTokens]'))
+    CREATE INDEX IX_PasswordResetTokens_ExpiresAt ON [dbo].[PasswordResetTokens] ([ExpiresAt]);
+GO
+
+-- sp_TryAcquireMaintenanceLeader: 尝试成为维护任务的 leader
+-- 功能: 在当前会话上以 Session 所有者获取排他应用锁 (不等待)。多个应用进程中只有持有锁的一个执行维护任务；
+--       该进程退出或连接断开时锁自动释放，其它进程在下一轮获取。已持有时直接返回 1 (可作为连接健康检查)。
+-- 输出: IsLeader (1 = 持有锁)
+DROP PROCEDURE IF EXISTS [sp_TryAcquireMaintenanceLeader];
+GO
+CREATE PROCEDURE [sp_TryAcquireMaintenanceLeader]
+    @Resource NVARCHAR(255)
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Result INT;
+
+    IF APPLOCK_MODE('public', @Resource, 'Session') = 'Exclusive'
+    BEGIN
+        SELECT 1 AS IsLeader;
+        RETURN;
+    END
+
+    EXEC @Result = sp_getapplock @Resource = @Resource, @LockMode = 'Exclusive', @LockOwner = 'Session', @LockTimeout = 0;
+    SELECT CASE WHEN @Result >= 0 THEN 1 ELSE 0 END AS IsLeader;
+END;
+GO
+
+-- sp_PurgeExpiredOtps: 删除一批已过期或已使用的 OTP
+-- 输入: @BatchSize 每批行数, @GraceHours 过期 / 使用后保留的小时数
+-- 输出: Purged 本批删除的行数 (小于 @BatchSize 表示已清理完)
+DROP PROCEDURE IF EXISTS [sp_PurgeExpiredOtps];
+GO
+CREATE PROCEDURE [sp_PurgeExpiredOtps]
+    @BatchSize INT = 1000,
+    @GraceHours INT = 24
+AS
+BEGIN
+    SET NOCOUNT ON;
+    -- OTP 的 ExpiresAt 按 UTC 写入 (见 sp_GetOtpDetailsAndValidate)
+    DECLARE @Cutoff DATETIME = DATEADD(HOUR, -@GraceHours, GETUTCDATE());
+
+    DELETE TOP (@BatchSize) FROM [Otp]
+    WHERE ExpiresAt < @Cutoff
+       OR (IsUsed = 1 AND CreationTime < @Cutoff);
+
+    SELECT @@ROWCOUNT AS Purged;
+END;
+GO
+
+-- sp_PurgeExpiredPasswordResetTokens: 删除一批已过期或已使用的密码重置 Token
+-- 输入: @BatchSize 每批行数, @GraceHours 过期 / 使用后保留的小时数
+-- 输出: Purged 本批删除的行数
+DROP PROCEDURE IF EXISTS [sp_PurgeExpiredPasswordResetTokens];
+GO
+CREATE PROCEDURE [sp_PurgeExpiredPasswordResetTokens]
+    @BatchSize INT = 1000,
+    @GraceHours INT = 24
+AS
+BEGIN
+    SET NOCOUNT ON;
+    -- Token 的 ExpiresAt 按服务器本地时间写入
+    DECLARE @Cutoff DATETIME = DATEADD(HOUR, -@GraceHours, GETDATE());
+
+    DELETE TOP (@BatchSize) FROM [PasswordResetTokens]
+    WHERE ExpiresAt < @Cutoff
+       OR (Used = 1 AND CreatedAt < @Cutoff);
+
+    SELECT @@ROWCOUNT AS Purged;
+END;
+GO
+
+-- sp_PurgeReadNotifications: 删除一批创建时间早于保留期的已读通知
+-- 输入: @BatchSize 每批行数, @RetentionDays 已读通知的保留天数
+-- 输出: Purged 本批删除的行数
+DROP PROCEDURE IF EXISTS [sp_PurgeReadNotifications];
+GO
+CREATE PROCEDURE [sp_PurgeReadNotifications]
+    @BatchSize INT = 1000,
+    @RetentionDays INT = 90
+AS
+BEGIN
+    SET NOCOUNT ON;
+    DECLARE @Cutoff DATETIME = DATEADD(DAY, -@RetentionDays, GETDATE());
+
+    DELETE TOP (@BatchSize) FROM [SystemNotification]
+    WHERE IsRead = 1 AND CreateTime < @Cutoff;
+
+    SELECT @@ROWCOUNT AS Purged;
+END;
+GO
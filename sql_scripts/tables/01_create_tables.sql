@@ -60,6 +60,10 @@ CREATE TABLE [ProductImage] (
 );
 GO
 
+-- 按商品取主图 (SortOrder 最小的图片)，订单历史列表逐行查找
+CREATE INDEX IX_ProductImage_ProductID_SortOrder ON [ProductImage] ([ProductID], [SortOrder], [UploadTime]) INCLUDE ([ImageURL]);
+GO
+
 -- 4. 订单表 (Order)
 -- 记录用户之间的交易订单信息。
 CREATE TABLE [Order] (
@@ -85,6 +89,15 @@ CREATE TABLE [Order] (
 );
 GO
 
+-- 订单历史按 (用户, 创建时间, 订单ID) 倒序做 keyset 分页，并按状态统计数量 (见 sp_GetOrderHistory)
+CREATE INDEX IX_Order_Buyer_CreateTime ON [Order] ([BuyerID], [CreateTime] DESC, [OrderID] DESC) INCLUDE ([Status]);
+GO
+CREATE INDEX IX_Order_Seller_CreateTime ON [Order] ([SellerID], [CreateTime] DESC, [OrderID] DESC) INCLUDE ([Status]);
+GO
+-- 按商品查找订单 (商品评价列表经订单关联到评价)
+CREATE INDEX IX_Order_ProductID ON [Order] ([ProductID]);
+GO
+
 -- 5. 评价表 (Evaluation)
 -- 专门用于构建卖家交易名片和信任度的评价。
 -- 买家对同一订单只能评价一次。评价对象是卖家,OrderID 是评价的上下文
@@ -106,6 +119,31 @@ CREATE TABLE [Evaluation] (
 );
 GO
 
+-- 卖家评价汇总 (SellerStats)
+-- 由触发器 tr_Evaluation_AfterChange_UpdateSellerStats 随评价增量维护，查看卖家信誉时只读一行，
+-- 不再扫描 Evaluation。历史数据或怀疑不一致时用 sp_RecomputeSellerStats 重算。
+CREATE TABLE [SellerStats] (
+    [SellerID] UNIQUEIDENTIFIER PRIMARY KEY,                    -- 卖家用户ID，主键
+    [EvaluationCount] INT NOT NULL DEFAULT 0,                   -- 收到的评价数
+    [RatingSum] INT NOT NULL DEFAULT 0,                         -- 评分之和 (平均分 = RatingSum / EvaluationCount)
+    [Rating1Count] INT NOT NULL DEFAULT 0,                      -- 1 星评价数
+    [Rating2Count] INT NOT NULL DEFAULT 0,                      -- 2 星评价数
+    [Rating3Count] INT NOT NULL DEFAULT 0,                      -- 3 星评价数
+    [Rating4Count] INT NOT NULL DEFAULT 0,                      -- 4 星评价数
+    [Rating5Count] INT NOT NULL DEFAULT 0,                      -- 5 星评价数
+    [LastEvaluationTime] DATETIME NULL,                         -- 最近一次收到评价的时间
+    [UpdateTime] DATETIME NOT NULL DEFAULT GETDATE(),           -- 汇总最后更新时间
+    CONSTRAINT FK_SellerStats_Seller FOREIGN KEY ([SellerID]) REFERENCES [User]([UserID]) ON DELETE CASCADE -- 卖家删除时汇总一并删除
+);
+GO
+
+-- 评价列表按 (卖家 / 买家, 创建时间, 评价ID) 倒序做 keyset 分页并统计数量与平均分 (见 sp_GetEvaluationPage)；
+-- 卖家索引同时用于按卖家重算汇总 (评价删除、sp_RecomputeSellerStats)
+CREATE INDEX IX_Evaluation_Seller_CreateTime ON [Evaluation] ([SellerID], [CreateTime] DESC, [EvaluationID] DESC) INCLUDE ([Rating]);
+GO
+CREATE INDEX IX_Evaluation_Buyer_CreateTime ON [Evaluation] ([BuyerID], [CreateTime] DESC, [EvaluationID] DESC) INCLUDE ([Rating]);
+GO
+
 -- 6. 消息表 (ChatMessage)
 -- 记录用户之间的聊天消息，严格以产品为中心。
 CREATE TABLE [ChatMessage] (
@@ -176,6 +214,10 @@ CREATE TABLE [SystemNotification] (
 );
 GO
 
+-- 维护任务按创建时间分批清理已读通知 (见 sp_PurgeReadNotifications)
+CREATE INDEX IX_SystemNotification_Read_CreateTime ON [SystemNotification] ([CreateTime]) WHERE [IsRead] = 1;
+GO
+
 -- 10. 举报表 (Report)
 -- 记录用户或管理员提交的举报信息。
 CREATE TABLE [Report] (
@@ -217,4 +259,26 @@ GO
 CREATE UNIQUE INDEX IX_Otp_UserID_OtpType_NotUsed 
 ON [Otp] ([UserID], [OtpType]) 
 WHERE [IsUsed] = 0; -- 同一用户针对同类型OTP只能有一个未使用的记录
-GO
\ No newline at end of file
+GO
+
+-- 维护任务按过期时间分批清理 OTP (见 sp_PurgeExpiredOtps)
+CREATE INDEX IX_Otp_ExpiresAt ON [Otp] ([ExpiresAt]);
+GO
+
+-- 12. 上传文件表 (UploadedFile)
+-- 记录内容寻址存储中的每个物理文件 (按 SHA-256 命名)，用于去重与引用计数。
+CREATE TABLE [UploadedFile] (
+    [UploadedFileID] UNIQUEIDENTIFIER PRIMARY KEY DEFAULT NEWID(), -- 文件记录唯一标识符，主键
+    [FileHash] CHAR(64) NOT NULL,                               -- 文件内容的 SHA-256 (十六进制)
+    [FileUrl] NVARCHAR(255) NOT NULL,                           -- 文件访问URL，例如 /uploads/ab/cd/<hash>.jpg
+    [FileSize] BIGINT NOT NULL,                                 -- 文件大小（字节）
+    [RefCount] INT NOT NULL DEFAULT 0,                          -- 被 ProductImage / User.AvatarUrl 引用的次数，由触发器维护
+    [UploadCount] INT NOT NULL DEFAULT 1,                       -- 被上传的次数（重复上传会被去重）
+    [FirstUploadTime] DATETIME NOT NULL DEFAULT GETDATE(),      -- 首次上传时间
+    [LastUploadTime] DATETIME NOT NULL DEFAULT GETDATE(),       -- 最近一次上传时间
+    CONSTRAINT UQ_UploadedFile_FileUrl UNIQUE ([FileUrl])       -- 同一URL只对应一条记录
+);
+GO
+
+CREATE INDEX IX_UploadedFile_FileHash ON [UploadedFile] ([FileHash]);
+GO
@@ -1,6 +1,6 @@
 /*
  * 交易管理模块 - 评价触发器
- * 功能: 评价插入后更新卖家的信用分
+ * 功能: 评价插入后更新卖家的信用分；评价插入 / 删除后维护卖家评价汇总 (SellerStats)
  */
 
 -- tr_Evaluation_AfterInsert_UpdateSellerCredit: 评价插入后更新卖家的信用分
@@ -35,4 +35,82 @@ BEGIN
         THROW;
     END CATCH
 END;
-GO 
\ No newline at end of file
+GO
+
+-- tr_Evaluation_AfterChange_UpdateSellerStats: 评价插入 / 删除后维护卖家评价汇总
+-- ON [Evaluation] AFTER INSERT, DELETE
+-- 插入时按卖家汇总新评价，增量累加到 SellerStats (不存在则插入)；
+-- 删除 (仅在删除用户时发生) 时最近评价时间无法增量回退，对涉及的卖家按 Evaluation 重新汇总。
+DROP TRIGGER IF EXISTS [tr_Evaluation_AfterChange_UpdateSellerStats];
+GO
+CREATE TRIGGER [tr_Evaluation_AfterChange_UpdateSellerStats]
+ON [Evaluation]
+AFTER INSERT, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    BEGIN TRY
+
+    IF EXISTS (SELECT 1 FROM inserted)
+    BEGIN
+        DECLARE @Delta TABLE (
+            SellerID UNIQUEIDENTIFIER PRIMARY KEY, EvaluationCount INT, RatingSum INT,
+            Rating1Count INT, Rating2Count INT, Rating3Count INT, Rating4Count INT, Rating5Count INT,
+            LastEvaluationTime DATETIME
+        );
+        INSERT INTO @Delta
+        SELECT SellerID, COUNT(*), SUM(Rating),
+               SUM(CASE WHEN Rating = 1 THEN 1 ELSE 0 END), SUM(CASE WHEN Rating = 2 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN Rating = 3 THEN 1 ELSE 0 END), SUM(CASE WHEN Rating = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN Rating = 5 THEN 1 ELSE 0 END), MAX(CreateTime)
+        FROM inserted
+        GROUP BY SellerID;
+
+        -- 卖家的第一条评价：先插入全零的汇总行，再统一累加。UPDLOCK + SERIALIZABLE 锁住键范围，
+        -- 并发的首条评价会等待前一个事务提交，之后看到已有的行并在其上累加，不会重复插入或丢失增量
+        INSERT INTO [SellerStats] (SellerID)
+        SELECT D.SellerID
+        FROM @Delta D
+        WHERE NOT EXISTS (SELECT 1 FROM [SellerStats] S WITH (UPDLOCK, SERIALIZABLE) WHERE S.SellerID = D.SellerID);
+
+        UPDATE S
+        SET S.EvaluationCount = S.EvaluationCount + D.EvaluationCount,
+            S.RatingSum = S.RatingSum + D.RatingSum,
+            S.Rating1Count = S.Rating1Count + D.Rating1Count,
+            S.Rating2Count = S.Rating2Count + D.Rating2Count,
+            S.Rating3Count = S.Rating3Count + D.Rating3Count,
+            S.Rating4Count = S.Rating4Count + D.Rating4Count,
+            S.Rating5Count = S.Rating5Count + D.Rating5Count,
+            S.LastEvaluationTime = CASE WHEN S.LastEvaluationTime IS NULL OR D.LastEvaluationTime > S.LastEvaluationTime
+                                        THEN D.LastEvaluationTime ELSE S.LastEvaluationTime END,
+            S.UpdateTime = GETDATE()
+        FROM [SellerStats] S
+        JOIN @Delta D ON S.SellerID = D.SellerID;
+    END
+
+    IF EXISTS (SELECT 1 FROM deleted)
+    BEGIN
+        DECLARE @Sellers TABLE (SellerID UNIQUEIDENTIFIER PRIMARY KEY);
+        INSERT INTO @Sellers SELECT DISTINCT SellerID FROM deleted;
+
+        DELETE S FROM [SellerStats] S JOIN @Sellers X ON S.SellerID = X.SellerID;
+
+        INSERT INTO [SellerStats] (SellerID, EvaluationCount, RatingSum, Rating1Count, Rating2Count, Rating3Count,
+                                   Rating4Count, Rating5Count, LastEvaluationTime, UpdateTime)
+        SELECT E.SellerID, COUNT(*), SUM(E.Rating),
+               SUM(CASE WHEN E.Rating = 1 THEN 1 ELSE 0 END), SUM(CASE WHEN E.Rating = 2 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN E.Rating = 3 THEN 1 ELSE 0 END), SUM(CASE WHEN E.Rating = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN E.Rating = 5 THEN 1 ELSE 0 END), MAX(E.CreateTime), GETDATE()
+        FROM [Evaluation] E
+        JOIN @Sellers X ON E.SellerID = X.SellerID
+        GROUP BY E.SellerID;
+    END
+
+    END TRY
+    BEGIN CATCH
+        -- 传播错误，回滚触发语句的事务 (评价与汇总保持一致)
+        THROW;
+    END CATCH
+END;
+GO
@@ -0,0 +1,77 @@
+/*
+ * 上传文件管理模块 - 引用计数触发器
+ * 功能: ProductImage.ImageURL 与 User.AvatarUrl 变化时维护 UploadedFile.RefCount
+ */
+
+-- tr_ProductImage_AfterChange_UploadRefCount: 商品图片增删改后调整引用计数
+-- ON [ProductImage] AFTER INSERT, UPDATE, DELETE
+DROP TRIGGER IF EXISTS [tr_ProductImage_AfterChange_UploadRefCount];
+GO
+CREATE TRIGGER [tr_ProductImage_AfterChange_UploadRefCount]
+ON [ProductImage]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- 只调整 SortOrder 时不需要处理
+    IF EXISTS (SELECT 1 FROM deleted) AND EXISTS (SELECT 1 FROM inserted) AND NOT UPDATE(ImageURL)
+        RETURN;
+
+    BEGIN TRY
+        -- inserted 计 +1，deleted 计 -1，按 URL 汇总后一次性更新，支持批量操作
+        UPDATE uf
+        SET uf.RefCount = CASE WHEN uf.RefCount + d.Delta < 0 THEN 0 ELSE uf.RefCount + d.Delta END
+        FROM [UploadedFile] uf
+        JOIN (
+            SELECT FileUrl, SUM(Delta) AS Delta
+            FROM (
+                SELECT ImageURL AS FileUrl, 1 AS Delta FROM inserted
+                UNION ALL
+                SELECT ImageURL, -1 FROM deleted
+            ) AS Changes
+            GROUP BY FileUrl
+            HAVING SUM(Delta) <> 0
+        ) AS d ON d.FileUrl = uf.FileUrl;
+    END TRY
+    BEGIN CATCH
+        THROW;
+    END CATCH
+END;
+GO
+
+-- tr_User_AfterChange_AvatarRefCount: 用户头像变更或用户删除后调整引用计数
+-- ON [User] AFTER INSERT, UPDATE, DELETE
+DROP TRIGGER IF EXISTS [tr_User_AfterChange_AvatarRefCount];
+GO
+CREATE TRIGGER [tr_User_AfterChange_AvatarRefCount]
+ON [User]
+AFTER INSERT, UPDATE, DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+
+    -- 用户表更新频繁 (登录时间、信用分等)，头像未变化时直接返回
+    IF EXISTS (SELECT 1 FROM deleted) AND EXISTS (SELECT 1 FROM inserted) AND NOT UPDATE(AvatarUrl)
+        RETURN;
+
+    BEGIN TRY
+        UPDATE uf
+        SET uf.RefCount = CASE WHEN uf.RefCount + d.Delta < 0 THEN 0 ELSE uf.RefCount + d.Delta END
+        FROM [UploadedFile] uf
+        JOIN (
+            SELECT FileUrl, SUM(Delta) AS Delta
+            FROM (
+                SELECT AvatarUrl AS FileUrl, 1 AS Delta FROM inserted WHERE AvatarUrl IS NOT NULL
+                UNION ALL
+                SELECT AvatarUrl, -1 FROM deleted WHERE AvatarUrl IS NOT NULL
+            ) AS Changes
+            GROUP BY FileUrl
+            HAVING SUM(Delta) <> 0
+        ) AS d ON d.FileUrl = uf.FileUrl;
+    END TRY
+    BEGIN CATCH
+        THROW;
+    END CATCH
+END;
+GO
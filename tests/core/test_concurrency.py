@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI, Request
+from starlette.testclient import TestClient
+
+from app.core import concurrency as concurrency_module
+from app.core.concurrency import (
+    ConcurrencyGovernor, ConcurrencyMetrics, concurrency_slot, register_admin_dependency, route_class,
+)
+from app.core.metrics import MetricsRegistry
+from app.exceptions import ServiceOverloadedError, service_overloaded_exception_handler
+
+def make_governor(limit=1, max_queue=1, queue_timeout=0.05):
+    return ConcurrencyGovernor(
+        {"write": limit}, {"write": max_queue}, queue_timeout=queue_timeout,
+        metrics=ConcurrencyMetrics(MetricsRegistry()),
+    )
+
+@pytest.mark.asyncio
+async def test_waiting_request_gets_the_released_slot():
+    governor = make_governor(queue_timeout=1)
+    order = []
+
+    async def request(name, hold):
+        async with governor.admit("write"):
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    await asyncio.gather(request("first", 0.01), request("second", 0))
+
+    assert order == ["first", "second"]
+    assert governor.metrics.in_flight.value("write") == 0
+    assert governor.metrics.queue_wait.count("write") == 1
+
+@pytest.mark.asyncio
+async def test_full_queue_is_shed_immediately():
+    governor = make_governor(limit=1, max_queue=0)
+
+    async with governor.admit("write"):
+        with pytest.raises(ServiceOverloadedError) as exc_info:
+            async with governor.admit("write"):
+                pass
+
+    assert exc_info.value.route_class == "write"
+    assert governor.metrics.shed.value("write", "queue_full") == 1
+    # 名额释放后可以再次进入
+    async with governor.admit("write"):
+        pass
+
+@pytest.mark.asyncio
+async def test_queue_deadline_sheds_and_keeps_the_budget_consistent():
+    governor = make_governor(limit=1, max_queue=1, queue_timeout=0.01)
+
+    async with governor.admit("write"):
+        with pytest.raises(ServiceOverloadedError):
+            async with governor.admit("write"):
+                pass
+        assert governor.metrics.queued.value("write") == 0
+
+    assert governor.metrics.shed.value("write", "timeout") == 1
+    async with governor.admit("write"):
+        assert governor.metrics.in_flight.value("write") == 1
+
+@pytest.mark.asyncio
+async def test_unconfigured_route_class_is_not_limited():
+    governor = make_governor(limit=1, max_queue=0)
+    async with governor.admit("browse"):
+        async with governor.admit("browse"):
+            pass
+
+def test_routes_are_classified_and_shed_with_503(monkeypatch):
+    governor = ConcurrencyGovernor(
+        {"browse": 1, "write": 1, "admin": 1, "auth": 1}, {}, queue_timeout=0,
+        metrics=ConcurrencyMetrics(MetricsRegistry()),
+    )
+    monkeypatch.setattr(concurrency_module, "get_concurrency_governor", lambda: governor)
+
+    async def require_admin():
+        return {"is_staff": True}
+    register_admin_dependency(require_admin)
+
+    app = FastAPI()
+    app.add_exception_handler(ServiceOverloadedError, service_overloaded_exception_handler)
+
+    async def classify(request: Request, _slot=Depends(concurrency_slot)):
+        return {"route_class": route_class(request)}
+
+    @app.get("/products")
+    async def browse(result=Depends(classify)):
+        return result
+
+    @app.post("/orders")
+    async def write(result=Depends(classify)):
+        return result
+
+    @app.post("/auth/login")
+    async def login(result=Depends(classify)):
+        return result
+
+    @app.post("/products/batch/activate")
+    async def admin(result=Depends(classify), _admin=Depends(require_admin)):
+        return result
+
+    client = TestClient(app)
+    assert client.get("/products").json() == {"route_class": "browse"}
+    assert client.post("/orders").json() == {"route_class": "write"}
+    assert client.post("/auth/login").json() == {"route_class": "auth"}
+    assert client.post("/products/batch/activate").json() == {"route_class": "admin"}
+
+    # write 类别饱和时返回 503，browse 不受影响
+    budget = governor._budgets["write"]
+    budget.active = budget.limit
+    response = client.post("/orders")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.get("/products").status_code == 200
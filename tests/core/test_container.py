@@ -0,0 +1,45 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from fastapi import Depends, FastAPI
+from starlette.testclient import TestClient
+
+from app.core.container import AppContainer
+from app.dependencies import get_product_service, get_user_service
+from app.services.product_service import ProductService
+from app.services.user_service import UserService
+
+def test_container_wires_shared_dals_into_services():
+    execute_query = AsyncMock()
+    container = AppContainer(execute_query_func=execute_query)
+
+    assert container.user_service.user_dal is container.user_dal
+    assert container.product_service.product_dal is container.product_dal
+    assert container.order_service.order_dal is container.orders_dal
+    assert container.user_dal.execute_query_func is execute_query
+
+@pytest.mark.asyncio
+async def test_container_shutdown_is_idempotent(mocker):
+    shutdown_image_pool = mocker.patch("app.core.container.shutdown_image_pool")
+    container = AppContainer(execute_query_func=AsyncMock())
+    await container.shutdown()
+    await container.shutdown()
+    shutdown_image_pool.assert_called_once()
+
+def test_service_dependencies_return_the_same_instances_across_requests():
+    app = FastAPI()
+    seen = []
+
+    @app.get("/services")
+    async def services(user_service: UserService = Depends(get_user_service),
+                       product_service: ProductService = Depends(get_product_service)):
+        seen.append((user_service, product_service))
+        return {}
+
+    with TestClient(app) as client:
+        client.get("/services")
+        client.get("/services")
+
+    assert seen[0][0] is seen[1][0]
+    assert seen[0][1] is seen[1][1]
+    assert app.state.container.user_service is seen[0][0]
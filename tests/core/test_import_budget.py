@@ -0,0 +1,43 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+def load_profile_imports():
+    path = os.path.join(PROJECT_ROOT, "scripts", "profile_imports.py")
+    spec = importlib.util.spec_from_file_location("profile_imports", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     encodings.idna
+import time:       300 |        400 |   app.config
+import time:       500 |       1200 | app.main
+import time:       800 |        800 | smtplib
+"""
+
+def test_parse_importtime_and_total():
+    profile_imports = load_profile_imports()
+    records = profile_imports.parse_importtime(IMPORTTIME_OUTPUT)
+    assert [(r.module, r.depth) for r in records] == [("encodings.idna", 2), ("app.config", 1), ("app.main", 0), ("smtplib", 0)]
+    assert profile_imports.total_ms(records) == 2.0
+
+def test_check_budget_reports_total_and_forbidden_modules():
+    profile_imports = load_profile_imports()
+    records = profile_imports.parse_importtime(IMPORTTIME_OUTPUT)
+    assert profile_imports.check_budget(records, {"max_total_ms": 5, "forbidden_modules": ["PIL.Image"]}) == []
+    violations = profile_imports.check_budget(records, {"max_total_ms": 1, "forbidden_modules": ["smtplib"]})
+    assert len(violations) == 2
+
+def test_email_sender_does_not_import_provider_sdks():
+    code = (
+        "import sys, app.utils.email_sender;"
+        "print(sorted(m for m in sys.modules if m.startswith(('alibabacloud', 'smtplib'))))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
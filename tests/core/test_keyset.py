@@ -0,0 +1,26 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.utils.keyset import InvalidCursorError, decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 12, 30, 15, 997000)
+    order_id = uuid4()
+
+    cursor = encode_cursor(created_at, order_id)
+
+    assert decode_cursor(cursor, datetime.fromisoformat, UUID) == (created_at, order_id)
+    assert "=" not in cursor # 可以直接放在查询参数中
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    encode_cursor("2024-05-01T00:00:00"),             # 值的个数不符
+    encode_cursor("yesterday", str(uuid4())),         # 时间格式错误
+    encode_cursor("2024-05-01T00:00:00", "not-a-uuid"),
+    "e30",                                            # {} 不是数组
+])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, datetime.fromisoformat, UUID)
@@ -0,0 +1,119 @@
+import gc
+import json
+import logging
+import logging.config
+
+from app.core.logging import DEFAULT_CONFIG_PATH, JsonFormatter, QueueListenerHandler, SamplingFilter, setup_logging
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+def make_record(name="app.test", level=logging.DEBUG, msg="value=%s", args=(1,), **extra):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_json_formatter_outputs_one_line_with_extra_fields():
+    line = JsonFormatter().format(make_record(level=logging.INFO, procedure="sp_GetProductList"))
+    payload = json.loads(line)
+    assert "\n" not in line
+    assert payload["level"] == "INFO"
+    assert payload["logger"] == "app.test"
+    assert payload["message"] == "value=1"
+    assert payload["procedure"] == "sp_GetProductList"
+
+def test_sampling_filter_limits_debug_per_logger_but_keeps_warnings():
+    sampling = SamplingFilter(level="DEBUG", max_per_second=3)
+    kept = [sampling.filter(make_record()) for _ in range(10)]
+    assert kept.count(True) == 3
+    assert sampling.filter(make_record(name="app.other")) is True
+    assert sampling.filter(make_record(level=logging.WARNING)) is True
+    assert sampling.dropped == 7
+
+def test_queue_handler_defers_formatting_to_listener_thread():
+    target = ListHandler()
+    target.name = "test_target"
+    logging._handlers["test_target"] = target
+    handler = QueueListenerHandler(handlers=["test_target"])
+    try:
+        payload = {"state": "before"}
+        handler.handle(make_record(msg="user=%s payload=%s", args=("alice", payload)))
+        handler.stop()  # 等待队列排空
+    finally:
+        handler.close()
+        del logging._handlers["test_target"]
+    assert len(target.records) == 1
+    assert target.records[0].args == ("alice", payload)  # 未在调用线程中格式化
+    assert target.records[0].getMessage() == "user=alice payload={'state': 'before'}"
+
+def test_queue_handler_drops_records_when_full():
+    target = ListHandler()
+    handler = QueueListenerHandler(handlers=[], queue_size=2)
+    handler.listener = object()  # 不启动监听线程，让队列保持满
+    for _ in range(5):
+        handler.emit(make_record())
+    assert handler.dropped == 3
+    handler.listener = None
+    handler.close()
+
+def test_setup_logging_loads_json_config(tmp_path):
+    config = {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "handlers": {
+            "collect": {"()": f"{__name__}.ListHandler"},
+            "queue": {"()": "app.core.logging.QueueListenerHandler", "handlers": ["cfg://handlers.collect"]},
+        },
+        "loggers": {"app.tests.logging": {"handlers": ["queue"], "level": "INFO", "propagate": False}},
+    }
+    config_path = tmp_path / "logging_config.json"
+    config_path.write_text(json.dumps(config))
+
+    setup_logging(str(config_path), level=None)
+    logger = logging.getLogger("app.tests.logging")
+    queue_handler = logger.handlers[0]
+    try:
+        assert not logger.isEnabledFor(logging.DEBUG)
+        logger.info("hello %s", "world", extra={"request_id": "abc"})
+        queue_handler.stop()
+        records = queue_handler.targets[0].records
+        assert records[0].getMessage() == "hello world"
+        assert records[0].request_id == "abc"
+    finally:
+        logger.removeHandler(queue_handler)
+        queue_handler.close()
+
+def test_repo_logging_config_is_valid():
+    with open(DEFAULT_CONFIG_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    queue_handlers = [name for name, handler in config["handlers"].items()
+                      if handler.get("()") == "app.core.logging.QueueListenerHandler"]
+    assert queue_handlers
+    for name in queue_handlers:
+        targets = config["handlers"][name]["handlers"]
+        assert all(target.startswith("cfg://handlers.") for target in targets)
+        assert {target[len("cfg://handlers."):] for target in targets} <= set(config["handlers"])
+    assert config["loggers"]["app"]["handlers"] == ["queue"]
+
+def test_target_handlers_survive_garbage_collection_before_start():
+    with open(DEFAULT_CONFIG_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    config["loggers"] = {"app.tests.gc": {"handlers": ["queue", "access_queue"], "level": "INFO", "propagate": False}}
+
+    logging.config.dictConfig(config)
+    logger = logging.getLogger("app.tests.gc")
+    handlers = list(logger.handlers)
+    try:
+        gc.collect() # console / access_console 只被队列处理器引用
+        for handler in handlers:
+            handler.start()
+            assert [target.name for target in handler.targets] in (["console"], ["access_console"])
+    finally:
+        for handler in handlers:
+            logger.removeHandler(handler)
+            handler.close()
@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from app.core.metrics import MetricsRegistry
+from app.services.maintenance import LEADER_RESOURCE, MaintenanceMetrics, MaintenanceRunner
+
+class FakeMaintenanceDAL:
+    """按预设的每批删除行数返回结果的清理 DAL。"""
+
+    def __init__(self, is_leader=True, otp_batches=(), token_batches=(), notification_batches=()):
+        self.try_acquire_leader = AsyncMock(return_value=is_leader)
+        self.purge_expired_otps = AsyncMock(side_effect=list(otp_batches) or [0])
+        self.purge_expired_password_reset_tokens = AsyncMock(side_effect=list(token_batches) or [0])
+        self.purge_read_notifications = AsyncMock(side_effect=list(notification_batches) or [0])
+
+def make_runner(dal, **kwargs):
+    connect = AsyncMock(return_value="conn")
+    disconnect = AsyncMock()
+    sleep = AsyncMock()
+    runner = MaintenanceRunner(
+        dal, connect, disconnect, batch_size=100, max_batches=3, batch_pause=0.05,
+        metrics=MaintenanceMetrics(MetricsRegistry()), sleep=sleep, **kwargs,
+    )
+    return runner, connect, disconnect, sleep
+
+@pytest.mark.asyncio
+async def test_leader_purges_in_batches_until_a_short_batch():
+    dal = FakeMaintenanceDAL(otp_batches=[100, 100, 20], notification_batches=[7])
+    runner, connect, _, sleep = make_runner(dal)
+
+    purged = await runner.run_once()
+
+    assert purged == {"otp": 220, "password_reset_token": 0, "read_notification": 7}
+    dal.try_acquire_leader.assert_awaited_once_with("conn", LEADER_RESOURCE)
+    assert dal.purge_expired_otps.await_count == 3
+    dal.purge_expired_otps.assert_awaited_with("conn", 100, 24)
+    dal.purge_read_notifications.assert_awaited_with("conn", 100, 90)
+    # 只在同一任务的批次之间暂停
+    assert sleep.await_count == 2
+    sleep.assert_awaited_with(0.05)
+
+    metrics = runner.metrics
+    assert metrics.rows_purged.value("otp") == 220
+    assert metrics.runs.value("otp", "completed") == 1
+    assert metrics.duration.count("read_notification") == 1
+    assert metrics.leader.value() == 1
+    # leader 保持维护连接 (锁随会话持有)
+    connect.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_max_batches_leaves_the_rest_for_the_next_run():
+    dal = FakeMaintenanceDAL(otp_batches=[100] * 5)
+    runner, *_ = make_runner(dal)
+
+    purged = await runner.run_once()
+
+    assert purged["otp"] == 300
+    assert dal.purge_expired_otps.await_count == 3
+    assert runner.metrics.runs.value("otp", "partial") == 1
+
+@pytest.mark.asyncio
+async def test_non_leader_skips_and_releases_its_connection():
+    dal = FakeMaintenanceDAL(is_leader=False)
+    runner, _, disconnect, _ = make_runner(dal)
+
+    assert await runner.run_once() is None
+
+    dal.purge_expired_otps.assert_not_awaited()
+    disconnect.assert_awaited_once_with("conn")
+    assert runner.metrics.leader.value() == 0
+
+@pytest.mark.asyncio
+async def test_failed_task_does_not_stop_the_others():
+    dal = FakeMaintenanceDAL(otp_batches=[100, RuntimeError("deadlock")], token_batches=[3])
+    runner, *_ = make_runner(dal)
+
+    purged = await runner.run_once()
+
+    assert purged == {"otp": 100, "password_reset_token": 3, "read_notification": 0}
+    assert runner.metrics.runs.value("otp", "failed") == 1
+    assert runner.metrics.rows_purged.value("otp") == 100
+
+@pytest.mark.asyncio
+async def test_lost_connection_is_replaced_on_the_next_run():
+    dal = FakeMaintenanceDAL()
+    dal.try_acquire_leader.side_effect = [RuntimeError("connection reset"), True]
+    runner, connect, disconnect, _ = make_runner(dal)
+
+    assert await runner.run_once() is None
+    disconnect.assert_awaited_once_with("conn")
+
+    assert await runner.run_once() is not None
+    assert connect.await_count == 2
@@ -0,0 +1,48 @@
+import pytest
+
+from app.core.metrics import MetricsRegistry, record_db_time, start_db_timer, stop_db_timer
+
+def test_counter_and_gauge_render_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ("method",))
+    in_progress = registry.gauge("in_progress", "In progress")
+    requests.inc("GET")
+    requests.inc("GET")
+    requests.inc("POST", amount=3)
+    in_progress.inc()
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{method="GET"} 2' in text
+    assert 'requests_total{method="POST"} 3' in text
+    assert "in_progress 1" in text
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.7, 5.0):
+        latency.observe(value, "/a")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1"} 3' in text
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/a"} 4' in text
+    assert latency.sum("/a") == pytest.approx(6.25)
+
+def test_label_values_are_escaped_and_checked():
+    registry = MetricsRegistry()
+    counter = registry.counter("c_total", "C", ("path",))
+    counter.inc('a"b')
+    assert 'c_total{path="a\\"b"} 1' in registry.render()
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        registry.counter("c_total", "duplicate")
+
+def test_db_time_is_only_recorded_inside_a_request():
+    record_db_time(1.0)  # 没有请求上下文时忽略
+    token = start_db_timer()
+    record_db_time(0.25)
+    record_db_time(0.5)
+    assert stop_db_timer(token) == pytest.approx(0.75)
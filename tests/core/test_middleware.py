@@ -0,0 +1,110 @@
+import asyncio
+
+from fastapi import FastAPI
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry, record_db_time
+from app.middleware import (
+    DisconnectCancellationMiddleware, DisconnectMetrics, InstrumentationMiddleware, RequestMetrics, UNMATCHED_ROUTE,
+)
+
+def make_client():
+    metrics = RequestMetrics(MetricsRegistry())
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        record_db_time(0.01)
+        await asyncio.sleep(0.02)
+        return {"item_id": item_id}
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    async def static_app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"x" * 10})
+
+    app.router.routes.append(Mount("/uploads", static_app))
+    app.add_middleware(InstrumentationMiddleware, metrics=metrics)
+    return TestClient(app), metrics
+
+def test_records_route_template_status_and_latency():
+    client, metrics = make_client()
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+    assert client.get("/items/abc").status_code == 422
+
+    assert metrics.requests.value("GET", "/items/{item_id}", "200") == 2
+    assert metrics.requests.value("GET", "/items/{item_id}", "422") == 1
+    assert metrics.duration.count("GET", "/items/{item_id}") == 3
+    assert metrics.duration.sum("GET", "/items/{item_id}") >= 0.04
+    assert metrics.in_progress.value() == 0
+
+def test_records_body_sizes_and_db_time_share():
+    client, metrics = make_client()
+    response = client.post("/echo", json={"name": "x" * 100})
+    assert metrics.request_size.sum("/echo") == len(b'{"name": "' + b"x" * 100 + b'"}')
+    assert metrics.response_size.sum("/echo") == len(response.content)
+    assert metrics.db_time.count("/echo") == 0
+
+    client.get("/items/1")
+    assert metrics.db_time.sum("/items/{item_id}") == 0.01
+    assert metrics.db_time_ratio.count("/items/{item_id}") == 1
+    assert metrics.db_time_ratio.sum("/items/{item_id}") < 1.0
+
+def test_mounts_and_unknown_paths_do_not_create_per_url_labels():
+    client, metrics = make_client()
+    client.get("/uploads/ab/cd/file.jpg")
+    client.get("/no/such/path")
+    client.get("/another/missing/path")
+
+    assert metrics.requests.value("GET", "/uploads", "200") == 1
+    assert metrics.response_size.sum("/uploads") == 10
+    assert metrics.requests.value("GET", UNMATCHED_ROUTE, "404") == 2
+
+def test_disconnect_cancels_request_before_response():
+    metrics = DisconnectMetrics(MetricsRegistry())
+    request_metrics = RequestMetrics(MetricsRegistry())
+    started = asyncio.Event()
+    cancelled = []
+
+    async def slow_app(scope, receive, send):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    app = DisconnectCancellationMiddleware(InstrumentationMiddleware(slow_app, metrics=request_metrics), metrics=metrics)
+
+    async def scenario():
+        async def receive():
+            await started.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            raise AssertionError("no response expected")
+
+        scope = {"type": "http", "method": "GET", "path": "/slow", "root_path": "", "headers": []}
+        await asyncio.wait_for(app(scope, receive, send), 1)
+
+    asyncio.run(scenario())
+
+    assert cancelled == [True]
+    assert metrics.cancelled.value() == 1
+    assert request_metrics.requests.value("GET", UNMATCHED_ROUTE, "499") == 1
+
+def test_disconnect_middleware_passes_request_body_and_response_through():
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(payload: dict):
+        return payload
+
+    app.add_middleware(DisconnectCancellationMiddleware, metrics=DisconnectMetrics(MetricsRegistry()))
+    client = TestClient(app)
+    assert client.post("/echo", json={"a": 1}).json() == {"a": 1}
@@ -0,0 +1,120 @@
+import pytest
+from fastapi import Depends, FastAPI, Form
+from pydantic import BaseModel
+from starlette.testclient import TestClient
+
+from app.core import rate_limit as rate_limit_module
+from app.core.metrics import MetricsRegistry
+from app.core.rate_limit import InMemoryRateLimitStore, RateLimit, RateLimiter, RateLimitMetrics, rate_limit
+from app.exceptions import RateLimitExceededError, rate_limit_exception_handler
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.mark.asyncio
+async def test_bucket_allows_a_burst_then_refills_over_time():
+    clock = FakeClock()
+    store = InMemoryRateLimitStore(clock=clock)
+    limit = RateLimit(3, 60)  # 每 20 秒补充一个令牌
+
+    assert [await store.consume("k", limit) for _ in range(3)] == [0, 0, 0]
+    assert await store.consume("k", limit) == pytest.approx(20)
+
+    clock.now += 10
+    assert await store.consume("k", limit) == pytest.approx(10) # 被拒绝的请求不扣减令牌
+    clock.now += 10
+    assert await store.consume("k", limit) == 0
+
+    clock.now += 3600 # 空闲很久也不会超过容量
+    assert [await store.consume("k", limit) for _ in range(4)][-1] > 0
+
+@pytest.mark.asyncio
+async def test_store_drops_least_recently_used_bucket():
+    store = InMemoryRateLimitStore(max_keys=2, clock=FakeClock())
+    limit = RateLimit(1, 60)
+    await store.consume("a", limit)
+    await store.consume("b", limit)
+    await store.consume("a", limit) # a 最近使用过
+    await store.consume("c", limit)
+
+    assert len(store) == 2
+    assert await store.consume("b", limit) == 0 # b 被丢弃，重新从满桶开始
+
+@pytest.mark.asyncio
+async def test_limiter_checks_ip_and_account_separately():
+    metrics = RateLimitMetrics(MetricsRegistry())
+    limiter = RateLimiter(
+        InMemoryRateLimitStore(clock=FakeClock()),
+        {"email": {"ip": RateLimit(5, 60), "account": RateLimit(1, 60)}},
+        metrics=metrics,
+    )
+
+    await limiter.check("email", "10.0.0.1", "a@sjtu.edu.cn")
+    with pytest.raises(RateLimitExceededError) as exc_info:
+        await limiter.check("email", "10.0.0.2", "a@sjtu.edu.cn")
+    assert exc_info.value.retry_after == pytest.approx(60)
+    # 其它账号不受影响
+    await limiter.check("email", "10.0.0.1", "b@sjtu.edu.cn")
+    # 未配置的策略不限制
+    await limiter.check("unknown", "10.0.0.1", "a@sjtu.edu.cn")
+
+    assert metrics.rejected.value("email", "account") == 1
+    assert metrics.checked.value("email") == 3
+
+@pytest.mark.asyncio
+async def test_store_failure_allows_the_request():
+    class BrokenStore(InMemoryRateLimitStore):
+        async def consume(self, key, limit, cost=1):
+            raise ConnectionError("store down")
+
+    metrics = RateLimitMetrics(MetricsRegistry())
+    limiter = RateLimiter(BrokenStore(), {"login": {"ip": RateLimit(1, 60)}}, metrics=metrics)
+
+    await limiter.check("login", "10.0.0.1")
+    await limiter.check("login", "10.0.0.1")
+    assert metrics.store_errors.value() == 2
+
+class EmailBody(BaseModel):
+    email: str
+
+@pytest.fixture
+def client(monkeypatch):
+    limiter = RateLimiter(
+        InMemoryRateLimitStore(clock=FakeClock()),
+        {"email": {"ip": RateLimit(10, 60), "account": RateLimit(2, 60)}, "login": {"ip": RateLimit(1, 30)}},
+        metrics=RateLimitMetrics(MetricsRegistry()),
+    )
+    monkeypatch.setattr(rate_limit_module, "get_rate_limiter", lambda: limiter)
+
+    app = FastAPI()
+    app.add_exception_handler(RateLimitExceededError, rate_limit_exception_handler)
+
+    @app.post("/otp", dependencies=[Depends(rate_limit("email", account_field="email"))])
+    async def otp(body: EmailBody):
+        return {"email": body.email}
+
+    @app.post("/login", dependencies=[Depends(rate_limit("login", account_field="username"))])
+    async def login(username: str = Form(...)):
+        return {"username": username}
+
+    return TestClient(app)
+
+def test_json_endpoint_is_limited_per_account_with_retry_after(client):
+    assert client.post("/otp", json={"email": "A@sjtu.edu.cn"}).status_code == 200
+    assert client.post("/otp", json={"email": "a@sjtu.edu.cn "}).json() == {"email": "a@sjtu.edu.cn "}
+
+    response = client.post("/otp", json={"email": "a@sjtu.edu.cn"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+    assert client.post("/otp", json={"email": "b@sjtu.edu.cn"}).status_code == 200
+
+def test_form_endpoint_is_limited_per_ip(client):
+    assert client.post("/login", data={"username": "alice"}).status_code == 200
+    response = client.post("/login", data={"username": "bob"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
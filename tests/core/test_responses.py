@@ -0,0 +1,39 @@
+import json
+from datetime import datetime
+from decimal import Decimal
+from uuid import uuid4
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import FastJSONResponse, dumps
+from app.schemas.user_schemas import UserResponseSchema
+
+def make_product_row():
+    return {
+        "商品ID": uuid4(),
+        "商品名称": "二手自行车",
+        "价格": Decimal("199.50"),
+        "库存": 1,
+        "发布时间": datetime(2024, 5, 1, 12, 30, 15, 123000),
+        "主图URL": None,
+    }
+
+def test_dumps_matches_jsonable_encoder_for_dal_rows():
+    rows = [make_product_row(), {**make_product_row(), "价格": Decimal("200")}]
+    assert json.loads(dumps(rows)) == jsonable_encoder(rows)
+
+def test_decimal_integral_values_are_ints():
+    assert dumps({"价格": Decimal("200")}) == b'{"\xe4\xbb\xb7\xe6\xa0\xbc":200}'
+    assert json.loads(dumps({"价格": Decimal("199.5")})) == {"价格": 199.5}
+
+def test_pydantic_models_are_serialized():
+    user = UserResponseSchema(
+        user_id=uuid4(), username="alice", email=None, status="Active", credit=100,
+        is_staff=False, is_super_admin=False, is_verified=True, join_time=datetime(2024, 1, 1),
+    )
+    assert json.loads(dumps([user])) == jsonable_encoder([user])
+
+def test_fast_json_response_renders_utf8():
+    response = FastJSONResponse([make_product_row()])
+    assert response.media_type == "application/json"
+    assert json.loads(response.body)[0]["商品名称"] == "二手自行车"
@@ -0,0 +1,121 @@
+import pytest
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry
+from app.dal import circuit_breaker as circuit_breaker_module
+from app.dal.circuit_breaker import CircuitBreaker, CircuitBreakerMetrics
+from app.exceptions import (
+    DatabaseUnavailableError, QueryTimeoutError, TransientDatabaseError, transient_database_exception_handler,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_breaker(clock, threshold=3, reset=10):
+    return CircuitBreaker(threshold, reset, metrics=CircuitBreakerMetrics(MetricsRegistry()), clock=clock)
+
+def test_opens_after_consecutive_failures_and_fails_fast():
+    clock = FakeClock()
+    breaker = make_breaker(clock)
+
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    breaker.allow()
+    breaker.record_success() # 成功会清零连续失败次数
+    for _ in range(3):
+        breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state == "open"
+    clock.now += 4
+    with pytest.raises(DatabaseUnavailableError) as exc_info:
+        breaker.allow()
+    assert exc_info.value.retry_after == pytest.approx(6)
+    assert breaker.metrics.rejected.value() == 1
+    assert breaker.metrics.state.value() == 2
+
+def test_half_open_allows_a_single_probe():
+    clock = FakeClock()
+    breaker = make_breaker(clock, threshold=1)
+    breaker.record_failure()
+
+    clock.now += 10
+    breaker.allow() # 探测连接
+    assert breaker.state == "half_open"
+    with pytest.raises(DatabaseUnavailableError):
+        breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.allow()
+    assert breaker.metrics.transitions.value("closed") == 1
+
+def test_failed_probe_reopens_and_restarts_the_timer():
+    clock = FakeClock()
+    breaker = make_breaker(clock, threshold=1)
+    breaker.record_failure()
+
+    clock.now += 10
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.retry_after() == pytest.approx(10)
+    assert breaker.metrics.transitions.value("open") == 2
+
+def test_released_probe_lets_the_next_request_probe():
+    clock = FakeClock()
+    breaker = make_breaker(clock, threshold=1)
+    breaker.record_failure()
+
+    clock.now += 10
+    breaker.allow()
+    breaker.release() # 探测请求被取消，没有结果
+    breaker.allow()
+    assert breaker.state == "half_open"
+
+def test_only_connection_errors_count_as_failures():
+    breaker = make_breaker(FakeClock(), threshold=1)
+    breaker.observe_error(TransientDatabaseError("死锁", reason="deadlock"))
+    breaker.observe_error(QueryTimeoutError())
+    assert breaker.state == "closed"
+
+    breaker.observe_error(TransientDatabaseError("连接中断", reason="connection"))
+    assert breaker.state == "open"
+
+def test_open_breaker_returns_503_and_degraded_health(monkeypatch):
+    from app.routers import monitoring
+
+    clock = FakeClock()
+    breaker = make_breaker(clock, threshold=1, reset=7.5)
+    monkeypatch.setattr(circuit_breaker_module, "get_circuit_breaker", lambda: breaker)
+    monkeypatch.setattr(monitoring, "get_circuit_breaker", lambda: breaker)
+
+    app = FastAPI()
+    app.add_exception_handler(TransientDatabaseError, transient_database_exception_handler)
+    app.include_router(monitoring.router)
+
+    @app.get("/items")
+    async def items():
+        circuit_breaker_module.get_circuit_breaker().allow()
+        return []
+
+    client = TestClient(app)
+    assert client.get("/health").json() == {
+        "status": "ok", "database": {"state": "closed", "consecutive_failures": 0, "retry_after_seconds": 0.0},
+    }
+
+    breaker.record_failure()
+    response = client.get("/items")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "8"
+
+    health = client.get("/health")
+    assert health.status_code == 200
+    assert health.json()["status"] == "degraded"
+    assert health.json()["database"]["state"] == "open"
@@ -0,0 +1,154 @@
+import pytest
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from app.config import settings
+from app.core.metrics import MetricsRegistry
+from app.dal.db_metrics import ADHOC_QUERY, QueryMetrics, QueryTimings, observe_query, procedure_name
+from app.exceptions import IntegrityError, QueryTimeoutError
+
+@pytest.mark.parametrize("sql, expected", [
+    ("{CALL sp_GetProductList (?, ?, ?)}", "sp_GetProductList"),
+    ("  {call dbo.sp_GetAllUsers(?)}", "sp_GetAllUsers"),
+    ("{? = CALL [dbo].[sp_CreateOrder] (?, ?, ?)}", "sp_CreateOrder"),
+    ("EXEC sp_RecalculateUploadRefCounts", "sp_RecalculateUploadRefCounts"),
+    ("SELECT * FROM [User] WHERE UserID = ?", ADHOC_QUERY),
+])
+def test_procedure_name(sql, expected):
+    assert procedure_name(sql) == expected
+
+@pytest.mark.asyncio
+async def test_query_timings_split_queue_and_stages():
+    loop = asyncio.get_running_loop()
+    timings = QueryTimings()
+    assert await timings.run(loop, "execute", lambda: sum(range(1000))) == 499500
+    await timings.run(loop, "fetch", lambda: None)
+    assert timings.execute > 0
+    assert timings.fetch > 0
+    assert timings.queue >= 0
+    assert timings.total == pytest.approx(timings.queue + timings.execute + timings.fetch)
+
+def make_timings(execute: float) -> QueryTimings:
+    timings = QueryTimings()
+    timings.queue, timings.execute, timings.fetch = 0.001, execute, 0.002
+    return timings
+
+def test_observe_query_records_calls_rows_and_errors():
+    metrics = QueryMetrics(MetricsRegistry())
+    observe_query("{CALL sp_GetOrdersByUser (?, ?)}", make_timings(0.01), rows=25, metrics=metrics)
+    observe_query("{CALL sp_CreateOrder (?, ?, ?)}", make_timings(0.01), error=IntegrityError("dup"), metrics=metrics)
+
+    assert metrics.calls.value("sp_GetOrdersByUser") == 1
+    assert metrics.rows.sum("sp_GetOrdersByUser") == 25
+    assert metrics.execute_time.count("sp_CreateOrder") == 1
+    assert metrics.rows.count("sp_CreateOrder") == 0
+    assert metrics.errors.value("sp_CreateOrder", "IntegrityError") == 1
+
+@pytest.fixture
+def slow_query_caplog(caplog):
+    # logging_config.json 中 "app" logger 不向根 logger 传播，caplog 的处理器直接挂到慢查询 logger 上
+    slow_query_logger = logging.getLogger("app.dal.slow_query")
+    slow_query_logger.addHandler(caplog.handler)
+    try:
+        yield caplog
+    finally:
+        slow_query_logger.removeHandler(caplog.handler)
+
+def test_slow_query_log_samples_and_redacts_params(monkeypatch, slow_query_caplog):
+    caplog = slow_query_caplog
+    metrics = QueryMetrics(MetricsRegistry())
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_THRESHOLD_MS", 100)
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_PARAMS_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(logging.getLogger("app"), "propagate", False) # 与 logging_config.json 一致
+
+    with caplog.at_level(logging.WARNING, logger="app.dal.slow_query"):
+        observe_query("{CALL sp_GetProductList (?)}", make_timings(0.01), rows=1, params=("fast",), metrics=metrics)
+        observe_query("{CALL sp_GetProductList (?)}", make_timings(0.5), rows=1, params=("x" * 200,), metrics=metrics)
+        observe_query("{CALL sp_UpdateUserPassword (?, ?)}", make_timings(0.5), params=("id", "hash"), metrics=metrics)
+        observe_query("{CALL sp_UpdateUserProfile (?, ?, ?, ?)}", make_timings(0.5),
+                      params=("id", "13800000000", "a@sjtu.edu.cn", "alice"), metrics=metrics)
+
+    assert metrics.slow_queries.value("sp_GetProductList") == 1
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 3
+    assert "Slow query sp_GetProductList" in messages[0]
+    assert "xxx..." in messages[0] and "x" * 64 not in messages[0]
+    assert "<redacted>" in messages[1] and "hash" not in messages[1]
+    # 不在允许列表中的过程默认不输出参数
+    assert "<redacted>" in messages[2] and "13800000000" not in messages[2] and "sjtu" not in messages[2]
+
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_PARAMS_SAMPLE_RATE", 0.0)
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger="app.dal.slow_query"):
+        observe_query("{CALL sp_GetProductList (?)}", make_timings(0.5), params=("secret-ish",), metrics=metrics)
+    assert "<not sampled>" in caplog.records[0].getMessage()
+
+def test_metrics_endpoint_exports_prometheus_text():
+    from app.routers import monitoring
+
+    app = FastAPI()
+    app.include_router(monitoring.router)
+    observe_query("{CALL sp_GetEvaluationsBySeller (?)}", make_timings(0.01), rows=3)
+
+    response = TestClient(app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'db_query_total{procedure="sp_GetEvaluationsBySeller"}' in response.text
+    assert "# TYPE db_pool_connections_in_use gauge" in response.text
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_call_never_runs():
+    loop = asyncio.get_running_loop()
+    ran = []
+    # 线程池中唯一的工作线程被占用，第二个调用只能排队
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+    blocker = asyncio.ensure_future(QueryTimings().run(loop, "execute", lambda: time.sleep(0.05)))
+
+    timings = QueryTimings()
+    queued = asyncio.ensure_future(timings.run(loop, "execute", lambda: ran.append(1)))
+    await asyncio.sleep(0.01)
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    await blocker
+    await asyncio.sleep(0.01)
+
+    assert ran == []
+    assert timings.cancelled == "queued"
+
+@pytest.mark.asyncio
+async def test_cancelled_running_call_is_cancelled_and_awaited():
+    loop = asyncio.get_running_loop()
+    release = threading.Event()
+    finished = []
+
+    def statement():
+        release.wait(1)
+        finished.append(1)
+
+    timings = QueryTimings()
+    running = asyncio.ensure_future(timings.run(loop, "execute", statement, release.set))
+    await asyncio.sleep(0.01)
+    running.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await running
+
+    # on_cancel (cursor.cancel) 让语句提前返回，并且等工作线程结束后才抛出 CancelledError
+    assert finished == [1]
+    assert timings.cancelled == "running"
+
+def test_observe_query_records_timeouts_and_cancellations():
+    metrics = QueryMetrics(MetricsRegistry())
+    observe_query("{CALL sp_GetProductList (?)}", make_timings(0.01), error=QueryTimeoutError(), metrics=metrics)
+    cancelled = make_timings(0.01)
+    cancelled.cancelled = "queued"
+    observe_query("{CALL sp_GetProductList (?)}", cancelled, metrics=metrics)
+
+    assert metrics.timeouts.value("sp_GetProductList") == 1
+    assert metrics.cancelled.value("sp_GetProductList", "queued") == 1
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+from unittest.mock import MagicMock
+
+from app.config import settings
+from app.dal import deadline
+from app.dal.deadline import driver_timeout, effective_timeout, query_deadline
+from app.dal.exceptions import map_db_exception
+from app.exceptions import QueryTimeoutError, TransientDatabaseError
+
+@pytest.fixture(autouse=True)
+def default_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_TIMEOUT_SECONDS", 30)
+
+def import_execute_query():
+    try:
+        from app.dal.base import execute_query
+    except ImportError:
+        pytest.skip("pyodbc / ODBC driver manager not available")
+    return execute_query
+
+def run_in_fresh_context(coro_factory):
+    """在新任务 (独立的 contextvars 上下文) 中执行，模拟一个请求。"""
+    async def runner():
+        return await asyncio.ensure_future(coro_factory())
+    return runner()
+
+@pytest.mark.asyncio
+async def test_timeout_is_the_smallest_of_call_route_and_default():
+    async def request():
+        assert effective_timeout() == 30
+        assert effective_timeout(2) == 2
+        await query_deadline(5)()
+        assert effective_timeout() == pytest.approx(5, abs=0.1)
+        assert effective_timeout(2) == 2
+    await run_in_fresh_context(request)
+
+@pytest.mark.asyncio
+async def test_zero_default_means_no_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "DB_QUERY_TIMEOUT_SECONDS", 0)
+    assert effective_timeout() is None
+    assert driver_timeout(None) == 0
+    assert driver_timeout(0.2) == 1
+    assert driver_timeout(2.5) == 3
+
+@pytest.mark.asyncio
+async def test_expired_route_deadline_skips_the_query():
+    execute_query = import_execute_query()
+    conn = MagicMock()
+
+    async def request():
+        deadline._query_deadline.set(time.monotonic() - 1)
+        with pytest.raises(QueryTimeoutError):
+            await execute_query(conn, "{CALL sp_GetProductList (?)}", (None,), fetchall=True)
+    await run_in_fresh_context(request)
+
+    conn.cursor.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_driver_timeout_is_set_before_the_cursor_is_created():
+    execute_query = import_execute_query()
+    conn = MagicMock()
+    conn.cursor.return_value.fetchall.return_value = []
+
+    await execute_query(conn, "{CALL sp_GetProductList (?)}", (None,), fetchall=True, timeout=1.5)
+
+    assert conn.raw_connection.timeout == 2
+
+def test_query_timeout_sqlstate_is_mapped_and_not_retryable():
+    try:
+        import pyodbc
+    except ImportError:
+        pytest.skip("pyodbc / ODBC driver manager not available")
+    error = map_db_exception(pyodbc.Error("HYT00", "[HYT00] Query timeout expired (0) (SQLExecDirectW)"))
+    assert isinstance(error, QueryTimeoutError)
+    assert isinstance(error, TransientDatabaseError)
+    assert error.reason == "timeout"
+
+    # 锁超时 (1222) 同样是 HYT00，仍按可重试的 lock_timeout 处理
+    lock_timeout = map_db_exception(pyodbc.Error("HYT00", "[HYT00] Lock request time out period exceeded. (1222) (SQLExecDirectW)"))
+    assert not isinstance(lock_timeout, QueryTimeoutError)
+    assert lock_timeout.reason == "lock_timeout"
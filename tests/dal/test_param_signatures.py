@@ -0,0 +1,63 @@
+import pathlib
+import re
+
+import pytest
+
+from app.dal import param_signatures
+from app.dal.db_metrics import procedure_name
+from app.dal.param_signatures import (
+    INT, MONEY, NVARCHAR, UNIQUEIDENTIFIER, get_param_signature, input_sizes_for, register_param_signature,
+)
+
+DAL_DIR = pathlib.Path(__file__).resolve().parents[2] / "app" / "dal"
+_CALL_PATTERN = re.compile(r'"(\{\s*CALL\s+[^"]*\})"')
+
+def dal_calls():
+    for path in sorted(DAL_DIR.glob("*_dal.py")):
+        for sql in _CALL_PATTERN.findall(path.read_text(encoding="utf-8")):
+            yield sql
+
+def test_registered_procedure_returns_input_sizes():
+    sizes = input_sizes_for("{CALL sp_GetOrderHistory (?, ?, ?, ?, ?, ?)}", ("id", False, None, 20, None, None))
+    assert sizes[0] == UNIQUEIDENTIFIER
+    assert sizes[2] == NVARCHAR(50)
+    assert sizes[3] == INT
+    assert sizes[5] == UNIQUEIDENTIFIER
+
+def test_trailing_optional_parameters_use_signature_prefix():
+    sizes = input_sizes_for("{CALL sp_RejectOrder (?, ?)}", ("order", "seller"))
+    assert sizes == [UNIQUEIDENTIFIER, UNIQUEIDENTIFIER]
+
+@pytest.mark.parametrize("sql, params", [
+    ("{CALL sp_NotRegistered(?)}", (1,)),
+    ("SELECT ?", (1,)),
+    ("{CALL sp_GetProductById(?)}", ()),
+    ("{CALL sp_GetProductById(?)}", None),
+    ("{CALL sp_GetProductById(?, ?)}", ("a", "b")), # 参数多于签名
+])
+def test_falls_back_to_inferred_types(sql, params):
+    assert input_sizes_for(sql, params) is None
+
+def test_register_overrides_existing_signature(monkeypatch):
+    monkeypatch.setattr(param_signatures, "_signatures", dict(param_signatures._signatures))
+    register_param_signature("sp_GetProductById", UNIQUEIDENTIFIER, MONEY)
+    assert get_param_signature("sp_GetProductById").sizes == (UNIQUEIDENTIFIER, MONEY)
+
+def test_every_dal_call_fits_its_signature():
+    checked = 0
+    for sql in dal_calls():
+        signature = get_param_signature(procedure_name(sql))
+        if signature is None:
+            continue
+        assert sql.count("?") <= len(signature.sizes), sql
+        checked += 1
+    assert checked > 40
+
+def test_type_codes_match_pyodbc():
+    try:
+        import pyodbc
+    except ImportError:
+        pytest.skip("pyodbc / ODBC driver manager not available")
+    for name in ("SQL_CHAR", "SQL_DECIMAL", "SQL_INTEGER", "SQL_TYPE_TIMESTAMP", "SQL_BIGINT", "SQL_BIT",
+                 "SQL_WVARCHAR", "SQL_GUID"):
+        assert getattr(param_signatures, name) == getattr(pyodbc, name), name
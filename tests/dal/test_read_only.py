@@ -0,0 +1,49 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.dal.read_only import READ_ONLY_PROCEDURES, ReadOnlyConnection, check_read_only, is_read_only_sql
+from app.exceptions import DALError, ReadOnlyViolationError
+
+@pytest.mark.parametrize("sql, expected", [
+    ("{CALL sp_GetProductList(?, ?, ?, ?, ?, ?, ?, ?)}", True),
+    ("{CALL dbo.sp_GetUserProfileById(?)}", True),
+    ("{CALL sp_CreateOrder(?, ?, ?, ?)}", False),
+    # 登录时会更新最后登录时间，不是只读过程
+    ("{CALL sp_GetUserByEmailWithPassword(?)}", False),
+    ("SELECT * FROM [User]", False),
+])
+def test_is_read_only_sql(sql, expected):
+    assert is_read_only_sql(sql) is expected
+
+def test_login_procedures_are_not_registered():
+    assert not any("WithPassword" in name or "Otp" in name for name in READ_ONLY_PROCEDURES)
+
+def test_check_read_only_rejects_writes_on_read_only_connection():
+    conn = ReadOnlyConnection(MagicMock())
+    check_read_only(conn, "{CALL sp_GetOrdersByUser(?, ?, ?, ?, ?)}")
+    with pytest.raises(ReadOnlyViolationError, match="sp_UpdateProduct"):
+        check_read_only(conn, "{CALL sp_UpdateProduct(?, ?)}")
+
+def test_check_read_only_allows_anything_on_regular_connection():
+    check_read_only(MagicMock(spec=["cursor", "commit"]), "{CALL sp_UpdateProduct(?, ?)}")
+
+def test_read_only_connection_delegates_and_blocks_commit():
+    raw = MagicMock()
+    conn = ReadOnlyConnection(raw)
+    assert conn.read_only is True
+    assert conn.raw_connection is raw
+
+    assert conn.cursor() is raw.cursor.return_value
+    assert conn.autocommit is raw.autocommit # 其它属性原样转发
+
+    with pytest.raises(ReadOnlyViolationError):
+        conn.commit()
+    conn.rollback()
+    raw.commit.assert_not_called()
+    raw.rollback.assert_not_called()
+
+    conn.close()
+    raw.close.assert_called_once()
+
+def test_read_only_violation_is_dal_error():
+    assert isinstance(ReadOnlyViolationError(), DALError)
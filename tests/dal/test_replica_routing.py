@@ -0,0 +1,81 @@
+import pytest
+
+from app.core.metrics import MetricsRegistry
+from app.dal.replica_routing import (
+    ROUTE_FALLBACK, ROUTE_NO_REPLICA, ROUTE_REPLICA, ROUTE_STICKY,
+    ReplicaRouter, ReplicaRoutingMetrics, sticky_key,
+)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def make_router(clock, replicas=("replica1,1433", "replica2,1433"), **kwargs):
+    metrics = ReplicaRoutingMetrics(MetricsRegistry())
+    return ReplicaRouter(list(replicas), clock=clock, metrics=metrics, **kwargs)
+
+def test_no_replicas_always_uses_primary(clock):
+    router = make_router(clock, replicas=())
+    assert not router.enabled
+    assert router.choose("user") is None
+
+def test_round_robin_between_replicas(clock):
+    router = make_router(clock)
+    assert [router.choose() for _ in range(4)] == ["replica1,1433", "replica2,1433"] * 2
+    assert router.metrics.routed.value("replica", ROUTE_REPLICA) == 4
+
+def test_read_your_writes_window(clock):
+    router = make_router(clock, sticky_seconds=5)
+    router.record_write("alice")
+
+    assert router.choose("alice") is None
+    assert router.choose("bob") == "replica1,1433"
+    assert router.metrics.routed.value("primary", ROUTE_STICKY) == 1
+
+    clock.now += 5.1
+    assert router.choose("alice") is not None
+
+def test_sticky_disabled_with_zero_window(clock):
+    router = make_router(clock, sticky_seconds=0)
+    router.record_write("alice")
+    assert router.choose("alice") is not None
+
+def test_failed_replica_is_skipped_until_retry(clock):
+    router = make_router(clock, retry_seconds=30)
+    router.mark_down("replica1,1433")
+    assert router.metrics.routed.value("primary", ROUTE_FALLBACK) == 1
+    assert router.metrics.replica_failures.value("replica1,1433") == 1
+
+    assert {router.choose() for _ in range(4)} == {"replica2,1433"}
+
+    router.mark_down("replica2,1433")
+    assert router.choose() is None
+    assert router.metrics.routed.value("primary", ROUTE_NO_REPLICA) == 1
+
+    clock.now += 31
+    assert router.choose() is not None
+
+def test_sticky_records_are_bounded_and_expire(clock):
+    router = make_router(clock, sticky_seconds=5, max_sticky_keys=2)
+    for key in ("a", "b", "c"):
+        router.record_write(key)
+        clock.now += 1
+    # 超出上限时丢弃最早的记录
+    assert router.choose("a") is not None
+    assert router.choose("c") is None
+
+    clock.now += 10
+    router.record_write("d")
+    assert list(router._sticky_until) == ["d"]
+
+def test_sticky_key_uses_authorization_header():
+    assert sticky_key({}) is None
+    assert sticky_key({"authorization": "Bearer t1"}) == sticky_key({"authorization": "Bearer t1"})
+    assert sticky_key({"authorization": "Bearer t1"}) != sticky_key({"authorization": "Bearer t2"})
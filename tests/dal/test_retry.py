@@ -0,0 +1,124 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+from app.dal.exceptions import classify_transient_error, sqlserver_error_number
+from app.dal.retry import RetryMetrics, RetryPolicy, find_transient_error, retry_transaction
+from app.exceptions import DALError, TransientDatabaseError
+
+class FakeDbError(Exception):
+    """模拟 pyodbc.Error：args 为 (SQLSTATE, 消息)。"""
+
+DEADLOCK = FakeDbError("40001", "[40001] [Microsoft][ODBC Driver 17 for SQL Server][SQL Server]Transaction was deadlocked (1205) (SQLExecDirectW)")
+LOCK_TIMEOUT = FakeDbError("HYT00", "[HYT00] Lock request time out period exceeded. (1222) (SQLExecDirectW)")
+CONNECTION_RESET = FakeDbError("08S01", "[08S01] TCP Provider: An existing connection was forcibly closed (10054) (SQLExecDirectW)")
+CONSTRAINT = FakeDbError("23000", "[23000] Violation of PRIMARY KEY constraint (2627) (SQLExecDirectW)")
+
+def run(coro):
+    return asyncio.run(coro)
+
+def make_policy(max_attempts=3):
+    return RetryPolicy(max_attempts=max_attempts, base_delay=0, max_delay=0, budget=10)
+
+@pytest.fixture
+def metrics():
+    return RetryMetrics(MetricsRegistry())
+
+def to_app_error(err):
+    reason = classify_transient_error(err)
+    if reason is None:
+        return DALError(f"数据库操作失败: {err}")
+    return TransientDatabaseError(f"数据库瞬时错误 ({reason}): {err}", reason=reason)
+
+def failing_work(*errors, result="ok"):
+    """依次抛出 errors 中的异常 (按 map_db_exception 的方式映射，再像 Service 层一样包装为 DALError)，之后返回 result。"""
+    remaining = list(errors)
+    calls = []
+
+    async def work():
+        calls.append(1)
+        if remaining:
+            err = remaining.pop(0)
+            try:
+                raise to_app_error(err) from err
+            except Exception as e:
+                raise DALError(f"Database error: {e}") from e
+        return result
+    work.calls = calls
+    return work
+
+@pytest.mark.parametrize("error, expected", [
+    (DEADLOCK, "deadlock"),
+    (LOCK_TIMEOUT, "lock_timeout"),
+    (CONNECTION_RESET, "connection"),
+    (CONSTRAINT, None),
+])
+def test_classify_transient_error(error, expected):
+    assert classify_transient_error(error) == expected
+
+def test_sqlserver_error_number_from_message():
+    assert sqlserver_error_number(DEADLOCK) == 1205
+    assert sqlserver_error_number(FakeDbError("42000", 1205)) == 1205
+    assert sqlserver_error_number(FakeDbError("no number here")) is None
+
+def test_find_transient_error_walks_wrapped_chain():
+    try:
+        run(failing_work(DEADLOCK)())
+    except DALError as e:
+        assert not isinstance(e, TransientDatabaseError)
+        assert find_transient_error(e).reason == "deadlock"
+    assert find_transient_error(DALError("plain")) is None
+
+def test_deadlock_is_retried_and_recovers(metrics):
+    conn = MagicMock()
+    work = failing_work(DEADLOCK, LOCK_TIMEOUT)
+
+    assert run(retry_transaction(conn, work, "order.create", make_policy(), metrics)) == "ok"
+    assert len(work.calls) == 3
+    assert conn.rollback.call_count == 2
+    assert conn.commit.call_count == 1
+    assert metrics.retries.value("order.create", "deadlock") == 1
+    assert metrics.retries.value("order.create", "lock_timeout") == 1
+    assert metrics.recovered.value("order.create") == 1
+
+def test_exhausted_retries_raise_transient_error(metrics):
+    conn = MagicMock()
+    work = failing_work(DEADLOCK, DEADLOCK, DEADLOCK)
+
+    with pytest.raises(TransientDatabaseError) as exc_info:
+        run(retry_transaction(conn, work, "order.create", make_policy(max_attempts=2), metrics))
+    assert exc_info.value.reason == "deadlock"
+    assert len(work.calls) == 2
+    conn.commit.assert_not_called()
+    assert metrics.exhausted.value("order.create", "deadlock") == 1
+
+def test_budget_stops_retries(metrics):
+    conn = MagicMock()
+    work = failing_work(DEADLOCK, DEADLOCK)
+    policy = RetryPolicy(max_attempts=5, base_delay=1, max_delay=1, budget=0)
+
+    with pytest.raises(TransientDatabaseError):
+        run(retry_transaction(conn, work, "order.create", policy, metrics))
+    assert len(work.calls) == 1
+
+def test_connection_errors_are_not_retried(metrics):
+    conn = MagicMock()
+    work = failing_work(CONNECTION_RESET)
+
+    with pytest.raises(TransientDatabaseError) as exc_info:
+        run(retry_transaction(conn, work, "order.create", make_policy(), metrics))
+    assert exc_info.value.reason == "connection"
+    assert len(work.calls) == 1
+    assert metrics.exhausted.value("order.create", "connection") == 1
+
+def test_non_transient_errors_propagate_unchanged(metrics):
+    conn = MagicMock()
+    work = failing_work(CONSTRAINT)
+
+    with pytest.raises(DALError) as exc_info:
+        run(retry_transaction(conn, work, "order.create", make_policy(), metrics))
+    assert not isinstance(exc_info.value, TransientDatabaseError)
+    assert len(work.calls) == 1
+    conn.rollback.assert_not_called()
@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+from uuid import UUID, uuid4
+
+from pydantic import BaseModel, Field
+
+from app.dal.row_mappers import RowMapper, get_row_mapper, USER_PROFILE_MAPPER
+from app.schemas.user_schemas import UserResponseSchema
+from app.schemas.order_schemas import OrderResponseSchema
+
+USER_COLUMNS = ["用户ID", "用户名", "账户状态", "信用分", "是否管理员", "是否超级管理员", "是否已认证",
+                "专业", "邮箱", "头像URL", "个人简介", "手机号码", "注册时间"]
+
+def make_user_row(user_id=None):
+    return (str(user_id or uuid4()).upper(), "alice", "Active", 100, True, False, True,
+            "CS", "a@example.com", None, None, None, datetime(2024, 1, 1))
+
+def test_user_mapper_matches_validated_schema():
+    row = make_user_row()
+    user = USER_PROFILE_MAPPER.compile(USER_COLUMNS)(row)
+    expected = UserResponseSchema(**{
+        "user_id": row[0], "username": "alice", "status": "Active", "credit": 100, "is_staff": True,
+        "is_super_admin": False, "is_verified": True, "major": "CS", "email": "a@example.com",
+        "join_time": datetime(2024, 1, 1),
+    })
+    assert isinstance(user, UserResponseSchema)
+    assert isinstance(user.user_id, UUID)
+    assert user == expected
+    # sp_GetAllUsers 没有 最后登录时间 列
+    assert user.last_login_time is None
+
+def test_compiled_mapper_is_cached_per_column_order():
+    first = USER_PROFILE_MAPPER.compile(USER_COLUMNS)
+    assert USER_PROFILE_MAPPER.compile(list(USER_COLUMNS)) is first
+    assert USER_PROFILE_MAPPER.compile(list(reversed(USER_COLUMNS))) is not first
+
+def test_map_dict_and_missing_flag_defaults():
+    user = USER_PROFILE_MAPPER.map_dict({"用户ID": uuid4(), "用户名": "bob", "账户状态": "Active", "信用分": 90, "注册时间": datetime(2024, 1, 1)})
+    assert user.is_staff is False
+    assert user.is_verified is False
+    assert USER_PROFILE_MAPPER.map_dict(None) is None
+
+def test_order_mapper_converts_decimal_and_uuid():
+    mapper = get_row_mapper("sp_GetOrdersByUser")
+    columns = ["OrderID", "ProductID", "ProductName", "Quantity", "TotalPrice", "OrderStatus",
+               "CreateTime", "CompleteTime", "CancelTime", "CancelReason", "SellerID", "BuyerID", "SellerUsername"]
+    order_id, product_id, seller_id, buyer_id = uuid4(), uuid4(), uuid4(), uuid4()
+    rows = [(str(order_id), str(product_id), "书", 2, Decimal("39.80"), "Completed",
+             datetime(2024, 1, 1), None, None, None, str(seller_id), str(buyer_id), "seller")]
+    order = mapper.map_rows(columns, rows)[0]
+    assert isinstance(order, OrderResponseSchema)
+    assert order.order_id == order_id
+    assert order.buyer_id == buyer_id
+    assert order.total_price == pytest.approx(39.8)
+    assert order.updated_at is None
+    assert OrderResponseSchema.model_validate(order.model_dump()) == order
+
+def test_missing_required_column_is_rejected():
+    mapper = get_row_mapper("sp_GetOrdersByUser")
+    columns = ["OrderID", "ProductID", "Quantity", "TotalPrice", "OrderStatus", "CreateTime", "SellerID"]
+    with pytest.raises(ValueError, match="BuyerID"):
+        mapper.compile(columns)
+
+def test_mutable_defaults_are_not_shared_between_rows():
+    class Tagged(BaseModel):
+        name: str
+        tags: List[str] = Field(default_factory=list)
+        labels: List[str] = []
+
+    users = RowMapper(Tagged, {"名称": "name"}).map_rows(["名称"], [("a",), ("b",)])
+    users[0].tags.append("x")
+    users[0].labels.append("y")
+    assert users[1].tags == []
+    assert users[1].labels == []
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError):
+        RowMapper(UserResponseSchema, {"用户ID": "no_such_field"})
+    with pytest.raises(KeyError):
+        get_row_mapper("sp_DoesNotExist")
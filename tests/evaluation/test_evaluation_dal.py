@@ -146,7 +146,7 @@ async def test_create_evaluation_success(
 
     # Assert that the injected mock execute function was called correctly
     expected_sql = "EXEC sp_CreateEvaluation @OrderID=?, @BuyerID=?, @Rating=?, @Comment=?"
-    expected_params = (order_id, str(buyer_id), rating, comment)
+    expected_params = (order_id, buyer_id, rating, comment)
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         expected_sql,
@@ -196,7 +196,7 @@ async def test_create_evaluation_pyodbc_error(
 
     # Assert that the injected mock execute function was called correctly
     expected_sql = "EXEC sp_CreateEvaluation @OrderID=?, @BuyerID=?, @Rating=?, @Comment=?"
-    expected_params = (order_id, str(buyer_id), rating, comment)
+    expected_params = (order_id, buyer_id, rating, comment)
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         expected_sql,
@@ -245,7 +245,7 @@ async def test_create_evaluation_generic_exception(
 
     # Assert that the injected mock execute function was called correctly
     expected_sql = "EXEC sp_CreateEvaluation @OrderID=?, @BuyerID=?, @Rating=?, @Comment=?"
-    expected_params = (order_id, str(buyer_id), rating, comment)
+    expected_params = (order_id, buyer_id, rating, comment)
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         expected_sql,
@@ -277,7 +277,7 @@ async def test_get_evaluations_by_product_id_success(
 
     # Assert that the injected mock execute function was called correctly
     expected_sql = "EXEC sp_GetEvaluationsByProductID @ProductID=?, @PageNumber=?, @PageSize=?"
-    expected_params = (str(product_id), 1, 10)
+    expected_params = (product_id, 1, 10)
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         expected_sql,
@@ -310,7 +310,7 @@ async def test_get_evaluations_by_buyer_id_success(
 
     # Assert that the injected mock execute function was called correctly
     expected_sql = "EXEC sp_GetEvaluationsByBuyerID @BuyerID=?, @PageNumber=?, @PageSize=?"
-    expected_params = (str(buyer_id), 1, 10)
+    expected_params = (buyer_id, 1, 10)
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         expected_sql,
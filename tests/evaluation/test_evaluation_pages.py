@@ -0,0 +1,88 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.dal.evaluation_dal import EvaluationDAL
+from app.schemas.evaluation_schemas import EvaluationResponseSchema
+from app.services.evaluation_service import EvaluationService
+
+SELLER_ID = uuid4()
+START = datetime(2024, 5, 1, 12, 0, 0)
+
+def evaluation_row(index, rating=5):
+    return {
+        "EvaluationID": str(uuid4()), "OrderID": str(uuid4()), "ProductID": str(uuid4()),
+        "BuyerID": str(uuid4()), "SellerID": str(SELLER_ID), "Rating": rating, "Content": f"评价 {index}",
+        "CreateTime": START - timedelta(minutes=index),
+    }
+
+@pytest.fixture
+def execute_query():
+    return AsyncMock()
+
+@pytest.fixture
+def evaluation_service(execute_query):
+    return EvaluationService(EvaluationDAL(execute_query_func=execute_query))
+
+@pytest.fixture
+def conn():
+    return MagicMock()
+
+@pytest.mark.asyncio
+async def test_seller_page_is_one_round_trip(evaluation_service, execute_query, conn):
+    # 过程返回 page_size + 1 行，多出的一行表示还有下一页
+    execute_query.return_value = [[{"EvaluationCount": 3, "RatingSum": 14}], [evaluation_row(i) for i in range(3)]]
+
+    page = await evaluation_service.get_evaluation_page(conn, "Seller", SELLER_ID, page_size=2)
+
+    assert execute_query.await_count == 1
+    _, sql, params = execute_query.await_args.args
+    assert "sp_GetEvaluationPage" in sql
+    assert params == ("Seller", SELLER_ID, None, None, 2, None, None)
+    assert execute_query.await_args.kwargs == {"fetch_sets": True}
+
+    assert page.summary.evaluation_count == 3
+    assert page.summary.average_rating == 4.67
+    assert len(page.items) == 2
+    assert isinstance(page.items[0], EvaluationResponseSchema)
+    assert page.items[0].comment == "评价 0"
+    assert page.next_cursor is not None
+
+@pytest.mark.asyncio
+async def test_next_cursor_and_rating_filter_are_passed_through(evaluation_service, execute_query, conn):
+    rows = [evaluation_row(i, rating=1) for i in range(3)]
+    execute_query.return_value = [[{"EvaluationCount": 3, "RatingSum": 3}], rows]
+    first = await evaluation_service.get_evaluation_page(conn, "Product", SELLER_ID, max_rating=2, page_size=2)
+
+    execute_query.return_value = [[{"EvaluationCount": 3, "RatingSum": 3}], rows[2:]]
+    second = await evaluation_service.get_evaluation_page(
+        conn, "Product", SELLER_ID, max_rating=2, page_size=2, cursor=first.next_cursor
+    )
+
+    _, _, params = execute_query.await_args.args
+    last = first.items[-1]
+    assert params == ("Product", SELLER_ID, None, 2, 2, last.created_at, last.evaluation_id)
+    assert len(second.items) == 1
+    assert second.next_cursor is None
+
+@pytest.mark.asyncio
+async def test_empty_page(evaluation_service, execute_query, conn):
+    execute_query.return_value = [[{"EvaluationCount": 0, "RatingSum": 0}], []]
+
+    page = await evaluation_service.get_evaluation_page(conn, "Buyer", SELLER_ID)
+
+    assert page.items == []
+    assert page.next_cursor is None
+    assert page.summary.evaluation_count == 0
+    assert page.summary.average_rating is None
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("scope, min_rating, max_rating", [
+    ("Category", None, None),
+    ("Seller", 4, 2),
+])
+async def test_invalid_arguments_are_rejected_without_a_query(evaluation_service, execute_query, conn, scope, min_rating, max_rating):
+    with pytest.raises(ValueError):
+        await evaluation_service.get_evaluation_page(conn, scope, SELLER_ID, min_rating=min_rating, max_rating=max_rating)
+    execute_query.assert_not_awaited()
@@ -447,3 +447,45 @@ async def test_get_evaluations_by_buyer_id_dal_error(
         mock_conn,
         buyer_id=buyer_id
     )
+
+
+# --- 卖家信誉汇总 ---
+
+@pytest.mark.asyncio
+async def test_get_seller_reputation(evaluation_service: EvaluationService, mock_evaluation_dal: AsyncMock, mock_conn: MagicMock):
+    last_time = datetime(2024, 5, 1, 12, 0, 0)
+    mock_evaluation_dal.get_seller_reputation.return_value = {
+        "SellerID": str(TEST_SELLER_ID), "Credit": 96, "EvaluationCount": 3, "RatingSum": 13,
+        "Rating1Count": 0, "Rating2Count": 0, "Rating3Count": 0, "Rating4Count": 2, "Rating5Count": 1,
+        "LastEvaluationTime": last_time,
+    }
+
+    reputation = await evaluation_service.get_seller_reputation(mock_conn, TEST_SELLER_ID)
+
+    mock_evaluation_dal.get_seller_reputation.assert_called_once_with(mock_conn, TEST_SELLER_ID)
+    assert reputation.seller_id == TEST_SELLER_ID
+    assert reputation.evaluation_count == 3
+    assert reputation.average_rating == 4.33
+    assert reputation.rating_distribution == {1: 0, 2: 0, 3: 0, 4: 2, 5: 1}
+    assert reputation.last_evaluation_time == last_time
+
+@pytest.mark.asyncio
+async def test_get_seller_reputation_without_evaluations(evaluation_service: EvaluationService, mock_evaluation_dal: AsyncMock, mock_conn: MagicMock):
+    mock_evaluation_dal.get_seller_reputation.return_value = {
+        "SellerID": str(TEST_SELLER_ID), "Credit": 100, "EvaluationCount": 0, "RatingSum": 0,
+        "Rating1Count": 0, "Rating2Count": 0, "Rating3Count": 0, "Rating4Count": 0, "Rating5Count": 0,
+        "LastEvaluationTime": None,
+    }
+
+    reputation = await evaluation_service.get_seller_reputation(mock_conn, TEST_SELLER_ID)
+
+    assert reputation.evaluation_count == 0
+    assert reputation.average_rating is None
+    assert reputation.rating_distribution == {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+
+@pytest.mark.asyncio
+async def test_get_seller_reputation_unknown_seller(evaluation_service: EvaluationService, mock_evaluation_dal: AsyncMock, mock_conn: MagicMock):
+    mock_evaluation_dal.get_seller_reputation.return_value = None
+
+    with pytest.raises(NotFoundError):
+        await evaluation_service.get_seller_reputation(mock_conn, TEST_SELLER_ID)
@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+from app.dal.orders_dal import OrdersDAL
+from app.schemas.order_schemas import OrderSummarySchema
+from app.services.order_service import OrderService
+from app.utils.keyset import InvalidCursorError
+
+USER_ID = uuid4()
+START = datetime(2024, 5, 1, 12, 0, 0)
+
+def summary_row(index):
+    return {
+        "OrderID": str(uuid4()), "SellerID": str(uuid4()), "BuyerID": str(USER_ID), "ProductID": str(uuid4()),
+        "Quantity": 1, "TotalPrice": Decimal("25.50"), "OrderStatus": "Completed",
+        "CreateTime": START - timedelta(minutes=index), "CompleteTime": None, "CancelTime": None, "CancelReason": None,
+        "ProductName": f"教材 {index}", "UnitPrice": Decimal("25.50"), "MainImageURL": f"/uploads/{index}.jpg",
+        "CounterpartID": str(uuid4()), "CounterpartUsername": f"seller{index}",
+    }
+
+COUNT_ROWS = [
+    {"Role": "Buyer", "OrderStatus": "Completed", "OrderCount": 3},
+    {"Role": "Buyer", "OrderStatus": "Cancelled", "OrderCount": 1},
+    {"Role": "Seller", "OrderStatus": "PendingSellerConfirmation", "OrderCount": 2},
+]
+
+@pytest.fixture
+def execute_query():
+    return AsyncMock()
+
+@pytest.fixture
+def order_service(execute_query):
+    return OrderService(OrdersDAL(execute_query_func=execute_query))
+
+@pytest.fixture
+def conn():
+    return MagicMock()
+
+@pytest.mark.asyncio
+async def test_history_page_is_one_round_trip(order_service, execute_query, conn):
+    # 过程返回 page_size + 1 行，多出的一行表示还有下一页
+    execute_query.return_value = [COUNT_ROWS, [summary_row(i) for i in range(3)]]
+
+    page = await order_service.get_order_history(conn, USER_ID, page_size=2)
+
+    assert execute_query.await_count == 1
+    _, sql, params = execute_query.await_args.args
+    assert "sp_GetOrderHistory" in sql
+    assert params == (USER_ID, False, None, 2, None, None)
+    assert execute_query.await_args.kwargs == {"fetch_sets": True}
+
+    assert len(page.items) == 2
+    item = page.items[0]
+    assert isinstance(item, OrderSummarySchema)
+    assert item.product_name == "教材 0"
+    assert item.unit_price == 25.5 and item.total_price == 25.5
+    assert item.main_image_url == "/uploads/0.jpg"
+    assert item.counterpart_username == "seller0"
+    assert isinstance(item.counterpart_id, UUID)
+    assert page.status_counts == {
+        "buyer": {"Completed": 3, "Cancelled": 1},
+        "seller": {"PendingSellerConfirmation": 2},
+    }
+    assert page.next_cursor is not None
+
+@pytest.mark.asyncio
+async def test_next_cursor_continues_after_last_item(order_service, execute_query, conn):
+    rows = [summary_row(i) for i in range(3)]
+    execute_query.return_value = [COUNT_ROWS, rows]
+    first = await order_service.get_order_history(conn, USER_ID, as_seller=True, status="Completed", page_size=2)
+
+    execute_query.return_value = [COUNT_ROWS, rows[2:]]
+    second = await order_service.get_order_history(
+        conn, USER_ID, as_seller=True, status="Completed", page_size=2, cursor=first.next_cursor
+    )
+
+    _, _, params = execute_query.await_args.args
+    last = first.items[-1]
+    assert params == (USER_ID, True, "Completed", 2, last.created_at, last.order_id)
+    assert len(second.items) == 1
+    assert second.next_cursor is None
+
+@pytest.mark.asyncio
+async def test_empty_history(order_service, execute_query, conn):
+    execute_query.return_value = [[], []]
+
+    page = await order_service.get_order_history(conn, USER_ID)
+
+    assert page.items == []
+    assert page.next_cursor is None
+    assert page.status_counts == {"buyer": {}, "seller": {}}
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected_without_a_query(order_service, execute_query, conn):
+    with pytest.raises(InvalidCursorError):
+        await order_service.get_order_history(conn, USER_ID, cursor="garbage")
+    execute_query.assert_not_awaited()
@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from app.dal.orders_dal import OrdersDAL
+from app.dal.row_mappers import ORDER_MAPPER
+from app.core.metrics import MetricsRegistry
+from app.exceptions import DALError, ForbiddenError, IntegrityError, InsufficientStockError, NotFoundError
+from app.schemas.order_schemas import OrderCreateSchema
+from app.services.order_service import OrderService
+from app.services.stock_gate import StockAdmissionGate, StockGateMetrics
+
+ORDER_ID = uuid4()
+USER_ID = uuid4()
+
+@pytest.fixture
+def updated_order():
+    return MagicMock(name="OrderResponseSchema")
+
+@pytest.fixture
+def execute_query(updated_order):
+    """记录每次数据库调用；状态变更过程直接返回变更后的订单。"""
+    return AsyncMock(return_value=updated_order)
+
+@pytest.fixture
+def order_service(execute_query):
+    return OrderService(OrdersDAL(execute_query_func=execute_query))
+
+@pytest.fixture
+def conn():
+    return MagicMock()
+
+TRANSITIONS = [
+    ("confirm_order", (ORDER_ID, USER_ID), "sp_ConfirmOrder"),
+    ("complete_order", (ORDER_ID, USER_ID), "sp_CompleteOrder"),
+    ("reject_order", (ORDER_ID, USER_ID, "缺货"), "sp_RejectOrder"),
+    ("cancel_order", (ORDER_ID, USER_ID, "不想要了"), "sp_CancelOrder"),
+]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, args, procedure", TRANSITIONS)
+async def test_transition_is_one_round_trip(order_service, execute_query, updated_order, conn, method, args, procedure):
+    result = await getattr(order_service, method)(conn, *args)
+
+    assert result is updated_order
+    assert execute_query.await_count == 1
+    _, sql, _ = execute_query.await_args.args
+    assert procedure in sql
+    assert execute_query.await_args.kwargs == {"fetchone": True, "row_mapper": ORDER_MAPPER}
+
+def created_order_row(product_id, remaining):
+    return {
+        "OrderID": str(ORDER_ID), "SellerID": str(uuid4()), "BuyerID": str(USER_ID), "ProductID": str(product_id),
+        "Quantity": 1, "TotalPrice": 10, "OrderStatus": "PendingSellerConfirmation", "CreateTime": None,
+        "CompleteTime": None, "CancelTime": None, "CancelReason": None, "RemainingQuantity": remaining,
+    }
+
+@pytest.mark.asyncio
+async def test_create_order_is_one_round_trip(order_service, execute_query, conn):
+    product_id = uuid4()
+    execute_query.return_value = created_order_row(product_id, remaining=4)
+    order_data = OrderCreateSchema(product_id=product_id, quantity=1, total_price=10.0)
+
+    order = await order_service.create_order(conn, order_data, USER_ID)
+
+    assert order.order_id == ORDER_ID
+    assert order.status == "PendingSellerConfirmation"
+    assert execute_query.await_count == 1
+    assert "sp_CreateOrder" in execute_query.await_args.args[1]
+
+@pytest.mark.asyncio
+async def test_sold_out_product_is_rejected_without_a_query(execute_query, conn):
+    gate = StockAdmissionGate(metrics=StockGateMetrics(MetricsRegistry()))
+    order_service = OrderService(OrdersDAL(execute_query_func=execute_query), stock_gate=gate)
+    product_id = uuid4()
+    execute_query.return_value = created_order_row(product_id, remaining=0) # 买走了最后一件
+    order_data = OrderCreateSchema(product_id=product_id, quantity=1, total_price=10.0)
+
+    await order_service.create_order(conn, order_data, USER_ID)
+    with pytest.raises(InsufficientStockError):
+        await order_service.create_order(conn, order_data, USER_ID)
+
+    assert execute_query.await_count == 1
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, args, message, expected", [
+    ("confirm_order", (ORDER_ID, USER_ID), "[42000] 确认订单失败：订单不存在或您不是该订单的卖家。 (50004)", NotFoundError),
+    ("confirm_order", (ORDER_ID, USER_ID), "[42000] 确认订单失败：当前状态：Completed (50005)", IntegrityError),
+    ("complete_order", (ORDER_ID, USER_ID), "[42000] 完成订单失败：您无权完成此订单。 (50007)", ForbiddenError),
+    ("cancel_order", (ORDER_ID, USER_ID, "不想要了"), "[42000] 取消订单失败：订单不存在。 (50016)", NotFoundError),
+])
+async def test_procedure_errors_are_mapped(order_service, execute_query, conn, method, args, message, expected):
+    # execute_query 把存储过程的 THROW 包装为通用 DALError
+    execute_query.side_effect = DALError(f"未知数据库错误: {message}")
+
+    with pytest.raises(expected):
+        await getattr(order_service, method)(conn, *args)
+    assert execute_query.await_count == 1
+
+@pytest.mark.asyncio
+async def test_missing_result_row_is_an_error(order_service, execute_query, conn):
+    execute_query.return_value = None
+
+    with pytest.raises(DALError, match="did not return"):
+        await order_service.confirm_order(conn, ORDER_ID, USER_ID)
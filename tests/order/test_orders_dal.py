@@ -2,6 +2,8 @@ import pytest
 import pytest_mock
 from unittest.mock import AsyncMock, patch, MagicMock, ANY
 from app.dal.orders_dal import OrdersDAL
+from app.dal.row_mappers import get_row_mapper
+from app.dal.exceptions import map_db_exception
 from app.schemas.order_schemas import OrderCreateSchema, OrderResponseSchema, OrderStatusUpdateSchema
 from uuid import UUID, uuid4
 from datetime import datetime, timezone
@@ -96,9 +98,7 @@ async def test_create_order_success(
         mock_db_connection, # Pass mock_db_connection
         buyer_id,
         mock_order_create_schema.product_id,
-        mock_order_create_schema.quantity,
-        mock_order_create_schema.shipping_address,
-        mock_order_create_schema.contact_phone
+        mock_order_create_schema.quantity
     )
 
     # Assert that the method returned the expected UUID
@@ -108,13 +108,11 @@ async def test_create_order_success(
     # Verify the injected execute_query_func was called with the correct parameters
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection, # Verify conn is passed
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}", # Updated SQL format
+        "{CALL sp_CreateOrder (?, ?, ?)}", # Updated SQL format
         (
-            str(buyer_id), # Pass UUID as string
-            str(mock_order_create_schema.product_id), # Pass UUID as string
-            mock_order_create_schema.quantity,
-            mock_order_create_schema.shipping_address,
-            mock_order_create_schema.contact_phone
+            buyer_id,
+            mock_order_create_schema.product_id,
+            mock_order_create_schema.quantity
         ),
         fetchone=True # Assuming SP returns a single row result
     )
@@ -140,21 +138,17 @@ async def test_create_order_db_error(
              mock_db_connection, # Pass mock_db_connection
              buyer_id,
              mock_order_create_schema.product_id,
-             mock_order_create_schema.quantity,
-             mock_order_create_schema.shipping_address,
-             mock_order_create_schema.contact_phone
+             mock_order_create_schema.quantity
          )
 
     # Verify the injected execute_query_func was called with the correct parameters
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection, # Verify conn is passed
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}", # Updated SQL format
+        "{CALL sp_CreateOrder (?, ?, ?)}", # Updated SQL format
         (
-            str(buyer_id), # Pass UUID as string
-            str(mock_order_create_schema.product_id), # Pass UUID as string
-            mock_order_create_schema.quantity,
-            mock_order_create_schema.shipping_address,
-            mock_order_create_schema.contact_phone
+            buyer_id,
+            mock_order_create_schema.product_id,
+            mock_order_create_schema.quantity
         ),
         fetchone=True # Assuming SP returns a single row result
     )
@@ -251,7 +245,7 @@ async def test_get_order_by_id_db_error(
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         "{CALL sp_GetOrderById (?)}",
-        (str(order_id),), # Ensure UUID is converted to string for DAL call
+        (order_id,),
         fetchone=True
     )
 
@@ -323,7 +317,8 @@ async def test_get_orders_by_user_buyer_found(
             1, # Default page_number is 1
             10 # Default page_size is 10
         ),
-        fetchall=True # Assuming SP returns multiple rows
+        fetchall=True, # Assuming SP returns multiple rows
+        row_mapper=get_row_mapper("sp_GetOrdersByUser")
     )
 
 @pytest.mark.asyncio
@@ -361,8 +356,9 @@ async def test_get_orders_by_user_seller_found(
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         "{CALL sp_GetOrdersByUser (?, ?, ?, ?, ?)}",
-        (str(user_id), True, "Confirmed", 1, 10),
-        fetchall=True
+        (user_id, True, "Confirmed", 1, 10),
+        fetchall=True,
+        row_mapper=get_row_mapper("sp_GetOrdersByUser")
     )
 
 @pytest.mark.asyncio
@@ -382,8 +378,9 @@ async def test_get_orders_by_user_seller_not_found(
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         "{CALL sp_GetOrdersByUser (?, ?, ?, ?, ?)}",
-        (str(user_id), True, "Pending", 1, 10),
-        fetchall=True
+        (user_id, True, "Pending", 1, 10),
+        fetchall=True,
+        row_mapper=get_row_mapper("sp_GetOrdersByUser")
     )
 
 @pytest.mark.asyncio
@@ -540,15 +537,18 @@ async def test_complete_order_success(
 ):
     order_id = uuid4()
     actor_id = uuid4() # Could be buyer or admin
-    mock_execute_query_func.return_value = None
+    completed_order = MagicMock(spec=OrderResponseSchema)
+    mock_execute_query_func.return_value = completed_order # sp_CompleteOrder returns the completed order row
 
-    await orders_dal.complete_order(mock_db_connection, order_id, actor_id)
+    result = await orders_dal.complete_order(mock_db_connection, order_id, actor_id)
 
+    assert result is completed_order
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         "{CALL sp_CompleteOrder (?, ?)}",
-        (str(order_id), str(actor_id)),
-        fetchone=False
+        (order_id, actor_id),
+        fetchone=True,
+        row_mapper=get_row_mapper("sp_CompleteOrder")
     )
 
 @pytest.mark.asyncio
@@ -560,7 +560,7 @@ async def test_complete_order_not_found(
     order_id = uuid4()
     actor_id = uuid4()
     error_msg = "[SQLSTATE 50006] 订单不存在"
-    mock_execute_query_func.side_effect = pyodbc.Error(error_msg)
+    mock_execute_query_func.side_effect = map_db_exception(pyodbc.Error(error_msg)) # execute_query 抛出的是映射后的 DALError
 
     with pytest.raises(NotFoundError) as excinfo:
         await orders_dal.complete_order(mock_db_connection, order_id, actor_id)
@@ -576,7 +576,7 @@ async def test_complete_order_forbidden(
     order_id = uuid4()
     actor_id = uuid4()
     error_msg = "[SQLSTATE 50007] 您无权完成此订单"
-    mock_execute_query_func.side_effect = pyodbc.Error(error_msg)
+    mock_execute_query_func.side_effect = map_db_exception(pyodbc.Error(error_msg)) # execute_query 抛出的是映射后的 DALError
 
     with pytest.raises(ForbiddenError) as excinfo:
         await orders_dal.complete_order(mock_db_connection, order_id, actor_id)
@@ -592,7 +592,7 @@ async def test_complete_order_invalid_status(
     order_id = uuid4()
     actor_id = uuid4()
     error_msg = "[SQLSTATE 50008] 订单状态不正确"
-    mock_execute_query_func.side_effect = pyodbc.Error(error_msg)
+    mock_execute_query_func.side_effect = map_db_exception(pyodbc.Error(error_msg)) # execute_query 抛出的是映射后的 DALError
 
     with pytest.raises(IntegrityError) as excinfo:
         await orders_dal.complete_order(mock_db_connection, order_id, actor_id)
@@ -651,8 +651,9 @@ async def test_get_orders_by_user_seller_found(
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         "{CALL sp_GetOrdersByUser (?, ?, ?, ?, ?)}",
-        (str(user_id), True, "Confirmed", 1, 10),
-        fetchall=True
+        (user_id, True, "Confirmed", 1, 10),
+        fetchall=True,
+        row_mapper=get_row_mapper("sp_GetOrdersByUser")
     )
 
 @pytest.mark.asyncio
@@ -672,8 +673,9 @@ async def test_get_orders_by_user_seller_not_found(
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         "{CALL sp_GetOrdersByUser (?, ?, ?, ?, ?)}",
-        (str(user_id), True, "Pending", 1, 10),
-        fetchall=True
+        (user_id, True, "Pending", 1, 10),
+        fetchall=True,
+        row_mapper=get_row_mapper("sp_GetOrdersByUser")
     )
 
 @pytest.mark.asyncio
@@ -707,9 +709,7 @@ async def test_create_order_with_minimum_quantity(orders_dal: OrdersDAL, mock_or
         mock_db_connection,
         buyer_id,
         min_quantity_schema.product_id,
-        min_quantity_schema.quantity,
-        min_quantity_schema.shipping_address,
-        min_quantity_schema.contact_phone
+        min_quantity_schema.quantity
     )
 
     assert isinstance(returned_order_id, UUID)
@@ -717,13 +717,11 @@ async def test_create_order_with_minimum_quantity(orders_dal: OrdersDAL, mock_or
 
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection, # Verify conn is passed
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}", # Updated SQL format
+        "{CALL sp_CreateOrder (?, ?, ?)}", # Updated SQL format
         (
-            str(buyer_id), # Pass UUID as string
-            str(mock_order_create_schema.product_id), # Pass UUID as string
-            mock_order_create_schema.quantity,
-            mock_order_create_schema.shipping_address,
-            mock_order_create_schema.contact_phone
+            buyer_id,
+            mock_order_create_schema.product_id,
+            mock_order_create_schema.quantity
         ),
         fetchone=True
     )
@@ -741,9 +739,7 @@ async def test_create_order_with_large_quantity(orders_dal: OrdersDAL, mock_orde
         mock_db_connection,
         buyer_id,
         large_quantity_schema.product_id,
-        large_quantity_schema.quantity,
-        large_quantity_schema.shipping_address,
-        large_quantity_schema.contact_phone
+        large_quantity_schema.quantity
     )
 
     assert isinstance(returned_order_id, UUID)
@@ -751,13 +747,11 @@ async def test_create_order_with_large_quantity(orders_dal: OrdersDAL, mock_orde
 
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
-            str(buyer_id),
-            str(large_quantity_schema.product_id),
-            large_quantity_schema.quantity,
-            large_quantity_schema.shipping_address,
-            large_quantity_schema.contact_phone
+            buyer_id,
+            large_quantity_schema.product_id,
+            large_quantity_schema.quantity
         ),
         fetchone=True
     )
@@ -781,9 +775,7 @@ async def test_create_order_with_zero_total_price(orders_dal: OrdersDAL, mock_or
         mock_db_connection,
         buyer_id,
         zero_price_schema.product_id,
-        zero_price_schema.quantity,
-        zero_price_schema.shipping_address,
-        zero_price_schema.contact_phone
+        zero_price_schema.quantity
     )
 
     assert isinstance(returned_order_id, UUID)
@@ -791,13 +783,11 @@ async def test_create_order_with_zero_total_price(orders_dal: OrdersDAL, mock_or
 
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
-            str(buyer_id),
-            str(zero_price_schema.product_id),
-            zero_price_schema.quantity,
-            zero_price_schema.shipping_address,
-            zero_price_schema.contact_phone
+            buyer_id,
+            zero_price_schema.product_id,
+            zero_price_schema.quantity
         ),
         fetchone=True
     )
@@ -817,20 +807,16 @@ async def test_create_order_with_negative_total_price_raises_value_error(orders_
             mock_db_connection,
             buyer_id,
             negative_price_schema.product_id,
-            negative_price_schema.quantity,
-            negative_price_schema.shipping_address,
-            negative_price_schema.contact_phone
+            negative_price_schema.quantity
         )
     
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
-            str(buyer_id),
-            str(negative_price_schema.product_id),
-            negative_price_schema.quantity,
-            negative_price_schema.shipping_address,
-            negative_price_schema.contact_phone
+            buyer_id,
+            negative_price_schema.product_id,
+            negative_price_schema.quantity
         ),
         fetchone=True
     )
@@ -850,20 +836,16 @@ async def test_create_order_with_empty_shipping_address_raises_value_error(order
             mock_db_connection,
             buyer_id,
             empty_address_schema.product_id,
-            empty_address_schema.quantity,
-            empty_address_schema.shipping_address,
-            empty_address_schema.contact_phone
+            empty_address_schema.quantity
         )
     
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
-            str(buyer_id),
-            str(empty_address_schema.product_id),
-            empty_address_schema.quantity,
-            empty_address_schema.shipping_address,
-            empty_address_schema.contact_phone
+            buyer_id,
+            empty_address_schema.product_id,
+            empty_address_schema.quantity
         ),
         fetchone=True
     )
@@ -883,20 +865,16 @@ async def test_create_order_with_empty_contact_phone_raises_value_error(orders_d
             mock_db_connection,
             buyer_id,
             empty_phone_schema.product_id,
-            empty_phone_schema.quantity,
-            empty_phone_schema.shipping_address,
-            empty_phone_schema.contact_phone
+            empty_phone_schema.quantity
         )
     
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
-            str(buyer_id),
-            str(empty_phone_schema.product_id),
-            empty_phone_schema.quantity,
-            empty_phone_schema.shipping_address,
-            empty_phone_schema.contact_phone
+            buyer_id,
+            empty_phone_schema.product_id,
+            empty_phone_schema.quantity
         ),
         fetchone=True
     )
@@ -922,9 +900,9 @@ async def test_create_order_with_invalid_product_id_raises_value_error(orders_da
 
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
-            str(buyer_id),
+            buyer_id,
             invalid_product_id_str, # Assert with the invalid string passed
             1,
             "address",
@@ -954,10 +932,10 @@ async def test_create_order_with_invalid_buyer_id_raises_value_error(orders_dal:
 
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
             invalid_buyer_id_str, # Assert with the invalid string passed
-            str(product_id),
+            product_id,
             1,
             "address",
             "phone"
@@ -978,20 +956,16 @@ async def test_create_order_db_connection_error(orders_dal: OrdersDAL, mock_orde
             mock_db_connection,
             buyer_id,
             mock_order_create_schema.product_id,
-            mock_order_create_schema.quantity,
-            mock_order_create_schema.shipping_address,
-            mock_order_create_schema.contact_phone
+            mock_order_create_schema.quantity
         )
     
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
-            str(buyer_id),
-            str(mock_order_create_schema.product_id),
-            mock_order_create_schema.quantity,
-            mock_order_create_schema.shipping_address,
-            mock_order_create_schema.contact_phone
+            buyer_id,
+            mock_order_create_schema.product_id,
+            mock_order_create_schema.quantity
         ),
         fetchone=True
     )
@@ -1009,20 +983,16 @@ async def test_create_order_db_insert_error(orders_dal: OrdersDAL, mock_order_cr
             mock_db_connection,
             buyer_id,
             mock_order_create_schema.product_id,
-            mock_order_create_schema.quantity,
-            mock_order_create_schema.shipping_address,
-            mock_order_create_schema.contact_phone
+            mock_order_create_schema.quantity
         )
     
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
         "{CALL sp_CreateOrder(?, ?, ?, ?, ?)}",
         (
-            str(buyer_id),
-            str(mock_order_create_schema.product_id),
-            mock_order_create_schema.quantity,
-            mock_order_create_schema.shipping_address,
-            mock_order_create_schema.contact_phone
+            buyer_id,
+            mock_order_create_schema.product_id,
+            mock_order_create_schema.quantity
         ),
         fetchone=True
     )
@@ -1143,21 +1113,17 @@ async def test_create_order_invalid_quantity(orders_dal: OrdersDAL, mock_order_c
              mock_db_connection, # Pass mock_db_connection
              buyer_id,
              invalid_quantity_schema.product_id,
-             invalid_quantity_schema.quantity,
-             invalid_quantity_schema.shipping_address,
-             invalid_quantity_schema.contact_phone
+             invalid_quantity_schema.quantity
          )
     assert "商品库存不足" in str(excinfo.value)
 
     mock_execute_query_func.assert_called_once_with(
         mock_db_connection,
-        "{CALL sp_CreateOrder (?, ?, ?, ?, ?)}",
+        "{CALL sp_CreateOrder (?, ?, ?)}",
         (
-            str(buyer_id),
-            str(invalid_quantity_schema.product_id),
-            invalid_quantity_schema.quantity,
-            invalid_quantity_schema.shipping_address,
-            invalid_quantity_schema.contact_phone
+            buyer_id,
+            invalid_quantity_schema.product_id,
+            invalid_quantity_schema.quantity
         ),
         fetchone=True
     )
\ No newline at end of file
@@ -226,57 +226,31 @@ async def test_confirm_order_success(
     mock_db_connection: MagicMock,
     base_mock_order_response_schema: OrderResponseSchema # 使用 fixture
 ):
-    # Mock get_order_by_id for pre-check and post-update fetch
-    initial_order_state = base_mock_order_response_schema.model_copy(update={
-        "status": "PendingConfirmation"
-    })
+    # sp_ConfirmOrder 在一次往返中检查前置条件并返回确认后的订单，服务层不再前后查询订单
     confirmed_order_state = base_mock_order_response_schema.model_copy(update={
-        "status": "Confirmed", # Status updated
-        "updated_at": datetime.now(timezone.utc) # 模拟更新时间
+        "status": "ConfirmedBySeller"
     })
-    
-    # First call to get_order_by_id (pre-check), second call (post-update fetch)
-    mock_order_dal.get_order_by_id.side_effect = [initial_order_state, confirmed_order_state]
-    mock_order_dal.confirm_order.return_value = None # confirm_order SP might not return anything
+    mock_order_dal.confirm_order.return_value = confirmed_order_state
 
     updated_order = await order_service.confirm_order(mock_db_connection, TEST_ORDER_ID, TEST_SELLER_ID)
 
     assert updated_order == confirmed_order_state
-    assert mock_order_dal.get_order_by_id.call_count == 2
-    mock_order_dal.get_order_by_id.assert_any_call(mock_db_connection, TEST_ORDER_ID)
-    mock_order_dal.confirm_order.assert_called_once_with(mock_db_connection, TEST_ORDER_ID, TEST_SELLER_ID) # 添加 seller_id 参数
+    mock_order_dal.get_order_by_id.assert_not_called()
+    mock_order_dal.confirm_order.assert_called_once_with(mock_db_connection, TEST_ORDER_ID, TEST_SELLER_ID)
 
 @pytest.mark.asyncio
-async def test_confirm_order_not_found_initial_fetch(
+async def test_confirm_order_not_found(
     order_service: OrderService, 
     mock_order_dal: AsyncMock, 
     mock_db_connection: MagicMock
 ):
-    mock_order_dal.get_order_by_id.return_value = None # Order not found initially
-
-    with pytest.raises(NotFoundError, match=f"Order with ID {TEST_ORDER_ID} not found."):
-        await order_service.confirm_order(mock_db_connection, TEST_ORDER_ID, TEST_SELLER_ID)
-    
-    mock_order_dal.confirm_order.assert_not_called()
-
-@pytest.mark.asyncio
-async def test_confirm_order_not_found_after_confirmation(
-    order_service: OrderService, 
-    mock_order_dal: AsyncMock, 
-    mock_db_connection: MagicMock,
-    base_mock_order_response_schema: OrderResponseSchema # 使用 fixture
-):
-    initial_order_state = base_mock_order_response_schema.model_copy(update={
-        "status": "PendingConfirmation"
-    })
-    mock_order_dal.get_order_by_id.side_effect = [initial_order_state, None] # Simulate order not found after confirmation
-    mock_order_dal.confirm_order.return_value = None
+    # sp_ConfirmOrder checks existence itself; the service no longer fetches the order first
+    mock_order_dal.confirm_order.side_effect = NotFoundError("确认订单失败: 订单不存在或您不是该订单的卖家。")
 
-    with pytest.raises(NotFoundError, match=f"Order with ID {TEST_ORDER_ID} not found after confirmation."):
+    with pytest.raises(NotFoundError):
         await order_service.confirm_order(mock_db_connection, TEST_ORDER_ID, TEST_SELLER_ID)
 
-    assert mock_order_dal.get_order_by_id.call_count == 2
-    mock_order_dal.confirm_order.assert_called_once_with(mock_db_connection, TEST_ORDER_ID, TEST_SELLER_ID) # 添加 seller_id 参数
+    mock_order_dal.get_order_by_id.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_confirm_order_dal_exception_on_confirm(
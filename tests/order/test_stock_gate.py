@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+from app.exceptions import InsufficientStockError
+from app.services.stock_gate import REJECT_INSUFFICIENT, REJECT_SOLD_OUT, StockAdmissionGate, StockGateMetrics
+
+PRODUCT = "product-1"
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def make_gate(clock, **kwargs):
+    return StockAdmissionGate(clock=clock, metrics=StockGateMetrics(MetricsRegistry()), **kwargs)
+
+@pytest.mark.asyncio
+async def test_known_sold_out_product_is_rejected_without_database(clock):
+    gate = make_gate(clock)
+    gate.record_remaining(PRODUCT, 0)
+
+    with pytest.raises(InsufficientStockError):
+        async with gate.admit(PRODUCT, 1):
+            pytest.fail("should not be admitted")
+    assert gate.metrics.rejected.value(REJECT_SOLD_OUT) == 1
+    assert gate.metrics.admitted.value() == 0
+
+@pytest.mark.asyncio
+async def test_insufficient_stock_bounds_larger_orders_only(clock):
+    gate = make_gate(clock)
+    gate.record_insufficient(PRODUCT, 3) # 库存少于 3
+
+    async with gate.admit(PRODUCT, 2):
+        pass
+    with pytest.raises(InsufficientStockError):
+        async with gate.admit(PRODUCT, 3):
+            pass
+    assert gate.metrics.rejected.value(REJECT_INSUFFICIENT) == 1
+
+@pytest.mark.asyncio
+async def test_records_expire_and_can_be_forgotten(clock):
+    gate = make_gate(clock, ttl=5)
+    gate.record_unavailable(PRODUCT)
+    clock.now += 5.1
+    assert gate.known_stock(PRODUCT) is None
+
+    gate.record_unavailable(PRODUCT)
+    gate.forget(PRODUCT)
+    async with gate.admit(PRODUCT, 1):
+        pass
+
+@pytest.mark.asyncio
+async def test_flash_sale_queues_buyers_and_rejects_after_sell_out(clock):
+    gate = make_gate(clock, concurrency=1)
+    stock = [3]
+    in_flight = 0
+    max_in_flight = 0
+
+    async def buyer():
+        nonlocal in_flight, max_in_flight
+        try:
+            async with gate.admit(PRODUCT, 1):
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.001)
+                stock[0] -= 1
+                gate.record_remaining(PRODUCT, stock[0])
+                in_flight -= 1
+            return True
+        except InsufficientStockError:
+            return False
+
+    results = await asyncio.gather(*(buyer() for _ in range(20)))
+
+    assert results.count(True) == 3
+    assert stock[0] == 0
+    assert max_in_flight == 1
+    # 售罄后排队中的请求被直接拒绝，没有再进入 "数据库"
+    assert gate.metrics.admitted.value() == 3
+    assert gate.metrics.rejected.value(REJECT_SOLD_OUT) == 17
+    assert gate.metrics.waiting.value() == 0
+    assert gate._slots == {}
+
+@pytest.mark.asyncio
+async def test_bounds_are_capped(clock):
+    gate = make_gate(clock, max_products=2)
+    for product in ("a", "b", "c"):
+        gate.record_unavailable(product)
+    assert list(gate._bounds) == ["b", "c"]
@@ -8,7 +8,7 @@ from app.services.product_service import ProductService
 from app.schemas.product import ProductCreate, ProductUpdate, Product
 from unittest.mock import AsyncMock, MagicMock, ANY
 from fastapi import Depends
-from app.dal.connection import get_db_connection
+from app.dal.connection import get_db_connection, get_read_only_db_connection
 from app.dependencies import (
     get_product_service as get_product_service_dependency,
     get_current_user as get_current_user_dependency,
@@ -187,6 +187,7 @@ def client(
         yield mock_db_connection
 
     app.dependency_overrides[get_db_connection] = override_get_db_connection_async
+    app.dependency_overrides[get_read_only_db_connection] = override_get_db_connection_async
     app.dependency_overrides[get_current_user_dependency] = mock_get_current_user_override
     app.dependency_overrides[get_current_active_admin_user_dependency] = mock_get_current_active_admin_user_override
     app.dependency_overrides[get_current_authenticated_user_dependency] = mock_get_current_authenticated_user_override
@@ -0,0 +1,80 @@
+import pytest
+import hashlib
+import io
+import os
+
+from starlette.datastructures import UploadFile
+
+from app.utils import file_upload
+from app.utils.file_upload import store_upload_file, save_upload_file, write_upload_to_temp, upload_url_for, content_addressed_path
+from app.exceptions import FileTooLargeError
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Redirect uploads into a temporary directory."""
+    monkeypatch.setattr(file_upload, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+def make_upload(content: bytes, filename: str = "photo.jpg", size=None) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename, size=size)
+
+@pytest.mark.asyncio
+async def test_store_upload_file_streams_content_and_hash(upload_dir):
+    content = os.urandom(3 * 1024 + 17)
+    saved = await store_upload_file(make_upload(content))
+
+    sha256 = hashlib.sha256(content).hexdigest()
+    assert saved.path == os.path.join(str(upload_dir), sha256[:2], sha256[2:4], f"{sha256}.jpg")
+    assert saved.size == len(content)
+    assert saved.sha256 == sha256
+    assert saved.deduplicated is False
+    with open(saved.path, "rb") as f:
+        assert f.read() == content
+    # 不应残留临时文件
+    assert [p.name for p in upload_dir.iterdir()] == [sha256[:2]]
+
+@pytest.mark.asyncio
+async def test_store_upload_file_deduplicates_identical_content(upload_dir):
+    content = b"same photo bytes"
+    first = await store_upload_file(make_upload(content, filename="a.JPEG"))
+    second = await store_upload_file(make_upload(content, filename="b.jpg"))
+
+    assert first.path == second.path
+    assert first.deduplicated is False
+    assert second.deduplicated is True
+    assert sorted(p.name for p in upload_dir.rglob("*") if p.is_file()) == [os.path.basename(first.path)]
+
+def test_content_addressed_path_and_url(upload_dir):
+    sha256 = "ab" * 32
+    relative_path = content_addressed_path(sha256, ".png")
+    assert relative_path == os.path.join("ab", "ab", f"{sha256}.png")
+    assert upload_url_for(os.path.join(str(upload_dir), relative_path)) == f"/uploads/ab/ab/{sha256}.png"
+
+@pytest.mark.asyncio
+async def test_write_upload_to_temp_uses_small_chunks(upload_dir):
+    content = b"x" * 1000
+    written = await write_upload_to_temp(make_upload(content), str(upload_dir), chunk_size=64)
+    assert written.size == 1000
+    assert written.temp_path.endswith(".part")
+    assert os.path.exists(written.temp_path)
+
+@pytest.mark.asyncio
+async def test_store_upload_file_rejects_declared_oversize(upload_dir):
+    upload = make_upload(b"x" * 10, size=10_000)
+    with pytest.raises(FileTooLargeError):
+        await store_upload_file(upload, max_size=100)
+    assert list(upload_dir.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_store_upload_file_aborts_when_stream_exceeds_limit(upload_dir):
+    # size 未知时，应在写入过程中发现超限并清理临时文件
+    upload = make_upload(b"x" * 1000)
+    with pytest.raises(FileTooLargeError):
+        await store_upload_file(upload, max_size=100)
+    assert list(upload_dir.iterdir()) == []
+
+@pytest.mark.asyncio
+async def test_save_upload_file_returns_path(upload_dir):
+    path = await save_upload_file(make_upload(b"hello", filename="a.png"))
+    assert path.endswith(".png")
+    assert os.path.exists(path)
@@ -0,0 +1,61 @@
+import pytest
+import os
+
+from app.utils import image_processing
+from app.utils.image_processing import derivative_paths, thumbnail_url_for, generate_image_derivatives
+
+PIL = pytest.importorskip("PIL")
+from PIL import Image
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    """Redirect uploads into a temporary directory."""
+    monkeypatch.setattr(image_processing, "UPLOAD_DIR", str(tmp_path))
+    return tmp_path
+
+@pytest.fixture(autouse=True)
+def shutdown_pool():
+    yield
+    image_processing.shutdown_image_pool()
+
+def test_derivative_paths():
+    assert derivative_paths("uploads/abc.jpg") == ("uploads/abc_thumb.webp", "uploads/abc.webp")
+    # 原图已是 WebP 时不重复生成全尺寸版本
+    assert derivative_paths("uploads/abc.webp") == ("uploads/abc_thumb.webp", "uploads/abc.webp")
+
+def test_thumbnail_url_falls_back_to_original(upload_dir):
+    assert thumbnail_url_for("/uploads/missing.jpg") == "/uploads/missing.jpg"
+    assert thumbnail_url_for("https://cdn.example.com/a.jpg") == "https://cdn.example.com/a.jpg"
+    assert thumbnail_url_for(None) is None
+
+def test_thumbnail_url_for_content_addressed_upload_does_not_stat(upload_dir, monkeypatch):
+    def fail(*args):
+        raise AssertionError("thumbnail_url_for must not touch the filesystem")
+    monkeypatch.setattr(os.path, "exists", fail)
+    monkeypatch.setattr(os, "stat", fail)
+
+    sha = "ab" * 32
+    assert thumbnail_url_for(f"/uploads/ab/ab/{sha}.jpg") == f"/uploads/ab/ab/{sha}_thumb.webp"
+    assert thumbnail_url_for(f"/uploads/ab/ab/{sha}") == f"/uploads/ab/ab/{sha}_thumb.webp"
+    assert thumbnail_url_for("/uploads/photo.jpg") == "/uploads/photo.jpg"
+
+@pytest.mark.asyncio
+async def test_generate_image_derivatives(upload_dir):
+    source = upload_dir / "photo.jpg"
+    Image.new("RGB", (1200, 800), (200, 30, 30)).save(source, "JPEG")
+
+    result = await generate_image_derivatives(str(source))
+
+    assert result is not None
+    with Image.open(result["thumbnail"]) as thumb:
+        assert max(thumb.size) == image_processing.settings.IMAGE_THUMBNAIL_SIZE
+        assert thumb.format == "WEBP"
+    with Image.open(result["webp"]) as webp:
+        assert webp.size == (1200, 800)
+
+@pytest.mark.asyncio
+async def test_generate_image_derivatives_ignores_invalid_image(upload_dir):
+    source = upload_dir / "broken.png"
+    source.write_bytes(b"not an image")
+    assert await generate_image_derivatives(str(source)) is None
+    assert not os.path.exists(upload_dir / "broken_thumb.webp")
@@ -0,0 +1,93 @@
+import pytest
+import os
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from app.utils.uploads_static import UploadsStaticFiles, parse_range
+
+SHA256 = "0f" * 32
+CONTENT = bytes(range(256)) * 4
+
+@pytest.fixture
+def uploads_dir(tmp_path):
+    shard = tmp_path / SHA256[:2] / SHA256[2:4]
+    shard.mkdir(parents=True)
+    (shard / f"{SHA256}.jpg").write_bytes(CONTENT)
+    (shard / f"{SHA256}_thumb.webp").write_bytes(CONTENT[:100])
+    (shard / f"{SHA256}.webp").write_bytes(CONTENT[:200])
+    return tmp_path
+
+def make_client(directory, **kwargs) -> TestClient:
+    app = Starlette(routes=[Mount("/uploads", UploadsStaticFiles(directory=str(directory), **kwargs))])
+    return TestClient(app)
+
+@pytest.fixture
+def client(uploads_dir):
+    return make_client(uploads_dir)
+
+URL = f"/uploads/{SHA256[:2]}/{SHA256[2:4]}/{SHA256}.jpg"
+
+def test_full_response_has_immutable_cache_headers(client):
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{SHA256}"'
+    assert "immutable" in response.headers["cache-control"]
+    assert response.headers["content-type"] == "image/jpeg"
+    assert response.headers["accept-ranges"] == "bytes"
+
+@pytest.mark.parametrize("name", [f"{SHA256}_thumb.webp", f"{SHA256}.webp"])
+def test_derivatives_do_not_reuse_source_hash_etag(client, name):
+    # 派生图片的内容取决于缩略图尺寸 / WebP 质量设置，不能沿用原图哈希作为强 ETag
+    response = client.get(f"/uploads/{SHA256[:2]}/{SHA256[2:4]}/{name}")
+    assert response.status_code == 200
+    assert SHA256 not in response.headers["etag"]
+    assert "immutable" not in response.headers["cache-control"]
+    assert response.headers["cache-control"] == "public, max-age=86400"
+
+def test_if_none_match_returns_304(client):
+    response = client.get(URL, headers={"If-None-Match": f'W/"other", "{SHA256}"'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+def test_if_modified_since_returns_304(client):
+    last_modified = client.get(URL).headers["last-modified"]
+    response = client.get(URL, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304
+
+def test_range_request(client):
+    response = client.get(URL, headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+
+def test_suffix_range_and_if_range_mismatch(client):
+    response = client.get(URL, headers={"Range": "bytes=-5"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[-5:]
+
+    # If-Range 与当前 ETag 不一致时返回完整内容
+    response = client.get(URL, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert response.content == CONTENT
+
+def test_unsatisfiable_range_returns_416(client):
+    response = client.get(URL, headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+def test_accel_redirect(uploads_dir):
+    client = make_client(uploads_dir, accel_redirect_prefix="/internal-uploads/")
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-accel-redirect"] == f"/internal-uploads/{SHA256[:2]}/{SHA256[2:4]}/{SHA256}.jpg"
+
+def test_parse_range():
+    assert parse_range("bytes=0-", 100) == (0, 99)
+    assert parse_range("bytes=90-200", 100) == (90, 99)
+    assert parse_range("bytes=0-1,5-6", 100) is None
+    with pytest.raises(ValueError):
+        parse_range("bytes=100-", 100)
@@ -7,7 +7,7 @@ from fastapi import Depends, status, HTTPException # Import HTTPException
 import pytest_mock
 # from unittest.mock import patch # Not strictly needed for this approach
 # from app.dependencies import get_user_service, get_current_user, get_current_active_admin_user # Import dependencies from here
-from app.dal.connection import get_db_connection # Import get_db_connection from its correct location
+from app.dal.connection import get_db_connection, get_read_only_db_connection # Import get_db_connection from its correct location
 # Import authentication dependencies directly from app.dependencies for type hinting if needed, but patch in routers module
 from app.dependencies import get_user_service as get_user_service_dependency, get_current_user as get_current_user_dependency, get_current_active_admin_user as get_current_active_admin_user_dependency, get_current_authenticated_user # Import get_current_active_admin_user directly
 from app.dependencies import get_current_active_admin_user # Import get_current_active_admin_user for direct use in test overrides
@@ -102,6 +102,7 @@ def client(mock_user_service, mocker, mock_settings): # Add mock_settings to cli
     # Set up dependency overrides using the simple mock functions
     app.dependency_overrides[get_user_service_dependency] = lambda: mock_user_service
     app.dependency_overrides[get_db_connection] = override_get_db_connection_async
+    app.dependency_overrides[get_read_only_db_connection] = override_get_db_connection_async
     # Override authentication dependencies with our simple mock functions
     app.dependency_overrides[get_current_user_dependency] = mock_get_current_user_override
     app.dependency_overrides[get_current_active_admin_user_dependency] = mock_get_current_active_admin_user_override
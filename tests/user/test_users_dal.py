@@ -5,6 +5,7 @@ from uuid import uuid4, UUID
 from unittest.mock import AsyncMock, patch, MagicMock
 from app.dal.user_dal import UserDAL # Import the new DAL class
 from app.dal.base import execute_query # Import the actual execute_query from base.py
+from app.dal.row_mappers import get_row_mapper
 from app.exceptions import NotFoundError, IntegrityError, DALError, ForbiddenError
 import asyncio # For explicit async calls
 from datetime import datetime, timedelta, timezone # Needed for token expiration tests
@@ -552,7 +553,8 @@ async def test_get_all_users_success(
         mock_db_connection,
         "{CALL sp_GetAllUsers(?)}",
         (admin_id,),
-        fetchall=True
+        fetchall=True,
+        row_mapper=get_row_mapper("sp_GetAllUsers")
     )
     assert len(users) == 2
     assert users[0]["username"] == "user1"
@@ -576,7 +578,8 @@ async def test_admin_get_all_users_forbidden(
         mock_db_connection,
         "{CALL sp_GetAllUsers(?)}",
         (admin_id,),
-        fetchall=True
+        fetchall=True,
+        row_mapper=get_row_mapper("sp_GetAllUsers")
     )
 
 @pytest.mark.asyncio
@@ -597,7 +600,8 @@ async def test_admin_get_all_users_not_found(
         mock_db_connection,
         "{CALL sp_GetAllUsers(?)}",
         (admin_id,),
-        fetchall=True
+        fetchall=True,
+        row_mapper=get_row_mapper("sp_GetAllUsers")
     )
     assert users == []
 